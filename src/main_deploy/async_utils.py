@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import os
+import subprocess
+import threading
+from typing import Awaitable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    This is the thin sync wrapper used by the blocking API (generate_project, run_test_generation_and_execution, ...).
+    If the calling thread already runs an event loop (e.g. a sync API called from inside a coroutine or
+    a notebook), the coroutine is run on a private loop in a helper thread instead of failing.
+    The helper thread runs in a copy of the caller's context, so trace spans keep their parent.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def runner():
+        try:
+            outcome['result'] = context.run(asyncio.run, awaitable)
+        except BaseException as e:  # re-raised on the calling thread
+            outcome['error'] = e
+
+    thread = threading.Thread(target=runner, name="run-sync")
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def script_command(script_path: str) -> List[str]:
+    """argv for running a generated .bat/.sh script without going through a shell string"""
+    if script_path.lower().endswith(('.bat', '.cmd')) and os.name == 'nt':
+        return ["cmd.exe", "/c", script_path]
+    return [script_path]
+
+
+async def run_subprocess(args: List[str], cwd: Optional[str] = None, timeout: Optional[float] = None,
+                         env: Optional[Dict[str, str]] = None, check: bool = False) -> subprocess.CompletedProcess:
+    """
+    asyncio equivalent of subprocess.run(args, capture_output=True, text=True).
+
+    Raises subprocess.TimeoutExpired (after killing the process) and, with check=True,
+    subprocess.CalledProcessError, so callers keep their existing error handling.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, cwd=cwd, env=env,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.communicate()
+        raise subprocess.TimeoutExpired(args, timeout)
+
+    result = subprocess.CompletedProcess(
+        args, process.returncode,
+        stdout.decode('utf-8', errors='replace'),
+        stderr.decode('utf-8', errors='replace')
+    )
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, args, result.stdout, result.stderr)
+    return result
@@ -1,8 +1,11 @@
 import logging
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
 import config
+from llm_cache import acached_llm_call
+from async_utils import run_sync
+from rate_limiter import get_rate_limiter
+from llm_clients import chat_model
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +18,25 @@ class BaseAgent:
         logger.info(f"Initializing {self.__class__.__name__} with model: {self.model_name}")
 
         try:
-            self.llm = ChatGoogleGenerativeAI(
-                model=self.model_name,
-                google_api_key=config.GEMINI_API_KEY,
-                temperature=0.3,
-                convert_system_message_to_human=True
-            )
+            self.llm = chat_model(self.model_name, temperature=0.3, convert_system_message_to_human=True)
             self.prompt = ChatPromptTemplate.from_template(prompt_template)
             #chain using LCEL
             self.chain = self.prompt | self.llm | StrOutputParser()
 
         except Exception as e:
             logger.critical(f"Failed to initialize LangChain components for {self.__class__.__name__}: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+    def invoke_chain(self, inputs: dict, validator=None) -> str:
+        """Blocking wrapper around ainvoke_chain."""
+        return run_sync(self.ainvoke_chain(inputs, validator=validator))
+
+    async def ainvoke_chain(self, inputs: dict, validator=None) -> str:
+        """Run the chain through the shared LLM response cache, keyed on the rendered prompt."""
+        rendered_prompt = self.prompt.format(**inputs)
+        return await acached_llm_call(
+            rendered_prompt,
+            self.model_name,
+            self.llm.temperature,
+            lambda: get_rate_limiter().acall(lambda: self.chain.ainvoke(inputs), estimated_tokens=len(rendered_prompt) // 4),
+            validator=validator
+        )
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from async_utils import run_sync
+from run_journal import PHASES
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRequest:
+    """One project of a batch: a line of the input JSONL"""
+
+    def __init__(self, request_id: str, description: Optional[str], line: int, error: Optional[str] = None):
+        self.request_id = request_id
+        self.description = description
+        self.line = line
+        self.error = error
+
+
+def read_requests(path: str) -> List[BatchRequest]:
+    """
+    Read project descriptions from JSONL.
+
+    Each line is an object with a `description` (or `title` and `body`) and an optional `id`
+    / `request_id`. Lines that cannot be used are returned with `error` set so they show up in
+    the results instead of disappearing.
+    """
+    requests, seen_ids = [], set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            request_id = f"project-{line_number:03d}"
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                requests.append(BatchRequest(request_id, None, line_number, f"invalid JSON: {e}"))
+                continue
+            if not isinstance(item, dict):
+                requests.append(BatchRequest(request_id, None, line_number, "line is not a JSON object"))
+                continue
+            request_id = str(item.get('id') or item.get('request_id') or request_id)
+            if request_id in seen_ids:
+                request_id = f"{request_id}-line{line_number}"
+            seen_ids.add(request_id)
+            description = item.get('description') or "\n\n".join(
+                part for part in (item.get('title'), item.get('body')) if part)
+            if not description or not str(description).strip():
+                requests.append(BatchRequest(request_id, None, line_number, "no description, title or body"))
+                continue
+            requests.append(BatchRequest(request_id, str(description).strip(), line_number))
+    return requests
+
+
+def parse_phase_limits(text: Optional[str]) -> Dict[str, int]:
+    """'coding=2,testing=2' -> {'coding': 2, 'testing': 2}"""
+    limits = {}
+    for part in (text or "").split(','):
+        if not part.strip():
+            continue
+        phase, _, value = part.partition('=')
+        phase = phase.strip()
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase '{phase}' in phase limits (expected one of {', '.join(PHASES)})")
+        limits[phase] = max(1, int(value))
+    return limits
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """Latest result per request id from an earlier (possibly interrupted) batch"""
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, dict) and result.get('id'):
+                results[result['id']] = result
+    return results
+
+
+class BatchFactory:
+    """
+    Runs many projects through the software factory concurrently in one process.
+
+    At most `max_projects` projects are in flight, and `phase_limits` bounds how many of them
+    are in a given phase at once (e.g. a couple in coding, one in debugging, while others are
+    still writing their specification). All projects share the process-wide rate limiter and
+    LLM response cache, so the quota is spread over the batch instead of idling. Every project
+    writes to `<output_root>/<id>/`, and its result is appended to `results_path` as soon as it
+    finishes.
+
+    Running the same batch again skips the projects that completed and resumes the failed ones
+    from their run journal.
+    """
+
+    def __init__(self, output_root: str, results_path: str, max_projects: int = 4,
+                 phase_limits: Optional[Dict[str, int]] = None,
+                 run_project: Optional[Callable[..., Awaitable[dict]]] = None):
+        self.output_root = output_root
+        self.results_path = results_path
+        self.max_projects = max(1, max_projects)
+        self.phase_limits = phase_limits or {}
+        self._run_project = run_project
+
+    async def arun(self, requests: List[BatchRequest]) -> List[dict]:
+        previous = load_results(self.results_path)
+        project_slots = asyncio.Semaphore(self.max_projects)
+        phase_slots = {phase: asyncio.Semaphore(limit) for phase, limit in self.phase_limits.items()}
+        run_project = self._run_project
+        if run_project is None:
+            from main import arun_autonomous_software_factory
+            run_project = arun_autonomous_software_factory
+
+        async def run_one(request: BatchRequest) -> dict:
+            earlier = previous.get(request.request_id)
+            if earlier and earlier.get('status') == 'completed':
+                logger.info(f"⏭️ [{request.request_id}] already completed in {self.results_path}")
+                return earlier
+            if request.error:
+                return self._record(request, {'status': 'invalid', 'error': request.error}, 0.0)
+
+            async with project_slots:
+                resume_run_id = earlier.get('run_id') if earlier else None
+                logger.info(f"🏭 [{request.request_id}] {'resuming ' + resume_run_id if resume_run_id else 'starting'}")
+                started = time.perf_counter()
+                try:
+                    if resume_run_id:
+                        summary = await run_project(resume_run_id=resume_run_id, phase_slots=phase_slots)
+                    else:
+                        summary = await run_project(request.description, output_dir=self._output_dir(request),
+                                                    phase_slots=phase_slots)
+                except Exception as e:
+                    logger.error(f"❌ [{request.request_id}] crashed: {e}", exc_info=True)
+                    summary = {'status': 'failed', 'error': str(e)}
+                return self._record(request, summary or {'status': 'failed'}, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_one(request) for request in requests))
+        completed = sum(1 for result in results if result.get('status') == 'completed')
+        logger.info(f"🏁 Batch finished: {completed}/{len(results)} projects completed in {time.perf_counter() - started:.1f}s "
+                    f"(results: {self.results_path})")
+        return results
+
+    def _output_dir(self, request: BatchRequest) -> str:
+        return os.path.join(self.output_root, re.sub(r'[^A-Za-z0-9_.-]', '_', request.request_id))
+
+    def _record(self, request: BatchRequest, summary: dict, seconds: float) -> dict:
+        result = {
+            'id': request.request_id,
+            'line': request.line,
+            'description': (request.description or '')[:200],
+            'output_dir': self._output_dir(request),
+            'seconds': round(seconds, 1),
+        }
+        result.update(summary)
+        os.makedirs(os.path.dirname(os.path.abspath(self.results_path)), exist_ok=True)
+        with open(self.results_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, default=str) + "\n")
+        status_icon = "✅" if result.get('status') == 'completed' else "❌"
+        logger.info(f"{status_icon} [{request.request_id}] {result.get('status')} in {seconds:.1f}s")
+        return result
+
+
+async def arun_batch(requests_path: str, results_path: Optional[str] = None, output_root: Optional[str] = None,
+                     max_projects: Optional[int] = None, phase_workers: Optional[str] = None) -> List[dict]:
+    """Run every project of a requests JSONL; defaults come from config.py (BATCH_*)"""
+    import config
+    config.init()
+    batch_name = os.path.splitext(os.path.basename(requests_path))[0]
+    output_root = output_root or os.path.join(config.BASE_OUTPUT_DIR, 'batches', batch_name)
+    factory = BatchFactory(
+        output_root=output_root,
+        results_path=results_path or os.path.join(output_root, 'results.jsonl'),
+        max_projects=max_projects or config.BATCH_MAX_PROJECTS,
+        phase_limits=parse_phase_limits(config.BATCH_PHASE_WORKERS if phase_workers is None else phase_workers),
+    )
+    requests = read_requests(requests_path)
+    logger.info(f"📦 Batch '{batch_name}': {len(requests)} projects, {factory.max_projects} at a time, "
+                f"phase limits {factory.phase_limits or 'none'}, output in {output_root}")
+    return await factory.arun(requests)
+
+
+def run_batch(requests_path: str, **kwargs) -> List[dict]:
+    return run_sync(arun_batch(requests_path, **kwargs))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the full main_deploy pipeline (specification -> design -> code -> tests -> debugging), offline.
+
+Every LLM call goes to the deterministic fake LLM (LLM_PROVIDER=fake, see fake_llm.py), which
+replays the spec and design of a fixture pair (<name>.spec.json / <name>.design.json, e.g. the
+samples in outputs/) and synthesizes code and tests. No API key or network is needed. Each
+fixture runs in a fresh subprocess, so peak RSS and module-level state are per run; the project
+environment setup (venv + pip install) is skipped and the LLM response cache is bypassed.
+
+Reports wall time, LLM calls, prompt/response tokens, injected 429s and malformed responses,
+the phases that completed and peak RSS. With --baseline, exits with status 1 when wall time,
+calls or tokens of a fixture grew by more than --max-regression.
+
+Usage: python benchmarks/bench_pipeline.py [--fixtures ../../outputs] [--latency 0.05]
+           [--rate-limit-rate 0.05] [--malformed-rate 0.05] [--save bench.json]
+           [--baseline bench.json] [--max-regression 0.2] [--keep]
+       Use --fixtures synthetic to run the built-in synthetic spec/design instead of fixture files.
+       Each run works in a temporary directory that is deleted afterwards; --keep leaves it in place.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN_DEPLOY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(MAIN_DEPLOY_DIR)), "outputs")
+RESULT_PREFIX = "BENCH_RESULT "
+REGRESSION_METRICS = ("wall_seconds", "calls", "tokens")
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+def find_fixtures(fixtures_dir):
+    prefixes = []
+    for spec_path in sorted(glob.glob(os.path.join(fixtures_dir, "*.spec.json"))):
+        prefix = spec_path[:-len(".spec.json")]
+        if os.path.exists(prefix + ".design.json"):
+            prefixes.append(prefix)
+    return prefixes
+
+def prepare_fixture(prefix, work_dir):
+    """Copy a fixture pair into work_dir; older designs without a root directory name get one from the file name"""
+    with open(prefix + ".spec.json", "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    with open(prefix + ".design.json", "r", encoding="utf-8") as f:
+        design = json.load(f)
+    name = os.path.basename(prefix)
+    folder_structure = design.setdefault("folder_Structure", {})
+    folder_structure.setdefault("root_Project_Directory_Name", name)
+    target = os.path.join(work_dir, "fixture", name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target + ".spec.json", "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2)
+    with open(target + ".design.json", "w", encoding="utf-8") as f:
+        json.dump(design, f, indent=2)
+    description = spec.get("metadata", {}).get("original_description") or spec.get("project_Overview", {}).get("project_Purpose", name)
+    return target, description
+
+def run_one(args):
+    """Run the pipeline once in this process and print one result line; the work directory is removed unless --keep"""
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        _run_in(work_dir, args)
+    finally:
+        if args.keep:
+            print(f"Kept the work directory {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def _run_in(work_dir, args):
+    description = "create a simple notes web app"
+    if args.run_one != "synthetic":
+        fixture_prefix, description = prepare_fixture(args.run_one, work_dir)
+        os.environ["FAKE_LLM_FIXTURE"] = fixture_prefix
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "PERSISTED_BASE_OUTPUT_DIR": os.path.join(work_dir, "out"),
+        "PERSISTED_PYTHON_PATH": sys.executable,
+        "LLM_CACHE_BYPASS": "true",
+        "SETUP_PROJECT_ENV": "false",
+        "GEMINI_RPM": str(args.rpm),
+        "FAKE_LLM_LATENCY": str(args.latency),
+        "FAKE_LLM_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "FAKE_LLM_MALFORMED_RATE": str(args.malformed_rate),
+    })
+    sys.path.append(MAIN_DEPLOY_DIR)
+
+    import asyncio
+    import config
+    import fake_llm
+    from main import arun_autonomous_software_factory
+    from run_journal import RunJournal
+
+    started = time.perf_counter()
+    asyncio.run(arun_autonomous_software_factory(description))
+    wall = time.perf_counter() - started
+
+    stats = fake_llm.get_fake_backend().stats()
+    runs = RunJournal.list_runs(config.BASE_OUTPUT_DIR)
+    phases = runs[0]["phases"] if runs else {}
+    result = {
+        "fixture": os.path.basename(args.run_one),
+        "wall_seconds": round(wall, 3),
+        "calls": stats["calls"],
+        "tokens": stats["prompt_tokens"] + stats["response_tokens"],
+        "prompt_tokens": stats["prompt_tokens"],
+        "response_tokens": stats["response_tokens"],
+        "rate_limited": stats["rate_limited"],
+        "malformed": stats["malformed"],
+        "calls_by_kind": stats["calls_by_kind"],
+        "completed_phases": [phase for phase, status in phases.items() if status == "completed"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+def run_fixture(prefix, args):
+    command = [sys.executable, os.path.abspath(__file__), "--run-one", prefix,
+               "--latency", str(args.latency), "--rate-limit-rate", str(args.rate_limit_rate),
+               "--malformed-rate", str(args.malformed_rate), "--rpm", str(args.rpm)]
+    if args.keep:
+        command.append("--keep")
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout, cwd=MAIN_DEPLOY_DIR)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"Benchmark run for {prefix} produced no result (exit {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+def compare(results, baseline, max_regression):
+    regressions = []
+    previous = {item["fixture"]: item for item in baseline}
+    for result in results:
+        before = previous.get(result["fixture"])
+        if not before:
+            continue
+        for metric in REGRESSION_METRICS:
+            if before.get(metric) and result[metric] > before[metric] * (1 + max_regression):
+                regressions.append(f"{result['fixture']}: {metric} {before[metric]} -> {result[metric]}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Directory with *.spec.json/*.design.json pairs, or 'synthetic'")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call in seconds")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with a 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of calls answered with malformed code/JSON")
+    parser.add_argument("--rpm", type=float, default=100000, help="GEMINI_RPM for the shared rate limiter during the run")
+    parser.add_argument("--timeout", type=float, default=900, help="Timeout per fixture in seconds")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --save")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative growth of wall time, calls and tokens")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary work directory of each run (generated code, journals)")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args)
+        return
+
+    prefixes = ["synthetic"] if args.fixtures == "synthetic" else find_fixtures(args.fixtures)
+    if not prefixes:
+        parser.error(f"No *.spec.json/*.design.json pairs found in {args.fixtures}")
+
+    results = []
+    print(f"{'fixture':<40} {'wall':>8} {'calls':>6} {'tokens':>9} {'429s':>5} {'bad':>4} {'peak RSS':>9}  phases")
+    for prefix in prefixes:
+        result = run_fixture(prefix, args)
+        results.append(result)
+        rss = f"{result['peak_rss_mb']}MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{result['fixture']:<40} {result['wall_seconds']:>7.2f}s {result['calls']:>6} {result['tokens']:>9} "
+              f"{result['rate_limited']:>5} {result['malformed']:>4} {rss:>9}  {len(result['completed_phases'])}/5")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions above {args.max_regression:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
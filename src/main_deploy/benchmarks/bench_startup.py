@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: startup cost of the main_deploy entry points, from `python -X importtime`.
+
+Each target module is imported in a fresh interpreter (best of --repeat runs). Reports the
+cumulative import time, the heaviest imports it pulled in, and any heavy framework
+(langchain, autogen, the Google clients, ...) that got loaded although no phase ran. Also
+times `run.py --help` end to end.
+
+Exits with status 1 when a target exceeds its budget or loads a heavy framework, so it can
+guard the lazy imports in CI and for short-lived worker processes.
+
+Usage: python benchmarks/bench_startup.py [--targets run,config,main,batch_factory]
+           [--budget main=300] [--default-budget-ms 250] [--repeat 5] [--top 8]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN_DEPLOY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGETS = "run,config,main,batch_factory"
+# Frameworks that only the phases themselves may load
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_google_genai", "autogen", "google.genai",
+                 "google.generativeai", "google.ai", "pydantic", "colorama")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile(module, env):
+    """[(depth, module, self_us, cumulative_us)] for `import module` in a fresh interpreter"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, cwd=MAIN_DEPLOY_DIR, env=env)
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((len(indent) // 2, name, int(self_us), int(cumulative_us)))
+    if completed.returncode != 0:
+        error = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(error[-1] if error else f"exit {completed.returncode}")
+    return rows
+
+def target_rows(rows, module):
+    """The rows of `import module` itself; interpreter startup imports come before it at depth 0"""
+    end = max(index for index, (depth, name, _, _) in enumerate(rows) if depth == 0 and name == module)
+    start = end
+    while start > 0 and rows[start - 1][0] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+def measure(module, env, repeat):
+    best = None
+    for _ in range(repeat):
+        rows = target_rows(import_profile(module, env), module)
+        total_us = rows[-1][3]
+        if best is None or total_us < best[0]:
+            best = (total_us, rows)
+    return best
+
+def heavy_loaded(rows):
+    return sorted({name for _, name, _, _ in rows
+                   if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)})
+
+def top_imports(rows, top):
+    """Direct imports of the target ranked by cumulative time (stdlib included)"""
+    return sorted(((cumulative, name) for depth, name, _, cumulative in rows if depth == 1), reverse=True)[:top]
+
+def time_help(env, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "run.py", "--help"], capture_output=True, cwd=MAIN_DEPLOY_DIR, env=env, check=True)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+def parse_budgets(items):
+    budgets = {}
+    for item in items:
+        module, _, value = item.partition("=")
+        budgets[module.strip()] = float(value)
+    return budgets
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=DEFAULT_TARGETS, help="Comma-separated modules to import")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS", help="Import budget of one target in milliseconds")
+    parser.add_argument("--default-budget-ms", type=float, default=250, help="Budget of the targets without --budget")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per target; the fastest one counts")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imports listed per target")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    budgets = parse_budgets(args.budget)
+    failures = []
+
+    for module in [target.strip() for target in args.targets.split(",") if target.strip()]:
+        budget_ms = budgets.get(module, args.default_budget_ms)
+        try:
+            total_us, rows = measure(module, env, args.repeat)
+        except RuntimeError as e:
+            failures.append(f"{module}: import failed ({e})")
+            print(f"{module:<16} import failed: {e}")
+            continue
+        heavy = heavy_loaded(rows)
+        status = "ok" if total_us / 1000 <= budget_ms and not heavy else "OVER"
+        print(f"{module:<16} {total_us / 1000:8.1f} ms  (budget {budget_ms:.0f} ms, {len(rows)} modules)  {status}")
+        for cumulative_us, name in top_imports(rows, args.top):
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+        if total_us / 1000 > budget_ms:
+            failures.append(f"{module}: {total_us / 1000:.1f} ms > {budget_ms:.0f} ms")
+        if heavy:
+            failures.append(f"{module}: loads {', '.join(heavy)} at import time")
+
+    try:
+        print(f"\nrun.py --help: {time_help(env, args.repeat) * 1000:.0f} ms (median of {args.repeat})")
+    except subprocess.CalledProcessError as e:
+        failures.append(f"run.py --help failed (exit {e.returncode})")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll targets within budget")
+
+if __name__ == "__main__":
+    main()
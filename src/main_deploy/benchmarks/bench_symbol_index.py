@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: ProjectContext symbol bookkeeping at 500 files / 5,000 symbols.
+
+Compares the SymbolIndex used by ProjectContext with the previous list-scanning
+approach (reproduced below as LegacySymbols) for the operations done per file:
+register definitions/imports, build forbidden redefinitions, find related files.
+
+Usage: python benchmarks/bench_symbol_index.py [--files 500] [--symbols 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to path to import symbol_index
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from symbol_index import SymbolIndex
+
+class LegacySymbols:
+    """The dict/list scanning implementation ProjectContext used before SymbolIndex"""
+
+    def __init__(self, file_dependencies):
+        self.defined_classes = {}
+        self.imports_used = {}
+        self.file_dependencies = file_dependencies
+
+    def add_class(self, name, file_path):
+        self.defined_classes[name] = file_path
+
+    def add_import(self, file_path, statement):
+        if file_path not in self.imports_used:
+            self.imports_used[file_path] = []
+        if statement not in self.imports_used[file_path]:
+            self.imports_used[file_path].append(statement)
+
+    def forbidden(self, current_file_path):
+        return [f"class {name}" for name, path in self.defined_classes.items() if path != current_file_path]
+
+    def exports_for(self, file_path):
+        return [name for name, path in self.defined_classes.items() if path == file_path]
+
+    def related(self, file_path):
+        related = [other for other, deps in self.file_dependencies.items() if file_path in deps]
+        related.extend(self.file_dependencies.get(file_path, []))
+        return list(set(related))
+
+class IndexedSymbols:
+    def __init__(self, file_dependencies):
+        self.index = SymbolIndex()
+        self.file_dependencies = file_dependencies
+        self.dependents = {}
+        for other, deps in file_dependencies.items():
+            for dep in deps:
+                self.dependents.setdefault(dep, []).append(other)
+
+    def add_class(self, name, file_path):
+        self.index.add_class(name, file_path)
+
+    def add_import(self, file_path, statement):
+        self.index.add_import(file_path, statement)
+
+    def forbidden(self, current_file_path):
+        return self.index.forbidden_class_patterns(current_file_path)
+
+    def exports_for(self, file_path):
+        return self.index.exports_for(file_path)['classes']
+
+    def related(self, file_path):
+        return list(set(self.dependents.get(file_path, []) + self.file_dependencies.get(file_path, [])))
+
+def build_project(num_files, num_symbols):
+    files = [f"backend/module_{i}.py" for i in range(num_files)]
+    per_file = max(1, num_symbols // num_files)
+    file_dependencies = {path: files[max(0, i - 3):i] for i, path in enumerate(files)}
+    symbols = {path: [f"Symbol_{i}_{j}" for j in range(per_file)] for i, path in enumerate(files)}
+    imports = {path: [f"from backend.module_{k} import Symbol_{k}_0" for k in range(max(0, i - 10), i)] for i, path in enumerate(files)}
+    return files, file_dependencies, symbols, imports
+
+def simulate_generation(impl_cls, files, file_dependencies, symbols, imports):
+    """One pass in generation order: build prompt context for a file, then register what it defined"""
+    impl = impl_cls(file_dependencies)
+    start = time.perf_counter()
+    for path in files:
+        impl.forbidden(path)
+        impl.related(path)
+        for dep in file_dependencies[path]:
+            impl.exports_for(dep)
+        for name in symbols[path]:
+            impl.add_class(name, path)
+        for statement in imports[path] * 2:  # duplicates exercise the membership check
+            impl.add_import(path, statement)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--files', type=int, default=500)
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    project = build_project(args.files, args.symbols)
+    print(f"Project: {args.files} files, {args.symbols} symbols")
+    results = {}
+    for label, impl_cls in (("legacy scan", LegacySymbols), ("SymbolIndex", IndexedSymbols)):
+        best = min(simulate_generation(impl_cls, *project) for _ in range(args.repeat))
+        results[label] = best
+        print(f"  {label:<12} {best * 1000:8.1f} ms  ({best / args.files * 1e6:7.1f} us/file)")
+    print(f"  speedup      {results['legacy scan'] / results['SymbolIndex']:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import ast
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PYDANTIC_MARKERS = ('pydantic', 'BaseModel')
+SQLALCHEMY_MARKERS = ('sqlalchemy', 'declarative_base', 'Column', 'flask_sqlalchemy')
+
+
+class CodeAnalysis:
+    """
+    Result of a single parse of a generated file, shared by every consumer
+    (syntax check, ContentClassifier, ImportAnalyzer, ProjectContext).
+
+    Instances are cached and shared between callers: treat them as read-only.
+    """
+
+    def __init__(self, file_path: str, content: str):
+        self.file_path = file_path
+        self.content = content
+        self.is_python = file_path.endswith('.py')
+        self.tree: Optional[ast.Module] = None
+        self.syntax_error: Optional[str] = None
+        self.imports: List[Dict] = []        # {statement, module, level, names, is_from, lineno, end_lineno}
+        self.classes: List[Dict] = []        # top-level only: {name, bases, lineno, is_db_model, is_schema}
+        self.functions: List[str] = []       # top-level functions (sync and async)
+        self.assignments: List[str] = []     # top-level names bound by assignment (Base, engine, router, ...)
+        self.exported_names: List[str] = []
+        self.contains_pydantic = False
+        self.contains_sqlalchemy = False
+
+    @property
+    def class_names(self) -> List[str]:
+        return [cls['name'] for cls in self.classes]
+
+    @property
+    def import_statements(self) -> List[str]:
+        return [imp['statement'] for imp in self.imports]
+
+    @property
+    def schema_classes(self) -> List[str]:
+        return [cls['name'] for cls in self.classes if cls['is_schema']]
+
+    @property
+    def model_classes(self) -> List[str]:
+        return [cls['name'] for cls in self.classes if cls['is_db_model']]
+
+    def has_import(self, module: str, name: Optional[str] = None) -> bool:
+        """True if `from module import name` (or `import module` when name is None) is present"""
+        for imp in self.imports:
+            if name is None and not imp['is_from'] and any(alias == module for alias, _ in imp['names']):
+                return True
+            if name is not None and imp['is_from'] and imp['module'] == module and any(alias == name for alias, _ in imp['names']):
+                return True
+        return False
+
+
+def _dotted_name(node) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted_name(node.value)
+        return f"{parent}.{node.attr}" if parent else node.attr
+    if isinstance(node, ast.Call):
+        return _dotted_name(node.func)
+    if isinstance(node, ast.Subscript):
+        return _dotted_name(node.value)
+    return ''
+
+
+def _statement_source(lines: List[str], node) -> str:
+    """Source text of a statement without trailing comments (joined back if it spans several lines)"""
+    segment = lines[node.lineno - 1:node.end_lineno]
+    if len(segment) == 1:
+        return segment[0][node.col_offset:node.end_col_offset].strip()
+    segment = list(segment)
+    segment[0] = segment[0][node.col_offset:]
+    segment[-1] = segment[-1][:node.end_col_offset]
+    return '\n'.join(segment).strip()
+
+
+def _analyze_import(lines: List[str], node) -> Dict:
+    is_from = isinstance(node, ast.ImportFrom)
+    return {
+        'statement': _statement_source(lines, node),
+        'module': (node.module or '') if is_from else None,
+        'level': node.level if is_from else 0,
+        'names': [(alias.name, alias.asname) for alias in node.names],
+        'is_from': is_from,
+        'lineno': node.lineno,
+        'end_lineno': node.end_lineno,
+    }
+
+
+def _is_db_base(base: str) -> bool:
+    """SQLAlchemy declarative bases (`Base`, `DeclarativeBase`) and Flask-SQLAlchemy's `db.Model`"""
+    return base.rsplit('.', 1)[-1] in ('Base', 'Model', 'DeclarativeBase')
+
+
+def _analyze_class(node: ast.ClassDef, schema_names: set, model_names: set) -> Dict:
+    bases = [_dotted_name(base) for base in node.bases]
+    base_names = {base.rsplit('.', 1)[-1] for base in bases}
+    has_tablename = any(
+        isinstance(stmt, ast.Assign) and any(isinstance(t, ast.Name) and t.id == '__tablename__' for t in stmt.targets)
+        for stmt in node.body
+    )
+    is_schema = 'BaseModel' in base_names or bool(base_names & schema_names)
+    is_db_model = not is_schema and (
+        has_tablename
+        or any(_is_db_base(base) for base in bases)
+        or bool(base_names & model_names)
+        or 'Model' in node.name
+    )
+    return {
+        'name': node.name,
+        'bases': bases,
+        'lineno': node.lineno,
+        'is_db_model': is_db_model,
+        'is_schema': is_schema,
+    }
+
+
+@lru_cache(maxsize=512)
+def analyze_code(file_path: str, content: str) -> CodeAnalysis:
+    """
+    Parse `content` once and extract everything downstream consumers need.
+    Results are memoized on (file_path, content), so the syntax check in the generator
+    and the later validation/context passes share the same parse.
+    """
+    analysis = CodeAnalysis(file_path, content)
+    if not analysis.is_python:
+        return analysis
+
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        analysis.syntax_error = f"{e.msg} (line {e.lineno})"
+        logger.debug(f"Could not parse {file_path}: {analysis.syntax_error}")
+        return analysis
+    analysis.tree = tree
+    lines = content.splitlines()
+
+    # Imports anywhere in the module (including inside functions / try blocks)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            analysis.imports.append(_analyze_import(lines, node))
+    analysis.imports.sort(key=lambda imp: imp['lineno'])
+
+    schema_names, model_names = set(), set()
+    explicit_all = None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            cls = _analyze_class(node, schema_names, model_names)
+            if cls['is_schema']:
+                schema_names.add(cls['name'])
+            elif cls['is_db_model']:
+                model_names.add(cls['name'])
+            analysis.classes.append(cls)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            analysis.functions.append(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                for name_node in ast.walk(target):
+                    if isinstance(name_node, ast.Name):
+                        if name_node.id == '__all__' and isinstance(node.value, (ast.List, ast.Tuple)):
+                            explicit_all = [elt.value for elt in node.value.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+                        elif name_node.id not in analysis.assignments:
+                            analysis.assignments.append(name_node.id)
+
+    if explicit_all is not None:
+        analysis.exported_names = explicit_all
+    else:
+        analysis.exported_names = [
+            name for name in analysis.class_names + analysis.functions + analysis.assignments
+            if not name.startswith('_')
+        ]
+
+    imported_text = ' '.join(
+        f"{imp['module'] or ''} {' '.join(name for name, _ in imp['names'])}" for imp in analysis.imports
+    )
+    analysis.contains_pydantic = any(marker in imported_text for marker in PYDANTIC_MARKERS)
+    analysis.contains_sqlalchemy = any(marker in imported_text for marker in SQLALCHEMY_MARKERS)
+    return analysis
+
@@ -0,0 +1,315 @@
+import ast
+import difflib
+import logging
+import textwrap
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import libcst as cst
+except ImportError:  # optional: without libcst the line-based fallback is used
+    cst = None
+
+logger = logging.getLogger(__name__)
+
+
+class RewriteResult:
+    """Outcome of `rewrite`: the new code, a unified diff, and which fix operations were applied"""
+
+    def __init__(self, code: str, diff: str, applied: List[dict], skipped: List[dict], engine: str):
+        self.code = code
+        self.diff = diff
+        self.applied = applied
+        self.skipped = skipped
+        self.engine = engine
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.diff)
+
+
+def rewrite(file_path: str, content: str, operations: List[dict]) -> RewriteResult:
+    """
+    Apply every fix operation to `content` at once.
+
+    Operations are the AutoFixer suggestions:
+      {'action': 'replace_import', 'old_import': ..., 'new_import': ...}
+      {'action': 'add_import', 'new_import': ...}
+      {'action': 'remove_redefinition', 'name': ..., 'definition': ..., 'new_import': ...}
+      {'action': 'fix_import_source', 'new_import': {'original', 'fixed', 'additional_import'}}
+
+    With libcst the module is parsed once and all operations are applied in a single
+    concrete-syntax-tree traversal, so formatting, comments and multi-line (parenthesized)
+    imports are preserved and one fix cannot break the text another fix looks for. Imports
+    are matched by meaning (module, level and imported names), not by text. Without libcst, or
+    when the code does not parse, the line-based edits are used.
+    """
+    origins, normalized = _normalize(operations)
+    engine = 'libcst'
+    new_code, applied = None, []
+    if cst is not None:
+        try:
+            new_code, applied, _ = _CstRewrite(normalized).apply(content)
+        except (cst.ParserSyntaxError, SyntaxError) as e:
+            logger.debug(f"Could not parse {file_path} for rewriting, using line-based fixes: {e}")
+    if new_code is None:
+        engine = 'text'
+        new_code, applied, _ = _text_rewrite(content, normalized)
+
+    # Report the caller's suggestions, not the flattened operations
+    applied_ids = {id(operation) for operation in applied}
+    applied_origins = {origin for origin, operation in zip(origins, normalized) if id(operation) in applied_ids}
+    return RewriteResult(new_code, unified_diff(file_path, content, new_code),
+                         [operation for index, operation in enumerate(operations) if index in applied_origins],
+                         [operation for index, operation in enumerate(operations) if index not in applied_origins],
+                         engine)
+
+
+def unified_diff(file_path: str, before: str, after: str) -> str:
+    return ''.join(difflib.unified_diff(before.splitlines(keepends=True), after.splitlines(keepends=True),
+                                        fromfile=f"a/{file_path}", tofile=f"b/{file_path}"))
+
+
+def _normalize(operations: List[dict]) -> Tuple[List[int], List[dict]]:
+    """Flatten the nested 'fix_import_source' form into replace/add operations, keeping the index each came from"""
+    origins, normalized = [], []
+    for index, operation in enumerate(operations):
+        if operation.get('action') == 'fix_import_source':
+            fix_info = operation.get('new_import', operation)
+            if isinstance(fix_info, dict) and 'original' in fix_info and 'fixed' in fix_info:
+                origins.append(index)
+                normalized.append(dict(operation, action='replace_import', old_import=fix_info['original'], new_import=fix_info['fixed']))
+                if fix_info.get('additional_import'):
+                    origins.append(index)
+                    normalized.append(dict(operation, action='add_import', new_import=fix_info['additional_import']))
+            continue
+        origins.append(index)
+        normalized.append(operation)
+    return origins, normalized
+
+
+def _import_keys(source: str) -> List[Tuple]:
+    """Meaning of the import statements in `source`: ('from', level, module, names) or ('import', names)"""
+    try:
+        tree = ast.parse(textwrap.dedent(source).strip())
+    except SyntaxError:
+        return []
+    keys = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            keys.append(('from', node.level, node.module or '', tuple(sorted((a.name, a.asname) for a in node.names))))
+        elif isinstance(node, ast.Import):
+            keys.append(('import', tuple(sorted((a.name, a.asname) for a in node.names))))
+    return keys
+
+
+def _covered(key: Tuple, present: List[Tuple]) -> bool:
+    """True if every name of import `key` is already imported the same way"""
+    if key in present:
+        return True
+    if key[0] == 'from':
+        imported = {name for other in present if other[0] == 'from' and other[1:3] == key[1:3] for name in other[3]}
+    else:
+        imported = {name for other in present if other[0] == 'import' for name in other[1]}
+    names = key[3] if key[0] == 'from' else key[1]
+    return bool(names) and all(name in imported for name in names)
+
+
+if cst is not None:
+
+    class _CstRewrite(cst.CSTTransformer):
+        """One traversal: imports are replaced where they are; removals and additions happen at module level"""
+
+        def __init__(self, operations: List[dict]):
+            super().__init__()
+            self.operations = operations
+            self.module = None
+            self.replacements: Dict[Tuple, List[dict]] = {}
+            self.done = set()
+            for index, operation in enumerate(operations):
+                if operation.get('action') == 'replace_import':
+                    for key in _import_keys(operation.get('old_import', ''))[:1]:
+                        self.replacements.setdefault(key, []).append(dict(operation, _index=index))
+
+        def apply(self, content: str) -> Tuple[str, List[dict], List[dict]]:
+            self.module = cst.parse_module(content)
+            new_module = self.module.visit(self)
+            applied = [op for index, op in enumerate(self.operations) if index in self.done]
+            skipped = [op for index, op in enumerate(self.operations) if index not in self.done]
+            return new_module.code, applied, skipped
+
+        def _key_of(self, node) -> Optional[Tuple]:
+            keys = _import_keys(self.module.code_for_node(node))
+            return keys[0] if keys else None
+
+        def leave_SimpleStatementLine(self, original_node, updated_node):
+            if not any(isinstance(small, (cst.Import, cst.ImportFrom)) for small in updated_node.body):
+                return updated_node
+            new_body, replaced = [], False
+            for small in updated_node.body:
+                pending = self.replacements.get(self._key_of(small)) if isinstance(small, (cst.Import, cst.ImportFrom)) else None
+                if pending:
+                    operation = pending.pop(0)
+                    new_lines = _parse_lines(operation['new_import'])
+                    if new_lines:
+                        self.done.add(operation['_index'])
+                        new_body.extend(small_statement for line in new_lines for small_statement in line.body)
+                        replaced = True
+                        continue
+                new_body.append(small)
+            if not replaced:
+                return updated_node
+            if len(updated_node.body) == 1:
+                # Usual case: one import per line, which becomes one line per new statement
+                lines = [cst.SimpleStatementLine(body=[small.with_changes(semicolon=cst.MaybeSentinel.DEFAULT)]) for small in new_body]
+                lines[0] = lines[0].with_changes(leading_lines=updated_node.leading_lines)
+                lines[-1] = lines[-1].with_changes(trailing_whitespace=updated_node.trailing_whitespace)
+                return cst.FlattenSentinel(lines)
+            body = [small.with_changes(semicolon=cst.MaybeSentinel.DEFAULT) for small in new_body]
+            return updated_node.with_changes(body=body)
+
+        def leave_Module(self, original_node, updated_node):
+            body = list(updated_node.body)
+            additions = []
+            for index, operation in enumerate(self.operations):
+                action = operation.get('action')
+                if action == 'remove_redefinition':
+                    kept = [statement for statement in body if not _defines(statement, operation.get('name'))]
+                    if len(kept) != len(body):
+                        body = kept
+                        self.done.add(index)
+                        if operation.get('new_import'):
+                            additions.append((index, operation['new_import']))
+                elif action == 'add_import':
+                    additions.append((index, operation['new_import']))
+
+            present = [key for statement in body if _is_import_line(statement)
+                       for key in _import_keys(updated_node.code_for_node(statement))]
+            insert_at = _import_insert_index(body)
+            for index, new_import in additions:
+                for line in _parse_lines(new_import):
+                    keys = _import_keys(updated_node.code_for_node(line))
+                    if keys and all(_covered(key, present) for key in keys):
+                        continue
+                    body.insert(insert_at, line)
+                    insert_at += 1
+                    present.extend(keys)
+                    self.done.add(index)
+            return updated_node.with_changes(body=body)
+
+    def _parse_lines(source: str) -> List:
+        try:
+            module = cst.parse_module(textwrap.dedent(source).strip() + "\n")
+        except cst.ParserSyntaxError:
+            logger.debug(f"Ignoring unparsable fix: {source!r}")
+            return []
+        return [statement for statement in module.body if isinstance(statement, cst.SimpleStatementLine)]
+
+    def _is_import_line(statement) -> bool:
+        return isinstance(statement, cst.SimpleStatementLine) and all(
+            isinstance(small, (cst.Import, cst.ImportFrom)) for small in statement.body)
+
+    def _is_docstring(statement) -> bool:
+        return (isinstance(statement, cst.SimpleStatementLine) and len(statement.body) == 1
+                and isinstance(statement.body[0], cst.Expr) and isinstance(statement.body[0].value, (cst.SimpleString, cst.ConcatenatedString)))
+
+    def _import_insert_index(body: List) -> int:
+        """After the leading block of imports, or after the module docstring when there are none"""
+        insert_at = 0
+        for position, statement in enumerate(body):
+            if _is_import_line(statement) or (position == 0 and _is_docstring(statement)):
+                insert_at = position + 1
+            else:
+                break
+        return insert_at
+
+    def _defines(statement, name: Optional[str]) -> bool:
+        """Top-level class/function definition or assignment binding `name`"""
+        if not name:
+            return False
+        if isinstance(statement, (cst.ClassDef, cst.FunctionDef)):
+            return statement.name.value == name
+        if isinstance(statement, cst.SimpleStatementLine) and len(statement.body) == 1:
+            small = statement.body[0]
+            if isinstance(small, cst.Assign):
+                return all(isinstance(target.target, cst.Name) and target.target.value == name for target in small.targets)
+            if isinstance(small, cst.AnnAssign):
+                return isinstance(small.target, cst.Name) and small.target.value == name
+        return False
+
+
+def _text_rewrite(content: str, operations: List[dict]) -> Tuple[str, List[dict], List[dict]]:
+    """Line-based fallback (the original AutoFixer behaviour)"""
+    fixed_content, applied, skipped, import_fixes = content, [], [], []
+    for operation in operations:
+        action = operation.get('action')
+        if action == 'replace_import':
+            updated = _text_replace_import(fixed_content, operation['old_import'], operation['new_import'])
+        elif action == 'remove_redefinition' and operation.get('definition'):
+            lines = fixed_content.split('\n')
+            kept = [line for line in lines if line.strip() != operation['definition'].strip()]
+            updated = '\n'.join(kept)
+            if updated != fixed_content and operation.get('new_import'):
+                import_fixes.append(operation['new_import'])
+        elif action == 'add_import':
+            import_fixes.append(operation['new_import'])
+            applied.append(operation)
+            continue
+        else:
+            skipped.append(operation)
+            continue
+        (applied if updated != fixed_content else skipped).append(operation)
+        fixed_content = updated
+
+    # Add all missing imports at the beginning
+    if import_fixes:
+        fixed_content = _text_add_imports(fixed_content, import_fixes)
+    return fixed_content, applied, skipped
+
+
+def _text_replace_import(content: str, old_import: str, new_import: str) -> str:
+    """Replace an import statement in the content"""
+    if '\n' in old_import.strip():
+        # Multi-line (parenthesized) import taken verbatim from the source
+        return content.replace(old_import.strip(), new_import, 1)
+    lines = content.split('\n')
+    for i, line in enumerate(lines):
+        if line.strip() == old_import.strip() or line.split('#', 1)[0].strip() == old_import.strip():
+            lines[i] = line[:len(line) - len(line.lstrip())] + new_import
+            break
+    return '\n'.join(lines)
+
+
+def _text_add_imports(content: str, new_imports: list) -> str:
+    """Add new imports at the appropriate location in the file"""
+    lines = content.split('\n')
+
+    # Find the location to insert imports (after existing imports or at the top)
+    insert_index = 0
+    last_import_index = -1
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith(('import ', 'from ')) and not stripped.startswith('#'):
+            last_import_index = i
+        elif stripped and not stripped.startswith('#') and last_import_index != -1:
+            # Found first non-import, non-comment line after imports
+            insert_index = last_import_index + 1
+            break
+
+    # If no imports found, insert at the beginning (after any initial comments/docstrings)
+    if last_import_index == -1:
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#') and not stripped.startswith('"""') and not stripped.startswith("'''"):
+                insert_index = i
+                break
+    else:
+        insert_index = last_import_index + 1
+
+    # Insert new imports
+    for new_import in new_imports:
+        if new_import.strip() not in [line.strip() for line in lines]:  # Avoid duplicates
+            lines.insert(insert_index, new_import)
+            insert_index += 1
+
+    return '\n'.join(lines)
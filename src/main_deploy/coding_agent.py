@@ -5,18 +5,36 @@ import time
 import sys
 import subprocess
 import argparse
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from pathlib import Path
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain.tools import BaseTool
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.callbacks.base import BaseCallbackHandler
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from detect_path import define_project_root, define_python_path
+from generation_scheduler import DependencyScheduler
+from async_utils import run_sync
+from llm_cache import acached_llm_call
+from generation_manifest import GenerationManifest
+from design_slices import stable_hash, design_slice_for_file, spec_slice_for_file
+from prompt_builder import SlicedPromptBuilder, estimate_tokens
+from code_analysis import analyze_code
+from code_rewriter import RewriteResult, rewrite as rewrite_code
+from project_index import ProjectIndex
+from symbol_index import SymbolIndex
+from stream_guard import StreamingCodeGuard, GenerationAborted, PARTIAL_SUFFIX
+from error_journal import ErrorJournal
+from rate_limiter import get_rate_limiter
+from generation_batches import plan_batches, contract_graph, parse_multi_file_response, BatchParseError
+from template_synthesis import TemplateSynthesizer
+from llm_clients import chat_model
+from utils import get_base_output_dir
+import tracing
 import config
 
 logger = logging.getLogger(__name__)
@@ -28,15 +46,29 @@ class AgentConfig(BaseModel):
     model_name: str = Field(description="LLM model name for code generation.")
     api_delay_seconds: int = Field(description="Delay between API calls.")
     max_retries: int = Field(description="Maximum retry attempts for LLM calls.")
+    max_workers: int = Field(default=4, description="Maximum number of files generated concurrently.")
+    stream_generation: bool = Field(default=True, description="Stream file generation and abort bad outputs early.")
+    max_output_chars: int = Field(default=200000, description="Abort a streamed file generation beyond this many characters.")
+    batch_small_files: bool = Field(default=True, description="Generate small sibling files (CSS, JS, __init__.py, schemas) in one request.")
+    batch_max_files: int = Field(default=4, description="Maximum number of files generated by one batched request.")
+    template_synthesis: bool = Field(default=True, description="Render boilerplate files (__init__, models, schemas, CRUD routers) from the design without the LLM.")
+    template_min_confidence: float = Field(default=0.9, description="Minimum template confidence; below it the file goes to the LLM.")
     
     @classmethod
     def from_central_config(cls) -> 'AgentConfig':
         return cls(
-            base_output_dir=config.BASE_OUTPUT_DIR,
+            base_output_dir=get_base_output_dir(),
             python_path=config.PYTHON_EXECUTABLE,
             model_name=config.CURRENT_MODELS['coding'],
             api_delay_seconds=config.API_DELAY_SECONDS,
-            max_retries=config.MAX_LLM_RETRIES
+            max_retries=config.MAX_LLM_RETRIES,
+            max_workers=config.MAX_GENERATION_WORKERS,
+            stream_generation=config.STREAM_CODE_GENERATION,
+            max_output_chars=config.MAX_GENERATED_FILE_CHARS,
+            batch_small_files=config.BATCH_SMALL_FILES,
+            batch_max_files=config.BATCH_MAX_FILES,
+            template_synthesis=config.TEMPLATE_SYNTHESIS,
+            template_min_confidence=config.TEMPLATE_MIN_CONFIDENCE
         )
     
     @classmethod
@@ -94,7 +126,10 @@ class ErrorTracker:
     def __init__(self, project_root: str):
         self.project_root = project_root
         self.errors = []
-        self.error_file = os.path.join(project_root, "coder_errors.json")
+        # Append-only journal; large context values (design/spec) are stored once as blobs
+        self.error_file = os.path.join(project_root, "coder_errors.jsonl")
+        self.journal = ErrorJournal(self.error_file, blob_dir=os.path.join(project_root, ".coder_error_blobs"))
+        self._lock = threading.Lock()  # files are generated concurrently
 
     def add_error(self, error_type: str, file_path: str, error_message: str, context: dict = None):
         error_entry = {
@@ -104,16 +139,12 @@ class ErrorTracker:
             "error_message": error_message,
             "context": context or {}
         }
-        self.errors.append(error_entry)
-        self._save_errors()
-
-    def _save_errors(self):
-        os.makedirs(os.path.dirname(self.error_file), exist_ok=True)
         try:
-            with open(self.error_file, 'w', encoding='utf-8') as f:
-                json.dump(self.errors, f, indent=2)
+            error_entry = self.journal.append(error_entry)
         except Exception as e:
-            logger.error(f"Failed to save coder errors to {self.error_file}: {e}")
+            logger.error(f"Failed to save coder error to {self.error_file}: {e}")
+        with self._lock:
+            self.errors.append(error_entry)
             
     def get_errors(self) -> List[Dict]:
         return self.errors
@@ -142,7 +173,8 @@ class TechnologyTemplateManager:
                 "run_script": self._python_run_script,
                 "requirements": self._python_requirements,
                 "env_file": self._python_env,
-                "prompt_template": self._python_prompt_template
+                "prompt_template": self._python_prompt_template,
+                "batch_prompt_template": self._python_batch_prompt_template
             }
         }
     
@@ -284,6 +316,9 @@ exit /b 0
         js_files = kwargs.get('js_files_to_link', [])
         json_design = kwargs.get('json_design', {})
         json_spec = kwargs.get('json_spec', {})
+        # Pre-sliced sections from SlicedPromptBuilder; fall back to the full documents
+        design_context = kwargs.get('design_context') or json.dumps(json_design, indent=2)
+        spec_context = kwargs.get('spec_context') or json.dumps(json_spec, indent=2)
         project_context_summary = kwargs.get('project_context_summary', '')
         context_instructions = kwargs.get('context_instructions', '')
         js_links_for_prompt = "\n".join([f"- /{js_file}" for js_file in js_files]) or "No JavaScript files detected."
@@ -309,7 +344,7 @@ exit /b 0
 
         TARGET FILE INFORMATION:
         - Full Path of the File to Generate: {file_path}
-        - Project Structure: This file is part of the project structure defined in the `folder_Structure` section of the JSON Design. The `folder_Structure.root_Project_Directory_Name` indicates the main project folder, and `folder_Structure.structure` lists all files and directories relative to that root.
+        - Project Structure: This file is part of the project structure defined in the `folder_Structure` section of the JSON Design. The `folder_Structure.root_Project_Directory_Name` indicates the main project folder, and the design context lists the `folder_Structure.structure` entries of this file's directory, relative to that root. Files in other directories that this file imports from are listed under the direct dependencies.
         - Backend Module Path: {backend_module_path}
         - Frontend Directory: {frontend_dir}
         - CSS File Path: Relative to frontend directory, {css_path}
@@ -403,9 +438,11 @@ exit /b 0
         8. Completeness:
         - Include all necessary imports, classes, functions, and logic.
         - For frontend files, provide complete HTML structure with basic styling.
-        9. JSON Design and Specification:
-        - Design: {json.dumps(json_design, indent=2)}
-        - Specification: {json.dumps(json_spec, indent=2)}
+        9. JSON Design and Specification (the parts relevant to this file):
+        - Design:
+        {design_context}
+        - Specification:
+        {spec_context}
         10. Entry Points:
             - Automatically detect if `{file_path}` is an entry point.
             - Include `if __name__ == "__main__":` for Python entry points.
@@ -419,6 +456,62 @@ exit /b 0
         - Readiness to run with `python -m uvicorn {backend_module_path}:app --reload --port 8001` for `{backend_module_path.replace('.', '/')}.py`.
     """
 
+    def _python_batch_prompt_template(self, **kwargs):
+        files = kwargs.get('files', [])  # [{'path', 'description', 'context_instructions'}]
+        project_name = kwargs.get('project_name', 'this application')
+        backend_language_framework = kwargs.get('backend_language_framework', 'FastAPI')
+        frontend_language_framework = kwargs.get('frontend_language_framework', 'Vanilla HTML/CSS/JS')
+        storage_type = kwargs.get('storage_type', 'sqlite')
+        frontend_dir = kwargs.get('frontend_dir', 'frontend')
+        css_path = kwargs.get('css_path', 'css/style.css')
+        design_context = kwargs.get('design_context', '')
+        spec_context = kwargs.get('spec_context', '')
+        project_context_summary = kwargs.get('project_context_summary', '')
+        file_sections = "\n".join(
+            f"""
+        FILE {index}: {item['path']}
+        - Purpose: {item.get('description', '')}
+        - Context-specific instructions:
+        {item.get('context_instructions', '') or 'None'}"""
+            for index, item in enumerate(files, 1)
+        )
+        first_path = files[0]['path'] if files else 'path/to/file.ext'
+        
+        return f"""
+        CONTEXT:
+        - You are an expert Senior Software Engineer generating several small, related files for a web application named {project_name}. The application uses:
+            - Backend: {backend_language_framework}
+            - Frontend: {frontend_language_framework}
+            - Storage: {storage_type}
+        - Frontend Directory: {frontend_dir}; CSS File Path (relative to the frontend directory): {css_path}
+        - The generated code must be executable, idiomatic, and aligned with the provided design and requirements.
+
+        PROJECT-WIDE CONTEXT AWARENESS:
+        {project_context_summary}
+
+        FILES TO GENERATE ({len(files)}):
+        {file_sections}
+
+        JSON Design and Specification (the parts relevant to these files):
+        - Design:
+        {design_context}
+        - Specification:
+        {spec_context}
+
+        CODE GENERATION RULES:
+        - Generate the complete code for EVERY file listed above, and no other file.
+        - Python files: imports at the top, `logger = logging.getLogger(__name__)`, follow the context instructions.
+        - Frontend files: vanilla HTML/CSS/JS compatible with FastAPI's StaticFiles.
+        - Keep the files consistent with each other (shared names, element ids, exported functions).
+
+        OUTPUT FORMAT (STRICT):
+        - Output each file exactly once, in this form and nothing else:
+        <<<FILE: {first_path}>>>
+        ...complete file content...
+        <<<END FILE>>>
+        - Use the exact paths listed above. Do NOT write any text, explanations or markdown outside the file blocks.
+    """
+
 # === CODE VALIDATION AND AUTO-FIX LAYER === logic mới vào chiều 28/6
 
 class ContentClassifier:
@@ -437,49 +530,21 @@ class ContentClassifier:
             'functions_found': list
         }
         """
+        analysis = analyze_code(file_path, content)
         classification = {
             'content_type': 'unknown',
-            'contains_pydantic': False,
-            'contains_sqlalchemy': False,
-            'imports_found': [],
-            'classes_found': [],
-            'functions_found': [],
-            'schema_classes': [],
-            'model_classes': []
+            'contains_pydantic': analysis.contains_pydantic,
+            'contains_sqlalchemy': analysis.contains_sqlalchemy,
+            'imports_found': analysis.import_statements,
+            'classes_found': analysis.class_names,
+            'functions_found': list(analysis.functions),
+            'schema_classes': analysis.schema_classes,
+            'model_classes': analysis.model_classes,
+            'analysis': analysis
         }
         
-        lines = content.split('\n')
         filename = os.path.basename(file_path).lower()
         
-        for line in lines:
-            line = line.strip()
-            
-            # Track imports
-            if line.startswith(('import ', 'from ')):
-                classification['imports_found'].append(line)
-                
-                # Detect framework patterns
-                if 'BaseModel' in line or 'pydantic' in line:
-                    classification['contains_pydantic'] = True
-                if 'declarative_base' in line or 'sqlalchemy' in line or 'Column' in line:
-                    classification['contains_sqlalchemy'] = True
-            
-            # Track class definitions
-            elif line.startswith('class ') and ':' in line:
-                class_name = line.split('class ')[1].split('(')[0].split(':')[0].strip()
-                classification['classes_found'].append(class_name)
-                
-                # Classify class type based on inheritance
-                if 'BaseModel' in line:
-                    classification['schema_classes'].append(class_name)
-                elif 'Base' in line and not 'BaseModel' in line:
-                    classification['model_classes'].append(class_name)
-            
-            # Track function definitions
-            elif line.startswith('def ') and '(' in line:
-                func_name = line.split('def ')[1].split('(')[0].strip()
-                classification['functions_found'].append(func_name)
-        
         # Determine content type based on analysis
         if classification['contains_pydantic'] or 'schema' in filename:
             classification['content_type'] = 'pydantic_schemas'
@@ -522,8 +587,10 @@ class ImportAnalyzer:
         
         # Analyze each import in the content
         current_imports = file_classification['imports_found']
-        for import_stmt in current_imports:
-            validation_result = self._validate_single_import(import_stmt, file_path, file_classification)
+        code_analysis = file_classification.get('analysis')
+        import_infos = code_analysis.imports if code_analysis else [None] * len(current_imports)
+        for import_stmt, import_info in zip(current_imports, import_infos):
+            validation_result = self._validate_single_import(import_stmt, file_path, file_classification, import_info)
             
             if validation_result['is_valid']:
                 analysis['valid_imports'].append(import_stmt)
@@ -553,7 +620,7 @@ class ImportAnalyzer:
         # Check for missing required imports
         required_imports = self._get_required_imports_for_content(file_path, file_classification)
         for required_import in required_imports:
-            if not self._is_import_present(required_import, current_imports):
+            if not self._is_import_present(required_import, current_imports, code_analysis):
                 analysis['missing_imports'].append(required_import)
                 analysis['auto_fix_suggestions'].append({
                     'action': 'add_import',
@@ -563,7 +630,7 @@ class ImportAnalyzer:
         
         return analysis
     
-    def _validate_single_import(self, import_stmt: str, current_file_path: str, file_classification: dict) -> dict:
+    def _validate_single_import(self, import_stmt: str, current_file_path: str, file_classification: dict, import_info: dict = None) -> dict:
         """Validate a single import statement"""
         validation = {
             'is_valid': True,
@@ -571,33 +638,41 @@ class ImportAnalyzer:
             'suggested_fix': None
         }
         
-        # Parse import statement
-        if 'from ' in import_stmt and ' import ' in import_stmt:
+        # Parse import statement (structured info from the AST when available, handles multi-line imports)
+        if import_info is not None:
+            if not import_info['is_from']:
+                return validation
+            module_part = '.' * import_info['level'] + import_info['module']
+            imported_items = [f"{name} as {asname}" if asname else name for name, asname in import_info['names']]
+            imports_part = ', '.join(imported_items)
+        elif 'from ' in import_stmt and ' import ' in import_stmt:
             parts = import_stmt.split(' import ')
             module_part = parts[0].replace('from ', '').strip()
             imports_part = parts[1].strip()
+            imported_items = [item.strip() for item in imports_part.split(',')]
+        else:
+            return validation
+        
+        # Check for schema/model confusion
+        if module_part.endswith('.models') and any(name in imports_part for name in ['Create', 'Update', 'Base']):
+            # Check if these are actually Pydantic schemas
+            schema_items = []
+            model_items = []
             
-            # Check for schema/model confusion
-            if module_part.endswith('.models') and any(name in imports_part for name in ['Create', 'Update', 'Base']):
-                # Check if these are actually Pydantic schemas
-                imported_items = [item.strip() for item in imports_part.split(',')]
-                schema_items = []
-                model_items = []
-                
-                for item in imported_items:
-                    if any(keyword in item for keyword in ['Create', 'Update']) and not item == 'Base':
-                        schema_items.append(item)
-                    else:
-                        model_items.append(item)
+            for item in imported_items:
+                if any(keyword in item for keyword in ['Create', 'Update']) and not item == 'Base':
+                    schema_items.append(item)
+                else:
+                    model_items.append(item)
+            
+            if schema_items:
+                validation['is_valid'] = False
+                validation['issue'] = f"Schema classes {schema_items} should be imported from schemas module"
+                validation['suggested_fix'] = f"from {module_part.replace('.models', '.schemas')} import {', '.join(schema_items)}"
                 
-                if schema_items:
-                    validation['is_valid'] = False
-                    validation['issue'] = f"Schema classes {schema_items} should be imported from schemas module"
-                    validation['suggested_fix'] = f"from {module_part.replace('.models', '.schemas')} import {', '.join(schema_items)}"
-                    
-                    # If there are still model items, we need to preserve the model import
-                    if model_items:
-                        validation['additional_import'] = f"from {module_part} import {', '.join(model_items)}"
+                # If there are still model items, we need to preserve the model import
+                if model_items:
+                    validation['additional_import'] = f"from {module_part} import {', '.join(model_items)}"
         
         return validation
     
@@ -636,96 +711,35 @@ class ImportAnalyzer:
                 return file_path
         return None
     
-    def _is_import_present(self, target_import: str, current_imports: list) -> bool:
+    def _is_import_present(self, target_import: str, current_imports: list, code_analysis=None) -> bool:
         """Check if a required import is already present"""
         target_clean = target_import.strip()
         for current_import in current_imports:
             if target_clean == current_import.strip():
                 return True
+        
+        # Compare by module and names, so `from x import (A, B)` counts as importing A
+        if code_analysis is not None:
+            target = analyze_code('required_import.py', target_clean)
+            if target.imports:
+                wanted = target.imports[0]
+                if not wanted['is_from']:
+                    return all(code_analysis.has_import(name) for name, _ in wanted['names'])
+                return all(code_analysis.has_import(wanted['module'], name) for name, _ in wanted['names'])
         return False
 
 class AutoFixer:
     """Automatically fixes detected code issues"""
     
     @staticmethod
-    def apply_fixes(content: str, fix_suggestions: list) -> str:
+    def apply_fixes(content: str, fix_suggestions: list, file_path: str = 'generated.py') -> str:
         """Apply all auto-fix suggestions to the content"""
-        fixed_content = content
-        import_fixes = []
-        
-        for suggestion in fix_suggestions:
-            if suggestion['action'] == 'replace_import':
-                fixed_content = AutoFixer._replace_import(
-                    fixed_content, 
-                    suggestion['old_import'], 
-                    suggestion['new_import']
-                )
-            elif suggestion['action'] == 'add_import':
-                import_fixes.append(suggestion['new_import'])
-            elif suggestion['action'] == 'fix_import_source':
-                # Handle complex import source fixes
-                fix_info = suggestion.get('new_import', suggestion)
-                if isinstance(fix_info, dict):
-                    if 'original' in fix_info and 'fixed' in fix_info:
-                        fixed_content = AutoFixer._replace_import(
-                            fixed_content, 
-                            fix_info['original'], 
-                            fix_info['fixed']
-                        )
-                        if fix_info.get('additional_import'):
-                            import_fixes.append(fix_info['additional_import'])
-        
-        # Add all missing imports at the beginning
-        if import_fixes:
-            fixed_content = AutoFixer._add_imports(fixed_content, import_fixes)
-        
-        return fixed_content
-    
-    @staticmethod
-    def _replace_import(content: str, old_import: str, new_import: str) -> str:
-        """Replace an import statement in the content"""
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if line.strip() == old_import.strip():
-                lines[i] = new_import
-                break
-        return '\n'.join(lines)
+        return AutoFixer.rewrite(content, fix_suggestions, file_path).code
     
     @staticmethod
-    def _add_imports(content: str, new_imports: list) -> str:
-        """Add new imports at the appropriate location in the file"""
-        lines = content.split('\n')
-        
-        # Find the location to insert imports (after existing imports or at the top)
-        insert_index = 0
-        last_import_index = -1
-        
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped.startswith(('import ', 'from ')) and not stripped.startswith('#'):
-                last_import_index = i
-            elif stripped and not stripped.startswith('#') and last_import_index != -1:
-                # Found first non-import, non-comment line after imports
-                insert_index = last_import_index + 1
-                break
-        
-        # If no imports found, insert at the beginning (after any initial comments/docstrings)
-        if last_import_index == -1:
-            for i, line in enumerate(lines):
-                stripped = line.strip()
-                if stripped and not stripped.startswith('#') and not stripped.startswith('"""') and not stripped.startswith("'''"):
-                    insert_index = i
-                    break
-        else:
-            insert_index = last_import_index + 1
-        
-        # Insert new imports
-        for new_import in new_imports:
-            if new_import.strip() not in [line.strip() for line in lines]:  # Avoid duplicates
-                lines.insert(insert_index, new_import)
-                insert_index += 1
-        
-        return '\n'.join(lines)
+    def rewrite(content: str, fix_suggestions: list, file_path: str = 'generated.py') -> RewriteResult:
+        """Apply all auto-fix suggestions in one pass (see code_rewriter); the result carries a diff"""
+        return rewrite_code(file_path, content, fix_suggestions)
 
 class CodeValidator:
     """Main validation orchestrator that coordinates all validation activities"""
@@ -745,6 +759,7 @@ class CodeValidator:
             'fixed_code': str,
             'issues_found': list,
             'fixes_applied': list,
+            'diff': str,
             'validation_summary': str
         }
         """
@@ -753,6 +768,7 @@ class CodeValidator:
             'fixed_code': generated_code,
             'issues_found': [],
             'fixes_applied': [],
+            'diff': '',
             'validation_summary': ''
         }
         
@@ -763,16 +779,22 @@ class CodeValidator:
             # Step 2: Analyze imports
             import_analysis = self.import_analyzer.analyze_imports(file_path, generated_code, file_classification)
             
+            redefinition_fixes = self._shared_definition_fixes(file_path, file_classification)
+            
             # Step 3: Collect all issues
-            if import_analysis['invalid_imports'] or import_analysis['missing_imports']:
+            if import_analysis['invalid_imports'] or import_analysis['missing_imports'] or redefinition_fixes:
                 result['is_valid'] = False
                 result['issues_found'].extend(import_analysis['invalid_imports'])
                 result['issues_found'].extend([{'type': 'missing_import', 'import': imp} for imp in import_analysis['missing_imports']])
+                result['issues_found'].extend([{'type': 'redefinition', 'name': fix['name']} for fix in redefinition_fixes])
             
-            # Step 4: Auto-fix issues
-            if import_analysis['auto_fix_suggestions']:
-                result['fixed_code'] = self.auto_fixer.apply_fixes(generated_code, import_analysis['auto_fix_suggestions'])
-                result['fixes_applied'] = import_analysis['auto_fix_suggestions']
+            # Step 4: Auto-fix issues (all suggestions in one rewrite of the file)
+            fix_suggestions = import_analysis['auto_fix_suggestions'] + redefinition_fixes
+            if fix_suggestions:
+                rewrite_result = self.auto_fixer.rewrite(generated_code, fix_suggestions, file_path)
+                result['fixed_code'] = rewrite_result.code
+                result['fixes_applied'] = rewrite_result.applied
+                result['diff'] = rewrite_result.diff
                 
                 # Re-validate after fixes
                 if result['fixed_code'] != generated_code:
@@ -789,6 +811,24 @@ class CodeValidator:
         
         return result
     
+    def _shared_definition_fixes(self, file_path: str, file_classification: dict) -> list:
+        """Shared definitions (e.g. `Base = declarative_base()`) redefined outside their file are replaced by an import"""
+        analysis = file_classification.get('analysis')
+        if analysis is None:
+            return []
+        fixes = []
+        shared_defs = self.project_context.established_patterns.get('shared_definitions', {})
+        for def_name, def_info in shared_defs.items():
+            if def_info['location'] != file_path and def_name in analysis.assignments:
+                fixes.append({
+                    'action': 'remove_redefinition',
+                    'name': def_name,
+                    'definition': def_info['definition'],
+                    'new_import': def_info['import_pattern'],
+                    'reason': f"{def_name} is defined in {def_info['location']}"
+                })
+        return fixes
+    
     def _generate_validation_summary(self, file_path: str, classification: dict, analysis: dict, fixes: list) -> str:
         """Generate a human-readable validation summary"""
         summary_parts = []
@@ -827,13 +867,15 @@ class ProjectContext:
         self.tech_stack = tech_stack.lower()
         self.design_data = design_data or {}
         
-        # Track what's been defined where
-        self.defined_classes = {}  # {class_name: file_path}
-        self.defined_functions = {}  # {function_name: file_path}
-        self.imports_used = {}  # {file_path: [import_statements]}
-        self.database_models = []  # [model_class_names]
+        # Track what's been defined where (views onto the incrementally updated symbol index)
+        self.symbol_index = SymbolIndex()
+        self.defined_classes = self.symbol_index.class_locations  # {class_name: file_path}
+        self.defined_functions = self.symbol_index.function_locations  # {function_name: file_path}
+        self.imports_used = self.symbol_index.imports  # {file_path: [import_statements]}
+        self.database_models = self.symbol_index.db_models  # [model_class_names]
         self.api_endpoints = []  # [endpoint_info]
         self.shared_components = {}  # {component_name: definition_location}
+        self.module_variables = self.symbol_index.variables  # {file_path: [top-level assigned names like Base, engine, router]}
         
         # Track file generation order and dependencies
         self.generation_order = []
@@ -842,6 +884,7 @@ class ProjectContext:
         # Analyze project structure to determine patterns dynamically
         self.project_structure = self._analyze_project_structure()
         self.established_patterns = self._init_dynamic_framework_patterns()
+        self._dependents = None  # reverse of established_patterns['file_dependencies'], built on first use
         
     def _analyze_project_structure(self) -> dict:
         """Dynamically analyze the project structure from design data"""
@@ -978,29 +1021,20 @@ class ProjectContext:
     
     def register_class(self, class_name: str, file_path: str, is_database_model: bool = False):
         """Register a class definition"""
-        self.defined_classes[class_name] = file_path
-        if is_database_model:
-            self.database_models.append(class_name)
+        self.symbol_index.add_class(class_name, file_path, is_database_model)
     
     def register_function(self, function_name: str, file_path: str):
         """Register a function definition"""
-        self.defined_functions[function_name] = file_path
+        self.symbol_index.add_function(function_name, file_path)
     
     def register_import(self, file_path: str, import_statement: str):
         """Register an import statement for a file"""
-        if file_path not in self.imports_used:
-            self.imports_used[file_path] = []
-        if import_statement not in self.imports_used[file_path]:
-            self.imports_used[file_path].append(import_statement)
+        self.symbol_index.add_import(file_path, import_statement)
     
     def get_forbidden_redefinitions(self, current_file_path: str) -> list:
         """Get list of things that should NOT be redefined in the current file"""
-        forbidden = []
-        
-        # Don't redefine classes defined elsewhere
-        for class_name, file_path in self.defined_classes.items():
-            if file_path != current_file_path:
-                forbidden.append(f"class {class_name}")
+        # Don't redefine classes defined elsewhere (project-wide list is cached in the index)
+        forbidden = self.symbol_index.forbidden_class_patterns(current_file_path)
         
         # Don't redefine shared definitions in wrong files
         shared_defs = self.established_patterns.get('shared_definitions', {})
@@ -1058,6 +1092,10 @@ class ProjectContext:
         }
         return context
     
+    def get_exports_for_file(self, file_path: str) -> dict:
+        """Classes, functions and module-level variables registered for a generated file"""
+        return self.symbol_index.exports_for(file_path)
+    
     def _determine_file_type(self, file_path: str) -> str:
         """Determine the type/purpose of a file based on project structure analysis"""
         if file_path in self.project_structure['database_files']:
@@ -1077,12 +1115,14 @@ class ProjectContext:
     
     def _get_related_files(self, file_path: str) -> list:
         """Get list of files that are related to the current file"""
-        related = []
+        if self._dependents is None:
+            self._dependents = {}
+            for other_file, deps in self.established_patterns.get('file_dependencies', {}).items():
+                for dep in deps:
+                    self._dependents.setdefault(dep, []).append(other_file)
         
         # Files that depend on this file
-        for other_file, deps in self.established_patterns.get('file_dependencies', {}).items():
-            if file_path in deps:
-                related.append(other_file)
+        related = list(self._dependents.get(file_path, []))
         
         # Files this file depends on
         if file_path in self.established_patterns.get('file_dependencies', {}):
@@ -1108,37 +1148,23 @@ class ProjectContext:
             logger.info(f"🔧 Auto-fixed {len(validation_result['fixes_applied'])} issues in {file_path}")
             for fix in validation_result['fixes_applied']:
                 logger.debug(f"  Applied: {fix['action']} - {fix.get('reason', '')}")
+            if validation_result['diff'] and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Auto-fix diff for {file_path}:\n{validation_result['diff']}")
         
         if not validation_result['is_valid']:
             logger.warning(f"⚠️ Validation issues remain in {file_path}: {len(validation_result['issues_found'])} issues")
         
-        # Parse the final code for context tracking
-        lines = final_code.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Track class definitions with enhanced classification
-            if line.startswith('class ') and ':' in line:
-                class_name = line.split('class ')[1].split('(')[0].split(':')[0].strip()
-                
-                # Enhanced DB model detection
-                is_db_model = False
-                if 'Base' in line and not 'BaseModel' in line:
-                    is_db_model = True
-                elif any(keyword in class_name for keyword in ['Model']) and 'BaseModel' not in line:
-                    is_db_model = True
-                
-                self.register_class(class_name, file_path, is_db_model)
-            
-            # Track function definitions
-            elif line.startswith('def ') and '(' in line:
-                func_name = line.split('def ')[1].split('(')[0].strip()
-                self.register_function(func_name, file_path)
-            
-            # Track import statements
-            elif line.startswith(('import ', 'from ')):
-                self.register_import(file_path, line)
+        # Track top-level definitions from the shared analysis record (nested classes/methods are not project symbols)
+        analysis = analyze_code(file_path, final_code)
+        for class_name, other_file in self.symbol_index.conflicts(file_path, analysis.class_names):
+            logger.warning(f"⚠️ {file_path} redefines class {class_name} already defined in {other_file}")
+        for class_info in analysis.classes:
+            self.register_class(class_info['name'], file_path, class_info['is_db_model'])
+        for func_name in analysis.functions:
+            self.register_function(func_name, file_path)
+        for import_statement in analysis.import_statements:
+            self.register_import(file_path, import_statement)
+        self.symbol_index.set_variables(file_path, [name for name in analysis.assignments if not name.startswith('_')])
         
         # Add to generation order if not already there
         if file_path not in self.generation_order:
@@ -1240,20 +1266,51 @@ class FileGeneratorTool(BaseTool):
     name: str = "file_generator"
     description: str = "Generates code for individual files based on specifications"
     
-    def __init__(self, llm, template_manager: TechnologyTemplateManager, error_tracker: ErrorTracker, config: AgentConfig):
+    #`chat_model` returns the chat model for the running event loop; it is called per request because
+    #the blocking API (_run, generate_project) runs every call on a loop of its own
+    def __init__(self, chat_model: Callable[[], Any], template_manager: TechnologyTemplateManager, error_tracker: ErrorTracker, config: AgentConfig):
         super().__init__()
-        self._llm = llm
+        self._chat_model = chat_model
         self._template_manager = template_manager
         self._error_tracker = error_tracker
         self._config = config
         
-    #Generate code for a specific file with retry logic
+    #Blocking entry point of the tool; the generation itself lives in _arun
     def _run(self, file_path: str, context: Dict, requirements: Dict) -> str:
-        tech_stack = context.get('tech_stack', 'fastapi')
-        project_root = context.get('project_root', '')
-        relative_file_path = os.path.relpath(file_path, project_root).replace('\\', '/')
+        return run_sync(self._arun(file_path, context, requirements))
+
+    #Generate code for a specific file with retry logic (used by LangChainCodingAgent.agenerate_project)
+    async def _arun(self, file_path: str, context: Dict, requirements: Dict) -> str:
+        with tracing.span('generate_file', kind='file', file=_relative_path(file_path, context), source='generated') as file_span:
+            templated = self._templated_file_content(file_path, context)
+            if templated is not None:
+                file_span.set(source='template')
+                return templated
+        
+            for attempt in range(self._config.max_retries):
+                try:
+                    file_span.set(attempts=attempt + 1)
+                    prompt_template = self._build_prompt(file_path, context, requirements, record=attempt == 0)
+                    return await acached_llm_call(
+                        prompt_template,
+                        self._config.model_name,
+                        getattr(self._chat_model(), 'temperature', 0.1),
+                        lambda: get_rate_limiter().acall(
+                            lambda: self._agenerate_and_validate(file_path, prompt_template),
+                            estimated_tokens=estimate_tokens(prompt_template)
+                        )
+                    )
+                except Exception as e:
+                    if self._record_failure(file_path, context, requirements, attempt, e):
+                        file_span.set(source='error', error=str(e)[:500])
+                        return f"# Error generating code: {str(e)}\n# TODO: Fix this file"
         
-        # Handle special files
+            return "# Error: Max retries reached"
+
+    #requirements.txt and .env are rendered from templates, never generated by the LLM
+    def _templated_file_content(self, file_path: str, context: Dict) -> Optional[str]:
+        tech_stack = context.get('tech_stack', 'fastapi')
+        relative_file_path = _relative_path(file_path, context)
         if relative_file_path == 'requirements.txt':
             return self._template_manager.get_template(
                 tech_stack, 'requirements',
@@ -1264,75 +1321,259 @@ class FileGeneratorTool(BaseTool):
                 tech_stack, 'env_file',
                 storage_type=context.get('design_data', {}).get('data_Design', {}).get('storage_Type', 'sqlite')
             )
-        
+        return None
+
+    #Render the per-file prompt with project context; `record` adds it to the prompt size report
+    def _build_prompt(self, file_path: str, context: Dict, requirements: Dict, record: bool = False) -> str:
+        tech_stack = context.get('tech_stack', 'fastapi')
         # --- modify lại dựa trên logic mới 28/6 ---
-        # Generate code using LLM with retries
-        for attempt in range(self._config.max_retries):
+        # Build enhanced prompt with project context
+        base_prompt_args = {
+            'file_path': file_path,
+            'project_name': requirements.get('project_Overview', {}).get('project_Name', 'this application'),
+            'backend_language_framework': f"{requirements.get('technology_Stack', {}).get('backend', {}).get('language', 'Python')} {requirements.get('technology_Stack', {}).get('backend', {}).get('framework', 'FastAPI')}",
+            'frontend_language_framework': f"{requirements.get('technology_Stack', {}).get('frontend', {}).get('language', 'HTML/CSS/JS')} {requirements.get('technology_Stack', {}).get('frontend', {}).get('framework', 'Vanilla')}",
+            'storage_type': context.get('design_data', {}).get('data_Design', {}).get('storage_Type', 'sqlite'),
+            'backend_module_path': context.get('backend_module_path', 'main'),
+            'frontend_dir': context.get('frontend_dir', 'frontend'),
+            'css_path': context.get('css_path', 'css/style.css'),
+            'js_files_to_link': context.get('js_files_to_link', []),
+            'json_design': context.get('design_data', {}),
+            'json_spec': requirements,
+            'design_context': context.get('design_context'),
+            'spec_context': context.get('spec_context')
+        }
+        
+        # Add project context if available
+        if 'project_context_summary' in context:
+            # Snapshot taken by the scheduler; the live context may change while we run
+            base_prompt_args['project_context_summary'] = context['project_context_summary']
+            base_prompt_args['context_instructions'] = context.get('context_instructions', '')
+        elif 'project_context' in context:
+            project_context = context['project_context']
+            base_prompt_args['project_context_summary'] = project_context.get_context_summary()
+            base_prompt_args['context_instructions'] = context.get('context_instructions', '')
+        else:
+            base_prompt_args['project_context_summary'] = "No project context available"
+            base_prompt_args['context_instructions'] = ""
+        
+        prompt_template = self._template_manager.get_template(
+            tech_stack, 'prompt_template',
+            **base_prompt_args
+        )
+        # --- end modify ---
+        
+        if record and 'prompt_builder' in context:
+            prompt_tokens = context['prompt_builder'].record_prompt(
+                prompt_template, context['prompt_sections'], context['baseline_sections_tokens']
+            )
+            logger.debug(f"Prompt for {os.path.basename(file_path)}: ~{prompt_tokens['after']} tokens (unsliced: ~{prompt_tokens['before']})")
+        return prompt_template
+
+    #Journal a failed attempt; returns True when no attempts are left
+    def _record_failure(self, file_path: str, context: Dict, requirements: Dict, attempt: int, error: Exception) -> bool:
+        self._error_tracker.add_error(
+            "code_generation", file_path, str(error),
+            {"context": context, "requirements": requirements, "attempt": attempt + 1}
+        )
+        if attempt == self._config.max_retries - 1:
+            return True
+        if isinstance(error, GenerationAborted):
+            logger.warning(f"⚠️ {os.path.basename(file_path)}: {error.reason}, retrying")
+        # No backoff sleep here: request pacing and 429 cooldowns are handled by the shared rate limiter
+        return False
+
+    #Call the LLM and return cleaned code; raises on empty or syntactically invalid output so it is never cached
+    async def _agenerate_and_validate(self, file_path: str, prompt: str) -> str:
+        if self._config.stream_generation:
+            generated_code = await self._astream_generate(file_path, prompt)
+        else:
+            response = await self._chat_model().ainvoke([HumanMessage(content=prompt)])
+            tracing.record_usage(response)
+            generated_code = self._strip_code_fence(_message_text(response).strip())
+        return self._check_generated_code(file_path, generated_code)
+
+    @staticmethod
+    def _strip_code_fence(generated_code: str) -> str:
+        # Clean up code blocks
+        if generated_code.startswith("```") and generated_code.endswith("```"):
+            lines = generated_code.splitlines()
+            if len(lines) > 2:
+                generated_code = "\n".join(lines[1:-1])
+            else:
+                generated_code = ""
+        return generated_code
+
+    @staticmethod
+    def _check_generated_code(file_path: str, generated_code: str) -> str:
+        if not generated_code:
+            raise ValueError("LLM returned empty code")
+        
+        # Basic syntax validation for Python files; the parse is reused by validation and context tracking
+        analysis = analyze_code(file_path, generated_code)
+        if analysis.syntax_error:
+            raise ValueError(f"Syntax error in generated Python code: {analysis.syntax_error}")
+        
+        return generated_code
+
+    #Blocking wrapper around _arun_batch
+    def _run_batch(self, file_paths: List[str], context: Dict, requirements: Dict) -> Optional[Dict[str, str]]:
+        return run_sync(self._arun_batch(file_paths, context, requirements))
+
+    #Generate several small sibling files in one request; returns {relative_path: code}, or None so the caller falls back to per-file generation
+    async def _arun_batch(self, file_paths: List[str], context: Dict, requirements: Dict) -> Optional[Dict[str, str]]:
+        prompt_template, relative_paths = self._build_batch_prompt(file_paths, context, requirements)
+        with tracing.span('generate_batch', kind='file', files=relative_paths, source='generated') as batch_span:
             try:
-                # Build enhanced prompt with project context
-                base_prompt_args = {
-                    'file_path': file_path,
-                    'project_name': requirements.get('project_Overview', {}).get('project_Name', 'this application'),
-                    'backend_language_framework': f"{requirements.get('technology_Stack', {}).get('backend', {}).get('language', 'Python')} {requirements.get('technology_Stack', {}).get('backend', {}).get('framework', 'FastAPI')}",
-                    'frontend_language_framework': f"{requirements.get('technology_Stack', {}).get('frontend', {}).get('language', 'HTML/CSS/JS')} {requirements.get('technology_Stack', {}).get('frontend', {}).get('framework', 'Vanilla')}",
-                    'storage_type': context.get('design_data', {}).get('data_Design', {}).get('storage_Type', 'sqlite'),
-                    'backend_module_path': context.get('backend_module_path', 'main'),
-                    'frontend_dir': context.get('frontend_dir', 'frontend'),
-                    'css_path': context.get('css_path', 'css/style.css'),
-                    'js_files_to_link': context.get('js_files_to_link', []),
-                    'json_design': context.get('design_data', {}),
-                    'json_spec': requirements
-                }
-                
-                # Add project context if available
-                if 'project_context' in context:
-                    project_context = context['project_context']
-                    base_prompt_args['project_context_summary'] = project_context.get_context_summary()
-                    base_prompt_args['context_instructions'] = context.get('context_instructions', '')
-                else:
-                    base_prompt_args['project_context_summary'] = "No project context available"
-                    base_prompt_args['context_instructions'] = ""
-                
-                prompt_template = self._template_manager.get_template(
-                    tech_stack, 'prompt_template',
-                    **base_prompt_args
+                response = await acached_llm_call(
+                    prompt_template,
+                    self._config.model_name,
+                    getattr(self._chat_model(), 'temperature', 0.1),
+                    lambda: get_rate_limiter().acall(
+                        lambda: self._agenerate_batch(prompt_template, relative_paths),
+                        estimated_tokens=estimate_tokens(prompt_template)
+                    ),
+                    validator=lambda text: self._is_valid_batch(text, relative_paths)
                 )
-                # --- end modify ---
-                
-                response = self._llm.invoke([HumanMessage(content=prompt_template)])
-                generated_code = response.content.strip()
-                
-                # Clean up code blocks
-                if generated_code.startswith("```") and generated_code.endswith("```"):
-                    lines = generated_code.splitlines()
-                    if len(lines) > 2:
-                        generated_code = "\n".join(lines[1:-1])
-                    else:
-                        generated_code = ""
-                
-                if not generated_code:
-                    raise ValueError("LLM returned empty code")
-                
-                # Basic syntax validation for Python files
-                if file_path.endswith('.py'):
-                    import ast
-                    try:
-                        ast.parse(generated_code)
-                    except SyntaxError as e:
-                        raise ValueError(f"Syntax error in generated Python code: {e}")
-                
-                return generated_code
-                
+                return self._parse_batch(response, relative_paths)
             except Exception as e:
-                self._error_tracker.add_error(
-                    "code_generation", file_path, str(e),
-                    {"context": context, "requirements": requirements, "attempt": attempt + 1}
-                )
-                if attempt == self._config.max_retries - 1:
-                    return f"# Error generating code: {str(e)}\n# TODO: Fix this file"
-                time.sleep(self._config.api_delay_seconds * (2 ** attempt))  # Exponential backoff
-        
-        return "# Error: Max retries reached"
+                self._record_batch_failure(relative_paths, e)
+                batch_span.set(source='error', error=str(e)[:500])
+                return None
+
+    def _build_batch_prompt(self, file_paths: List[str], context: Dict, requirements: Dict) -> tuple:
+        tech_stack = context.get('tech_stack', 'fastapi')
+        project_root = context.get('project_root', '')
+        relative_paths = [os.path.relpath(path, project_root).replace('\\', '/') for path in file_paths]
+        technology_stack = requirements.get('technology_Stack', {})
+        
+        prompt_template = self._template_manager.get_template(
+            tech_stack, 'batch_prompt_template',
+            files=context.get('batch_files', [{'path': path} for path in relative_paths]),
+            project_name=requirements.get('project_Overview', {}).get('project_Name', 'this application'),
+            backend_language_framework=f"{technology_stack.get('backend', {}).get('language', 'Python')} {technology_stack.get('backend', {}).get('framework', 'FastAPI')}",
+            frontend_language_framework=f"{technology_stack.get('frontend', {}).get('language', 'HTML/CSS/JS')} {technology_stack.get('frontend', {}).get('framework', 'Vanilla')}",
+            storage_type=context.get('design_data', {}).get('data_Design', {}).get('storage_Type', 'sqlite'),
+            frontend_dir=context.get('frontend_dir', 'frontend'),
+            css_path=context.get('css_path', 'css/style.css'),
+            design_context=context.get('design_context', ''),
+            spec_context=context.get('spec_context', ''),
+            project_context_summary=context.get('project_context_summary', '')
+        )
+        if 'prompt_builder' in context:
+            context['prompt_builder'].record_prompt(
+                prompt_template, context['prompt_sections'], context['baseline_sections_tokens']
+            )
+        return prompt_template, relative_paths
+
+    def _record_batch_failure(self, relative_paths: List[str], error: Exception):
+        self._error_tracker.add_error("batch_generation", ", ".join(relative_paths), str(error), {"files": relative_paths})
+        logger.warning(f"⚠️ Batched generation of {relative_paths} failed ({error}); generating them one by one")
+
+    #One LLM call for a batch; raises BatchParseError unless every file is present and valid, so bad responses are never cached
+    async def _agenerate_batch(self, prompt: str, relative_paths: List[str]) -> str:
+        response = await self._chat_model().ainvoke([HumanMessage(content=prompt)])
+        tracing.record_usage(response)
+        content = _message_text(response)
+        self._parse_batch(content, relative_paths)
+        return content
+
+    @classmethod
+    def _is_valid_batch(cls, response: str, relative_paths: List[str]) -> bool:
+        try:
+            cls._parse_batch(response, relative_paths)
+            return True
+        except BatchParseError:
+            return False
+
+    @staticmethod
+    def _parse_batch(response: str, relative_paths: List[str]) -> Dict[str, str]:
+        files = parse_multi_file_response(response or "", relative_paths)
+        for path, code in files.items():
+            analysis = analyze_code(path, code)
+            if analysis.syntax_error:
+                raise BatchParseError(f"syntax error in {path}: {analysis.syntax_error}")
+        return files
+
+    #Stream the response through StreamingCodeGuard; the accepted code is written to <file>.partial as it arrives
+    async def _astream_generate(self, file_path: str, prompt: str) -> str:
+        stream = _StreamingFileWriter(file_path, self._config.max_output_chars)
+        chunks = self._chat_model().astream([HumanMessage(content=prompt)])
+        try:
+            async for chunk in chunks:
+                if stream.consume(chunk):
+                    break
+            return stream.finish()
+        finally:
+            aclose = getattr(chunks, 'aclose', None)
+            if aclose:
+                await aclose()
+            stream.close()
+
+
+def _relative_path(file_path: str, context: Dict) -> str:
+    return os.path.relpath(file_path, context.get('project_root', '')).replace('\\', '/')
+
+
+def _message_text(message) -> str:
+    """Text of a chat model message/chunk; Gemini may return a list of content parts"""
+    content = message.content
+    if isinstance(content, list):
+        content = "".join(part if isinstance(part, str) else part.get('text', '') for part in content)
+    return content or ""
+
+
+def _remove_partial_file(file_path: str):
+    """Drop the streamed <file>.partial once the final content of the file is on disk"""
+    partial_path = file_path + PARTIAL_SUFFIX
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+
+
+class _StreamingFileWriter:
+    """
+    Feeds streamed chunks through StreamingCodeGuard and mirrors the accepted code to <file>.partial.
+
+    The partial file stays on disk after the stream ends (a retry overwrites it), so generation
+    can be followed while it happens; it is removed by `_remove_partial_file` once the
+    validated, auto-fixed content has been written to the file itself.
+    """
+
+    def __init__(self, file_path: str, max_chars: int):
+        self.file_path = file_path
+        self.guard = StreamingCodeGuard(file_path, max_chars=max_chars)
+        self.partial_path = file_path + PARTIAL_SUFFIX
+        os.makedirs(os.path.dirname(self.partial_path) or ".", exist_ok=True)
+        self.partial = open(self.partial_path, 'w', encoding='utf-8')
+        self.started = time.time()
+        self.first_token_at = None
+
+    def consume(self, chunk) -> bool:
+        """Returns True once the file is complete and the stream can be dropped"""
+        content = _message_text(chunk)
+        # Gemini reports usage on the last chunk
+        tracing.record_usage(chunk)
+        if content and self.first_token_at is None:
+            self.first_token_at = time.time()
+            logger.debug(f"First token for {os.path.basename(self.file_path)} after {self.first_token_at - self.started:.2f}s")
+        accepted = self.guard.feed(content)
+        if accepted:
+            self.partial.write(accepted)
+            self.partial.flush()
+        if self.guard.done:
+            return True
+        finish_reason = (getattr(chunk, 'response_metadata', None) or {}).get('finish_reason')
+        if finish_reason and str(finish_reason).upper().endswith('MAX_TOKENS'):
+            raise GenerationAborted("output limit reached")
+        return False
+
+    def finish(self) -> str:
+        self.partial.write(self.guard.finish())
+        logger.debug(f"Streamed {os.path.basename(self.file_path)} in {time.time() - self.started:.2f}s")
+        return self.guard.code
+
+    def close(self):
+        self.partial.close()
 
 #Tool for creating project structure
 class ProjectStructureTool(BaseTool):
@@ -1373,10 +1614,12 @@ class ProjectStructureTool(BaseTool):
                     logger.debug(f"Created directory: {path}")
                 else:
                     os.makedirs(os.path.dirname(path), exist_ok=True)
-                    with open(path, 'w', encoding='utf-8') as f:
-                        f.write("")  # Create empty file
-                    created_items.append(f"File: {path}")
-                    logger.debug(f"Created file: {path}")
+                    # Keep existing files: incremental regeneration decides which ones get rewritten
+                    if not os.path.exists(path):
+                        with open(path, 'w', encoding='utf-8') as f:
+                            f.write("")  # Create empty file
+                        created_items.append(f"File: {path}")
+                        logger.debug(f"Created file: {path}")
             
             # Ensure logs directory
             logs_dir = os.path.join(project_root, 'logs')
@@ -1409,22 +1652,34 @@ class ProjectValidatorTool(BaseTool):
     
     #Validate the generated project
     def _run(self, project_root: str, tech_stack: str) -> str:
+        try:
+            issues = self.validate(project_root, tech_stack)
+        except Exception as e:
+            return f"Validation error: {str(e)}"
+        if issues:
+            return f"Found {len(issues)} validation issues:\n" + "\n".join(issues)
+        return "Project validation passed successfully"
+    
+    #Issues of the generated project, one message each; they are also recorded in the error tracker
+    def validate(self, project_root: str, tech_stack: str) -> List[str]:
         issues = []
         
         try:
+            # One walk of the project: files, modules and the import graph between them
+            index = ProjectIndex.build(project_root)
+            
             # Check for required files
             required_files = ['main.py', 'requirements.txt'] if tech_stack.lower() == 'fastapi' else ['index.js', 'package.json']
             for req_file in required_files:
-                if not self._find_file(project_root, req_file):
+                if not index.has_file(req_file):
                     issues.append(f"Missing required file: {req_file}")
             
             # Check for empty files
-            for root, _, files in os.walk(project_root):
-                for file in files:
-                    if file.endswith(('.py', '.js', '.html', '.css')):
-                        file_path = os.path.join(root, file)
-                        if os.path.getsize(file_path) == 0:
-                            issues.append(f"Empty file: {file_path}")
+            for rel_path in index.empty_files:
+                issues.append(f"Empty file: {os.path.join(project_root, rel_path)}")
+            
+            # Check that imports between project modules resolve (unresolved, circular, missing __init__.py)
+            issues.extend(index.check())
             
             # Check for non-ASCII characters in batch files
             for file in ['run.bat']:
@@ -1442,22 +1697,13 @@ class ProjectValidatorTool(BaseTool):
                     {"tech_stack": tech_stack}
                 )
             
-            if issues:
-                return f"Found {len(issues)} validation issues:\n" + "\n".join(issues)
-            return "Project validation passed successfully"
+            return issues
             
         except Exception as e:
             self._error_tracker.add_error(
                 "validation_error", project_root, str(e)
             )
-            return f"Validation error: {str(e)}"
-    
-    #Find if a file exists in the directory tree
-    def _find_file(self, root_dir: str, filename: str) -> bool:
-        for root, _, files in os.walk(root_dir):
-            if filename in files:
-                return True
-        return False
+            raise
 
 # Main Coding Agent
 class LangChainCodingAgent:
@@ -1465,30 +1711,35 @@ class LangChainCodingAgent:
         self.config = agent_config
         self.template_manager = TechnologyTemplateManager()
         self.error_tracker = None  # Initialized per-project in generate_project
+        self.validation_issues: List[str] = []  # Issues ProjectValidatorTool found in the last generated project
         
         logger.info(f"LangChainCodingAgent initialized with model: {self.config.model_name}")
         
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.config.model_name,
-            google_api_key=config.GEMINI_API_KEY,
-            temperature=0.1,
-            convert_system_message_to_human=True
-        )
         self.tools = []
 
+    #Chat model bound to the running event loop. Not kept on the agent: async clients belong to the loop
+    #that first used them, and generate_project (e.g. the AutoGen fallback) runs on a new loop per call.
+    def _chat_model(self):
+        return chat_model(self.config.model_name, temperature=0.1, convert_system_message_to_human=True)
+
     #Initializes tools for a specific project run.
     def _setup_project_tools(self, project_root: str):
         self.error_tracker = ErrorTracker(project_root)
         self.tools = [
             ProjectStructureTool(self.error_tracker),
-            FileGeneratorTool(self.llm, self.template_manager, self.error_tracker, self.config),
+            FileGeneratorTool(self._chat_model, self.template_manager, self.error_tracker, self.config),
             ProjectValidatorTool(self.error_tracker)
         ]
         logger.debug("Coding agent tools initialized for new project.")
 
     #Generates a complete project from design and specification dictionaries.
     def generate_project(self, design_data: dict, spec_data: dict) -> str:
+        return run_sync(self.agenerate_project(design_data, spec_data))
+
+    #Async version of generate_project; use one agent instance per project when running several concurrently.
+    async def agenerate_project(self, design_data: dict, spec_data: dict) -> str:
         project_name = None
+        self.validation_issues = []
         try:
             logger.info("🚀 Starting project generation...")
             logger.info(f"Design data keys: {list(design_data.keys()) if design_data else 'None'}")
@@ -1517,13 +1768,16 @@ class LangChainCodingAgent:
             logger.info(f"✅ Structure creation result: {structure_result}")
             
             # 4. Generate all project files
-            files_result = self._generate_project_files(design_data, spec_data, project_root)
+            files_result = await self._agenerate_project_files(design_data, spec_data, project_root)
             logger.info(f"✅ File generation result: {files_result}")
             
             # 5. Create the run script to start the application
             self._create_run_script(project_root, spec_data, design_data)
             logger.info(f"✅ Created run script for project '{project_name}'.")
             
+            # 6. Check the generated project (imports between modules) before any venv install or test run
+            self.validation_issues = self._validate_project(project_root, spec_data)
+            
             logger.info(f"🎉 Project generation completed successfully for: {project_root}")
             
             # This success message is what the AutoGen Coder will report back to the ProjectManager.
@@ -1538,6 +1792,21 @@ class LangChainCodingAgent:
             raise
 
     # --- Helper Methods ---
+    # Validate the generated project; returns the issues (also logged and recorded in the error tracker)
+    def _validate_project(self, project_root: str, spec_data: dict) -> List[str]:
+        tech_stack = spec_data.get('technology_Stack', {}).get('backend', {}).get('framework', 'fastapi')
+        validator = next(t for t in self.tools if isinstance(t, ProjectValidatorTool))
+        try:
+            issues = validator.validate(project_root, tech_stack)
+        except Exception as e:
+            logger.warning(f"⚠️ Validation error: {e}")
+            return []
+        if issues:
+            logger.warning(f"⚠️ Found {len(issues)} validation issues:\n" + "\n".join(issues))
+        else:
+            logger.info("✅ Project validation passed successfully")
+        return issues
+    
     # Validate JSON design and specification files
     def _validate_json(self, design_data: dict, spec_data: dict):
         required_design_fields = ['folder_Structure', 'data_Design', 'interface_Design', 'dependencies']
@@ -1570,7 +1839,7 @@ class LangChainCodingAgent:
         )
     
     # Wrapper for FileGeneratorTool actions
-    def _generate_project_files(self, design_data: dict, spec_data: dict, project_root: str) -> str:
+    async def _agenerate_project_files(self, design_data: dict, spec_data: dict, project_root: str) -> str:
         structure = design_data['folder_Structure']['structure']
         context_for_generation = self._build_context(design_data, spec_data, project_root)
         
@@ -1591,53 +1860,229 @@ class LangChainCodingAgent:
         # Sort files to generate database/model files first, then routes, then entry points
         sorted_files = self._sort_files_by_dependency_order(structure, project_context)
         
+        items_by_path = {}
         for item in sorted_files:
-            if 'directory' not in item.get('description', '').lower():
-                # Validate and sanitize the path to prevent directory traversal
-                item_path = item['path'].strip('/\\')
-                if '..' in item_path or item_path.startswith('/') or item_path.startswith('\\'):
-                    logger.warning(f"Skipping potentially unsafe path: {item_path}")
-                    continue
-                
-                file_path = os.path.join(project_root, item_path)
-                
-                # Ensure the directory exists before creating the file
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
-                # --- logic mới 28/6 ---
-                # Build enhanced context with project-wide awareness
-                file_context = context_for_generation.copy()
-                file_context['file_info'] = item
-                file_context['project_context'] = project_context
-                file_context['context_instructions'] = project_context.get_context_for_prompt(item_path)
-                
-                logger.info(f"📝 Generating {item_path} (type: {project_context._determine_file_type(item_path)})")
-                
-                code = file_generator._run(file_path, file_context, spec_data)
-                
-                # Update project context with what was generated (includes validation and auto-fixing)
-                validation_result = project_context.update_from_generated_file(item_path, code)
-                
-                # Use the fixed code for writing to file
-                final_code = validation_result['fixed_code']
-                # --- end logic mới ---
-                
+            # Validate and sanitize the path to prevent directory traversal
+            item_path = item['path'].strip('/\\')
+            if '..' in item_path or item_path.startswith('/') or item_path.startswith('\\'):
+                logger.warning(f"Skipping potentially unsafe path: {item_path}")
+                continue
+            items_by_path[item_path] = item
+        
+        # File-level dependency graph (unknown paths dropped, cycles broken by priority order)
+        file_graph = DependencyScheduler(
+            project_context.established_patterns.get('file_dependencies', {}),
+            order=list(items_by_path)
+        )
+        file_dependencies = file_graph.dependencies
+        
+        # Small sibling files (same directory and type) are generated in one request; each batch is one node
+        batches = {}
+        if self.config.batch_small_files:
+            batches = plan_batches(list(items_by_path), file_dependencies, project_context._determine_file_type, self.config.batch_max_files)
+        node_order, node_dependencies = contract_graph(list(items_by_path), file_dependencies, batches)
+        
+        # Files only start once the files they depend on are written and registered in the context
+        scheduler = DependencyScheduler(node_dependencies, order=node_order, max_workers=self.config.max_workers)
+        logger.info(f"🧵 Generating {len(items_by_path)} files in {len(scheduler.levels())} dependency levels with up to {scheduler.max_workers} concurrent requests")
+        for members in batches.values():
+            logger.info(f"📦 Batching {members} into one request")
+        
+        # Incremental regeneration: only files whose inputs changed go back to the LLM
+        manifest = GenerationManifest.load(project_root)
+        manifest.set_generator_hash(stable_hash({
+            'model': self.config.model_name,
+            **{key: value for key, value in context_for_generation.items() if key not in ('design_data', 'project_root')}
+        }))
+        for removed_path in manifest.removed_files(items_by_path):
+            removed_file = os.path.join(project_root, removed_path)
+            if os.path.isfile(removed_file):
+                os.remove(removed_file)
+                logger.info(f"🗑️ Removed {removed_path} (no longer in the design)")
+            manifest.forget(removed_path)
+        output_hashes = {}
+        reused_files = []
+        templated_files = []
+        prompt_builder = SlicedPromptBuilder(design_data, spec_data, project_context)
+        synthesizer = None
+        if self.config.template_synthesis:
+            synthesizer = TemplateSynthesizer(design_data, project_context.project_structure, self.config.template_min_confidence)
+        
+        def input_hashes_for(item_path: str) -> dict:
+            file_type = project_context._determine_file_type(item_path)
+            return {
+                'design': stable_hash(design_slice_for_file(design_data, item_path, file_type)),
+                'spec': stable_hash(spec_slice_for_file(spec_data, design_data, item_path, file_type)),
+                'dependencies': stable_hash({dep: output_hashes.get(dep) for dep in file_dependencies[item_path]}),
+            }
+        
+        def prepare(item_path: str) -> tuple:
+            # Runs between awaits on the event loop, so the context snapshot is consistent
+            file_path = os.path.join(project_root, item_path)
+            
+            # Ensure the directory exists before creating the file
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            
+            # Dependencies are already registered here, so their output hashes are final
+            input_hashes = input_hashes_for(item_path)
+            if manifest.is_up_to_date(item_path, input_hashes) and os.path.isfile(file_path):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    existing_code = f.read()
+                if existing_code.strip():
+                    logger.info(f"♻️ Keeping {item_path} (inputs unchanged)")
+                    return file_path, None, input_hashes, existing_code, None
+            
+            # Boilerplate rendered straight from the design; dependencies are registered, so their exports are known
+            if synthesizer is not None:
+                synthesis = synthesizer.synthesize(item_path, project_context._determine_file_type(item_path), project_context.symbol_index.exports_for)
+                if synthesis.code is not None:
+                    logger.info(f"🧩 Templating {item_path} ({synthesis.reason})")
+                    return file_path, None, input_hashes, None, synthesis.code
+                logger.debug(f"LLM needed for {item_path}: {synthesis.reason}")
+            
+            # --- logic mới 28/6 ---
+            # Build enhanced context with project-wide awareness
+            file_context = context_for_generation.copy()
+            file_context['file_info'] = items_by_path[item_path]
+            file_context['project_context'] = project_context
+            file_context['context_instructions'] = project_context.get_context_for_prompt(item_path)
+            
+            # Only the design/spec parts this file needs plus the exports of its direct dependencies
+            file_type = project_context._determine_file_type(item_path)
+            prompt_sections = prompt_builder.sections_for(item_path, file_type, file_dependencies[item_path], project_context)
+            file_context.update(prompt_sections)
+            file_context['prompt_builder'] = prompt_builder
+            file_context['prompt_sections'] = prompt_sections
+            file_context['baseline_sections_tokens'] = prompt_builder.full_documents_tokens + estimate_tokens(project_context.get_context_summary())
+            
+            logger.info(f"📝 Generating {item_path} (type: {project_context._determine_file_type(item_path)})")
+            return file_path, file_context, input_hashes, None, None
+        
+        async def generate(item_path: str, prepared: tuple) -> tuple:
+            file_path, file_context, input_hashes, existing_code, templated_code = prepared
+            if existing_code is not None:
+                return input_hashes, existing_code, 'kept'
+            if templated_code is not None:
+                return input_hashes, templated_code, 'template'
+            return input_hashes, await file_generator._arun(file_path, file_context, spec_data), 'generated'
+        
+        def register(item_path: str, result: tuple):
+            file_path = os.path.join(project_root, item_path)
+            input_hashes, code, source = result
+            reused = source == 'kept'
+            
+            # Update project context with what was generated (includes validation and auto-fixing).
+            # Kept files are registered too, so their dependents still see their definitions.
+            validation_result = project_context.update_from_generated_file(item_path, code)
+            
+            # Use the fixed code for writing to file
+            final_code = validation_result['fixed_code']
+            # --- end logic mới ---
+            
+            if not reused or final_code != code:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(final_code)
-                
+            _remove_partial_file(file_path)
+            
+            output_hashes[item_path] = stable_hash(final_code)
+            if code.startswith("# Error"):
+                manifest.forget(item_path)
+            else:
+                manifest.record(item_path, input_hashes, output_hashes[item_path])
+            manifest.save()
+            
+            if reused:
+                reused_files.append(file_path)
+            else:
                 generated_files.append(file_path)
-                
-                # Log validation results
-                if validation_result['fixes_applied']:
-                    logger.info(f"  ✅ Auto-fixed {len(validation_result['fixes_applied'])} issues")
+                if source == 'template':
+                    templated_files.append(file_path)
+            
+            # Log validation results
+            if validation_result['fixes_applied']:
+                logger.info(f"  ✅ Auto-fixed {len(validation_result['fixes_applied'])} issues in {item_path}")
+            else:
+                logger.debug(f"  ✅ No issues found")
+            logger.debug(f"✅ Generated and analyzed {item_path}")
+        
+        batched_requests = []
+        
+        def prepare_node(node: str):
+            if node not in batches:
+                return prepare(node)
+            members = batches[node]
+            prepared_files = {item_path: prepare(item_path) for item_path in members}
+            # Kept and templated files need no request
+            stale = [item_path for item_path in members if prepared_files[item_path][3] is None and prepared_files[item_path][4] is None]
+            if len(stale) < 2:
+                return prepared_files, stale, None
+            
+            batch_context = context_for_generation.copy()
+            prompt_sections = prompt_builder.batch_sections_for(
+                stale, project_context._determine_file_type(stale[0]),
+                list(dict.fromkeys(dep for item_path in stale for dep in file_dependencies[item_path])),
+                project_context
+            )
+            batch_context.update(prompt_sections)
+            batch_context['batch_files'] = [
+                {
+                    'path': item_path,
+                    'description': items_by_path[item_path].get('description', ''),
+                    'context_instructions': prepared_files[item_path][1]['context_instructions'],
+                }
+                for item_path in stale
+            ]
+            batch_context['prompt_builder'] = prompt_builder
+            batch_context['prompt_sections'] = prompt_sections
+            # Without batching every file would have carried the full documents
+            batch_context['baseline_sections_tokens'] = len(stale) * prepared_files[stale[0]][1]['baseline_sections_tokens']
+            return prepared_files, stale, batch_context
+        
+        async def generate_node(node: str, prepared) -> Any:
+            if node not in batches:
+                return await generate(node, prepared)
+            prepared_files, stale, batch_context = prepared
+            batch_code = {}
+            if batch_context is not None:
+                batch_code = await file_generator._arun_batch(
+                    [os.path.join(project_root, item_path) for item_path in stale], batch_context, spec_data
+                ) or {}
+                if batch_code:
+                    batched_requests.append(node)
+            results = {}
+            for item_path in batches[node]:
+                if item_path in batch_code:
+                    results[item_path] = (prepared_files[item_path][2], batch_code[item_path], 'generated')
                 else:
-                    logger.debug(f"  ✅ No issues found")
-                logger.debug(f"✅ Generated and analyzed {item_path}")
-        
-        logger.info(f"📊 Final project context summary:")
-        logger.info(project_context.get_context_summary())
-        
-        return f"Generated {len(generated_files)} files with project-wide context awareness"
+                    # Unchanged or templated file, or per-file fallback when the batch response could not be parsed
+                    results[item_path] = await generate(item_path, prepared_files[item_path])
+            return results
+        
+        def register_node(node: str, result):
+            if node not in batches:
+                register(node, result)
+                return
+            for item_path in batches[node]:
+                register(item_path, result[item_path])
+        
+        await scheduler.arun(generate_node, register_node, prepare=prepare_node)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"📊 Final project context summary:")
+            logger.info(project_context.get_context_summary())
+        
+        logger.info(f"♻️ Reused {len(reused_files)} unchanged files, regenerated {len(generated_files)}")
+        if synthesizer is not None:
+            logger.info(f"🧩 Template fast path: {len(templated_files)} of {len(generated_files)} regenerated files rendered without the LLM")
+        if batched_requests:
+            batched_files = sum(len(batches[node]) for node in batched_requests)
+            logger.info(f"📦 Generated {batched_files} small files in {len(batched_requests)} batched requests")
+        prompt_report = prompt_builder.report()
+        if prompt_report['prompts']:
+            logger.info(f"📉 Prompt tokens (estimated): {prompt_report['tokens_before']} unsliced -> {prompt_report['tokens_after']} sliced "
+                        f"({prompt_report['saved_pct']}% saved over {prompt_report['prompts']} prompts)")
+        
+        return f"Generated {len(generated_files)} files (kept {len(reused_files)} unchanged) with project-wide context awareness"
     
     def _sort_files_by_dependency_order(self, structure: list, project_context: ProjectContext) -> list:
         """Sort files by dependency order to generate foundational files first"""
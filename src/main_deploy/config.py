@@ -2,54 +2,84 @@ import os
 import logging
 import logging.handlers
 import sys
-import colorama
 from dotenv import load_dotenv, find_dotenv
 
-colorama.init(autoreset=True)
+# Importing this module only reads settings. Logging handlers, colorama and the check of the
+# essential variables are set up by init(), called once by the entry points (run.py, the
+# factory run, batch runs), so short-lived imports and the test scripts stay cheap.
+
 class ColorFormatter(logging.Formatter):
-    LOG_COLORS = {
-            logging.DEBUG: colorama.Fore.CYAN,
-            logging.INFO: colorama.Fore.GREEN,
-            logging.WARNING: colorama.Fore.YELLOW,
-            logging.ERROR: colorama.Fore.RED,
-            logging.CRITICAL: colorama.Fore.MAGENTA + colorama.Style.BRIGHT,
-    }
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import colorama
+        colorama.init(autoreset=True)
+        self.log_colors = {
+                logging.DEBUG: colorama.Fore.CYAN,
+                logging.INFO: colorama.Fore.GREEN,
+                logging.WARNING: colorama.Fore.YELLOW,
+                logging.ERROR: colorama.Fore.RED,
+                logging.CRITICAL: colorama.Fore.MAGENTA + colorama.Style.BRIGHT,
+        }
+        self.default_color = colorama.Fore.WHITE
 
     def format(self, record):
         log_message = super().format(record)
-        return self.LOG_COLORS.get(record.levelno, colorama.Fore.WHITE) + log_message
+        return self.log_colors.get(record.levelno, self.default_color) + log_message
+
+_log_listener = None
 
 def setup_global_logger():
+    """
+    Root logger for the whole process.
+
+    Records go through a queue to a listener thread that owns the rotating file and console
+    handlers, so file writes and colouring never run on the generation loop (LOG_QUEUE=false
+    writes directly). The root level is LOG_LEVEL, so disabled levels are dropped before a
+    record is even created.
+    """
+    global _log_listener
+    import log_utils
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(LOG_LEVEL)
     
     project_root = os.path.dirname(os.path.abspath(__file__))
     log_file_path = os.path.join(project_root, 'overall_system.log')
 
     file_handler = logging.handlers.RotatingFileHandler(log_file_path, maxBytes=3*1024*1024, backupCount=5, encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
-
+    file_handler.setLevel(LOG_LEVEL)
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = ColorFormatter('%(asctime)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    console_handler.setLevel(LOG_LEVEL)
+    if LOG_FORMAT == "json":
+        file_handler.setFormatter(log_utils.JsonFormatter())
+        console_handler.setFormatter(log_utils.JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        console_handler.setFormatter(ColorFormatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    if LOG_QUEUE:
+        # Stopped (and flushed) at interpreter exit
+        _log_listener = log_utils.start_queue_logging(logger, [file_handler, console_handler])
+    else:
+        for handler in (file_handler, console_handler):
+            handler.addFilter(log_utils.TraceContextFilter())
+            logger.addHandler(handler)
 
     return logger
 
 # Other modules can just call `import logging; logger = logging.getLogger(__name__)`
-# and they will automatically use this configuration.
-logger = setup_global_logger()
+# and they will use the configuration set up by init().
+logger = logging.getLogger(__name__)
 
-dotenv_path = find_dotenv()
-if dotenv_path:
-    load_dotenv(dotenv_path)
-    logger.info(f"Loaded .env file from: {dotenv_path}")
-else:
-    logger.warning(".env file not found. Relying on environment variables or defaults.")
+# The settings below are read from the environment, so the .env file is loaded first
+DOTENV_PATH = find_dotenv()
+if DOTENV_PATH:
+    load_dotenv(DOTENV_PATH)
+
+# Logging (see setup_global_logger): level of the file and console output, "text" or "json"
+# lines, and whether handlers run on a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() in ("1", "true", "yes")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 BASE_OUTPUT_DIR = os.getenv("PERSISTED_BASE_OUTPUT_DIR")
@@ -62,6 +92,42 @@ else:
 
 API_DELAY_SECONDS = int(os.getenv("API_DELAY_SECONDS", "5"))
 MAX_LLM_RETRIES = int(os.getenv("MAX_LLM_RETRIES", "2"))
+MAX_GENERATION_WORKERS = int(os.getenv("MAX_GENERATION_WORKERS", "4"))
+# Unit-test generation requests in flight at once (paced by the shared rate limiter below)
+TEST_GENERATION_WORKERS = int(os.getenv("TEST_GENERATION_WORKERS", str(MAX_GENERATION_WORKERS)))
+# Unit tests for the functions of one module in one request, while the module fits the token budget
+BATCH_UNIT_TESTS = os.getenv("BATCH_UNIT_TESTS", "true").lower() in ("1", "true", "yes")
+UNIT_TEST_BATCH_TOKENS = int(os.getenv("UNIT_TEST_BATCH_TOKENS", "6000"))
+# Shared API quota for every agent (requests / tokens per minute); the limiter backs off on 429s
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "15"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_RATE_BURST = float(os.getenv("GEMINI_RATE_BURST", "1"))
+STREAM_CODE_GENERATION = os.getenv("STREAM_CODE_GENERATION", "true").lower() in ("1", "true", "yes")
+MAX_GENERATED_FILE_CHARS = int(os.getenv("MAX_GENERATED_FILE_CHARS", "200000"))
+BATCH_SMALL_FILES = os.getenv("BATCH_SMALL_FILES", "true").lower() in ("1", "true", "yes")
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "4"))
+TEMPLATE_SYNTHESIS = os.getenv("TEMPLATE_SYNTHESIS", "true").lower() in ("1", "true", "yes")
+TEMPLATE_MIN_CONFIDENCE = float(os.getenv("TEMPLATE_MIN_CONFIDENCE", "0.9"))
+# "gemini", or "fake" for the offline stand-in used by the benchmarks (see fake_llm.py)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.05"))
+FAKE_LLM_RATE_LIMIT_RATE = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+FAKE_LLM_MALFORMED_RATE = float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0"))
+FAKE_LLM_FIXTURE = os.getenv("FAKE_LLM_FIXTURE")  # path prefix of a <prefix>.spec.json / <prefix>.design.json pair
+# run.py --batch: projects in flight at once, and per-phase limits ("phase=N,..."; unlisted phases use BATCH_MAX_PROJECTS)
+BATCH_MAX_PROJECTS = int(os.getenv("BATCH_MAX_PROJECTS", "4"))
+BATCH_PHASE_WORKERS = os.getenv("BATCH_PHASE_WORKERS", "coding=2,testing=2,debugging=1")
+# Let concurrent identical prompts share one in-flight LLM call
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+# Share LLM clients (and their connections) between agents asking for the same model/temperature/options
+LLM_CLIENT_POOL = os.getenv("LLM_CLIENT_POOL", "true").lower() in ("1", "true", "yes")
+# Create the generated project's venv and install its requirements (off for offline benchmarks)
+SETUP_PROJECT_ENV = os.getenv("SETUP_PROJECT_ENV", "true").lower() in ("1", "true", "yes")
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR") or (os.path.join(BASE_OUTPUT_DIR, ".llm_cache") if BASE_OUTPUT_DIR else ".llm_cache")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "500"))
+LLM_CACHE_MAX_AGE_DAYS = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() in ("1", "true", "yes")
 
 DEFAULT_GEMINI_MODEL_FOR_SPEC_DESIGN = os.getenv("SPEC_DESIGN_MODEL", "gemini-2.0-flash")
 DEFAULT_GEMINI_MODEL_FOR_CODING = os.getenv("CODING_MODEL", "gemini-2.0-flash")
@@ -105,27 +171,63 @@ def choose_models():
     except (EOFError, KeyboardInterrupt):
         logger.warning("\nModel selection skipped. Using default models.")
 
-ESSENTIAL_VARIABLES = {
-    "GEMINI_API_KEY": GEMINI_API_KEY,
-    "BASE_OUTPUT_DIR": BASE_OUTPUT_DIR,
-    "PYTHON_EXECUTABLE": PYTHON_EXECUTABLE,
-}
+_initialized = False
+
+def init():
+    """
+    Set up logging and check the essential variables; safe to call more than once.
+
+    Raises:
+        EnvironmentError: If an essential variable is missing.
+    """
+    global _initialized
+    if _initialized:
+        return
+    setup_global_logger()
+    if DOTENV_PATH:
+        logger.info(f"Loaded .env file from: {DOTENV_PATH}")
+    else:
+        logger.warning(".env file not found. Relying on environment variables or defaults.")
+    check_essential_variables()
+    _initialized = True
+
+def check_essential_variables():
+    essential_variables = {
+        "GEMINI_API_KEY": GEMINI_API_KEY if LLM_PROVIDER == "gemini" else "not needed",
+        "BASE_OUTPUT_DIR": BASE_OUTPUT_DIR,
+        "PYTHON_EXECUTABLE": PYTHON_EXECUTABLE,
+    }
 
-missing_variables = [key for key, value in ESSENTIAL_VARIABLES.items() if not value]
+    missing_variables = [key for key, value in essential_variables.items() if not value]
+
+    if missing_variables:
+        error_message = (
+            f"Missing essential configuration variable(s): {', '.join(missing_variables)}. "
+            "Please ensure your .env file is correctly set up. You may need to run "
+            "a setup script first (like your detect_path.py logic)."
+        )
+        logger.critical(error_message)
+        raise EnvironmentError(error_message)
 
-if missing_variables:
-    error_message = (
-        f"Missing essential configuration variable(s): {', '.join(missing_variables)}. "
-        "Please ensure your .env file is correctly set up. You may need to run "
-        "a setup script first (like your detect_path.py logic)."
-    )
-    logger.critical(error_message)
-    raise EnvironmentError(error_message)
-else:
     logger.info("Essential configurations loaded successfully.")
-    logger.info(f"  GEMINI_API_KEY: {'*' * (len(GEMINI_API_KEY) - 4) + GEMINI_API_KEY[-4:]}")
+    if GEMINI_API_KEY:
+        logger.info(f"  GEMINI_API_KEY: {'*' * (len(GEMINI_API_KEY) - 4) + GEMINI_API_KEY[-4:]}")
     logger.info(f"  BASE_OUTPUT_DIR: {BASE_OUTPUT_DIR}")
     logger.info(f"  PYTHON_EXECUTABLE: {PYTHON_EXECUTABLE}")
     logger.info(f"  SPEC_DESIGN_OUTPUT_DIR (will be created): {SPEC_DESIGN_OUTPUT_DIR}")
     logger.info(f"  API_DELAY_SECONDS: {API_DELAY_SECONDS}")
     logger.info(f"  MAX_LLM_RETRIES: {MAX_LLM_RETRIES}")
+    logger.info(f"  MAX_GENERATION_WORKERS: {MAX_GENERATION_WORKERS}")
+    logger.info(f"  TEST_GENERATION_WORKERS: {TEST_GENERATION_WORKERS}")
+    logger.info(f"  BATCH_UNIT_TESTS: {BATCH_UNIT_TESTS} (up to {UNIT_TEST_BATCH_TOKENS} tokens per request)")
+    logger.info(f"  GEMINI_RPM / GEMINI_TPM: {GEMINI_RPM} / {GEMINI_TPM}")
+    logger.info(f"  STREAM_CODE_GENERATION: {STREAM_CODE_GENERATION} (max {MAX_GENERATED_FILE_CHARS} chars per file)")
+    logger.info(f"  BATCH_SMALL_FILES: {BATCH_SMALL_FILES} (up to {BATCH_MAX_FILES} files per request)")
+    logger.info(f"  TEMPLATE_SYNTHESIS: {TEMPLATE_SYNTHESIS} (min confidence {TEMPLATE_MIN_CONFIDENCE})")
+    logger.info(f"  LLM_PROVIDER: {LLM_PROVIDER}" + (f" (latency {FAKE_LLM_LATENCY}s, 429 rate {FAKE_LLM_RATE_LIMIT_RATE}, malformed rate {FAKE_LLM_MALFORMED_RATE})" if LLM_PROVIDER == "fake" else ""))
+    logger.info(f"  SETUP_PROJECT_ENV: {SETUP_PROJECT_ENV}")
+    logger.info(f"  LLM_CLIENT_POOL: {LLM_CLIENT_POOL}")
+    logger.info(f"  LLM_SINGLE_FLIGHT: {LLM_SINGLE_FLIGHT}")
+    logger.info(f"  BATCH_MAX_PROJECTS: {BATCH_MAX_PROJECTS} (phase workers: {BATCH_PHASE_WORKERS})")
+    logger.info(f"  LLM_CACHE_DIR: {LLM_CACHE_DIR} (bypass: {LLM_CACHE_BYPASS})")
+    logger.info(f"  LOG_LEVEL: {LOG_LEVEL} (format: {LOG_FORMAT}, queued: {LOG_QUEUE})")
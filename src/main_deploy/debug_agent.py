@@ -7,11 +7,14 @@ import subprocess
 import ast
 import argparse
 from langchain.agents import initialize_agent, AgentType
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.tools import StructuredTool
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple, List
 import config
+from rate_limiter import get_rate_limiter, langchain_rate_limiter, is_rate_limit_error, retry_after_from_error
+from async_utils import run_sync, run_subprocess, script_command
+import tracing
+from llm_clients import chat_model
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +144,7 @@ class RunTestsInput(BaseModel):
 class DebuggingTools:
     def __init__(self, project_root: str):
         self.project_root = project_root
-        self.llm_model = ChatGoogleGenerativeAI(model=config.CURRENT_MODELS['debugging'], google_api_key=config.GEMINI_API_KEY)
+        self.llm_model = chat_model(config.CURRENT_MODELS['debugging'], rate_limiter=langchain_rate_limiter())
         
     def get_all_tools(self) -> List[StructuredTool]:
         return [
@@ -165,12 +168,14 @@ class DebuggingTools:
             ),
             StructuredTool.from_function(
                 func=self._run_tests_and_get_results,
+                coroutine=self._arun_tests_and_get_results,
                 name="run_tests_and_get_results",
                 description="Runs the project's test suite and returns the result. Returns 'All tests passed.' or a JSON string of the first failure.",
                 args_schema=EmptyInput
             ),
             StructuredTool.from_function(
                 func=self._run_fresh_tests,
+                coroutine=self._arun_fresh_tests,
                 name="run_fresh_tests",
                 description="Runs the tests and returns the result. This is similar to 'run_tests_and_get_results' but ensures fresh failure information is retrieved.",
                 args_schema=RunTestsInput
@@ -194,7 +199,8 @@ class DebuggingTools:
             with open(log_file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            logger.debug(f"Test log content (first 500 chars): {content[:500]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Test log content (first 500 chars): {content[:500]}")
             
             # First try: Look for the "Failure Summary (Mapped)" section generated by test_generator_agent.py
             pattern = re.compile(
@@ -381,6 +387,9 @@ class DebuggingTools:
     # Internal implementation for run_test tool
     def _run_tests_and_get_results(self) -> str:
         """Internal method for run_test tool."""
+        return run_sync(self._arun_tests_and_get_results())
+
+    async def _arun_tests_and_get_results(self) -> str:
         bat_file = os.path.join(self.project_root, "run_test.bat")
         test_log_file = os.path.join(self.project_root, TEST_LOG_FILE)
 
@@ -398,17 +407,13 @@ class DebuggingTools:
 
         try:
             # Execute the batch script. It will write pytest output to test_results.log
-            result = subprocess.run(
-                f'"{bat_file}"',
-                shell=True,
-                capture_output=True, # Capture output/stderr of the batch script itself (e.g., debug_test_agent.log content)
-                text=True,
-                cwd=self.project_root,
-                check=False # Do not raise CalledProcessError as we handle exit code manually
-            )
+            # stdout/stderr of the batch script itself are captured; the exit code is handled manually
+            with tracing.span('pytest', kind='test', project_root=self.project_root) as test_span:
+                result = await run_subprocess(script_command(bat_file), cwd=self.project_root)
+                test_span.set(exit_code=result.returncode)
             
             # Log stdout/stderr of the batch script itself (debug_test_agent.log content will also be here)
-            if result.stdout:
+            if result.stdout and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"run_test.bat stdout (from debug_test_agent.log):\n{result.stdout}")
             if result.stderr:
                 logger.error(f"run_test.bat stderr (from debug_test_agent.log):\n{result.stderr}")
@@ -430,6 +435,9 @@ class DebuggingTools:
     # Internal implementation for run_fresh_tests tool
     def _run_fresh_tests(self, test_filter: Optional[str] = None) -> str:
         """Internal method for run_fresh_tests tool."""
+        return run_sync(self._arun_fresh_tests(test_filter))
+
+    async def _arun_fresh_tests(self, test_filter: Optional[str] = None) -> str:
         bat_file = os.path.join(self.project_root, "run_test.bat")
         test_log_file = os.path.join(self.project_root, TEST_LOG_FILE)
 
@@ -447,23 +455,18 @@ class DebuggingTools:
 
         try:
             # Execute the batch script with optional test filter
-            command = f'"{bat_file}"'
+            command = script_command(bat_file)
             if test_filter:
                 # Modify the bat file execution to accept filter (this is a simplified approach)
                 # For a more robust solution, we'd modify the run_test.bat to accept arguments
                 logger.info(f"Running tests with filter: {test_filter}")
             
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.project_root,
-                check=False
-            )
+            with tracing.span('pytest', kind='test', project_root=self.project_root) as test_span:
+                result = await run_subprocess(command, cwd=self.project_root)
+                test_span.set(exit_code=result.returncode)
             
             # Log the execution details
-            if result.stdout:
+            if result.stdout and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Test execution stdout:\n{result.stdout}")
             if result.stderr:
                 logger.error(f"Test execution stderr:\n{result.stderr}")
@@ -519,7 +522,16 @@ class DebuggingTools:
 #             return f"Error deploying application: {str(e)}"
 
 
-def run_debugging_cycle(project_root: str, initial_failures: List[Dict]) -> bool:
+def run_debugging_cycle(project_root: str, initial_failures: List[Dict],
+                        on_iteration: Optional[Callable[[int, str], None]] = None,
+                        refresh_tests: Optional[Callable[[], Awaitable[Any]]] = None) -> bool:
+    """Blocking wrapper around arun_debugging_cycle."""
+    return run_sync(arun_debugging_cycle(project_root, initial_failures, on_iteration, refresh_tests))
+
+
+async def arun_debugging_cycle(project_root: str, initial_failures: List[Dict],
+                               on_iteration: Optional[Callable[[int, str], None]] = None,
+                               refresh_tests: Optional[Callable[[], Awaitable[Any]]] = None) -> bool:
     """
     The main entry point for the debugging phase. It orchestrates the iterative
     fix-and-retest loop using a LangChain agent.
@@ -527,6 +539,11 @@ def run_debugging_cycle(project_root: str, initial_failures: List[Dict]) -> bool
     Args:
         project_root (str): The absolute path to the generated project's root directory.
         initial_failures (list): The list of failed tests from the testing phase.
+        on_iteration (callable): Optional, called as on_iteration(iteration, outcome) after every
+            debug iteration (used to checkpoint progress in the run journal).
+        refresh_tests (callable): Optional coroutine function awaited after every iteration that did not
+            end the cycle, before the tests are re-run; it regenerates the tests of the functions and
+            endpoints the fixes changed (see testing_agent.arefresh_generated_tests).
 
     Returns:
         bool: True if all bugs were fixed, False otherwise.
@@ -535,10 +552,10 @@ def run_debugging_cycle(project_root: str, initial_failures: List[Dict]) -> bool
     
     # initialize the tools and the Langchain agent
     tools_instance = DebuggingTools(project_root=project_root)
-    llm = ChatGoogleGenerativeAI(
-        model=config.CURRENT_MODELS['debugging'],
-        google_api_key=config.GEMINI_API_KEY,
-        temperature=0.2
+    llm = chat_model(
+        config.CURRENT_MODELS['debugging'],
+        temperature=0.2,
+        rate_limiter=langchain_rate_limiter()  # the agent executor calls the model itself, so gate it at the model
     )
     
     agent_executor = initialize_agent(
@@ -565,7 +582,7 @@ def run_debugging_cycle(project_root: str, initial_failures: List[Dict]) -> bool
     else:
         # No initial failures provided, try to discover current failures
         logger.info("No initial failures provided. Will run tests to discover current failures.")
-        initial_test_result = tools_instance._run_tests_and_get_results()
+        initial_test_result = await tools_instance._arun_tests_and_get_results()
         if "No failed tests found" not in initial_test_result:
             current_failure_json = initial_test_result
             logger.info(f"Discovered failure: {current_failure_json}")
@@ -611,26 +628,45 @@ def run_debugging_cycle(project_root: str, initial_failures: List[Dict]) -> bool
         IMPORTANT: Use 'run_fresh_tests' rather than 'run_tests_and_get_results' for the most current test status.
         """
         
-        try:
-            response = agent_executor.invoke({"input": agent_prompt})
-            final_answer = response.get("output", "")
+        with tracing.span('debug_iteration', kind='debug', iteration=i + 1) as iteration_span:
+            try:
+                response = await agent_executor.ainvoke({"input": agent_prompt})
+                final_answer = response.get("output", "")
             
-            if "TERMINATE" in final_answer or "All tests passed" in final_answer:
-                logger.info("Agent reports all tests passed. Debugging successful.")
-                return True
+                if "TERMINATE" in final_answer or "All tests passed" in final_answer:
+                    logger.info("Agent reports all tests passed. Debugging successful.")
+                    if on_iteration:
+                        on_iteration(i + 1, "fixed")
+                    iteration_span.set(outcome="fixed")
+                    return True
             
-            lastest_results_str = tools_instance._run_tests_and_get_results()
-            if "No failed tests found" in lastest_results_str:
-                logger.info("Verification shows all tests passed. Debugging successfully.")
-                return True
-            else:
-                current_failure_json = lastest_results_str # update for the next loop
-                current_debug_history += f"\n- Iteration {i+1} Result: Fix was not complete. New failure: {current_failure_json}"
+                if refresh_tests:
+                    try:
+                        await refresh_tests()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not regenerate the tests of changed functions: {e}")
+                lastest_results_str = await tools_instance._arun_tests_and_get_results()
+                if "No failed tests found" in lastest_results_str:
+                    logger.info("Verification shows all tests passed. Debugging successfully.")
+                    if on_iteration:
+                        on_iteration(i + 1, "fixed")
+                    iteration_span.set(outcome="fixed")
+                    return True
+                else:
+                    current_failure_json = lastest_results_str # update for the next loop
+                    current_debug_history += f"\n- Iteration {i+1} Result: Fix was not complete. New failure: {current_failure_json}"
+                    if on_iteration:
+                        on_iteration(i + 1, f"still failing: {current_failure_json[:500]}")
+                    iteration_span.set(outcome="still failing")
 
-        except Exception as e:
-            logger.error(f"An error occurred in the agent executor during iteration {i+1}: {e}", exc_info=True)
-            current_debug_history += f"\n- Iteration {i+1} Result: Agent loop crashed with an error. Error: {e}"
-            time.sleep(config.API_DELAY_SECONDS)
+            except Exception as e:
+                logger.error(f"An error occurred in the agent executor during iteration {i+1}: {e}", exc_info=True)
+                current_debug_history += f"\n- Iteration {i+1} Result: Agent loop crashed with an error. Error: {e}"
+                if on_iteration:
+                    on_iteration(i + 1, f"error: {e}")
+                iteration_span.set(outcome="error", error=str(e)[:500])
+                if is_rate_limit_error(e):
+                    get_rate_limiter().on_rate_limited(retry_after_from_error(e))
     
     logger.error(f"Reached maximum debug iterations ({max_debug_iterations}). Unable to fix all bugs.")
     return False
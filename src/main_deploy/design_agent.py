@@ -2,6 +2,7 @@ import logging
 import json
 import os
 from base_agent import BaseAgent
+from async_utils import run_sync
 from prompt import DESIGN_PROMPT
 import utils
 from datetime import datetime
@@ -14,14 +15,19 @@ class DesignAgent(BaseAgent):
         logger.info("DesignAgent initialized.")
 
     def generate_design(self, spec_data: dict) -> dict:
+        return run_sync(self.agenerate_design(spec_data))
+
+    async def agenerate_design(self, spec_data: dict) -> dict:
         if not isinstance(spec_data, dict) or not spec_data:
             logger.error("Input specification data must be a non-empty dictionary.")
             raise ValueError("Input specification data must be a non-empty dictionary.")
 
         try:
             logger.info("Generating system design from specification...")
-            spec_json_string = json.dumps(spec_data, indent=2)
-            response_text = self.chain.invoke({"agent1_output_json": spec_json_string})
+            # Metadata (timestamps, file paths) changes on every run and would defeat the response cache
+            spec_for_prompt = {k: v for k, v in spec_data.items() if k != "metadata"}
+            spec_json_string = json.dumps(spec_for_prompt, indent=2)
+            response_text = await self.ainvoke_chain({"agent1_output_json": spec_json_string}, validator=utils.is_json_object_response)
             logger.info("Received response from model.")
 
             #parse the JSON response
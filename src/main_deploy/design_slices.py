@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+# Fields that change on every run (timestamps, output paths) and never affect generated code
+VOLATILE_KEYS = ('metadata',)
+
+
+def stable_hash(obj) -> str:
+    """sha256 of a canonical JSON rendering, so dict ordering never changes the hash"""
+    if isinstance(obj, str):
+        payload = obj
+    else:
+        payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _without_volatile(data: dict) -> dict:
+    return {key: value for key, value in (data or {}).items() if key not in VOLATILE_KEYS}
+
+
+def _resource_names(file_path: str) -> List[str]:
+    """'backend/routes/flashcard_routes.py' -> ['flashcard', 'flashcards']"""
+    stem = os.path.splitext(os.path.basename(file_path))[0].lower()
+    stem = re.sub(r'(_?(routes?|router|api|endpoints?|views?))$', '', stem).strip('_')
+    if not stem:
+        return []
+    singular = stem[:-1] if stem.endswith('s') else stem
+    return [singular, singular + 's']
+
+
+def endpoints_for_file(design_data: dict, file_path: str) -> List[dict]:
+    """API specifications served by a route file, matched on the resource name; all endpoints if nothing matches"""
+    endpoints = design_data.get('interface_Design', {}).get('api_Specifications', []) or []
+    names = _resource_names(file_path)
+    if not names:
+        return endpoints
+    matched = [
+        spec for spec in endpoints
+        if any(name in re.split(r'[/{}<>:\-]+', str(spec.get('endpoint', '')).lower()) for name in names)
+    ]
+    return matched or endpoints
+
+
+# Which parts of the design / spec each file type needs. Anything not listed gets the full document.
+DESIGN_SECTIONS_BY_TYPE = {
+    'database': ('storage', 'dependencies', 'data_Models'),
+    'config': ('storage', 'dependencies'),
+    'models': ('data_Models',),
+    'routes': ('data_Models', 'file_endpoints'),
+    'entry_point': ('data_Models', 'api_Specifications', 'dependencies'),
+    'frontend': ('data_Models', 'api_Specifications'),
+}
+SPEC_SECTIONS_BY_TYPE = {
+    'database': ('non_Functional_Requirements',),
+    'config': ('non_Functional_Requirements',),
+    'models': ('functional_Requirements',),
+    'routes': ('file_requirements',),
+    'entry_point': ('functional_Requirements',),
+    'frontend': ('functional_Requirements',),
+}
+
+
+def design_sections_for(file_type: str) -> tuple:
+    return DESIGN_SECTIONS_BY_TYPE.get(file_type, ('design',))
+
+
+def spec_sections_for(file_type: str) -> tuple:
+    return SPEC_SECTIONS_BY_TYPE.get(file_type, ('spec',))
+
+
+def structure_entry_for_file(design_data: dict, file_path: str) -> dict:
+    structure = design_data.get('folder_Structure', {}).get('structure', []) or []
+    return next((item for item in structure if item.get('path', '').strip('/\\') == file_path), {})
+
+
+def requirements_for_file(spec_data: dict, design_data: dict, file_path: str) -> List[dict]:
+    """Requirements referenced by the endpoints a route file implements; all FRs if none are referenced"""
+    referenced = set()
+    for endpoint in endpoints_for_file(design_data or {}, file_path):
+        referenced.update(endpoint.get('related_NFRs', []) or [])
+    requirements = [
+        req for req in (spec_data.get('functional_Requirements', []) or []) + (spec_data.get('non_Functional_Requirements', []) or [])
+        if req.get('id') in referenced
+    ]
+    return requirements or spec_data.get('functional_Requirements', [])
+
+
+def sibling_entries(design_data: dict, file_path: str) -> List[dict]:
+    """
+    Paths and descriptions of the structure entries in the same directory as `file_path` (including
+    itself), sorted by path. This is the structure a file's prompt shows, and what its design hash covers.
+    """
+    structure = design_data.get('folder_Structure', {}).get('structure', []) or []
+    directory = os.path.dirname(file_path.strip('/\\').replace('\\', '/'))
+    entries = ({'path': item.get('path', '').strip('/\\').replace('\\', '/'), 'description': item.get('description', '')}
+               for item in structure)
+    return sorted((entry for entry in entries if entry['path'] and os.path.dirname(entry['path']) == directory),
+                  key=lambda entry: entry['path'])
+
+
+def design_slice_for_file(design_data: dict, file_path: str, file_type: str) -> Dict:
+    """
+    The part of the design that a file's code actually depends on.
+    Unknown file types get the whole design (minus metadata) so nothing is ever missed.
+
+    Only the same-directory siblings are included, not the whole structure (the prompt shows
+    the same entries): adding or renaming a file elsewhere must not invalidate every file.
+    Paths of the files it imports from are covered by the dependency hash.
+    """
+    design_data = _without_volatile(design_data)
+    data_design = design_data.get('data_Design', {}) or {}
+
+    design_slice = {
+        'siblings': sibling_entries(design_data, file_path),
+        'file': structure_entry_for_file(design_data, file_path),
+    }
+    for section in design_sections_for(file_type):
+        if section == 'storage':
+            design_slice['storage'] = {key: data_design.get(key) for key in ('storage_Type', 'database_Type')}
+        elif section == 'dependencies':
+            design_slice['dependencies'] = design_data.get('dependencies', {})
+        elif section == 'data_Models':
+            design_slice['data_Models'] = data_design.get('data_Models', [])
+        elif section == 'file_endpoints':
+            design_slice['api_Specifications'] = endpoints_for_file(design_data, file_path)
+        elif section == 'api_Specifications':
+            design_slice['api_Specifications'] = design_data.get('interface_Design', {}).get('api_Specifications', [])
+        elif section == 'design':
+            design_slice['design'] = design_data
+    return design_slice
+
+
+def spec_slice_for_file(spec_data: dict, design_data: dict, file_path: str, file_type: str) -> Dict:
+    """The part of the specification a file depends on; routes only see the requirements their endpoints reference"""
+    spec_data = _without_volatile(spec_data)
+    spec_slice = {
+        'project_Overview': spec_data.get('project_Overview', {}),
+        'technology_Stack': spec_data.get('technology_Stack', {}),
+    }
+    for section in spec_sections_for(file_type):
+        if section == 'file_requirements':
+            spec_slice['requirements'] = requirements_for_file(spec_data, design_data, file_path)
+        elif section == 'spec':
+            spec_slice['spec'] = spec_data
+        else:
+            spec_slice[section] = spec_data.get(section, [])
+    return spec_slice
@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_KEY = "$blob"
+
+
+def _canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ErrorJournal:
+    """
+    Append-only JSONL error log.
+
+    Each error is one line in the journal. Large context values (design data, requirements)
+    are moved out of the entry into content-addressed blob files and replaced by
+    {"$blob": "<sha256>"}, so repeated errors for the same project share a single copy.
+    Appending is O(entry size); nothing already written is rewritten.
+    """
+
+    def __init__(self, journal_path: str, blob_dir: Optional[str] = None, inline_limit: int = 2048):
+        self.journal_path = journal_path
+        self.blob_dir = blob_dir or os.path.join(os.path.dirname(journal_path) or ".", ".error_blobs")
+        self.inline_limit = inline_limit
+        self._lock = threading.Lock()
+        self._known_blobs = set()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.json")
+
+    def _store_blob(self, serialized: str) -> str:
+        digest = hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+        if digest in self._known_blobs:
+            return digest
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(serialized)
+            os.replace(tmp_path, path)
+        self._known_blobs.add(digest)
+        return digest
+
+    def _externalize(self, context: dict) -> dict:
+        reduced = {}
+        for key, value in (context or {}).items():
+            serialized = _canonical_json(value)
+            if len(serialized) > self.inline_limit:
+                reduced[key] = {BLOB_REF_KEY: self._store_blob(serialized)}
+            else:
+                reduced[key] = value
+        return reduced
+
+    def append(self, entry: dict) -> dict:
+        """Write one entry; returns the entry as journaled (large context values replaced by blob refs)"""
+        record = dict(entry)
+        with self._lock:
+            if 'context' in record:
+                record['context'] = self._externalize(record['context'])
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return record
+
+    def load_blob(self, digest: str):
+        with open(self._blob_path(digest), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def resolve(self, record: dict) -> dict:
+        """Return a copy of `record` with blob references replaced by their content"""
+        resolved = dict(record)
+        context = {}
+        for key, value in (record.get('context') or {}).items():
+            if isinstance(value, dict) and set(value) == {BLOB_REF_KEY}:
+                try:
+                    value = self.load_blob(value[BLOB_REF_KEY])
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Missing error blob {value[BLOB_REF_KEY]}: {e}")
+            context[key] = value
+        if 'context' in record:
+            resolved['context'] = context
+        return resolved
+
+    def read(self, resolve: bool = False) -> Iterator[dict]:
+        """Iterate journaled entries; a torn trailing line from an interrupted run is skipped"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line {line_number} in {self.journal_path}")
+                    continue
+                yield self.resolve(record) if resolve else record
+
+    def compact(self, keep_last: Optional[int] = None) -> Dict[str, int]:
+        """
+        Rewrite the journal without unreadable lines (optionally only the last `keep_last` entries)
+        and delete blobs no longer referenced by any entry.
+        """
+        with self._lock:
+            records = list(self.read())
+            if keep_last is not None:
+                records = records[-keep_last:] if keep_last > 0 else []
+
+            referenced = set()
+            for record in records:
+                for value in (record.get('context') or {}).values():
+                    if isinstance(value, dict) and set(value) == {BLOB_REF_KEY}:
+                        referenced.add(value[BLOB_REF_KEY])
+
+            if os.path.exists(self.journal_path):
+                tmp_path = self.journal_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                os.replace(tmp_path, self.journal_path)
+
+            removed_blobs = 0
+            if os.path.isdir(self.blob_dir):
+                for root, _, files in os.walk(self.blob_dir):
+                    for name in files:
+                        digest = name[:-len(".json")] if name.endswith(".json") else None
+                        if digest not in referenced:
+                            os.remove(os.path.join(root, name))
+                            removed_blobs += 1
+            self._known_blobs &= referenced
+
+        return {'entries': len(records), 'blobs': len(referenced), 'removed_blobs': removed_blobs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read or compact a JSONL error journal.")
+    parser.add_argument("journal", help="Path to the .jsonl error journal")
+    parser.add_argument("--resolve", action="store_true", help="Print entries with blob references expanded")
+    parser.add_argument("--compact", action="store_true", help="Drop unreadable lines and unreferenced blobs")
+    parser.add_argument("--keep-last", type=int, default=None, help="With --compact, keep only the last N entries")
+    parser.add_argument("--blob-dir", default=None, help="Blob directory (defaults to .error_blobs next to the journal)")
+    args = parser.parse_args()
+
+    journal = ErrorJournal(args.journal, blob_dir=args.blob_dir)
+    if args.compact:
+        stats = journal.compact(keep_last=args.keep_last)
+        print(f"Compacted {args.journal}: {stats['entries']} entries, {stats['blobs']} blobs kept, {stats['removed_blobs']} removed")
+        return
+    for record in journal.read(resolve=args.resolve):
+        if args.resolve:
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+        else:
+            print(f"{record.get('timestamp')} [{record.get('error_type')}] {record.get('file_path')}: {record.get('error_message')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prompt markers of each agent, checked in order
+_PROMPT_KINDS = (
+    ('specification', 'Requirements Analyst AI'),
+    ('design', 'System Designer AI'),
+    ('batch', 'FILES TO GENERATE ('),
+    ('file', 'Full Path of the File to Generate:'),
+    ('test', 'test file now'),
+    ('debug', 'debugging agent'),
+)
+_FILE_PATH_RE = re.compile(r"Full Path of the File to Generate:\s*(\S+)")
+_BATCH_FILE_RE = re.compile(r"^\s*FILE \d+: (\S+)\s*$", re.MULTILINE)
+
+
+class FakeRateLimitError(Exception):
+    """Looks like a Gemini 429 to rate_limiter.is_rate_limit_error / retry_after_from_error"""
+
+    code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429 RESOURCE_EXHAUSTED: quota exceeded (fake LLM). Please retry in {retry_after}s.")
+
+
+class FakeReply:
+    def __init__(self, text: str, prompt_tokens: int, response_tokens: int):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.response_tokens = response_tokens
+
+    @property
+    def usage(self) -> dict:
+        """langchain usage_metadata"""
+        return {'input_tokens': self.prompt_tokens, 'output_tokens': self.response_tokens,
+                'total_tokens': self.prompt_tokens + self.response_tokens}
+
+
+class FakeLLMBackend:
+    """
+    Deterministic stand-in for Gemini used by the offline benchmarks (LLM_PROVIDER=fake).
+
+    Responses are recognized by the prompt of each agent and either replayed from `canned`
+    (kind -> text, e.g. a fixture spec.json for 'specification') or synthesized: small valid
+    modules for generated files, multi-file blocks for batches, pytest files for tests and a
+    final answer for the debugging agent.
+
+    Every call sleeps `latency` seconds (plus up to `jitter`). Errors are injected with the
+    given rates: `rate_limit_rate` raises a 429 and `malformed_rate` returns broken code or
+    truncated JSON. The decision is a hash of the prompt and how often it was seen, so a run
+    is reproducible regardless of the order in which concurrent requests arrive, and a retry
+    of the same prompt gets a fresh roll.
+    """
+
+    def __init__(self, canned: Optional[Dict[str, str]] = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_rate: float = 0.0, malformed_rate: float = 0.0, retry_after: float = 0.05,
+                 functions_per_module: int = 5, seed: str = ""):
+        self.canned = dict(canned or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.functions_per_module = functions_per_module
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.rate_limited = 0
+        self.malformed = 0
+        self.calls_by_kind: Dict[str, int] = {}
+
+    @classmethod
+    def from_fixture(cls, spec_path: str, design_path: str, **kwargs) -> 'FakeLLMBackend':
+        """Replay a saved spec/design pair (e.g. outputs/*.spec.json and *.design.json)"""
+        canned = {}
+        for kind, path in (('specification', spec_path), ('design', design_path)):
+            with open(path, 'r', encoding='utf-8') as f:
+                canned[kind] = f.read()
+        return cls(canned=canned, **kwargs)
+
+    def complete(self, prompt: str, model: str = "fake") -> FakeReply:
+        delay, error, reply = self._plan(prompt)
+        if delay > 0:
+            time.sleep(delay)
+        if error:
+            raise error
+        return reply
+
+    async def acomplete(self, prompt: str, model: str = "fake") -> FakeReply:
+        delay, error, reply = self._plan(prompt)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        return reply
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'response_tokens': self.response_tokens,
+                'rate_limited': self.rate_limited,
+                'malformed': self.malformed,
+                'calls_by_kind': dict(self.calls_by_kind),
+            }
+
+    def _plan(self, prompt: str):
+        kind = self._kind(prompt)
+        prompt_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        with self._lock:
+            seen = self._seen.get(prompt_key, 0)
+            self._seen[prompt_key] = seen + 1
+            self.calls += 1
+            self.calls_by_kind[kind] = self.calls_by_kind.get(kind, 0) + 1
+        roll_key = f"{self.seed}:{prompt_key}:{seen}"
+        delay = self.latency + self.jitter * self._roll(roll_key, 'latency')
+
+        if self._roll(roll_key, 'rate_limit') < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            return delay, FakeRateLimitError(self.retry_after), None
+
+        text = self.canned.get(kind)
+        if text is None:
+            text = self._synthesize(kind, prompt)
+        if kind != 'debug' and self._roll(roll_key, 'malformed') < self.malformed_rate:
+            text = self._malformed(kind, text)
+            with self._lock:
+                self.malformed += 1
+
+        reply = FakeReply(text, len(prompt) // 4, len(text) // 4)
+        with self._lock:
+            self.prompt_tokens += reply.prompt_tokens
+            self.response_tokens += reply.response_tokens
+        return delay, None, reply
+
+    @staticmethod
+    def _roll(key: str, purpose: str) -> float:
+        digest = hashlib.sha256(f"{purpose}:{key}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+    @staticmethod
+    def _kind(prompt: str) -> str:
+        for kind, marker in _PROMPT_KINDS:
+            if marker in prompt:
+                return kind
+        return 'other'
+
+    def _synthesize(self, kind: str, prompt: str) -> str:
+        if kind == 'specification':
+            return json.dumps(_SYNTHETIC_SPEC, indent=2)
+        if kind == 'design':
+            return json.dumps(_SYNTHETIC_DESIGN, indent=2)
+        if kind == 'file':
+            match = _FILE_PATH_RE.search(prompt)
+            return self._file_content(match.group(1) if match else 'module.py')
+        if kind == 'batch':
+            blocks = [f"<<<FILE: {path}>>>\n{self._file_content(path)}\n<<<END FILE>>>" for path in _BATCH_FILE_RE.findall(prompt)]
+            return "\n".join(blocks)
+        if kind == 'test':
+            return _test_module()
+        if kind == 'debug':
+            return 'Action:\n```json\n{"action": "Final Answer", "action_input": "TERMINATE - All tests passed."}\n```'
+        return "OK"
+
+    def _file_content(self, path: str) -> str:
+        stem = re.sub(r'\W', '_', os.path.splitext(os.path.basename(path))[0]) or 'module'
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.py':
+            return _python_module(stem, self.functions_per_module)
+        if extension in ('.html', '.htm'):
+            return f"<!DOCTYPE html>\n<html>\n<head><title>{stem}</title></head>\n<body><h1>{stem}</h1></body>\n</html>"
+        if extension == '.css':
+            return f"/* {stem} */\nbody {{\n    margin: 0;\n    font-family: sans-serif;\n}}"
+        if extension == '.js':
+            return f"// {stem}\ndocument.addEventListener('DOMContentLoaded', () => {{\n    console.log('{stem} loaded');\n}});"
+        return f"# {stem}"
+
+    @staticmethod
+    def _malformed(kind: str, text: str) -> str:
+        if kind in ('specification', 'design'):
+            return text[:len(text) // 2]
+        if kind == 'batch':
+            return text.rsplit("<<<END FILE>>>", 1)[0]
+        return "def broken(:\n    return"
+
+
+def _python_module(stem: str, functions: int) -> str:
+    lines = ["import logging", "", "logger = logging.getLogger(__name__)", ""]
+    for index in range(max(1, functions)):
+        lines += [
+            "",
+            f"def {stem}_step_{index}(value: int = {index}) -> dict:",
+            f'    """Synthetic helper {index} of {stem}."""',
+            f"    logger.debug(\"{stem} step {index}: %s\", value)",
+            f"    return {{\"module\": \"{stem}\", \"step\": {index}, \"value\": value * 2}}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _test_module() -> str:
+    return (
+        "import pytest\n\n\n"
+        "def test_synthetic_behaviour():\n"
+        "    # source_info: synthetic.module.function\n"
+        "    assert 1 + 1 == 2\n"
+    )
+
+
+_SYNTHETIC_SPEC = {
+    "project_Overview": {"project_Name": "Synthetic Notes App", "project_Purpose": "Benchmark fixture."},
+    "functional_Requirements": [{"id": "FR-001", "title": "Manage notes", "description": "CRUD for notes."}],
+    "technology_Stack": {
+        "backend": {"language": "Python", "framework": "FastAPI"},
+        "frontend": {"language": "HTML/CSS/JS", "framework": "Vanilla"},
+    },
+    "data_Storage": {"storage_Type": "SQL", "database_Type": "SQLite"},
+}
+
+_SYNTHETIC_DESIGN = {
+    "system_Architecture": {"description": "FastAPI backend serving a static frontend."},
+    "data_Design": {
+        "storage_Type": "SQL",
+        "database_Type": "SQLite",
+        "data_Models": [{
+            "model_Name": "Note",
+            "fields": [
+                {"name": "id", "type": "INTEGER", "constraints": ["primary_key: true"]},
+                {"name": "title", "type": "VARCHAR(100)", "constraints": ["required"]},
+            ],
+        }],
+    },
+    "interface_Design": {"api_Specifications": [{"endpoint": "/api/notes", "method": "GET"}]},
+    "folder_Structure": {
+        "root_Project_Directory_Name": "synthetic_notes_app",
+        "structure": [
+            {"path": "backend/__init__.py", "description": "Backend package marker."},
+            {"path": "backend/database.py", "description": "Database setup."},
+            {"path": "backend/models.py", "description": "ORM models."},
+            {"path": "backend/routes.py", "description": "API routes."},
+            {"path": "backend/main.py", "description": "FastAPI entry point."},
+            {"path": "frontend/index.html", "description": "Main page."},
+            {"path": "frontend/css/style.css", "description": "Styles."},
+            {"path": "frontend/js/app.js", "description": "Client logic."},
+        ],
+    },
+    "dependencies": {"backend": ["fastapi", "uvicorn", "sqlalchemy"], "frontend": []},
+}
+
+
+class _FakeUsage:
+    def __init__(self, reply: FakeReply):
+        self.prompt_token_count = reply.prompt_tokens
+        self.candidates_token_count = reply.response_tokens
+        self.total_token_count = reply.prompt_tokens + reply.response_tokens
+
+
+class FakeGenaiResponse:
+    def __init__(self, reply: FakeReply):
+        self.text = reply.text
+        self.usage_metadata = _FakeUsage(reply)
+
+
+class FakeGenerativeModel:
+    """Drop-in for google.generativeai.GenerativeModel (generate_content / generate_content_async)"""
+
+    def __init__(self, model_name: str, backend: FakeLLMBackend):
+        self.model_name = model_name
+        self._backend = backend
+
+    def generate_content(self, contents, **kwargs) -> FakeGenaiResponse:
+        return FakeGenaiResponse(self._backend.complete(_contents_text(contents), self.model_name))
+
+    async def generate_content_async(self, contents, **kwargs) -> FakeGenaiResponse:
+        return FakeGenaiResponse(await self._backend.acomplete(_contents_text(contents), self.model_name))
+
+
+def _contents_text(contents) -> str:
+    if isinstance(contents, str):
+        return contents
+    return "\n".join(str(part) for part in contents)
+
+
+def _messages_text(messages: List) -> str:
+    parts = []
+    for message in messages:
+        content = getattr(message, 'content', message)
+        if isinstance(content, list):
+            content = "".join(part if isinstance(part, str) else part.get('text', '') for part in content)
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+_chat_model_class = None
+
+
+def fake_chat_model(backend: FakeLLMBackend, model_name: str, temperature: Optional[float] = None, **kwargs):
+    """
+    Drop-in for ChatGoogleGenerativeAI (invoke/ainvoke/stream/astream, LCEL chains, agents).
+    Gemini-only constructor arguments are ignored; langchain_core is only needed here.
+    """
+    global _chat_model_class
+    if _chat_model_class is None:
+        _chat_model_class = _build_chat_model_class()
+    return _chat_model_class(backend=backend, model=model_name, temperature=0.7 if temperature is None else temperature,
+                             rate_limiter=kwargs.get('rate_limiter'))
+
+
+def _build_chat_model_class():
+    from typing import Any
+
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    def chunks(reply: FakeReply, size: int = 200):
+        pieces = [reply.text[i:i + size] for i in range(0, len(reply.text), size)] or [""]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=piece,
+                usage_metadata=reply.usage if last else None,
+                response_metadata={'finish_reason': 'STOP'} if last else {},
+            ))
+
+    class FakeChatModel(BaseChatModel):
+        backend: Any
+        model: str = "fake-gemini"
+        temperature: float = 0.1
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake-gemini"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            reply = self.backend.complete(_messages_text(messages), self.model)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply.text, usage_metadata=reply.usage))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            reply = await self.backend.acomplete(_messages_text(messages), self.model)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply.text, usage_metadata=reply.usage))])
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            yield from chunks(self.backend.complete(_messages_text(messages), self.model))
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            for chunk in chunks(await self.backend.acomplete(_messages_text(messages), self.model)):
+                yield chunk
+
+        def bind_tools(self, tools, **kwargs):
+            # The fake never calls tools; the debugging agent gets a final answer right away
+            return self
+
+    return FakeChatModel
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_fake_backend() -> FakeLLMBackend:
+    """Process-wide backend configured from config.py (FAKE_LLM_*), unless one was installed with set_fake_backend"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                import config
+                options = dict(latency=config.FAKE_LLM_LATENCY, rate_limit_rate=config.FAKE_LLM_RATE_LIMIT_RATE,
+                               malformed_rate=config.FAKE_LLM_MALFORMED_RATE)
+                if config.FAKE_LLM_FIXTURE:
+                    _backend = FakeLLMBackend.from_fixture(f"{config.FAKE_LLM_FIXTURE}.spec.json",
+                                                           f"{config.FAKE_LLM_FIXTURE}.design.json", **options)
+                else:
+                    _backend = FakeLLMBackend(**options)
+    return _backend
+
+
+def set_fake_backend(backend: Optional[FakeLLMBackend]):
+    global _backend
+    with _backend_lock:
+        _backend = backend
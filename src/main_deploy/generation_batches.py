@@ -0,0 +1,160 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+# Files that are usually only a few dozen lines and cheap to generate together
+BATCHABLE_EXTENSIONS = ('.css', '.js', '.json', '.gitignore')
+BATCHABLE_FILENAMES = ('__init__.py', 'schemas.py', 'schema.py', '.gitignore')
+# Rendered from templates in FileGeneratorTool, never sent to the LLM
+TEMPLATED_FILES = ('requirements.txt', '.env')
+
+BATCH_NODE_PREFIX = "batch::"
+
+FILE_START_RE = re.compile(r"^<<<FILE:\s*(?P<path>[^>]+?)\s*>>>\s*$")
+FILE_END = "<<<END FILE>>>"
+
+
+class BatchParseError(ValueError):
+    """The multi-file response does not follow the delimiter protocol"""
+
+
+def is_batchable(file_path: str) -> bool:
+    name = os.path.basename(file_path)
+    if name in TEMPLATED_FILES:
+        return False
+    return name in BATCHABLE_FILENAMES or name.lower().endswith(BATCHABLE_EXTENSIONS)
+
+
+def _reaches(source: str, target: str, dependencies: Dict[str, List[str]],
+             node_of: Dict[str, str], members_of: Dict[str, List[str]]) -> bool:
+    """Whether `source` depends on `target` (directly or transitively) once files are replaced by their batch node"""
+    seen, stack = {source}, [source]
+    while stack:
+        node = stack.pop()
+        for member in members_of.get(node, [node]):
+            for dep in dependencies.get(member, []):
+                dep_node = node_of.get(dep, dep)
+                if dep_node == target:
+                    return True
+                if dep_node not in seen:
+                    seen.add(dep_node)
+                    stack.append(dep_node)
+    return False
+
+
+def plan_batches(order: List[str], dependencies: Dict[str, List[str]], file_type_of: Callable[[str], str],
+                 max_files: int = 4) -> Dict[str, List[str]]:
+    """
+    Group small sibling files (same directory and file type) into batches of up to `max_files`.
+
+    A file only joins a batch if, with the batches planned so far contracted into single
+    nodes, neither the file nor the batch depends on the other (directly, or through other
+    files and batches). Each merge therefore keeps the contracted graph acyclic, and batch
+    members never wait on each other. Returns {batch_node_name: [member paths in priority
+    order]}; groups of a single file are left alone.
+    """
+    if max_files < 2:
+        return {}
+    node_of: Dict[str, str] = {}                # batched file -> first member of its batch
+    members_of: Dict[str, List[str]] = {}       # first member -> members
+    groups: Dict[tuple, List[str]] = {}
+    for path in order:
+        if not is_batchable(path):
+            continue
+        key = (os.path.dirname(path), file_type_of(path))
+        candidates = groups.setdefault(key, [])
+        for head in candidates:
+            batch = members_of[head]
+            if len(batch) >= max_files:
+                continue
+            related = (_reaches(path, head, dependencies, node_of, members_of)
+                       or _reaches(head, path, dependencies, node_of, members_of))
+            if not related:
+                batch.append(path)
+                node_of[path] = head
+                break
+        else:
+            candidates.append(path)
+            members_of[path] = [path]
+            node_of[path] = path
+
+    batches = {}
+    for (directory, file_type), candidates in groups.items():
+        for index, head in enumerate(candidates):
+            if len(members_of[head]) > 1:
+                batches[f"{BATCH_NODE_PREFIX}{directory or '.'}:{file_type}:{index}"] = members_of[head]
+    return batches
+
+
+def contract_graph(order: List[str], dependencies: Dict[str, List[str]], batches: Dict[str, List[str]]):
+    """Replace batch members by their batch node: returns (node order, node dependencies)"""
+    node_of = {member: node for node, members in batches.items() for member in members}
+    node_order = list(dict.fromkeys(node_of.get(path, path) for path in order))
+    node_dependencies: Dict[str, List[str]] = {}
+    for path in order:
+        node = node_of.get(path, path)
+        deps = node_dependencies.setdefault(node, [])
+        for dep in dependencies.get(path, []):
+            dep_node = node_of.get(dep, dep)
+            if dep_node != node and dep_node not in deps:
+                deps.append(dep_node)
+    return node_order, node_dependencies
+
+
+def _strip_fence(content: str) -> str:
+    lines = content.strip('\n').splitlines()
+    if len(lines) >= 2 and lines[0].strip().startswith("```") and lines[-1].strip() == "```":
+        lines = lines[1:-1]
+    return "\n".join(lines).strip()
+
+
+def parse_multi_file_response(text: str, expected_paths: List[str]) -> Dict[str, str]:
+    """
+    Split a response written in the multi-file protocol:
+
+        <<<FILE: relative/path.ext>>>
+        ...file content...
+        <<<END FILE>>>
+
+    Anything other than whitespace outside the blocks, a missing/unexpected/duplicate file,
+    an unterminated block or an empty file raises BatchParseError.
+    """
+    expected = {path.strip('/\\').replace('\\', '/') for path in expected_paths}
+    files: Dict[str, str] = {}
+    current: Optional[str] = None
+    buffer: List[str] = []
+
+    lines = text.strip().splitlines()
+    # A single fence around the whole answer is tolerated
+    if len(lines) >= 2 and lines[0].strip().startswith("```") and lines[-1].strip() == "```":
+        lines = lines[1:-1]
+
+    for line_number, line in enumerate(lines, 1):
+        if current is None:
+            match = FILE_START_RE.match(line.strip())
+            if match:
+                current = match.group('path').strip().strip('`').strip('/\\').replace('\\', '/')
+                if current not in expected:
+                    raise BatchParseError(f"unexpected file '{current}' (line {line_number})")
+                if current in files:
+                    raise BatchParseError(f"file '{current}' appears twice")
+                buffer = []
+            elif line.strip():
+                raise BatchParseError(f"text outside a file block at line {line_number}: {line.strip()[:60]!r}")
+        elif line.strip() == FILE_END:
+            content = _strip_fence("\n".join(buffer))
+            if not content:
+                raise BatchParseError(f"file '{current}' is empty")
+            files[current] = content
+            current = None
+        elif FILE_START_RE.match(line.strip()):
+            raise BatchParseError(f"file '{current}' is not terminated before line {line_number}")
+        else:
+            buffer.append(line)
+
+    if current is not None:
+        raise BatchParseError(f"file '{current}' is not terminated")
+    missing = sorted(expected - set(files))
+    if missing:
+        raise BatchParseError(f"missing files: {missing}")
+    return files
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationManifest:
+    """
+    Records, per generated file, the hashes of the inputs that went into its prompt
+    (design slice, spec slice, dependency outputs) and of the code that was written.
+
+    It lives next to the project directory (`<project_root>.manifest.json`) so wiping
+    or zipping the generated project never touches it.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, data: dict = None):
+        self.path = path
+        self.data = data or {'version': self.VERSION, 'generator_hash': None, 'files': {}}
+
+    @staticmethod
+    def path_for(project_root: str) -> str:
+        return os.path.normpath(project_root) + '.manifest.json'
+
+    @classmethod
+    def load(cls, project_root: str) -> 'GenerationManifest':
+        path = cls.path_for(project_root)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == cls.VERSION:
+                    return cls(path, data)
+                logger.info(f"Ignoring generation manifest with old version {data.get('version')}")
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Could not read generation manifest {path}: {e}. Regenerating all files.")
+        return cls(path)
+
+    @property
+    def files(self) -> Dict[str, dict]:
+        return self.data['files']
+
+    def set_generator_hash(self, generator_hash: str):
+        """Settings shared by every prompt (model, tech stack, paths). A change invalidates all entries."""
+        if self.data.get('generator_hash') not in (None, generator_hash) and self.files:
+            logger.info("Generator settings changed since the last run. All files will be regenerated.")
+            self.files.clear()
+        self.data['generator_hash'] = generator_hash
+
+    def is_up_to_date(self, file_path: str, input_hashes: Dict[str, str]) -> bool:
+        entry = self.files.get(file_path)
+        return bool(entry) and entry.get('inputs') == input_hashes
+
+    def record(self, file_path: str, input_hashes: Dict[str, str], output_hash: str):
+        self.files[file_path] = {
+            'inputs': input_hashes,
+            'output': output_hash,
+            'generated_at': datetime.now().isoformat(),
+        }
+
+    def forget(self, file_path: str):
+        self.files.pop(file_path, None)
+
+    def removed_files(self, current_paths) -> List[str]:
+        """Files generated by an earlier run that are no longer part of the design"""
+        current = set(current_paths)
+        return [path for path in self.files if path not in current]
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save generation manifest {self.path}: {e}")
+
+
+class UnitTestManifest(GenerationManifest):
+    """
+    Records, per tested function/method (`module.Class.method`) and for the integration tests,
+    the hashes of what went into the test prompt (source segment, framework, model) and the
+    test file that was written, so only entries whose inputs changed are regenerated.
+
+    Lives next to the project directory too (`<project_root>.tests.manifest.json`); test file
+    paths are stored relative to the project root.
+    """
+
+    SUFFIX = '.tests.manifest.json'
+
+    @classmethod
+    def path_for(cls, project_root: str) -> str:
+        return os.path.normpath(project_root) + cls.SUFFIX
+
+    @property
+    def project_root(self) -> str:
+        return self.path[:-len(self.SUFFIX)]
+
+    def test_file(self, key: str) -> Optional[str]:
+        """Absolute path of the test file recorded for `key`"""
+        relative = self.files.get(key, {}).get('test_file')
+        return os.path.join(self.project_root, *relative.split('/')) if relative else None
+
+    def is_up_to_date(self, key: str, input_hashes: Dict[str, str], test_path: Optional[str] = None) -> bool:
+        """Also requires the recorded test file to be `test_path` and to still exist"""
+        if not super().is_up_to_date(key, input_hashes):
+            return False
+        if test_path is None:
+            return True
+        return os.path.normpath(self.test_file(key) or '') == os.path.normpath(test_path) and os.path.isfile(test_path)
+
+    def record_test(self, key: str, input_hashes: Dict[str, str], test_path: str, code: str, kind: str = 'unit'):
+        self.record(key, input_hashes, hashlib.sha256(code.encode('utf-8')).hexdigest())
+        self.files[key]['test_file'] = os.path.relpath(test_path, self.project_root).replace(os.sep, '/')
+        self.files[key]['kind'] = kind
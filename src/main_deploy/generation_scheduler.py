@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from async_utils import run_sync
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyScheduler:
+    """
+    Runs one work item per node of a dependency DAG on a bounded thread pool.
+
+    A node is submitted as soon as every node it depends on has completed, so
+    independent files (frontend assets, sibling route modules, ...) are generated
+    concurrently while dependents still see the output of their dependencies.
+
+    `prepare` and `on_complete` always run on the scheduler thread (the calling thread,
+    unless it already runs an event loop; see run_sync), one at a time, which makes them
+    the safe place to read from / write to shared state such as ProjectContext.
+    Only `work` runs on the pool.
+    """
+
+    def __init__(self, dependencies: Dict[str, List[str]], order: List[str], max_workers: int = 4):
+        self.order = list(dict.fromkeys(order))
+        self.max_workers = max(1, int(max_workers or 1))
+        self._position = {node: index for index, node in enumerate(self.order)}
+
+        # Keep only edges between known nodes; unknown dependencies (directories,
+        # files outside the structure) must not block anything.
+        self.dependencies = {
+            node: [dep for dep in dict.fromkeys(dependencies.get(node, [])) if dep in self._position and dep != node]
+            for node in self.order
+        }
+        self._break_cycles()
+
+        self.dependents = {node: [] for node in self.order}
+        for node, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(node)
+
+    def _break_cycles(self):
+        """Drop back-edges (by priority order) for nodes that can never become ready"""
+        remaining = {node: set(deps) for node, deps in self.dependencies.items()}
+        ready = [node for node in self.order if not remaining[node]]
+        resolved = set()
+        while ready:
+            node = ready.pop()
+            resolved.add(node)
+            for other, deps in remaining.items():
+                if node in deps:
+                    deps.discard(node)
+                    if not deps and other not in resolved:
+                        ready.append(other)
+
+        cyclic = [node for node in self.order if node not in resolved]
+        if not cyclic:
+            return
+
+        logger.warning(f"Circular file dependencies detected between {cyclic}. Falling back to priority order for these files.")
+        for node in cyclic:
+            self.dependencies[node] = [
+                dep for dep in self.dependencies[node]
+                if dep not in cyclic or self._position[dep] < self._position[node]
+            ]
+
+    def levels(self) -> List[List[str]]:
+        """Group nodes into waves that could run fully in parallel (useful for logging/planning)"""
+        depth = {}
+        for node in self._topological_order():
+            depth[node] = 1 + max((depth[dep] for dep in self.dependencies[node]), default=-1)
+        waves: Dict[int, List[str]] = {}
+        for node in self.order:
+            waves.setdefault(depth[node], []).append(node)
+        return [waves[level] for level in sorted(waves)]
+
+    def _topological_order(self) -> List[str]:
+        remaining = {node: len(deps) for node, deps in self.dependencies.items()}
+        ready = [node for node in self.order if remaining[node] == 0]
+        result = []
+        while ready:
+            node = ready.pop(0)
+            result.append(node)
+            for dependent in self.dependents[node]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+            ready.sort(key=self._position.get)
+        return result
+
+    def run(self,
+            work: Callable[[str, Any], Any],
+            on_complete: Callable[[str, Any], None],
+            prepare: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+        """
+        Execute the DAG.
+
+        Args:
+            work: Called on a pool thread as work(node, prepared) and returns the node result.
+            on_complete: Called on the scheduler thread as on_complete(node, result) once a node is done.
+                Dependents are released only after this returns.
+            prepare: Optional, called on the scheduler thread right before a node is submitted.
+
+        Returns:
+            A dict mapping every node to its result.
+        """
+        # Same scheduling loop as `arun`; the blocking work items run on a dedicated pool
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="codegen") as pool:
+            async def awork(node: str, prepared: Any) -> Any:
+                return await asyncio.get_running_loop().run_in_executor(pool, work, node, prepared)
+
+            return run_sync(self.arun(awork, on_complete, prepare))
+
+    async def arun(self,
+                   work: Callable[[str, Any], Awaitable[Any]],
+                   on_complete: Callable[[str, Any], None],
+                   prepare: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+        """
+        asyncio version of `run`: `work` is a coroutine function and at most `max_workers`
+        nodes are in flight at once, all on the running event loop (no threads).
+        `prepare` and `on_complete` run between awaits, so they never interleave.
+        """
+        results = {}
+        waiting = {node: set(deps) for node, deps in self.dependencies.items()}
+        ready = [node for node in self.order if not waiting[node]]
+        running = {}
+
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_workers:
+                    node = ready.pop(0)
+                    prepared = prepare(node) if prepare else None
+                    running[asyncio.ensure_future(work(node, prepared))] = node
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    result = task.result()
+                    on_complete(node, result)
+                    results[node] = result
+
+                    for dependent in self.dependents[node]:
+                        waiting[dependent].discard(node)
+                        if not waiting[dependent]:
+                            ready.append(dependent)
+                ready.sort(key=self._position.get)
+        finally:
+            for task in running:
+                task.cancel()
+
+        return results
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import tracing
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Content-addressed, disk-backed cache for LLM responses.
+
+    Every entry is keyed by sha256(model name, temperature, rendered prompt) and stored
+    as a small JSON file under `cache_dir/<key[:2]>/<key>.json`. The file mtime is
+    refreshed on every hit, so eviction (oldest-used first) is a plain LRU over files.
+    Entries older than `max_age_seconds` are treated as misses and removed.
+
+    Misses go through `single_flight`, so concurrent calls with the same key (also with
+    `bypass`) share one upstream request.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = 500 * 1024 * 1024,
+                 max_age_seconds: float = 30 * 24 * 3600, bypass: bool = False,
+                 single_flight: bool = True):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self.single_flight = SingleFlight(enabled=single_flight)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size_bytes = None  # computed lazily on the first write
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, prompt: str) -> str:
+        payload = json.dumps([model_name, float(temperature or 0.0), prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key` or None on a miss"""
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+
+            if time.time() - stat.st_mtime > self.max_age_seconds:
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                os.utime(path)  # mark as recently used
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry.get('response')
+
+    def put(self, key: str, response: str, metadata: Optional[Dict] = None):
+        entry = {'response': response, 'created_at': time.time(), **(metadata or {})}
+        path = self._entry_path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Failed to write LLM cache entry {key[:12]}: {e}")
+                return
+
+            self.stores += 1
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            else:
+                self._size_bytes += len(data) - previous_size
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove(self, path: str, size: int):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        self.evictions += 1
+        if self._size_bytes is not None:
+            self._size_bytes -= size
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        now = time.time()
+        entries = sorted(self._entries())
+        self._size_bytes = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if self._size_bytes <= self.max_size_bytes and now - mtime <= self.max_age_seconds:
+                break
+            self._remove(path, size)
+        logger.debug(f"LLM cache evicted down to {self._size_bytes} bytes")
+
+    def clear(self):
+        with self._lock:
+            for _, size, path in self._entries():
+                self._remove(path, size)
+            self._size_bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'bypass': self.bypass,
+        }
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache configured from config.py"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                import config
+                _cache_instance = LLMResponseCache(
+                    cache_dir=config.LLM_CACHE_DIR,
+                    max_size_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+                    max_age_seconds=config.LLM_CACHE_MAX_AGE_DAYS * 24 * 3600,
+                    bypass=config.LLM_CACHE_BYPASS,
+                    single_flight=config.LLM_SINGLE_FLIGHT,
+                )
+    return _cache_instance
+
+
+def cached_llm_call(prompt: str, model_name: str, temperature: float,
+                    generate_fn: Callable[[], Optional[str]],
+                    validator: Optional[Callable[[str], bool]] = None,
+                    cache: Optional[LLMResponseCache] = None) -> Optional[str]:
+    """
+    Single entry point for cached LLM calls.
+
+    `generate_fn` performs the real call and returns the response text. Only non-empty
+    responses that pass `validator` are stored, so a bad generation is never replayed.
+    Exceptions raised by `generate_fn` propagate unchanged and nothing is cached. While a
+    call for the same key is in flight, the response (or exception) of that call is
+    returned instead of calling `generate_fn`.
+    """
+    cache = cache or get_llm_cache()
+    with _llm_span(prompt, model_name) as llm_span:
+        key = cache.make_key(model_name, temperature, prompt)
+        cached = _cache_lookup(cache, key, model_name, validator, llm_span)
+        if cached is not None:
+            return cached
+        response, shared = cache.single_flight.do(key, generate_fn)
+        return _store_response(cache, key, model_name, temperature, validator, llm_span, response, shared)
+
+
+async def acached_llm_call(prompt: str, model_name: str, temperature: float,
+                           agenerate_fn: Callable[[], Awaitable[Optional[str]]],
+                           validator: Optional[Callable[[str], bool]] = None,
+                           cache: Optional[LLMResponseCache] = None) -> Optional[str]:
+    """Async version of `cached_llm_call`; cache lookups are small local file reads and stay synchronous"""
+    cache = cache or get_llm_cache()
+    with _llm_span(prompt, model_name) as llm_span:
+        key = cache.make_key(model_name, temperature, prompt)
+        cached = _cache_lookup(cache, key, model_name, validator, llm_span)
+        if cached is not None:
+            return cached
+        response, shared = await cache.single_flight.ado(key, agenerate_fn)
+        return _store_response(cache, key, model_name, temperature, validator, llm_span, response, shared)
+
+
+def _cache_lookup(cache: LLMResponseCache, key: str, model_name: str,
+                  validator: Optional[Callable[[str], bool]], llm_span) -> Optional[str]:
+    """Valid cached response for `key`, or None (always None when the cache is bypassed)"""
+    if cache.bypass:
+        return None
+    cached = cache.get(key)
+    if cached is not None and (validator is None or validator(cached)):
+        logger.info(f"♻️ LLM cache hit ({model_name}, key {key[:12]})")
+        llm_span.set(cache_hit=True)
+        return _finish_llm_span(llm_span, cached)
+    return None
+
+
+def _store_response(cache: LLMResponseCache, key: str, model_name: str, temperature: float,
+                    validator: Optional[Callable[[str], bool]], llm_span,
+                    response: Optional[str], shared: bool) -> Optional[str]:
+    """Store a fresh, non-empty and valid response (the leader of a shared call stores it once)"""
+    if response and not shared and not cache.bypass and (validator is None or validator(response)):
+        cache.put(key, response, {'model': model_name, 'temperature': temperature})
+    return _finish_llm_span(llm_span, response, shared)
+
+
+def _llm_span(prompt: str, model_name: str):
+    """Trace span of one cached call; token counts are estimates unless the response reported usage"""
+    return tracing.span('llm_call', kind='llm', model=model_name, prompt_tokens=len(prompt) // 4,
+                        response_tokens=0, retries=0, cache_hit=False, coalesced=False)
+
+
+def _finish_llm_span(llm_span, response: Optional[str], shared: bool = False) -> Optional[str]:
+    if shared:
+        logger.info("🔗 Shared the response of an identical in-flight LLM call")
+        llm_span.set(coalesced=True)
+    if response and not getattr(llm_span, 'attrs', {}).get('tokens_reported'):
+        llm_span.set(response_tokens=len(response) // 4)
+    return response
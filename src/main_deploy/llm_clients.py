@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """
+    Pool of LLM clients shared by every agent and phase, keyed by (kind, provider, model,
+    temperature, options).
+
+    A client keeps its HTTP/gRPC channel open, so reusing it saves the connection setup and
+    TLS handshake that a new client pays on its first request; test generation alone makes
+    hundreds of calls. Async channels are bound to the event loop that first used them, so
+    clients created while a loop is running are pooled per loop and dropped once that loop
+    is closed.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._uses = Counter()
+        self.created = 0
+        self.reused = 0
+
+    def get(self, kind: str, provider: str, model_name: str, factory: Callable[[], Any],
+            temperature: Optional[float] = None, **options) -> Any:
+        loop = _running_loop()
+        key = (kind, provider, model_name, temperature, _options_key(options), id(loop) if loop else None)
+        with self._lock:
+            self._drop_closed_loops()
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.reused += 1
+                self._uses[self._label(key)] += 1
+                return entry[0]
+        # Built outside the lock: creating a client can take a while and must not block other agents
+        client = factory()
+        with self._lock:
+            entry = self._clients.setdefault(key, (client, loop))
+            if entry[0] is client:
+                self.created += 1
+                logger.debug(f"🔌 New {kind} client for {model_name} (temperature {temperature}, {len(self._clients)} pooled)")
+            else:
+                self.reused += 1
+            self._uses[self._label(key)] += 1
+            return entry[0]
+
+    def _drop_closed_loops(self):
+        for key in [key for key, (_, loop) in self._clients.items() if loop is not None and loop.is_closed()]:
+            del self._clients[key]
+
+    @staticmethod
+    def _label(key: Tuple) -> str:
+        kind, provider, model_name, temperature = key[:4]
+        return f"{kind}:{provider}:{model_name}" + (f"@{temperature}" if temperature is not None else "")
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.created + self.reused
+            return {
+                'pooled': len(self._clients),
+                'created': self.created,
+                'reused': self.reused,
+                'reuse_rate': round(self.reused / requests, 3) if requests else 0.0,
+                'uses': dict(self._uses),
+            }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _options_key(options: dict) -> Tuple:
+    """Hashable form of client options; objects such as rate limiters count by identity"""
+    return tuple((name, _option_value(value)) for name, value in sorted(options.items()))
+
+
+def _option_value(value: Any) -> Hashable:
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_option_value(item) for item in value)
+    if isinstance(value, dict):
+        return _options_key(value)
+    return (type(value).__qualname__, id(value))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Process-wide client pool"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
+
+
+def _pooled(kind: str, model_name: str, factory: Callable[[], Any], temperature: Optional[float] = None, **options) -> Any:
+    import config
+    if not config.LLM_CLIENT_POOL:
+        return factory()
+    provider: Hashable = config.LLM_PROVIDER
+    if provider == 'fake':
+        import fake_llm
+        provider = ('fake', id(fake_llm.get_fake_backend()))
+    return get_client_registry().get(kind, provider, model_name, factory, temperature=temperature, **options)
+
+
+def chat_model(model_name: str, temperature: Optional[float] = None, **kwargs):
+    """
+    LangChain chat model for the agents, selected by LLM_PROVIDER and shared through the client
+    registry (agents asking for the same model, temperature and options get the same client).
+
+    'gemini' (default) returns ChatGoogleGenerativeAI; 'fake' returns the offline stand-in from
+    fake_llm, used by the benchmarks so a full run needs no API key or network.
+    """
+    return _pooled('chat', model_name, lambda: _new_chat_model(model_name, temperature, **kwargs),
+                   temperature=temperature, **kwargs)
+
+
+def _new_chat_model(model_name: str, temperature: Optional[float] = None, **kwargs):
+    import config
+    if temperature is not None:
+        kwargs['temperature'] = temperature
+    if config.LLM_PROVIDER == 'fake':
+        import fake_llm
+        return fake_llm.fake_chat_model(fake_llm.get_fake_backend(), model_name, **kwargs)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=model_name, google_api_key=config.GEMINI_API_KEY, **kwargs)
+
+
+def generative_model(model_name: str):
+    """google.generativeai GenerativeModel (or the fake equivalent), selected by LLM_PROVIDER and pooled"""
+    return _pooled('generative', model_name, lambda: _new_generative_model(model_name))
+
+
+def _new_generative_model(model_name: str):
+    import config
+    if config.LLM_PROVIDER == 'fake':
+        import fake_llm
+        return fake_llm.FakeGenerativeModel(model_name, fake_llm.get_fake_backend())
+
+    import google.generativeai as genai
+    return genai.GenerativeModel(model_name)
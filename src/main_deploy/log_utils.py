@@ -0,0 +1,89 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+from typing import List
+
+import tracing
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (LOG_FORMAT=json), with the run's trace/span ids when inside a traced run"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for field in ('trace_id', 'span_id', 'span'):
+            value = getattr(record, field, None)
+            if value:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Adds trace_id / span_id / span of the current tracing span to every record, so the lines
+    of concurrent runs (batch mode) can be told apart. Must run on the logging thread, where
+    the span context lives, i.e. before the record is queued.
+    """
+
+    def filter(self, record):
+        current = tracing.current_span()
+        tracer = getattr(current, 'tracer', None)
+        if tracer is not None:
+            record.trace_id = tracer.trace_id
+            record.span_id = current.span_id
+            record.span = current.name
+        return True
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for a QueueListener. Only the message is rendered on the calling thread;
+    the traceback is rendered to exc_text so the listener's formatters still see it apart
+    from the message.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def start_queue_logging(logger: logging.Logger, handlers: List[logging.Handler]) -> logging.handlers.QueueListener:
+    """
+    Route `logger` through a queue to `handlers`, which then run on a listener thread.
+
+    The listener is stopped at interpreter exit, which flushes the records still queued.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = BackgroundQueueHandler(log_queue)
+    queue_handler.addFilter(TraceContextFilter())
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_queue_logging, listener)
+    return listener
+
+
+def stop_queue_logging(listener: logging.handlers.QueueListener):
+    """Handle what is still queued and stop the listener thread; safe to call twice"""
+    if listener._thread is not None:
+        listener.stop()
@@ -1,42 +1,61 @@
+import asyncio
+import contextlib
 import logging
 import os
 import json
-import time
 import subprocess
+from typing import TYPE_CHECKING, Callable, List, Optional
 
 # --- Core Modules ---
 # These are our own refactored modules that provide configuration and setup.
 import config
-from utils import save_json_to_file, generate_filename, get_spec_design_output_dir
-
-# --- Agent Classes ---
-# These are the refactored agent classes for the pre-coding phases.
-from specification_agent import SpecificationAgent
-from design_agent import DesignAgent
-from coding_agent import LangChainCodingAgent, AgentConfig
+from utils import save_json_to_file, generate_filename, get_spec_design_output_dir, get_base_output_dir, project_output_dir
+from llm_cache import get_llm_cache
+from rate_limiter import get_rate_limiter, retry_after_from_error, is_rate_limit_error
+from async_utils import run_sync, run_subprocess, script_command
+from llm_clients import get_client_registry
+from run_journal import RunJournal, file_hashes
+import tracing
+from generation_manifest import GenerationManifest
+from project_index import ProjectIndex, import_blockers
 
 # --- Phase-Specific Logic (from refactored standalone scripts) ---
-# We import the primary functions from our testing and debugging modules.
-from testing_agent import run_test_generation_and_execution
-from debug_agent import run_debugging_cycle
-
-try:
-    from google.genai.errors import ClientError
-except ImportError:
-    ClientError = Exception  # Fallback if import fails
+# The agents pull in langchain, autogen and the Google clients, so each phase imports its
+# agent when it starts; importing this module (and run.py --help / --list-runs) stays fast.
+from testing_agent import TEST_OUTPUT_DIR_NAME
 
-# --- Third-Party Libraries ---
-import autogen
+if TYPE_CHECKING:
+    from coding_agent import LangChainCodingAgent
 
 # Get a logger for this module, which will use the global config.
 logger = logging.getLogger(__name__)
 
 
-def run_autogen_coding_crew(spec_data: dict, design_data: dict) -> str:
+def _client_error_type() -> type:
+    """google.genai's ClientError, imported on first use"""
+    try:
+        from google.genai.errors import ClientError
+    except ImportError:
+        ClientError = Exception  # Fallback if import fails
+    return ClientError
+
+
+def run_autogen_coding_crew(spec_data: dict, design_data: dict,
+                            on_validation: Optional[Callable[[List[str]], None]] = None) -> str:
+    return run_sync(arun_autogen_coding_crew(spec_data, design_data, on_validation))
+
+
+async def arun_autogen_coding_crew(spec_data: dict, design_data: dict,
+                                   on_validation: Optional[Callable[[List[str]], None]] = None) -> str:
     """
     Phase 3: Generate project code with robust rate limiting and retry logic.
+
+    on_validation: Optional, called with the issues ProjectValidatorTool found in the generated
+        project (used to record them in the run journal). With unresolved or circular imports the
+        project environment is not set up, since its tests could not even be collected.
     """
-    import autogen
+    from coding_agent import LangChainCodingAgent, AgentConfig
+    ClientError = _client_error_type()
 
     try:
         # Determine project path
@@ -45,7 +64,7 @@ def run_autogen_coding_crew(spec_data: dict, design_data: dict) -> str:
             project_name = design_data.get("project_name", "unnamed_project")
             project_name_slug = project_name.lower().replace(" ", "_")
         
-        project_root_path = os.path.abspath(os.path.join(config.BASE_OUTPUT_DIR, project_name_slug))
+        project_root_path = os.path.abspath(os.path.join(get_base_output_dir(), project_name_slug))
         logger.info(f"Code will be generated in: {project_root_path}")
         os.makedirs(project_root_path, exist_ok=True)
 
@@ -65,169 +84,56 @@ def run_autogen_coding_crew(spec_data: dict, design_data: dict) -> str:
         for attempt in range(max_direct_attempts):
             try:
                 logger.info(f"🔧 Direct attempt {attempt + 1}/{max_direct_attempts}: Generating code...")
-                result = coding_agent_instance.generate_project(design_data, spec_data)
+                result = await coding_agent_instance.agenerate_project(design_data, spec_data)
                 logger.info(f"🎉 Direct code generation successful: {result}")
                 
                 # Verify files were created
                 if verify_code_generation(project_root_path):
+                    if _has_import_blockers(coding_agent_instance, on_validation):
+                        return project_root_path
                     # Set up project environment (venv, dependencies)
                     logger.info("🔧 Setting up project environment after direct generation...")
-                    if not setup_project_environment(project_root_path):
+                    if not await asetup_project_environment(project_root_path):
                         logger.warning("⚠️  Environment setup via run.bat failed, trying manual setup...")
-                        if not create_venv_manually(project_root_path):
+                        if not await acreate_venv_manually(project_root_path):
                             logger.warning("⚠️  Failed to create virtual environment manually")
                     
                     return project_root_path
                 else:
                     logger.warning(f"⚠️  Direct attempt {attempt + 1}: No files generated")
                     
-            except ClientError as e:
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                    wait_time = 60 + (attempt * 30)  # Increasing wait time
-                    logger.warning(f"⚠️  Rate limit hit. Waiting {wait_time} seconds...")
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    # Any provider's 429: the shared limiter applies the cooldown (retry-after if given) before the next request
+                    get_rate_limiter().on_rate_limited(retry_after_from_error(e))
                     if attempt < max_direct_attempts - 1:
-                        time.sleep(wait_time)
                         continue
                     else:
                         logger.error("❌ All direct attempts failed due to rate limits")
                         break
-                else:
+                elif isinstance(e, ClientError):
                     logger.error(f"❌ API error: {e}")
                     break
-            except Exception as e:
                 logger.error(f"❌ Direct attempt {attempt + 1} failed: {e}")
+                # Retry right away: request pacing comes from the shared rate limiter, not from idle sleeps
                 if attempt < max_direct_attempts - 1:
-                    time.sleep(10)
                     continue
                 else:
                     break
 
-        # Second attempt: AutoGen with rate limiting
-        logger.info("🔄 Trying AutoGen approach with enhanced rate limiting...")
-        
-        # Configure AutoGen with conservative settings
-        autogen_llm_config = {
-            "config_list": [{
-                "model": config.CURRENT_MODELS['coding'],
-                "api_key": config.GEMINI_API_KEY,
-                "api_type": "google"
-            }],
-            "temperature": 0.3,
-            "timeout": 300,
-            "request_timeout": 300,
-        }
-
-        # Create agents with very clear instructions
-        project_manager = autogen.AssistantAgent(
-            name="ProjectManager",
-            system_message="""You are a project manager. Your ONLY task is to instruct the Coder to call generate_project().
-            
-            INSTRUCTIONS:
-            1. Tell the Coder to call generate_project(design_data, spec_data) immediately
-            2. Do NOT ask questions or request clarifications
-            3. After the function executes successfully, say "TERMINATE"
-            4. If there's a rate limit error, wait 60 seconds and try again
-            """,
-            llm_config=autogen_llm_config,
-        )
-
-        coder = autogen.AssistantAgent(
-            name="Coder",
-            system_message="""You are a coder. When instructed, call generate_project() function immediately.
-            
-            CRITICAL:
-            - Call generate_project(design_data, spec_data) using the provided data
-            - DO NOT write code in chat
-            - If rate limited, wait 60 seconds and retry
-            - Report success/failure clearly
-            """,
-            llm_config=autogen_llm_config,
-        )
-
-        # Rate-limited function wrapper
-        def rate_limited_generate_project(design_data: dict, spec_data: dict) -> str:
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    logger.info(f"🔧 AutoGen function call attempt {attempt + 1}/{max_retries}...")
-                    result = coding_agent_instance.generate_project(design_data, spec_data)
-                    logger.info(f"🎉 AutoGen generation successful: {result}")
-                    return result
-                except ClientError as e:
-                    if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                        wait_time = 60 + (attempt * 30)
-                        logger.warning(f"⚠️  Function call rate limited. Waiting {wait_time}s...")
-                        if attempt < max_retries - 1:
-                            time.sleep(wait_time)
-                            continue
-                        else:
-                            raise Exception("Rate limit exhausted in function calls")
-                    else:
-                        raise
-                except Exception as e:
-                    logger.error(f"❌ Function call error: {e}")
-                    if attempt < max_retries - 1:
-                        time.sleep(15)
-                        continue
-                    else:
-                        raise
-
-        user_proxy = autogen.UserProxyAgent(
-            name="UserProxy",
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=3,  # Keep it short
-            is_termination_msg=lambda x: "TERMINATE" in x.get("content", "").upper(),
-            code_execution_config={"work_dir": project_root_path, "use_docker": False},
-            function_map={"generate_project": rate_limited_generate_project}
-        )
-
-        # Start conversation
-        groupchat = autogen.GroupChat(
-            agents=[user_proxy, project_manager, coder], 
-            messages=[], 
-            max_round=6  # Keep it minimal
-        )
-        manager = autogen.GroupChatManager(groupchat=groupchat, llm_config=autogen_llm_config)
-
-        # Clear, direct message
-        initial_message = f"""
-        IMMEDIATE ACTION REQUIRED:
-        
-        ProjectManager: Tell Coder to call generate_project() NOW.
-        Coder: Call generate_project(design_data, spec_data) immediately.
-        
-        Data:
-        SPEC: {json.dumps(spec_data, indent=1)}
-        DESIGN: {json.dumps(design_data, indent=1)}
-        
-        NO DISCUSSION. EXECUTE NOW.
-        """
-
-        logger.info("🚀 Starting AutoGen with rate limiting...")
-        
-        max_autogen_attempts = 2
-        for autogen_attempt in range(max_autogen_attempts):
-            try:
-                user_proxy.initiate_chat(manager, message=initial_message)
-                break  # Success
-            except ClientError as e:
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                    if autogen_attempt < max_autogen_attempts - 1:
-                        logger.warning(f"⚠️  AutoGen rate limited. Waiting 90 seconds...")
-                        time.sleep(90)
-                        continue
-                    else:
-                        raise Exception("AutoGen conversation rate limited")
-                else:
-                    raise
+        # Second attempt: AutoGen with rate limiting.
+        # AutoGen only has a blocking API, so the conversation runs on a worker thread.
+        await asyncio.to_thread(_run_autogen_fallback, coding_agent_instance, spec_data, design_data, project_root_path)
 
         # Final verification
         if verify_code_generation(project_root_path):
+            if _has_import_blockers(coding_agent_instance, on_validation):
+                return project_root_path
             # Set up project environment (venv, dependencies)
             logger.info("🔧 Setting up project environment...")
-            if not setup_project_environment(project_root_path):
+            if not await asetup_project_environment(project_root_path):
                 logger.warning("⚠️  Environment setup via run.bat failed, trying manual setup...")
-                if not create_venv_manually(project_root_path):
+                if not await acreate_venv_manually(project_root_path):
                     logger.error("❌ Failed to create virtual environment")
                     # Don't fail the entire process, just warn
                     logger.warning("⚠️  Continuing without venv - testing phase may fail")
@@ -241,6 +147,141 @@ def run_autogen_coding_crew(spec_data: dict, design_data: dict) -> str:
         raise
 
 
+def _has_import_blockers(coding_agent_instance: 'LangChainCodingAgent',
+                         on_validation: Optional[Callable[[List[str]], None]]) -> bool:
+    """Report the validation issues of the generated project; True when its imports are broken"""
+    issues = coding_agent_instance.validation_issues
+    if on_validation:
+        on_validation(issues)
+    blockers = import_blockers(issues)
+    if blockers:
+        logger.warning(f"⚠️ {len(blockers)} unresolved or circular imports in the generated project, "
+                       f"skipping the project environment setup")
+    return bool(blockers)
+
+
+def _run_autogen_fallback(coding_agent_instance: 'LangChainCodingAgent', spec_data: dict, design_data: dict, project_root_path: str):
+    """Let an AutoGen group chat drive generate_project() when the direct attempts failed."""
+    import autogen
+    ClientError = _client_error_type()
+    # Second attempt: AutoGen with rate limiting
+    logger.info("🔄 Trying AutoGen approach with enhanced rate limiting...")
+
+    # Configure AutoGen with conservative settings
+    autogen_llm_config = {
+        "config_list": [{
+            "model": config.CURRENT_MODELS['coding'],
+            "api_key": config.GEMINI_API_KEY,
+            "api_type": "google"
+        }],
+        "temperature": 0.3,
+        "timeout": 300,
+        "request_timeout": 300,
+    }
+
+    # Create agents with very clear instructions
+    project_manager = autogen.AssistantAgent(
+        name="ProjectManager",
+        system_message="""You are a project manager. Your ONLY task is to instruct the Coder to call generate_project().
+
+        INSTRUCTIONS:
+        1. Tell the Coder to call generate_project(design_data, spec_data) immediately
+        2. Do NOT ask questions or request clarifications
+        3. After the function executes successfully, say "TERMINATE"
+        4. If there's a rate limit error, wait 60 seconds and try again
+        """,
+        llm_config=autogen_llm_config,
+    )
+
+    coder = autogen.AssistantAgent(
+        name="Coder",
+        system_message="""You are a coder. When instructed, call generate_project() function immediately.
+
+        CRITICAL:
+        - Call generate_project(design_data, spec_data) using the provided data
+        - DO NOT write code in chat
+        - If rate limited, wait 60 seconds and retry
+        - Report success/failure clearly
+        """,
+        llm_config=autogen_llm_config,
+    )
+
+    # Rate-limited function wrapper
+    def rate_limited_generate_project(design_data: dict, spec_data: dict) -> str:
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"🔧 AutoGen function call attempt {attempt + 1}/{max_retries}...")
+                result = coding_agent_instance.generate_project(design_data, spec_data)
+                logger.info(f"🎉 AutoGen generation successful: {result}")
+                return result
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    get_rate_limiter().on_rate_limited(retry_after_from_error(e))
+                    if attempt < max_retries - 1:
+                        continue
+                    else:
+                        raise Exception("Rate limit exhausted in function calls")
+                elif isinstance(e, ClientError):
+                    raise
+                logger.error(f"❌ Function call error: {e}")
+                # Retry right away: request pacing comes from the shared rate limiter, not from idle sleeps
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    raise
+
+    user_proxy = autogen.UserProxyAgent(
+        name="UserProxy",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=3,  # Keep it short
+        is_termination_msg=lambda x: "TERMINATE" in x.get("content", "").upper(),
+        code_execution_config={"work_dir": project_root_path, "use_docker": False},
+        function_map={"generate_project": rate_limited_generate_project}
+    )
+
+    # Start conversation
+    groupchat = autogen.GroupChat(
+        agents=[user_proxy, project_manager, coder], 
+        messages=[], 
+        max_round=6  # Keep it minimal
+    )
+    manager = autogen.GroupChatManager(groupchat=groupchat, llm_config=autogen_llm_config)
+
+    # Clear, direct message
+    initial_message = f"""
+    IMMEDIATE ACTION REQUIRED:
+
+    ProjectManager: Tell Coder to call generate_project() NOW.
+    Coder: Call generate_project(design_data, spec_data) immediately.
+
+    Data:
+    SPEC: {json.dumps(spec_data, indent=1)}
+    DESIGN: {json.dumps(design_data, indent=1)}
+
+    NO DISCUSSION. EXECUTE NOW.
+    """
+
+    logger.info("🚀 Starting AutoGen with rate limiting...")
+
+    max_autogen_attempts = 2
+    for autogen_attempt in range(max_autogen_attempts):
+        try:
+            user_proxy.initiate_chat(manager, message=initial_message)
+            break  # Success
+        except ClientError as e:
+            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                if autogen_attempt < max_autogen_attempts - 1:
+                    # AutoGen calls the API directly, so wait out the cooldown here
+                    get_rate_limiter().on_rate_limited(retry_after_from_error(e))
+                    get_rate_limiter().wait_for_cooldown()
+                    continue
+                else:
+                    raise Exception("AutoGen conversation rate limited")
+            else:
+                raise
+
+
 def verify_code_generation(project_root_path: str) -> bool:
     """Verify that code files were actually generated."""
     if not os.path.exists(project_root_path):
@@ -279,7 +320,7 @@ def verify_code_generation(project_root_path: str) -> bool:
         raise ValueError("Could not determine 'root_Project_Directory_Name' from design data.")
     
     # Construct the absolute path for the generated code
-    project_root_path = os.path.abspath(os.path.join(config.BASE_OUTPUT_DIR, project_name_slug))
+    project_root_path = os.path.abspath(os.path.join(get_base_output_dir(), project_name_slug))
     logger.info(f"Code will be generated in: {project_root_path}")
     os.makedirs(project_root_path, exist_ok=True)
 
@@ -383,67 +424,206 @@ def verify_code_generation(project_root_path: str) -> bool:
             logger.error("❌ Code generation verification failed")
 
 
-def run_autonomous_software_factory(user_description: str):
+def run_autonomous_software_factory(user_description: str = None, resume_run_id: str = None):
+    return run_sync(arun_autonomous_software_factory(user_description, resume_run_id))
+
+
+def _load_json_file(file_path: str) -> dict:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _generated_test_files(project_root_path: str) -> list:
+    tests_dir = os.path.join(project_root_path, TEST_OUTPUT_DIR_NAME)
+    test_files = []
+    for root, _, files in os.walk(tests_dir):
+        for file in files:
+            if file.startswith("test_") and file.endswith(".py"):
+                test_files.append(os.path.relpath(os.path.join(root, file), project_root_path).replace(os.sep, '/'))
+    return sorted(test_files)
+
+
+async def arun_autonomous_software_factory(user_description: str = None, resume_run_id: str = None,
+                                           output_dir: str = None, phase_slots: dict = None) -> dict:
     """
     The main orchestration function for the entire multi-agent workflow.
     
+    Every phase is checkpointed in a run journal; when resume_run_id is given, completed
+    phases are loaded from the journal instead of being run again.
+    
     Args:
         user_description: The initial user prompt describing the software to build.
+        resume_run_id: Id of an earlier (interrupted) run to continue.
+        output_dir: Optional, own output directory for this project (used by batch runs).
+        phase_slots: Optional, {phase: asyncio.Semaphore} bounding how many runs of this process
+            are in each phase at the same time (used by batch runs).
+    
+    Returns:
+        Summary of the run: run_id, status ('completed' or 'failed'), project_root and, on failure, phase and error.
     """
+    config.init()
+    journal = None
+    current_phase = None
+    project_root_path = None
     try:
-        logger.info("=================================================")
-        logger.info("======= AUTONOMOUS SOFTWARE FACTORY START =======")
-        logger.info("=================================================")
-        logger.info(f"Received user request: '{user_description[:100]}...'")
-
-        # --- PHASE 1: SPECIFICATION ---
-        logger.info("\n----- PHASE 1: GENERATING SPECIFICATION -----")
-        spec_agent = SpecificationAgent()
-        spec_data = spec_agent.generate_specification(user_description)
-        logger.info("✅ Specification generated successfully.")
-
-        # --- PHASE 2: DESIGN ---
-        logger.info("\n----- PHASE 2: GENERATING SYSTEM DESIGN -----")
-        design_agent = DesignAgent()
-        design_data = design_agent.generate_design(spec_data)
-        logger.info("✅ System Design generated successfully.")
-
-        # --- PHASE 3: CODING (AUTOGEN) ---
-        logger.info("\n----- PHASE 3: GENERATING PROJECT CODE -----")
-        project_root_path = run_autogen_coding_crew(spec_data, design_data)
-        logger.info(f"✅ Code Generation complete. Project located at: {project_root_path}")
-
-        # --- PHASE 4: TESTING ---
-        logger.info("\n----- PHASE 4: GENERATING & RUNNING TESTS -----")
-        failed_tests = run_test_generation_and_execution(project_root_path, design_data, spec_data)
-
-        # --- PHASE 5: DEBUGGING (CONDITIONAL) ---
-        if failed_tests:
-            logger.warning(f"Detected {len(failed_tests)} test failures. Entering debugging phase...")
-            logger.info("\n----- PHASE 5: DEBUGGING FAILED TESTS -----")
-            debugging_successful = run_debugging_cycle(project_root_path, failed_tests)
-
-            if debugging_successful:
-                logger.info("✅ All bugs were successfully fixed by the Debugging Agent!")
-            else:
-                logger.error("❌ Debugging Agent could not fix all issues after multiple attempts.")
+        if resume_run_id:
+            journal = RunJournal.load(config.BASE_OUTPUT_DIR, resume_run_id)
+            user_description = journal.user_description
+            output_dir = journal.output_dir
+            logger.info(f"🔁 Resuming run {journal.run_id} at phase '{journal.current_phase()}'")
         else:
-            logger.info("✅ All tests passed successfully! No debugging needed.")
-
-        logger.info("\n================================================")
-        logger.info("======= AUTONOMOUS SOFTWARE FACTORY END ========")
-        logger.info("================================================")
-        logger.info(f"Final project is located at: {project_root_path}")
+            journal = RunJournal.create(config.BASE_OUTPUT_DIR, user_description, output_dir=output_dir)
+            logger.info(f"📒 Run id: {journal.run_id} (journal: {journal.path})")
+
+        trace_file = tracing.trace_path(config.BASE_OUTPUT_DIR, journal.run_id)
+        with project_output_dir(output_dir), tracing.trace_run(trace_file, journal.run_id), \
+                tracing.span('factory_run', kind='run', resumed=bool(resume_run_id)):
+            logger.info("=================================================")
+            logger.info("======= AUTONOMOUS SOFTWARE FACTORY START =======")
+            logger.info("=================================================")
+            logger.info(f"Received user request: '{user_description[:100]}...'")
+
+            # --- PHASE 1: SPECIFICATION ---
+            current_phase = 'specification'
+            if journal.is_completed(current_phase):
+                spec_data = _load_json_file(journal.phase(current_phase)['spec_path'])
+                logger.info("⏭️ Specification loaded from the run journal.")
+            else:
+                logger.info("\n----- PHASE 1: GENERATING SPECIFICATION -----")
+                journal.start_phase(current_phase)
+                async with _phase_slot(journal, current_phase, phase_slots):
+                    from specification_agent import SpecificationAgent
+                    spec_agent = SpecificationAgent()
+                    spec_data = await spec_agent.agenerate_specification(user_description)
+                    journal.complete_phase(current_phase, spec_path=spec_data['metadata']['filepath'])
+                    logger.info("✅ Specification generated successfully.")
+
+            # --- PHASE 2: DESIGN ---
+            current_phase = 'design'
+            if journal.is_completed(current_phase):
+                design_data = _load_json_file(journal.phase(current_phase)['design_path'])
+                logger.info("⏭️ System Design loaded from the run journal.")
+            else:
+                logger.info("\n----- PHASE 2: GENERATING SYSTEM DESIGN -----")
+                journal.start_phase(current_phase)
+                async with _phase_slot(journal, current_phase, phase_slots):
+                    from design_agent import DesignAgent
+                    design_agent = DesignAgent()
+                    design_data = await design_agent.agenerate_design(spec_data)
+                    journal.complete_phase(current_phase, design_path=design_data['metadata']['filepath'])
+                    logger.info("✅ System Design generated successfully.")
+
+            # --- PHASE 3: CODING (AUTOGEN) ---
+            current_phase = 'coding'
+            if journal.is_completed(current_phase):
+                project_root_path = journal.project_root
+                logger.info(f"⏭️ Code generation already completed: {project_root_path}")
+            else:
+                logger.info("\n----- PHASE 3: GENERATING PROJECT CODE -----")
+                journal.start_phase(current_phase)
+                async with _phase_slot(journal, current_phase, phase_slots):
+                    # Files finished before an interruption are kept by the generation manifest
+                    validation_issues = []
+                    project_root_path = await arun_autogen_coding_crew(spec_data, design_data, on_validation=validation_issues.extend)
+                    journal.project_root = project_root_path
+                    generated_files = sorted(GenerationManifest.load(project_root_path).files)
+                    journal.complete_phase(current_phase, files=file_hashes(project_root_path, generated_files),
+                                           validation_issues=validation_issues)
+                    logger.info(f"✅ Code Generation complete. Project located at: {project_root_path}")
+
+            # --- PHASE 4: TESTING ---
+            current_phase = 'testing'
+            if journal.is_completed(current_phase):
+                failed_tests = journal.phase(current_phase).get('failures', [])
+                logger.info(f"⏭️ Test results loaded from the run journal ({len(failed_tests)} failures).")
+            else:
+                logger.info("\n----- PHASE 4: GENERATING & RUNNING TESTS -----")
+                journal.start_phase(current_phase)
+                async with _phase_slot(journal, current_phase, phase_slots):
+                    # pytest cannot collect a project with broken imports (checked on the files as they are now, so a
+                    # run resumed after fixing them goes on): no install and no test run, the imports go to debugging
+                    import_failures = ProjectIndex.build(project_root_path).import_failures()
+                    if import_failures:
+                        logger.warning(f"⚠️ Tests skipped, the generated project has {len(import_failures)} unresolved or "
+                                       f"circular imports:\n" + "\n".join(f['error_line_summary'] for f in import_failures))
+                        failed_tests = import_failures
+                    else:
+                        from testing_agent import arun_test_generation_and_execution
+                        failed_tests = await arun_test_generation_and_execution(project_root_path, design_data, spec_data)
+                    journal.complete_phase(current_phase, tests=_generated_test_files(project_root_path), failures=failed_tests)
+
+            # --- PHASE 5: DEBUGGING (CONDITIONAL) ---
+            current_phase = 'debugging'
+            if journal.is_completed(current_phase):
+                logger.info(f"⏭️ Debugging already finished (all fixed: {journal.phase(current_phase).get('successful')}).")
+            elif failed_tests:
+                logger.warning(f"Detected {len(failed_tests)} test failures. Entering debugging phase...")
+                logger.info("\n----- PHASE 5: DEBUGGING FAILED TESTS -----")
+                journal.start_phase(current_phase)
+                async with _phase_slot(journal, current_phase, phase_slots):
+                    from debug_agent import arun_debugging_cycle
+                    from testing_agent import arefresh_generated_tests
+                    # Tests of the functions the fixes change are regenerated before each re-run
+                    debugging_successful = await arun_debugging_cycle(
+                        project_root_path, failed_tests, on_iteration=journal.record_debug_iteration,
+                        refresh_tests=lambda: arefresh_generated_tests(project_root_path, design_data, spec_data)
+                    )
+                    journal.complete_phase(current_phase, successful=debugging_successful)
+
+                if debugging_successful:
+                    logger.info("✅ All bugs were successfully fixed by the Debugging Agent!")
+                else:
+                    logger.error("❌ Debugging Agent could not fix all issues after multiple attempts.")
+            else:
+                journal.complete_phase(current_phase, successful=True)
+                logger.info("✅ All tests passed successfully! No debugging needed.")
+
+            logger.info("\n================================================")
+            logger.info("======= AUTONOMOUS SOFTWARE FACTORY END ========")
+            logger.info("================================================")
+            logger.info(f"Final project is located at: {project_root_path}")
+            logger.info(f"LLM cache stats: {get_llm_cache().stats()}")
+            logger.info(f"LLM single-flight stats: {get_llm_cache().single_flight.stats()}")
+            logger.info(f"Rate limiter stats: {get_rate_limiter().stats()}")
+            logger.info(f"LLM client pool stats: {get_client_registry().stats()}")
+            logger.info(f"🔎 Trace: {trace_file} (summary: python src/main_deploy/tracing.py {journal.run_id})")
+        return {'run_id': journal.run_id, 'status': 'completed', 'project_root': project_root_path}
 
     except Exception as e:
         logger.critical(f"A critical error halted the main workflow: {e}", exc_info=True)
         logger.critical("The process has been stopped.")
+        if journal and current_phase:
+            journal.fail_phase(current_phase, str(e))
+            logger.critical(f"Progress is saved. Resume with: python src/main_deploy/run.py --resume {journal.run_id}")
+        return {'run_id': journal.run_id if journal else None, 'status': 'failed', 'project_root': project_root_path,
+                'phase': current_phase, 'error': str(e)}
+
+
+@contextlib.asynccontextmanager
+async def _phase_slot(journal: RunJournal, phase: str, phase_slots: dict = None):
+    """Trace span of one phase; with phase_slots, waits for a free slot of that phase first"""
+    slot = (phase_slots or {}).get(phase)
+    if slot is not None:
+        await slot.acquire()
+    try:
+        with tracing.span(phase, kind='phase', attempt=journal.phase(phase)['attempts']):
+            yield
+    finally:
+        if slot is not None:
+            slot.release()
 
 
 def setup_project_environment(project_root_path: str) -> bool:
+    return run_sync(asetup_project_environment(project_root_path))
+
+
+async def asetup_project_environment(project_root_path: str) -> bool:
     """
     Set up the project environment by creating venv and installing dependencies.
     """
+    if not config.SETUP_PROJECT_ENV:
+        logger.info("⏭️ SETUP_PROJECT_ENV is off, skipping the project environment setup.")
+        return True
     try:
         logger.info("🔧 Setting up project environment...")
         
@@ -513,12 +693,9 @@ exit /b 0
             f.write(setup_bat_content)
         
         logger.info("🚀 Executing environment setup script...")
-        result = subprocess.run(
-            f'"{setup_bat_path}"',
-            shell=True,
+        result = await run_subprocess(
+            script_command(setup_bat_path),
             cwd=project_root_path,
-            capture_output=True,
-            text=True,
             timeout=300  # 5 minute timeout
         )
         
@@ -530,11 +707,13 @@ exit /b 0
         
         if result.returncode == 0:
             logger.info("✅ Environment setup completed successfully")
-            logger.debug(f"Setup output: {result.stdout}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Setup output: {result.stdout}")
             return True
         else:
             logger.error(f"❌ Environment setup failed: {result.stderr}")
-            logger.debug(f"Setup stdout: {result.stdout}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Setup stdout: {result.stdout}")
             return False
             
     except subprocess.TimeoutExpired:
@@ -546,6 +725,10 @@ exit /b 0
 
 
 def create_venv_manually(project_root_path: str) -> bool:
+    return run_sync(acreate_venv_manually(project_root_path))
+
+
+async def acreate_venv_manually(project_root_path: str) -> bool:
     """
     Manually create virtual environment if run.bat fails.
     """
@@ -554,10 +737,8 @@ def create_venv_manually(project_root_path: str) -> bool:
         
         # Create virtual environment
         venv_path = os.path.join(project_root_path, "venv")
-        result = subprocess.run(
+        result = await run_subprocess(
             [config.PYTHON_EXECUTABLE, "-m", "venv", venv_path],
-            capture_output=True,
-            text=True,
             cwd=project_root_path
         )
         
@@ -569,10 +750,8 @@ def create_venv_manually(project_root_path: str) -> bool:
         requirements_path = os.path.join(project_root_path, "requirements.txt")
         if os.path.exists(requirements_path):
             venv_pip = os.path.join(venv_path, "Scripts", "pip.exe")
-            result = subprocess.run(
+            result = await run_subprocess(
                 [venv_pip, "install", "-r", requirements_path],
-                capture_output=True,
-                text=True,
                 cwd=project_root_path
             )
             
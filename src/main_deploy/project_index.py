@@ -0,0 +1,335 @@
+import ast
+import logging
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from code_analysis import analyze_code
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_DIRS = {'venv', '.venv', 'env', '__pycache__', '.git', 'node_modules', '.pytest_cache'}
+# Issues that make pytest fail at collection, so installing the venv and running the tests is pointless
+UNRESOLVED_IMPORT = "Unresolved import"
+CIRCULAR_IMPORT = "Circular import"
+
+
+class ModuleInfo:
+    """A Python module of the generated project, named as it is imported from the project root"""
+
+    def __init__(self, name: str, path: str, is_package: bool):
+        self.name = name
+        self.path = path
+        self.is_package = is_package
+        self.exports: Set[str] = set()
+        self.open_exports = False    # star import or unparsable: any name may exist
+        self.imports: List[Dict] = []
+        self.syntax_error: Optional[str] = None
+
+    @property
+    def package(self) -> str:
+        """Package relative imports are resolved against"""
+        return self.name if self.is_package else self.name.rpartition('.')[0]
+
+
+class ProjectIndex:
+    """
+    One walk over a generated project: every file, a module -> exported names map and the
+    import graph between project modules.
+
+    From it a single `check` reports unresolved imports, circular imports and packages without
+    `__init__.py`, i.e. the breakage that otherwise only shows up once the venv is installed
+    and pytest collects the tests. Imports of modules that are not part of the project
+    (stdlib, third-party) are not checked.
+    """
+
+    def __init__(self, project_root: str):
+        self.project_root = os.path.abspath(project_root)
+        self.files: List[str] = []                  # relative paths, '/' separated
+        self.empty_files: List[str] = []
+        self.modules: Dict[str, ModuleInfo] = {}
+        self.package_dirs: Dict[str, bool] = {}     # dotted dir name -> has __init__.py
+        self.graph: Dict[str, Set[str]] = {}        # module -> project modules imported at module level
+
+    @classmethod
+    def build(cls, project_root: str) -> 'ProjectIndex':
+        index = cls(project_root)
+        index._walk()
+        index._build_graph()
+        logger.debug(f"Indexed {len(index.files)} files, {len(index.modules)} modules in {index.project_root}")
+        return index
+
+    def has_file(self, filename: str) -> bool:
+        return any(os.path.basename(path) == filename for path in self.files)
+
+    def _walk(self):
+        for root, dirs, files in os.walk(self.project_root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS and not d.endswith('.egg-info'))
+            rel_dir = os.path.relpath(root, self.project_root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir
+            dir_parts = rel_dir.split('/') if rel_dir else []
+            if rel_dir and any(f.endswith('.py') for f in files):
+                self.package_dirs['.'.join(dir_parts)] = '__init__.py' in files
+
+            for file in sorted(files):
+                rel_path = f"{rel_dir}/{file}" if rel_dir else file
+                file_path = os.path.join(root, file)
+                self.files.append(rel_path)
+                if file.endswith(('.py', '.js', '.html', '.css')) and file != '__init__.py' and os.path.getsize(file_path) == 0:
+                    self.empty_files.append(rel_path)
+                if file.endswith('.py'):
+                    self._index_module(dir_parts, file, file_path)
+
+    def _index_module(self, dir_parts: List[str], file: str, file_path: str):
+        is_package = file == '__init__.py'
+        parts = dir_parts if is_package else dir_parts + [file[:-3]]
+        if not parts or not all(part.isidentifier() for part in parts):
+            return
+        module = ModuleInfo('.'.join(parts), file_path, is_package)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            module.syntax_error = str(e)
+            module.open_exports = True
+            self.modules[module.name] = module
+            return
+
+        analysis = analyze_code(file_path, content)
+        if analysis.tree is None:
+            module.syntax_error = analysis.syntax_error
+            module.open_exports = True
+        else:
+            module.exports, module_level_lines = _module_level_bindings(analysis.tree)
+            module.imports = [dict(imp, module_level=imp['lineno'] in module_level_lines) for imp in analysis.imports]
+            module.open_exports = any(name == '*' for imp in module.imports for name, _ in imp['names'])
+        self.modules[module.name] = module
+
+    def _build_graph(self):
+        for module in self.modules.values():
+            edges = self.graph.setdefault(module.name, set())
+            for imp in module.imports:
+                if not imp['module_level']:
+                    continue
+                for target in self._targets(module, imp):
+                    if target in self.modules and target != module.name:
+                        edges.add(target)
+
+    def _absolute(self, module: ModuleInfo, imp: Dict) -> Optional[str]:
+        """Absolute dotted name of the module an import statement refers to (None if above the root)"""
+        if not imp['is_from'] or not imp['level']:
+            return imp['module']
+        package_parts = module.package.split('.') if module.package else []
+        if imp['level'] - 1 >= len(package_parts):
+            return None
+        base = package_parts[:len(package_parts) - (imp['level'] - 1)]
+        return '.'.join(base + ([imp['module']] if imp['module'] else []))
+
+    def _targets(self, module: ModuleInfo, imp: Dict) -> List[str]:
+        """Project modules executed by an import"""
+        if not imp['is_from']:
+            return [name for name, _ in imp['names']]
+        base = self._absolute(module, imp)
+        if base is None:
+            return []
+        return [base] + [f"{base}.{name}" if base else name for name, _ in imp['names']]
+
+    def _is_module(self, name: str) -> bool:
+        return name in self.modules or name in self.package_dirs
+
+    def _is_local(self, name: str) -> bool:
+        """A name that belongs to the project: its top-level part is a project module or package"""
+        return self._is_module(name.split('.')[0])
+
+    def _suggest(self, name: str) -> Optional[str]:
+        """Project module whose dotted name ends with `name` (e.g. 'models' -> 'app.models')"""
+        matches = sorted(module for module in list(self.modules) + list(self.package_dirs) if module.endswith('.' + name))
+        return matches[0] if matches else None
+
+    def unresolved_imports(self) -> List[str]:
+        return [f"{self._rel(module.path)}:{imp['lineno']}: `{imp['statement']}` {problem}"
+                for module, imp, problem in self._unresolved()]
+
+    def _unresolved(self) -> List[Tuple[ModuleInfo, Dict, str]]:
+        problems = []
+        for module in sorted(self.modules.values(), key=lambda m: m.name):
+            for imp in module.imports:
+                problem = self._check_import(module, imp)
+                if problem:
+                    problems.append((module, imp, problem))
+        return problems
+
+    def _check_import(self, module: ModuleInfo, imp: Dict) -> Optional[str]:
+        if not imp['is_from']:
+            for name, _ in imp['names']:
+                problem = self._check_module(name)
+                if problem:
+                    return problem
+            return None
+
+        target = self._absolute(module, imp)
+        if target is None:
+            return "goes above the project root"
+        if not target:
+            return None
+        if imp['level'] == 0:
+            problem = self._check_module(target)
+            if problem or not self._is_module(target):
+                return problem
+        elif not self._is_module(target):
+            return f"cannot be resolved: no module {target}"
+
+        info = self.modules.get(target)
+        if info is None or info.open_exports:
+            return None
+        missing = [name for name, _ in imp['names']
+                   if name != '*' and name not in info.exports and not self._is_module(f"{target}.{name}")]
+        if missing:
+            return f"imports {', '.join(missing)} not defined in {self._rel(info.path)}"
+        return None
+
+    def _check_module(self, name: str) -> Optional[str]:
+        """Problem with an absolute module name, or None (also for modules outside the project)"""
+        if self._is_module(name):
+            return None
+        if self._is_local(name):
+            return f"cannot be resolved: no module {name}"
+        suggestion = self._suggest(name)
+        if suggestion:
+            return f"cannot be resolved from the project root (did you mean {suggestion}?)"
+        return None
+
+    def circular_imports(self) -> List[List[str]]:
+        """Import cycles among module-level imports, each as a path that returns to its first module"""
+        return [_cycle_path(component, self.graph) for component in _strongly_connected(self.graph) if len(component) > 1]
+
+    def missing_init_files(self) -> List[str]:
+        return sorted(name.replace('.', '/') for name, has_init in self.package_dirs.items() if not has_init)
+
+    def syntax_errors(self) -> List[str]:
+        return [f"{self._rel(module.path)}: {module.syntax_error}"
+                for module in sorted(self.modules.values(), key=lambda m: m.name) if module.syntax_error]
+
+    def check(self) -> List[str]:
+        """All import-level problems of the project, one message each"""
+        issues = [f"Syntax error: {error}" for error in self.syntax_errors()]
+        issues.extend(f"{UNRESOLVED_IMPORT}: {problem}" for problem in self.unresolved_imports())
+        issues.extend(f"{CIRCULAR_IMPORT}: {' -> '.join(cycle)}" for cycle in self.circular_imports())
+        issues.extend(f"Missing __init__.py in package: {package}" for package in self.missing_init_files())
+        return issues
+
+    def import_failures(self) -> List[Dict[str, str]]:
+        """
+        The unresolved and circular imports as test failures (the entries of testing_agent.arun_test),
+        so a project whose tests cannot be collected still goes to the debugging phase
+        """
+        failures = [_import_failure(self._rel(module.path),
+                                    f"{UNRESOLVED_IMPORT}: {self._rel(module.path)}:{imp['lineno']}: `{imp['statement']}` {problem}")
+                    for module, imp, problem in self._unresolved()]
+        failures.extend(_import_failure(self._rel(self.modules[cycle[0]].path), f"{CIRCULAR_IMPORT}: {' -> '.join(cycle)}")
+                        for cycle in self.circular_imports())
+        return failures
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.project_root).replace(os.sep, '/')
+
+
+def import_blockers(issues: List[str]) -> List[str]:
+    """The unresolved and circular imports among validation issues (see ProjectIndex.check)"""
+    return [issue for issue in issues if issue.startswith((f"{UNRESOLVED_IMPORT}:", f"{CIRCULAR_IMPORT}:"))]
+
+
+def _import_failure(source_file: str, message: str) -> Dict[str, str]:
+    return {
+        "test": "import check",
+        "test_file_path": None,  # found before any test ran
+        "source_file": source_file,
+        "source_function": "<module>",
+        "error_line_summary": message
+    }
+
+
+def _module_level_bindings(tree: ast.Module) -> Tuple[Set[str], Set[int]]:
+    """Names bound at module level (also inside if/try/with blocks) and the lines of module-level imports"""
+    names, import_lines = set(), set()
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            import_lines.add(node.lineno)
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split('.')[0])
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.update(n.id for target in targets for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, (ast.If, ast.Try, ast.With, ast.For, ast.While)) or type(node).__name__ == 'TryStar':
+            for field in ('body', 'orelse', 'finalbody'):
+                pending.extend(getattr(node, field, []))
+            for handler in getattr(node, 'handlers', []):
+                pending.extend(handler.body)
+    return names, import_lines
+
+
+def _strongly_connected(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Tarjan's algorithm (iterative), components in a deterministic order"""
+    index_of, lowlink, on_stack, stack, components = {}, {}, set(), [], []
+    counter = 0
+    for start in sorted(graph):
+        if start in index_of:
+            continue
+        work = [(start, iter(sorted(graph.get(start, ()))))]
+        index_of[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index_of:
+                    index_of[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(graph.get(successor, ())))))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return sorted(components)
+
+
+def _cycle_path(component: List[str], graph: Dict[str, Set[str]]) -> List[str]:
+    """Shortest cycle through the first module of a strongly connected component"""
+    members, start = set(component), component[0]
+    previous, frontier = {start: None}, [start]
+    while frontier:
+        next_frontier = []
+        for node in frontier:
+            for successor in sorted(graph.get(node, ())):
+                if successor == start:
+                    path = [node]
+                    while previous[path[-1]] is not None:
+                        path.append(previous[path[-1]])
+                    return list(reversed(path)) + [start]
+                if successor in members and successor not in previous:
+                    previous[successor] = node
+                    next_frontier.append(successor)
+        frontier = next_frontier
+    return component + [start]
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List
+
+from design_slices import (
+    VOLATILE_KEYS, design_sections_for, spec_sections_for,
+    structure_entry_for_file, endpoints_for_file, requirements_for_file, sibling_entries
+)
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/code), good enough for before/after comparisons"""
+    return (len(text) + 3) // 4
+
+
+def _dump(obj) -> str:
+    return json.dumps(obj, indent=1, ensure_ascii=False)
+
+
+def _unique(items) -> list:
+    """Drop duplicates (by content) while keeping order"""
+    seen = set()
+    result = []
+    for item in items:
+        key = json.dumps(item, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+class SlicedPromptBuilder:
+    """
+    Builds the per-file design/spec/context sections of the code generation prompt.
+
+    Only the parts of the design a file needs are included: the structure entries of its
+    directory, the data models, the endpoints it implements and the exported symbols of its
+    direct dependencies. Sections shared by many files are serialized once per project.
+    The design part is what design_slices.design_slice_for_file hashes for the manifest.
+    """
+
+    def __init__(self, design_data: dict, spec_data: dict, project_context=None):
+        self.design_data = {k: v for k, v in (design_data or {}).items() if k not in VOLATILE_KEYS}
+        self.spec_data = {k: v for k, v in (spec_data or {}).items() if k not in VOLATILE_KEYS}
+        data_design = self.design_data.get('data_Design', {}) or {}
+
+        # Static sections, serialized once for the whole project
+        self._design_sections = {
+            'storage': "Storage (data_Design):\n" + _dump({key: data_design.get(key) for key in ('storage_Type', 'database_Type')}),
+            'dependencies': "Dependencies:\n" + _dump(self.design_data.get('dependencies', {})),
+            'data_Models': "Data Models (data_Design.data_Models):\n" + _dump(data_design.get('data_Models', [])),
+            'api_Specifications': "API Endpoints (interface_Design.api_Specifications):\n" + _dump(
+                self.design_data.get('interface_Design', {}).get('api_Specifications', [])
+            ),
+        }
+        self._spec_sections = {
+            'overview': "Project Overview and Technology Stack:\n" + _dump({
+                'project_Overview': self.spec_data.get('project_Overview', {}),
+                'technology_Stack': self.spec_data.get('technology_Stack', {}),
+            }),
+            'functional_Requirements': "Functional Requirements:\n" + _dump(self.spec_data.get('functional_Requirements', [])),
+            'non_Functional_Requirements': "Non-Functional Requirements:\n" + _dump(self.spec_data.get('non_Functional_Requirements', [])),
+        }
+        self._full_design = None
+        self._full_spec = None
+        self._project_header = None
+        if project_context is not None:
+            structure_info = project_context.project_structure
+            self._project_header = (
+                f"- Project: {project_context.project_name}\n"
+                f"- Framework: {project_context.tech_stack}\n"
+                f"- Database Files: {structure_info['database_files']}\n"
+                f"- Model Files: {structure_info['model_files']}\n"
+                f"- Route Files: {structure_info['route_files']}\n"
+                f"- Entry Points: {structure_info['entry_points']}"
+            )
+
+        # Size of the full documents as they were embedded before slicing (for the savings report)
+        self.full_documents_tokens = estimate_tokens(json.dumps(design_data or {}, indent=2)) + estimate_tokens(json.dumps(spec_data or {}, indent=2))
+
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def design_context_for(self, file_path: str, file_type: str) -> str:
+        return self._design_context([file_path], file_type)
+
+    def spec_context_for(self, file_path: str, file_type: str) -> str:
+        return self._spec_context([file_path], file_type)
+
+    def _design_context(self, file_paths: List[str], file_type: str) -> str:
+        entries = [structure_entry_for_file(self.design_data, path) for path in file_paths]
+        structure = self._structure_section(file_paths)
+        if len(file_paths) == 1:
+            parts = [structure, "This File:\n" + _dump(entries[0])]
+        else:
+            parts = [structure, "Files In This Batch:\n" + _dump(entries)]
+        for section in design_sections_for(file_type):
+            if section == 'file_endpoints':
+                endpoints = _unique(endpoint for path in file_paths for endpoint in endpoints_for_file(self.design_data, path))
+                parts.append("API Endpoints Implemented By This File:\n" + _dump(endpoints))
+            elif section == 'design':
+                if self._full_design is None:
+                    self._full_design = "Full Design:\n" + _dump(self.design_data)
+                parts.append(self._full_design)
+            else:
+                parts.append(self._design_sections[section])
+        return "\n\n".join(parts)
+
+    def _structure_section(self, file_paths: List[str]) -> str:
+        """The structure entries of the files' directory (batches are siblings, so they share it)"""
+        siblings = _unique(entry for path in file_paths for entry in sibling_entries(self.design_data, path))
+        directory = os.path.dirname(file_paths[0].strip('/\\').replace('\\', '/')) or '.'
+        return f"Project Structure, directory {directory}/ (folder_Structure.structure):\n" + "\n".join(
+            f"- {entry['path']}: {entry['description']}" for entry in siblings
+        )
+
+    def _spec_context(self, file_paths: List[str], file_type: str) -> str:
+        parts = [self._spec_sections['overview']]
+        for section in spec_sections_for(file_type):
+            if section == 'file_requirements':
+                requirements = _unique(req for path in file_paths for req in requirements_for_file(self.spec_data, self.design_data, path))
+                parts.append("Requirements For This File:\n" + _dump(requirements))
+            elif section == 'spec':
+                if self._full_spec is None:
+                    self._full_spec = "Full Specification:\n" + _dump(self.spec_data)
+                parts.append(self._full_spec)
+            else:
+                parts.append(self._spec_sections[section])
+        return "\n\n".join(parts)
+
+    def dependency_context_for(self, file_path: str, dependencies: List[str], project_context) -> str:
+        """Project header plus the symbols exported by the files this one directly depends on"""
+        lines = ["PROJECT CONTEXT SUMMARY:"]
+        if self._project_header:
+            lines.append(self._project_header)
+        lines.append("")
+        lines.append("DIRECT DEPENDENCIES (already generated - import from them, do not redefine):")
+        if not dependencies:
+            lines.append("- None")
+        for dep in dependencies:
+            exports = project_context.get_exports_for_file(dep)
+            module = os.path.splitext(dep)[0].replace('/', '.').replace('\\', '.')
+            lines.append(f"- {dep} (module `{module}`)")
+            if exports['classes']:
+                lines.append(f"    classes: {', '.join(exports['classes'])}")
+            if exports['functions']:
+                lines.append(f"    functions: {', '.join(exports['functions'])}")
+            if exports.get('variables'):
+                lines.append(f"    variables: {', '.join(exports['variables'])}")
+        return "\n".join(lines)
+
+    def sections_for(self, file_path: str, file_type: str, dependencies: List[str], project_context) -> Dict[str, str]:
+        return {
+            'design_context': self.design_context_for(file_path, file_type),
+            'spec_context': self.spec_context_for(file_path, file_type),
+            'project_context_summary': self.dependency_context_for(file_path, dependencies, project_context),
+        }
+
+    def batch_sections_for(self, file_paths: List[str], file_type: str, dependencies: List[str], project_context) -> Dict[str, str]:
+        """One set of sections for a batch of sibling files: shared parts once, per-file entries merged"""
+        return {
+            'design_context': self._design_context(file_paths, file_type),
+            'spec_context': self._spec_context(file_paths, file_type),
+            'project_context_summary': self.dependency_context_for(file_paths[0], dependencies, project_context),
+        }
+
+    def record_prompt(self, prompt: str, sections: Dict[str, str], baseline_sections_tokens: int) -> Dict[str, int]:
+        """
+        Record the size of a rendered prompt against what the unsliced prompt would have been.
+        `baseline_sections_tokens` is the size of the sections the slices replaced (full documents + full summary).
+        """
+        after = estimate_tokens(prompt)
+        sliced = sum(estimate_tokens(text) for text in sections.values())
+        before = after - sliced + baseline_sections_tokens
+        with self._lock:
+            self.prompts += 1
+            self.tokens_before += before
+            self.tokens_after += after
+        return {'before': before, 'after': after}
+
+    def report(self) -> Dict[str, float]:
+        saved = self.tokens_before - self.tokens_after
+        return {
+            'prompts': self.prompts,
+            'tokens_before': self.tokens_before,
+            'tokens_after': self.tokens_after,
+            'saved_pct': round(100.0 * saved / self.tokens_before, 1) if self.tokens_before else 0.0,
+        }
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RETRY_AFTER_PATTERNS = (
+    re.compile(r"retry[_ ]?delay['\"]?\s*[:=]?\s*\{?\s*['\"]?(?:seconds['\"]?\s*[:=]\s*)?['\"]?(\d+(?:\.\d+)?)s?", re.IGNORECASE),
+    re.compile(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*(?:s\b|sec|seconds)", re.IGNORECASE),
+)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """429 / RESOURCE_EXHAUSTED from google-genai, google-generativeai or langchain_google_genai"""
+    for attr in ("code", "status_code"):
+        if getattr(error, attr, None) == 429:
+            return True
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "ResourceExhausted" in type(error).__name__
+
+
+def retry_after_from_error(error: BaseException) -> Optional[float]:
+    """Retry hint in seconds from a Retry-After header or the RetryInfo detail of a Gemini error, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        header = headers.get("retry-after") or headers.get("Retry-After")
+        if header:
+            return float(header)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    text = str(error)
+    for pattern in _RETRY_AFTER_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _usage_tokens(result) -> Optional[int]:
+    """Total tokens reported by a langchain AIMessage or a genai response, if the result carries usage"""
+    usage = getattr(result, "usage_metadata", None)
+    if isinstance(usage, dict):
+        return usage.get("total_tokens")
+    return getattr(usage, "total_token_count", None)
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide token bucket for requests per minute and tokens per minute.
+
+    Callers reserve capacity in `acquire` and sleep only for their own deficit, so concurrent
+    workers are spaced out instead of waking up together. The request rate is adjusted AIMD-style:
+    it is halved on a 429/RESOURCE_EXHAUSTED (at most once per cooldown window, so a burst of
+    failures counts once) and grows back by one RPM per successful call. A retry-after hint
+    blocks all callers until it expires.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float = 0, burst: float = 1,
+                 min_requests_per_minute: float = 1, default_cooldown: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.max_rpm = float(requests_per_minute)
+        self.rpm = float(requests_per_minute)
+        self.tpm = float(tokens_per_minute or 0)
+        self.burst = max(1.0, float(burst))
+        self.min_rpm = max(0.1, float(min_requests_per_minute))
+        self.default_cooldown = default_cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._request_allowance = self.burst
+        self._token_allowance = self.tpm
+        self._updated = now
+        self._blocked_until = now
+        self._last_decrease = None
+        self.total_wait = 0.0
+        self.rate_limited = 0
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._request_allowance = min(self.burst, self._request_allowance + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._token_allowance = min(self.tpm, self._token_allowance + elapsed * self.tpm / 60.0)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Take one request (and `tokens`) from the buckets; returns how long the caller must wait before sending"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._request_allowance -= 1
+            wait = max(0.0, self._blocked_until - now)
+            if self._request_allowance < 0:
+                wait = max(wait, -self._request_allowance * 60.0 / self.rpm)
+            if self.tpm and tokens:
+                self._token_allowance -= min(tokens, self.tpm)
+                if self._token_allowance < 0:
+                    wait = max(wait, -self._token_allowance * 60.0 / self.tpm)
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"⏳ Rate limiter: waiting {wait:.2f}s ({self.rpm:.1f} RPM)")
+            self._sleep(wait)
+            with self._lock:
+                self.total_wait += wait
+        return wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"⏳ Rate limiter: waiting {wait:.2f}s ({self.rpm:.1f} RPM)")
+            await asyncio.sleep(wait)
+            with self._lock:
+                self.total_wait += wait
+        return wait
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage of a call is known"""
+        if not self.tpm or actual_tokens is None:
+            return
+        with self._lock:
+            self._token_allowance -= (actual_tokens - estimated_tokens)
+
+    def on_success(self):
+        with self._lock:
+            self.rpm = min(self.max_rpm, self.rpm + 1.0)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """Back off after a 429; returns the cooldown applied to every caller"""
+        with self._lock:
+            now = self._clock()
+            cooldown = retry_after if retry_after is not None else self.default_cooldown
+            self.rate_limited += 1
+            if self._last_decrease is None or now - self._last_decrease >= cooldown:
+                self.rpm = max(self.min_rpm, self.rpm / 2.0)
+                self._last_decrease = now
+                # Drop accumulated burst so the next calls really run at the reduced rate
+                self._request_allowance = min(self._request_allowance, 0.0)
+            self._blocked_until = max(self._blocked_until, now + cooldown)
+            logger.warning(f"⚠️ Rate limited by the API: cooling down {cooldown:.1f}s, request rate now {self.rpm:.1f} RPM")
+            return cooldown
+
+    def wait_for_cooldown(self) -> float:
+        """Block until a retry-after cooldown has passed (for calls that do not go through `call`)"""
+        with self._lock:
+            wait = max(0.0, self._blocked_until - self._clock())
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def call(self, fn: Callable[[], T], estimated_tokens: int = 0, max_rate_limit_retries: int = 5) -> T:
+        """Run `fn` under the limiter; 429s are retried after the backoff, other errors propagate"""
+        waited = 0.0
+        for attempt in range(max_rate_limit_retries + 1):
+            waited += self.acquire(estimated_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                self._on_call_error(e, attempt, max_rate_limit_retries, waited)
+                continue
+            return self._on_call_success(result, estimated_tokens, attempt, waited)
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], estimated_tokens: int = 0, max_rate_limit_retries: int = 5) -> T:
+        """Async version of `call`: `fn` returns a fresh awaitable per attempt"""
+        waited = 0.0
+        for attempt in range(max_rate_limit_retries + 1):
+            waited += await self.aacquire(estimated_tokens)
+            try:
+                result = await fn()
+            except Exception as e:
+                self._on_call_error(e, attempt, max_rate_limit_retries, waited)
+                continue
+            return self._on_call_success(result, estimated_tokens, attempt, waited)
+
+    def _on_call_error(self, error: Exception, attempt: int, max_rate_limit_retries: int, waited: float):
+        """Back off after a 429 so the caller retries; re-raise anything else or the last 429"""
+        if not is_rate_limit_error(error) or attempt == max_rate_limit_retries:
+            tracing.annotate(retries=attempt, rate_limit_wait_s=round(waited, 3))
+            raise error
+        self.on_rate_limited(retry_after_from_error(error))
+
+    def _on_call_success(self, result: T, estimated_tokens: int, attempt: int, waited: float) -> T:
+        self.on_success()
+        self.settle(estimated_tokens, _usage_tokens(result))
+        tracing.annotate(retries=attempt, rate_limit_wait_s=round(waited, 3))
+        tracing.record_usage(result)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'rpm': round(self.rpm, 1),
+            'rate_limited': self.rate_limited,
+            'total_wait_seconds': round(self.total_wait, 1),
+        }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Process-wide limiter shared by every agent (configured from config.GEMINI_RPM / GEMINI_TPM)"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            import config
+            _limiter = AdaptiveRateLimiter(
+                requests_per_minute=config.GEMINI_RPM,
+                tokens_per_minute=config.GEMINI_TPM,
+                burst=config.GEMINI_RATE_BURST
+            )
+        return _limiter
+
+
+def langchain_rate_limiter(limiter: Optional[AdaptiveRateLimiter] = None):
+    """
+    The shared limiter as a LangChain `rate_limiter=` for chat models that are driven by an agent
+    executor (and therefore cannot be wrapped with `call`). Returns None on langchain-core
+    versions without rate limiter support.
+    """
+    try:
+        from langchain_core.rate_limiters import BaseRateLimiter
+    except ImportError:
+        return None
+
+    shared = limiter or get_rate_limiter()
+    # One adapter per limiter, so chat models asking for it share a pooled client (see llm_clients)
+    adapter = getattr(shared, '_langchain_adapter', None)
+    if adapter is not None:
+        return adapter
+
+    class _SharedRateLimiter(BaseRateLimiter):
+        def acquire(self, *, blocking: bool = True) -> bool:
+            if not blocking:
+                return False
+            shared.acquire()
+            return True
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            if not blocking:
+                return False
+            await shared.aacquire()
+            return True
+
+    shared._langchain_adapter = _SharedRateLimiter()
+    return shared._langchain_adapter
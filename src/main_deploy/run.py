@@ -4,11 +4,8 @@ import argparse
 import os
 
 # --- Minimal Initial Imports ---
-# Only import modules that DO NOT depend on the .env file being complete.
-# 'detect_path' is safe because it's what CREATES the .env file.
-from detect_path import define_project_root, define_python_path
-
-# We cannot import 'config' here at the top level anymore.
+# Everything else is imported when a command needs it, so `--help`, `--setup` and
+# `--list-runs` start without loading the agents and their frameworks.
 
 def run_initial_setup():
     """
@@ -17,6 +14,7 @@ def run_initial_setup():
     """
     print("--- Initial Setup Wizard ---")
     print("Please provide the required paths. These will be saved to your .env file.")
+    from detect_path import define_project_root, define_python_path
     try:
         # Create a .env file if it doesn't exist, to prevent errors.
         if not os.path.exists('.env'):
@@ -50,6 +48,44 @@ def main():
         default=None,
         help="A detailed description of the web application to build.\nIf not provided, the script will prompt you for it interactively."
     )
+    parser.add_argument(
+        '--no-cache',
+        action="store_true",
+        help="Bypass the on-disk LLM response cache and call the model for every prompt."
+    )
+    parser.add_argument(
+        '--resume',
+        metavar="RUN_ID",
+        type=str,
+        default=None,
+        help="Continue an interrupted run from its journal, skipping the phases (and files) it already completed."
+    )
+    parser.add_argument(
+        '--list-runs',
+        action="store_true",
+        help="List the recorded runs and the status of their phases."
+    )
+    parser.add_argument(
+        '--batch',
+        metavar="REQUESTS_JSONL",
+        type=str,
+        default=None,
+        help="Build every project described in a JSONL file ({\"id\", \"description\"} or {\"title\", \"body\"} per line)\n"
+             "concurrently. Re-running the same batch skips completed projects and resumes failed ones."
+    )
+    parser.add_argument(
+        '--results',
+        metavar="RESULTS_JSONL",
+        type=str,
+        default=None,
+        help="Where batch results are appended (default: <BASE_OUTPUT_DIR>/batches/<name>/results.jsonl)."
+    )
+    parser.add_argument(
+        '--max-projects',
+        type=int,
+        default=None,
+        help="Projects built at the same time in batch mode (default: BATCH_MAX_PROJECTS)."
+    )
     args = parser.parse_args()
 
     # --- Handle Setup FIRST ---
@@ -58,16 +94,42 @@ def main():
         return # Exit after setup
 
     # --- Run Main Application ---
-    # If we are NOT running setup, it's now safe to import our main modules
-    # that depend on the .env file.
+    # If we are NOT running setup, the .env file must be complete: config.init() sets up
+    # logging and raises EnvironmentError for missing variables.
     try:
         import config
-        from main import run_autonomous_software_factory
+        config.init()
         from setup import configure_gemini_api
 
         # Get the logger that was configured in config.py
         logger = logging.getLogger(__name__)
 
+        if args.no_cache:
+            config.LLM_CACHE_BYPASS = True
+
+        if args.list_runs:
+            from run_journal import RunJournal
+            for run in RunJournal.list_runs(config.BASE_OUTPUT_DIR):
+                phases = ", ".join(f"{phase}={status}" for phase, status in run['phases'].items())
+                print(f"{run['run_id']}  {run['description']!r}\n    {phases}")
+            return
+
+        if args.batch:
+            from batch_factory import run_batch
+            configure_gemini_api()
+            results = run_batch(args.batch, results_path=args.results, max_projects=args.max_projects)
+            failed = [result['id'] for result in results if result.get('status') != 'completed']
+            print(f"\n{len(results) - len(failed)}/{len(results)} projects completed." + (f" Not completed: {', '.join(failed)}" if failed else ""))
+            sys.exit(1 if failed else 0)
+
+        from main import run_autonomous_software_factory
+
+        if args.resume:
+            configure_gemini_api()
+            config.choose_models()
+            run_autonomous_software_factory(resume_run_id=args.resume)
+            return
+
         # 1. Configure the Gemini API (must be done before any agent is created)
         configure_gemini_api()
 
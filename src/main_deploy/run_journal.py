@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('specification', 'design', 'coding', 'testing', 'debugging')
+
+
+class RunJournal:
+    """
+    Checkpoint of one run of the software factory, saved after every state change.
+
+    Each phase is recorded as pending / running / completed / failed together with its
+    outputs (spec/design file paths, generated files with their hashes, generated tests,
+    test failures, debug iterations). `--resume <run-id>` reloads the journal and skips
+    every completed phase. Inside the coding phase, files finished before a crash are
+    skipped by the generation manifest, so only the remaining files are generated again.
+
+    Journals live in `<BASE_OUTPUT_DIR>/.runs/<run_id>.json`, also for batch runs whose
+    projects are written to their own `output_dir`.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, data: dict):
+        self.path = path
+        self.data = data
+
+    @staticmethod
+    def runs_dir(base_output_dir: str) -> str:
+        return os.path.join(base_output_dir, '.runs')
+
+    @classmethod
+    def create(cls, base_output_dir: str, user_description: str, output_dir: Optional[str] = None) -> 'RunJournal':
+        now = datetime.now()
+        digest = hashlib.sha256(f"{user_description}{now.isoformat()}".encode('utf-8')).hexdigest()[:6]
+        run_id = f"{now.strftime('%Y%m%d-%H%M%S')}-{digest}"
+        data = {
+            'version': cls.VERSION,
+            'run_id': run_id,
+            'created_at': now.isoformat(),
+            'user_description': user_description,
+            'output_dir': output_dir,
+            'project_root': None,
+            'phases': {phase: {'status': 'pending'} for phase in PHASES},
+        }
+        journal = cls(os.path.join(cls.runs_dir(base_output_dir), f"{run_id}.json"), data)
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, base_output_dir: str, run_id: str) -> 'RunJournal':
+        path = os.path.join(cls.runs_dir(base_output_dir), f"{run_id}.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No run journal found for run id '{run_id}' in {cls.runs_dir(base_output_dir)}")
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"Run journal {path} has unsupported version {data.get('version')}")
+        return cls(path, data)
+
+    @classmethod
+    def list_runs(cls, base_output_dir: str) -> List[dict]:
+        """Short summary of every journal, newest first"""
+        runs_dir = cls.runs_dir(base_output_dir)
+        if not os.path.isdir(runs_dir):
+            return []
+        runs = []
+        for name in sorted(os.listdir(runs_dir), reverse=True):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(runs_dir, name), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            runs.append({
+                'run_id': data.get('run_id'),
+                'created_at': data.get('created_at'),
+                'description': (data.get('user_description') or '')[:60],
+                'phases': {phase: state.get('status') for phase, state in data.get('phases', {}).items()},
+            })
+        return runs
+
+    @property
+    def run_id(self) -> str:
+        return self.data['run_id']
+
+    @property
+    def user_description(self) -> str:
+        return self.data['user_description']
+
+    @property
+    def output_dir(self) -> Optional[str]:
+        """Per-project output directory of a batch run (None: BASE_OUTPUT_DIR)"""
+        return self.data.get('output_dir')
+
+    @property
+    def project_root(self) -> Optional[str]:
+        return self.data.get('project_root')
+
+    @project_root.setter
+    def project_root(self, value: str):
+        self.data['project_root'] = value
+        self.save()
+
+    def phase(self, name: str) -> Dict[str, Any]:
+        return self.data['phases'][name]
+
+    def is_completed(self, name: str) -> bool:
+        return self.phase(name).get('status') == 'completed'
+
+    def start_phase(self, name: str):
+        state = self.phase(name)
+        state['status'] = 'running'
+        state['attempts'] = state.get('attempts', 0) + 1
+        state['started_at'] = datetime.now().isoformat()
+        state.pop('error', None)
+        self.save()
+
+    def complete_phase(self, name: str, **outputs):
+        state = self.phase(name)
+        state.update(outputs)
+        state['status'] = 'completed'
+        state['completed_at'] = datetime.now().isoformat()
+        self.save()
+
+    def fail_phase(self, name: str, error: str):
+        state = self.phase(name)
+        state['status'] = 'failed'
+        state['error'] = error
+        state['failed_at'] = datetime.now().isoformat()
+        self.save()
+
+    def current_phase(self) -> Optional[str]:
+        """First phase that has not completed yet"""
+        return next((name for name in PHASES if not self.is_completed(name)), None)
+
+    def record_debug_iteration(self, iteration: int, outcome: str):
+        self.phase('debugging').setdefault('iterations', []).append({
+            'iteration': iteration,
+            'outcome': outcome,
+            'at': datetime.now().isoformat(),
+        })
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save run journal {self.path}: {e}")
+
+
+def file_hashes(project_root: str, relative_paths) -> Dict[str, Optional[str]]:
+    """sha256 of each file under project_root (None when it is missing)"""
+    hashes = {}
+    for relative_path in relative_paths:
+        full_path = os.path.join(project_root, relative_path)
+        try:
+            with open(full_path, 'rb') as f:
+                hashes[relative_path] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            hashes[relative_path] = None
+    return hashes
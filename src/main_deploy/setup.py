@@ -1,5 +1,4 @@
 import logging
-import google.generativeai as genai
 import config
 
 logger = logging.getLogger(__name__)
@@ -13,6 +12,10 @@ def configure_gemini_api():
         logger.debug("Gemini API is already configured. Skipping.")
         return True
     
+    if config.LLM_PROVIDER != "gemini":
+        logger.debug(f"LLM_PROVIDER is '{config.LLM_PROVIDER}', the Gemini client is not needed.")
+        return True
+
     api_key = config.GEMINI_API_KEY
 
     if not api_key:
@@ -20,6 +23,7 @@ def configure_gemini_api():
         raise ValueError("GEMINI_API_KEY not found. Cannot configure the Gemini client.")
 
     try:
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
         _is_configured = True
         logger.info("Successfully configured the Google Generative AI client.")
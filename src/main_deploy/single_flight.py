@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight blocking call and the threads waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    """One in-flight coroutine call, run as its own task, and the number of callers awaiting it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in flight, later callers
+    with the same key wait for it and get its result (or its exception) instead of starting
+    their own.
+
+    It complements the response cache, which only helps once a response is stored: files,
+    test functions or batch projects that send a byte-identical prompt at the same time share
+    one upstream request. Nothing is remembered after the call finishes.
+
+    Async calls run as a separate task per key (and event loop). A caller that is cancelled
+    stops waiting without affecting the others; the upstream call is cancelled only when
+    every caller waiting for it has been cancelled.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._acalls: Dict[Tuple[int, Hashable], _AsyncCall] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run `fn` unless an identical call is in flight; returns (result, shared)"""
+        if not self.enabled:
+            return fn(), False
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, afn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async version of `do`"""
+        if not self.enabled:
+            return await afn(), False
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            call = self._acalls.get(flight_key)
+            shared = call is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                call = self._acalls[flight_key] = _AsyncCall(loop.create_task(afn()))
+                call.task.add_done_callback(lambda task: self._finish(flight_key, call))
+                self.calls += 1
+            call.waiters += 1
+
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.task.cancelled() or call.task.done():
+                raise
+            # Only this caller was cancelled; the call goes on for the others
+            call.waiters -= 1
+            if call.waiters == 0:
+                with self._lock:
+                    if self._acalls.get(flight_key) is call:
+                        del self._acalls[flight_key]
+                call.task.cancel()
+            raise
+
+    def _finish(self, flight_key: Tuple[int, Hashable], call: _AsyncCall):
+        with self._lock:
+            if self._acalls.get(flight_key) is call:
+                del self._acalls[flight_key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.errors += 1
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._acalls)
+
+    def stats(self) -> dict:
+        requests = self.calls + self.coalesced
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'coalesced_rate': round(self.coalesced / requests, 3) if requests else 0.0,
+        }
+
@@ -2,6 +2,7 @@ import logging
 import os
 from datetime import datetime
 from base_agent import BaseAgent
+from async_utils import run_sync
 from prompt import SPECIFICATION_PROMPT
 import utils
 
@@ -13,13 +14,16 @@ class SpecificationAgent(BaseAgent):
         logger.info("Specification Agent initialized.")
 
     def generate_specification(self, user_description: str) -> dict:
+        return run_sync(self.agenerate_specification(user_description))
+
+    async def agenerate_specification(self, user_description: str) -> dict:
         if not user_description or not user_description.strip():
             logger.error("User description cannot be empty.")
             raise ValueError("User description cannot be empty.")
         
         try:
             logger.info("Generating software specification from user description...")
-            response_text = self.chain.invoke({"user_description": user_description})
+            response_text = await self.ainvoke_chain({"user_description": user_description}, validator=utils.is_json_object_response)
             logger.info("Received response from model.")
             
             #parse the JSON response, can show this step in report by showing JSON before and after parse
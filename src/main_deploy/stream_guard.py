@@ -0,0 +1,134 @@
+import codeop
+import os
+import re
+import warnings
+from typing import List
+
+# Openers that only ever start a chatty answer, never a source file
+PROSE_RE = re.compile(
+    r"^(here(\s+is|'s|\s+are)|sure\b|certainly\b|of course\b|below\s+is|the following\b|okay\b|ok,|"
+    r"i\s+will\b|i'll\b|let\s+me\b|this\s+(file|code|module)\s+(is|will|implements|contains))",
+    re.IGNORECASE
+)
+# A markdown heading / bold label announcing another file, e.g. "### File: backend/routes.py"
+FILE_HEADER_RE = re.compile(r"^(#{2,4}\s+|\*\*)?`?(file(name)?|path)\s*:\s*`?[\w./\\-]+\.\w+", re.IGNORECASE)
+# Lines at column 0 that continue the previous statement rather than start a new one
+CONTINUATION_RE = re.compile(r"^(else|elif|except|finally|case)\b|^[)\]}]")
+# Files whose content may legitimately contain their own ``` fences
+FENCE_FREE_EXTENSIONS = ('.md', '.markdown', '.rst', '.txt')
+# The accepted code of a streaming file is mirrored to <file><PARTIAL_SUFFIX> until the final write
+PARTIAL_SUFFIX = '.partial'
+
+
+class GenerationAborted(ValueError):
+    """Raised when a streamed generation is cancelled because the output went off the rails"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Generation aborted: {reason}")
+        self.reason = reason
+
+
+class StreamingCodeGuard:
+    """
+    Consumes a streamed LLM response line by line for a single target file.
+
+    Strips the surrounding code fence, and raises GenerationAborted as soon as the output
+    is clearly unusable: prose instead of code (not checked for FENCE_FREE_EXTENSIONS),
+    a second file/code block, the output limit, or (for Python) a definite syntax error
+    in the already complete statements.
+    A closing fence marks the file as done so the caller can stop the stream early.
+    """
+
+    def __init__(self, file_path: str, max_chars: int = 200_000, syntax_check_every: int = 40):
+        self.file_path = file_path
+        self.is_python = file_path.endswith('.py')
+        self.track_fences = not file_path.lower().endswith(FENCE_FREE_EXTENSIONS)
+        self.max_chars = max_chars
+        self.syntax_check_every = syntax_check_every
+        self.done = False
+        self.fenced = False
+        self._started = False
+        self._pending = ''
+        self._lines: List[str] = []
+        self._chars = 0
+        self._lines_since_check = 0
+
+    @property
+    def code(self) -> str:
+        lines = self._lines
+        # Fence-free files keep inner fences, so only drop the outer closing one here
+        if self.fenced and not self.track_fences and lines and lines[-1].strip() == '```':
+            lines = lines[:-1]
+        return '\n'.join(lines).strip()
+
+    def feed(self, text: str) -> str:
+        """Process a streamed chunk; returns the newly accepted code text (for progressive writes)"""
+        if self.done or not text:
+            return ''
+        self._pending += text
+        *complete, self._pending = self._pending.split('\n')
+        accepted = []
+        for line in complete:
+            if self._accept_line(line):
+                accepted.append(line + '\n')
+            if self.done:
+                break
+        if not self.done and len(self._pending) > self.max_chars:
+            raise GenerationAborted("output limit reached")
+        return ''.join(accepted)
+
+    def finish(self) -> str:
+        """Flush the last partial line once the stream has ended"""
+        if self.done or not self._pending:
+            return ''
+        line, self._pending = self._pending, ''
+        return line if self._accept_line(line) else ''
+
+    def _accept_line(self, line: str) -> bool:
+        stripped = line.strip()
+
+        if not self._started:
+            if not stripped:
+                return False
+            self._started = True
+            if stripped.startswith('```'):
+                self.fenced = True
+                return False
+            # Prose is the content of a README or notes file, not a sign of a chatty answer
+            if self.track_fences and PROSE_RE.match(stripped):
+                raise GenerationAborted(f"prose instead of code: {stripped[:60]!r}")
+
+        if self.track_fences and stripped.startswith('```'):
+            if stripped == '```' and (self.fenced or self._lines):
+                self.done = True
+                return False
+            raise GenerationAborted("a second code block started (likely another file)")
+        if self._lines and FILE_HEADER_RE.match(stripped) and not stripped.startswith('# '):
+            raise GenerationAborted(f"a second file started: {stripped[:60]!r}")
+
+        self._chars += len(line) + 1
+        if self._chars > self.max_chars:
+            raise GenerationAborted("output limit reached")
+
+        if self.is_python:
+            self._check_python_prefix(line)
+        self._lines.append(line)
+        return True
+
+    def _check_python_prefix(self, line: str):
+        """At a new top-level statement, everything before it must compile (incomplete input is fine)"""
+        self._lines_since_check += 1
+        if self._lines_since_check < self.syntax_check_every:
+            return
+        if not line or line[0] in ' \t#' or CONTINUATION_RE.match(line):
+            return
+        self._lines_since_check = 0
+        prefix = '\n'.join(self._lines) + '\n'
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                codeop.compile_command(prefix, os.path.basename(self.file_path), 'exec')
+        except SyntaxError as e:
+            raise GenerationAborted(f"syntax error at line {e.lineno}: {e.msg}")
+        except (ValueError, OverflowError):
+            return
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class SymbolIndex:
+    """
+    Incrementally updated symbol table for a generated project.
+
+    - name -> defining module (classes and functions)
+    - module -> exports (classes, functions, module-level variables)
+    - module -> import statements (list for ordering + set for O(1) membership)
+
+    The containers are plain dicts/lists so ProjectContext can expose them directly
+    (`defined_classes`, `imports_used`, ...) without copying.
+    """
+
+    def __init__(self):
+        self.class_locations: Dict[str, str] = {}
+        self.function_locations: Dict[str, str] = {}
+        self.db_models: List[str] = []
+        self.imports: Dict[str, List[str]] = {}
+        self.variables: Dict[str, List[str]] = {}
+        self._db_model_set = set()
+        self._import_sets: Dict[str, set] = {}
+        self._module_classes: Dict[str, Dict[str, None]] = {}    # insertion-ordered sets
+        self._module_functions: Dict[str, Dict[str, None]] = {}
+        self._class_patterns: Dict[str, str] = {}  # name -> "class name", maintained incrementally
+
+    def add_class(self, name: str, file_path: str, is_db_model: bool = False):
+        previous = self.class_locations.get(name)
+        if previous is not None and previous != file_path:
+            self._module_classes.get(previous, {}).pop(name, None)
+        self.class_locations[name] = file_path
+        self._module_classes.setdefault(file_path, {})[name] = None
+        if name not in self._class_patterns:
+            self._class_patterns[name] = f"class {name}"
+        if is_db_model and name not in self._db_model_set:
+            self._db_model_set.add(name)
+            self.db_models.append(name)
+
+    def add_function(self, name: str, file_path: str):
+        previous = self.function_locations.get(name)
+        if previous is not None and previous != file_path:
+            self._module_functions.get(previous, {}).pop(name, None)
+        self.function_locations[name] = file_path
+        self._module_functions.setdefault(file_path, {})[name] = None
+
+    def add_import(self, file_path: str, import_statement: str) -> bool:
+        """Returns True if the statement was not known for this file yet"""
+        seen = self._import_sets.setdefault(file_path, set())
+        if import_statement in seen:
+            return False
+        seen.add(import_statement)
+        self.imports.setdefault(file_path, []).append(import_statement)
+        return True
+
+    def set_variables(self, file_path: str, names: List[str]):
+        self.variables[file_path] = list(names)
+
+    def defining_module(self, name: str) -> Optional[str]:
+        return self.class_locations.get(name) or self.function_locations.get(name)
+
+    def exports_for(self, file_path: str) -> Dict[str, List[str]]:
+        return {
+            'classes': list(self._module_classes.get(file_path, {})),
+            'functions': list(self._module_functions.get(file_path, {})),
+            'variables': self.variables.get(file_path, []),
+        }
+
+    def conflicts(self, file_path: str, class_names: List[str]) -> List[Tuple[str, str]]:
+        """Classes in `class_names` that are already defined by another module: [(name, other_module)]"""
+        found = []
+        for name in class_names:
+            location = self.class_locations.get(name)
+            if location is not None and location != file_path:
+                found.append((name, location))
+        return found
+
+    def forbidden_class_patterns(self, file_path: str) -> List[str]:
+        """`class X` for every class defined outside `file_path`; the project-wide list is maintained on registration"""
+        own_classes = self._module_classes.get(file_path)
+        if not own_classes:
+            return list(self._class_patterns.values())
+        return [pattern for name, pattern in self._class_patterns.items() if name not in own_classes]
@@ -0,0 +1,619 @@
+import keyword
+import logging
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Field names whose value needs real logic (hashing, secrets), which a template cannot provide
+SENSITIVE_FIELD_MARKERS = ('password', 'secret', 'token', 'hash')
+# Route files named like this serve every endpoint of the design; others only their own resource
+GENERIC_ROUTE_FILES = ('routes', 'route', 'api', 'endpoints', 'router', 'routers', 'views')
+
+ENDPOINT_RE = re.compile(r"^(?P<prefix>(?:/[a-z0-9_-]+)*?)/(?P<resource>[a-z0-9_-]+)(?:/\{(?P<param>\w+)\})?/?$")
+
+
+class SynthesisResult:
+    """Outcome of a template attempt; `code` is None when the file must go to the LLM"""
+
+    def __init__(self, code: Optional[str], confidence: float, reason: str, kind: str = ''):
+        self.code = code
+        self.confidence = confidence
+        self.reason = reason
+        self.kind = kind
+
+    def __repr__(self):
+        return f"SynthesisResult(kind={self.kind!r}, confidence={self.confidence:.2f}, reason={self.reason!r})"
+
+
+class _NotTemplatable(Exception):
+    """A construct in the design that no template covers; the file goes to the LLM"""
+
+
+def _snake(name: str) -> str:
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', name).replace('-', '_').lower()
+
+
+def _plural(word: str) -> str:
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return word + 'es'
+    if word.endswith('y') and word[-2:-1] not in ('a', 'e', 'i', 'o', 'u'):
+        return word[:-1] + 'ies'
+    return word + 's'
+
+
+def _module_of(path: str) -> str:
+    return os.path.splitext(path.strip('/\\'))[0].replace('\\', '/').replace('/', '.')
+
+
+def _is_identifier(name: str) -> bool:
+    return bool(name) and name.isidentifier() and not keyword.iskeyword(name)
+
+
+def _map_type(raw_type: str) -> Optional[Tuple[str, str]]:
+    """SQL-ish design type -> (SQLAlchemy column type, Python annotation)"""
+    normalized = re.sub(r'\s+', ' ', str(raw_type or '').strip().upper())
+    match = re.match(r'^(?:VARCHAR|CHAR|CHARACTER VARYING|STRING|NVARCHAR)\s*\((\d+)\)$', normalized)
+    if match:
+        return f"String({match.group(1)})", 'str'
+    match = re.match(r'^(?:DECIMAL|NUMERIC)\s*\((\d+)\s*,\s*(\d+)\)$', normalized)
+    if match:
+        return f"Numeric({match.group(1)}, {match.group(2)})", 'float'
+    simple = {
+        'INTEGER': ('Integer', 'int'), 'INT': ('Integer', 'int'), 'SMALLINT': ('Integer', 'int'),
+        'BIGINT': ('BigInteger', 'int'),
+        'VARCHAR': ('String', 'str'), 'STRING': ('String', 'str'), 'CHAR': ('String', 'str'), 'TEXT': ('Text', 'str'),
+        'BOOLEAN': ('Boolean', 'bool'), 'BOOL': ('Boolean', 'bool'),
+        'DATE': ('Date', 'date'), 'DATETIME': ('DateTime', 'datetime'), 'TIMESTAMP': ('DateTime', 'datetime'),
+        'FLOAT': ('Float', 'float'), 'REAL': ('Float', 'float'), 'DOUBLE': ('Float', 'float'),
+        'DOUBLE PRECISION': ('Float', 'float'), 'DECIMAL': ('Numeric', 'float'), 'NUMERIC': ('Numeric', 'float'),
+    }
+    return simple.get(normalized)
+
+
+def _literal(value: str, py_type: str):
+    """Default value from the design as a Python literal (as source text)"""
+    text = value.strip().strip('"\'')
+    if py_type == 'bool' and text.lower() in ('true', 'false'):
+        return repr(text.lower() == 'true')
+    if py_type == 'int' and re.fullmatch(r'-?\d+', text):
+        return text
+    if py_type == 'float' and re.fullmatch(r'-?\d+(\.\d+)?', text):
+        return repr(float(text))
+    if py_type == 'str':
+        return repr(text)
+    return None
+
+
+class _Field:
+    def __init__(self, name: str, sa_type: str, py_type: str):
+        self.name = name
+        self.sa_type = sa_type
+        self.py_type = py_type
+        self.primary_key = False
+        self.autoincrement = False
+        self.nullable: Optional[bool] = None
+        self.unique = False
+        self.index = False
+        self.default: Optional[str] = None
+        self.server_now = False
+        self.foreign_key: Optional[str] = None
+        self.on_delete: Optional[str] = None
+
+    @property
+    def sensitive(self) -> bool:
+        return any(marker in self.name.lower() for marker in SENSITIVE_FIELD_MARKERS)
+
+    @property
+    def required(self) -> bool:
+        return self.nullable is False and self.default is None and not self.server_now
+
+
+class _Model:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.snake = _snake(name)
+        self.table = _plural(self.snake)
+        self.fields: List[_Field] = []
+        self.parents: List[Tuple[str, str, str]] = []   # (attribute, parent model, back_populates)
+        self.children: List[Tuple[str, str, str, bool]] = []  # (attribute, child model, back_populates, cascade)
+
+    @property
+    def primary_key(self) -> Optional[_Field]:
+        return next((field for field in self.fields if field.primary_key), None)
+
+
+class TemplateSynthesizer:
+    """
+    Renders boilerplate files straight from the design JSON instead of asking the LLM:
+    empty `__init__.py` files, SQLAlchemy model files, Pydantic schema files and plain
+    CRUD routers built from `data_Design` and `interface_Design`.
+
+    Every attempt gets a confidence score: the share of design elements (fields,
+    constraints, endpoints) that a template understands. Anything a template cannot
+    express (unknown types, custom constraints, auth, query filters, many-to-many, ...)
+    or a missing definition in an already generated dependency (e.g. `get_db`) sends
+    the file to the LLM.
+    """
+
+    def __init__(self, design_data: dict, project_structure: dict, min_confidence: float = 0.9):
+        self.design_data = design_data or {}
+        self.project_structure = project_structure or {}
+        self.min_confidence = min_confidence
+        self.stats = {'templated': 0, 'llm': 0}
+        self.templated_files: List[str] = []
+        self._models = None
+
+    def synthesize(self, relative_path: str, file_type: str,
+                   exports_for: Callable[[str], Dict[str, List[str]]]) -> SynthesisResult:
+        relative_path = relative_path.strip('/\\').replace('\\', '/')
+        try:
+            result = self._synthesize(relative_path, file_type, exports_for)
+        except _NotTemplatable as e:
+            result = SynthesisResult(None, 0.0, str(e))
+        if result.code is not None and result.confidence < self.min_confidence:
+            result = SynthesisResult(None, result.confidence, f"confidence {result.confidence:.2f} below {self.min_confidence}", result.kind)
+        if result.code is not None:
+            try:
+                compile(result.code, relative_path, 'exec')
+            except SyntaxError as e:
+                logger.error(f"Template for {relative_path} does not compile ({e}); using the LLM instead")
+                result = SynthesisResult(None, 0.0, f"template error: {e}", result.kind)
+        if result.code is not None:
+            self.stats['templated'] += 1
+            self.templated_files.append(relative_path)
+        else:
+            self.stats['llm'] += 1
+        return result
+
+    def _synthesize(self, path: str, file_type: str, exports_for) -> SynthesisResult:
+        name = os.path.basename(path)
+        description = self._description_of(path).lower()
+        if name == '__init__.py':
+            # Package markers only; an __init__ that should export or initialise something needs the LLM
+            if any(word in description for word in ('export', 'initiali', 'factory', 'create_app', 'register', 'import')):
+                raise _NotTemplatable("__init__.py has a non-trivial description")
+            return SynthesisResult("", 1.0, "package marker", 'package')
+        if not name.endswith('.py'):
+            raise _NotTemplatable("no template for this file type")
+        stem = os.path.splitext(name)[0].lower()
+        if 'schema' in stem:
+            return self._schemas_file(path)
+        if stem in ('models', 'model'):
+            return self._models_file(path, exports_for)
+        if file_type == 'routes' or stem in GENERIC_ROUTE_FILES or '/routers/' in f"/{path}" or '/routes/' in f"/{path}":
+            return self._router_file(path, exports_for)
+        raise _NotTemplatable("no template for this file")
+
+    def _description_of(self, path: str) -> str:
+        for item in self.design_data.get('folder_Structure', {}).get('structure', []):
+            if item.get('path', '').strip('/\\').replace('\\', '/') == path:
+                return item.get('description', '')
+        return ''
+
+    def _python_files(self, predicate) -> List[str]:
+        files = []
+        for item in self.design_data.get('folder_Structure', {}).get('structure', []):
+            path = item.get('path', '').strip('/\\').replace('\\', '/')
+            if path.endswith('.py') and predicate(os.path.splitext(os.path.basename(path))[0].lower()):
+                files.append(path)
+        return files
+
+    # --- data model parsing ---
+
+    def models(self) -> Tuple[Dict[str, _Model], float]:
+        """Parse data_Design once: (models by name, share of understood constraints)"""
+        if self._models is None:
+            self._models = self._parse_models()
+        return self._models
+
+    def _parse_models(self) -> Tuple[Dict[str, _Model], float]:
+        data_design = self.design_data.get('data_Design', {})
+        storage = f"{data_design.get('storage_Type', '')} {data_design.get('database_Type', '')}".lower()
+        if 'sql' not in storage or 'nosql' in storage:
+            raise _NotTemplatable(f"storage '{storage.strip()}' is not relational")
+        raw_models = data_design.get('data_Models') or []
+        if not raw_models:
+            raise _NotTemplatable("design has no data models")
+
+        models: Dict[str, _Model] = {}
+        understood = total = 0
+        for raw_model in raw_models:
+            name = raw_model.get('model_Name', '')
+            if not _is_identifier(name) or name in models:
+                raise _NotTemplatable(f"invalid or duplicate model name {name!r}")
+            model = _Model(name, raw_model.get('description', ''))
+            for raw_field in raw_model.get('fields', []):
+                field_name = raw_field.get('name', '')
+                mapped = _map_type(raw_field.get('type'))
+                if not _is_identifier(field_name) or mapped is None:
+                    raise _NotTemplatable(f"{name}.{field_name}: unsupported field or type {raw_field.get('type')!r}")
+                field = _Field(field_name, *mapped)
+                for constraint in raw_field.get('constraints', []):
+                    total += 1
+                    understood += self._apply_constraint(field, str(constraint))
+                model.fields.append(field)
+            if model.primary_key is None:
+                raise _NotTemplatable(f"model {name} has no primary key")
+            models[name] = model
+
+        # Foreign keys first, so one-to-many declarations on the parent can be checked against them
+        relationships = [(models[raw_model['model_Name']], relationship)
+                         for raw_model in raw_models for relationship in raw_model.get('relationships', [])]
+        relationships.sort(key=lambda pair: _relationship_kind(pair[1]) == 'onetomany')
+        for model, relationship in relationships:
+            total += 1
+            self._apply_relationship(models, model, relationship)
+            understood += 1
+
+        for model in models.values():
+            names = [field.name for field in model.fields] + [rel[0] for rel in model.parents] + [rel[0] for rel in model.children]
+            if len(names) != len(set(names)):
+                raise _NotTemplatable(f"relationship attribute clashes with a field in {model.name}")
+        return models, (understood / total if total else 1.0)
+
+    @staticmethod
+    def _apply_constraint(field: _Field, constraint: str) -> bool:
+        key, _, value = constraint.partition(':')
+        key = key.strip().lower().replace(' ', '_').replace('-', '_')
+        flag = value.strip().lower() in ('', 'true', 'yes')
+        if key in ('primary_key', 'pk') and flag:
+            field.primary_key = True
+            field.nullable = None
+        elif key in ('autoincrement', 'auto_increment') and flag:
+            field.autoincrement = True
+        elif key in ('required', 'not_null') or (key == 'nullable' and not flag):
+            field.nullable = False
+        elif key in ('nullable', 'optional') and flag:
+            field.nullable = True
+        elif key == 'unique' and flag:
+            field.unique = True
+        elif key in ('indexed', 'index') and flag:
+            field.index = True
+        elif key == 'default':
+            if value.strip().lower() in ('now', 'now()', 'current_timestamp', 'current_date'):
+                field.server_now = True
+            else:
+                field.default = _literal(value, field.py_type)
+                return field.default is not None
+        elif key in ('foreign_key', 'references'):
+            pass  # described again (with the target model) in the relationships section
+        else:
+            return False
+        return True
+
+    @staticmethod
+    def _apply_relationship(models: Dict[str, _Model], model: _Model, relationship: dict):
+        kind = _relationship_kind(relationship)
+        related = models.get(relationship.get('related_Model', ''))
+        if related is None:
+            raise _NotTemplatable(f"{model.name}: unknown related model {relationship.get('related_Model')!r}")
+        if kind == 'onetomany':
+            # Declared on the parent; usable only when the child holds the foreign key as many-to-one
+            if not any(parent == model.name for _, parent, _ in related.parents):
+                raise _NotTemplatable(f"{model.name}: one-to-many without a foreign key on {related.name}")
+            return
+        if kind not in ('manytoone', 'onetoone'):
+            raise _NotTemplatable(f"{model.name}: {relationship.get('type')} relationships need the LLM")
+        field = next((f for f in model.fields if f.name == relationship.get('field_Name')), None)
+        target = next((f for f in related.fields if f.name == (relationship.get('foreign_Field') or related.primary_key.name)), None)
+        if field is None or target is None or not target.primary_key:
+            raise _NotTemplatable(f"{model.name}: relationship on {relationship.get('field_Name')!r} does not reference a primary key")
+        field.foreign_key = f"{related.table}.{target.name}"
+        on_delete = str(relationship.get('on_Delete') or '').upper()
+        field.on_delete = on_delete if on_delete in ('CASCADE', 'SET NULL', 'RESTRICT') else None
+        attribute = field.name[:-3] if field.name.endswith('_id') else related.snake
+        back = related.snake if kind == 'onetoone' else model.table
+        model.parents.append((attribute, related.name, back))
+        related.children.append((back, model.name, attribute, on_delete == 'CASCADE'))
+
+    # --- models.py ---
+
+    def _database_module(self, exports_for, required: List[str]) -> str:
+        database_files = [path for path in self.project_structure.get('database_files', []) if path.endswith('.py')]
+        if len(database_files) != 1:
+            raise _NotTemplatable("expected exactly one database module")
+        exports = exports_for(database_files[0])
+        names = set(exports.get('variables', [])) | set(exports.get('functions', [])) | set(exports.get('classes', []))
+        missing = [name for name in required if name not in names]
+        if missing:
+            raise _NotTemplatable(f"{database_files[0]} does not define {missing} (yet)")
+        return _module_of(database_files[0])
+
+    def _models_file(self, path: str, exports_for) -> SynthesisResult:
+        if len(self._python_files(lambda stem: stem in ('models', 'model'))) != 1:
+            raise _NotTemplatable("models are split across several files")
+        models, confidence = self.models()
+        database_module = self._database_module(exports_for, ['Base'])
+
+        sa_types = set()
+        uses_now = False
+        body = []
+        for model in models.values():
+            lines = [f"class {model.name}(Base):"]
+            if model.description:
+                lines.append(f"    {_docstring(model.description)}")
+            lines += [f'    __tablename__ = "{model.table}"', ""]
+            for field in model.fields:
+                sa_types.add(field.sa_type.split('(')[0])
+                args = [field.sa_type]
+                if field.foreign_key:
+                    on_delete = f', ondelete="{field.on_delete}"' if field.on_delete else ''
+                    args.append(f'ForeignKey("{field.foreign_key}"{on_delete})')
+                if field.primary_key:
+                    args.append("primary_key=True")
+                    args.append("index=True")
+                    if field.autoincrement:
+                        args.append("autoincrement=True")
+                else:
+                    if field.unique:
+                        args.append("unique=True")
+                    if field.index or field.foreign_key:
+                        args.append("index=True")
+                    if field.nullable is not None:
+                        args.append(f"nullable={field.nullable}")
+                if field.default is not None:
+                    args.append(f"default={field.default}")
+                if field.server_now:
+                    uses_now = True
+                    args.append("server_default=func.now()")
+                lines.append(f"    {field.name} = Column({', '.join(args)})")
+            if model.parents or model.children:
+                lines.append("")
+            for attribute, parent, back in model.parents:
+                lines.append(f'    {attribute} = relationship("{parent}", back_populates="{back}")')
+            for attribute, child, back, cascade in model.children:
+                cascade_arg = ', cascade="all, delete-orphan"' if cascade else ''
+                lines.append(f'    {attribute} = relationship("{child}", back_populates="{back}"{cascade_arg})')
+            body.append("\n".join(lines))
+
+        column_imports = ["Column"] + sorted(sa_types) + (["ForeignKey"] if any(f.foreign_key for m in models.values() for f in m.fields) else [])
+        header = [f"from sqlalchemy import {', '.join(column_imports)}"]
+        if any(model.parents or model.children for model in models.values()):
+            header.append("from sqlalchemy.orm import relationship")
+        if uses_now:
+            header.append("from sqlalchemy.sql import func")
+        header.append("")
+        header.append(f"from {database_module} import Base")
+        code = "\n".join(header) + "\n\n\n" + "\n\n\n".join(body) + "\n"
+        return SynthesisResult(code, confidence, f"{len(models)} SQLAlchemy models", 'models')
+
+    # --- schemas.py ---
+
+    def _schemas_file(self, path: str) -> SynthesisResult:
+        if len(self._python_files(lambda stem: 'schema' in stem)) != 1:
+            raise _NotTemplatable("schemas are split across several files")
+        models, confidence = self.models()
+
+        py_types = set()
+        blocks = []
+        for model in models.values():
+            pk = model.primary_key
+            data_fields = [field for field in model.fields if not field.primary_key and not field.server_now]
+            public_fields = [field for field in data_fields if not field.sensitive]
+            secret_fields = [field for field in data_fields if field.sensitive]
+            py_types.update(field.py_type for field in model.fields)
+
+            base = [f"class {model.name}Base(BaseModel):"] + [f"    {_annotation(field)}" for field in _required_first(public_fields)]
+            if not public_fields:
+                base.append("    pass")
+            create = [f"class {model.name}Create({model.name}Base):"] + [f"    {_annotation(field)}" for field in _required_first(secret_fields)]
+            if not secret_fields:
+                create.append("    pass")
+            update = [f"class {model.name}Update(BaseModel):"] + [f"    {field.name}: Optional[{field.py_type}] = None" for field in data_fields]
+            if not data_fields:
+                update.append("    pass")
+            response = [
+                f"class {model.name}Response({model.name}Base):",
+                "    model_config = ConfigDict(from_attributes=True)",
+                "",
+                f"    {pk.name}: {pk.py_type}",
+            ] + [f"    {field.name}: Optional[{field.py_type}] = None" for field in model.fields if field.server_now]
+            blocks += ["\n".join(base), "\n".join(create), "\n".join(update), "\n".join(response)]
+
+        header = []
+        datetime_names = sorted(name for name in ('date', 'datetime') if name in py_types)
+        if datetime_names:
+            header.append(f"from datetime import {', '.join(datetime_names)}")
+        header.append("from typing import Optional")
+        header.append("")
+        header.append("from pydantic import BaseModel, ConfigDict")
+        code = "\n".join(header) + "\n\n\n" + "\n\n\n".join(blocks) + "\n"
+        return SynthesisResult(code, confidence, f"Pydantic schemas for {len(models)} models", 'schemas')
+
+    # --- CRUD routers ---
+
+    def _router_file(self, path: str, exports_for) -> SynthesisResult:
+        models, _ = self.models()
+        stem = os.path.splitext(os.path.basename(path))[0].lower()
+        by_resource = {}
+        for model in models.values():
+            for alias in (model.snake, model.table, model.snake.replace('_', '-'), model.table.replace('_', '-')):
+                by_resource[alias] = model
+
+        generic = stem in GENERIC_ROUTE_FILES
+        if not generic and stem not in by_resource:
+            raise _NotTemplatable(f"route file {path} does not match a data model")
+        endpoints = []
+        for spec in self.design_data.get('interface_Design', {}).get('api_Specifications', []):
+            match = ENDPOINT_RE.match(str(spec.get('endpoint', '')).strip())
+            if not generic and (match is None or by_resource.get(match.group('resource')) is not by_resource[stem]):
+                continue
+            endpoints.append((spec, match))
+        if not endpoints:
+            raise _NotTemplatable("no endpoints for this route file")
+
+        operations = []
+        for spec, match in endpoints:
+            endpoint = spec.get('endpoint')
+            method = str(spec.get('method', '')).upper()
+            if match is None or match.group('resource') not in by_resource:
+                raise _NotTemplatable(f"{method} {endpoint} is not a CRUD endpoint on a data model")
+            if spec.get('authentication_Required'):
+                raise _NotTemplatable(f"{method} {endpoint} requires authentication")
+            request_format = spec.get('request_Format') or {}
+            if request_format.get('query'):
+                raise _NotTemplatable(f"{method} {endpoint} takes query parameters")
+            model = by_resource[match.group('resource')]
+            if any(field.sensitive for field in model.fields):
+                raise _NotTemplatable(f"{model.name} has sensitive fields that need custom handling")
+            param = match.group('param')
+            operation = {
+                ('GET', False): 'list', ('POST', False): 'create', ('GET', True): 'get',
+                ('PUT', True): 'update', ('PATCH', True): 'patch', ('DELETE', True): 'delete',
+            }.get((method, bool(param)))
+            if operation is None or (param and not _is_identifier(param)):
+                raise _NotTemplatable(f"{method} {endpoint} is not a plain CRUD operation")
+            success_status = (spec.get('response_Format') or {}).get('success_Status')
+            operations.append((operation, model, endpoint, param, success_status, spec.get('description', '')))
+
+        # Everything the router imports must already exist in the generated dependencies
+        database_module = self._database_module(exports_for, ['get_db'])
+        models_files = self._python_files(lambda s: s in ('models', 'model'))
+        schema_files = self._python_files(lambda s: 'schema' in s)
+        if len(models_files) != 1 or len(schema_files) != 1:
+            raise _NotTemplatable("expected one models module and one schemas module")
+        model_exports = set(exports_for(models_files[0]).get('classes', []))
+        schema_exports = set(exports_for(schema_files[0]).get('classes', []))
+        used_models = list(dict.fromkeys(model for _, model, _, _, _, _ in operations))
+        schema_names = set()
+        for model in used_models:
+            if model.name not in model_exports:
+                raise _NotTemplatable(f"{models_files[0]} does not define {model.name} (yet)")
+            needed = {f"{model.name}Response"}
+            needed |= {f"{model.name}Create" for op, m, *_ in operations if m is model and op == 'create'}
+            needed |= {f"{model.name}Update" for op, m, *_ in operations if m is model and op in ('update', 'patch')}
+            missing = needed - schema_exports
+            if missing:
+                raise _NotTemplatable(f"{schema_files[0]} does not define {sorted(missing)}")
+            schema_names |= needed
+
+        functions = []
+        function_names = set()
+        for operation, model, endpoint, param, success_status, description in operations:
+            function_name = f"{operation}_{model.table if operation == 'list' else model.snake}"
+            if function_name in function_names:
+                raise _NotTemplatable(f"duplicate endpoint {endpoint}")
+            function_names.add(function_name)
+            functions.append(_crud_function(operation, model, endpoint, param, success_status, description, function_name))
+
+        needs_response = any(op == 'delete' for op, *_ in operations)
+        fastapi_names = ["APIRouter", "Depends", "HTTPException"] + (["Response"] if needs_response else []) + ["status"]
+        header = [
+            "import logging",
+            "from typing import List",
+            "",
+            f"from fastapi import {', '.join(fastapi_names)}",
+            "from sqlalchemy.orm import Session",
+            "",
+            f"from {database_module} import get_db",
+            f"from {_module_of(models_files[0])} import {', '.join(model.name for model in used_models)}",
+            f"from {_module_of(schema_files[0])} import {', '.join(sorted(schema_names))}",
+            "",
+            "logger = logging.getLogger(__name__)",
+            "",
+            "router = APIRouter()",
+        ]
+        code = "\n".join(header) + "\n\n\n" + "\n\n\n".join(functions) + "\n"
+        return SynthesisResult(code, 1.0, f"{len(operations)} CRUD endpoints", 'router')
+
+
+def _relationship_kind(relationship: dict) -> str:
+    return re.sub(r'[\s_-]', '', str(relationship.get('type', '')).lower())
+
+
+def _docstring(text: str) -> str:
+    return '"""' + text.replace('\\', '\\\\').replace('"""', "'''").strip() + '"""'
+
+
+def _annotation(field: _Field) -> str:
+    if field.required:
+        return f"{field.name}: {field.py_type}"
+    if field.default is not None:
+        return f"{field.name}: {field.py_type} = {field.default}"
+    return f"{field.name}: Optional[{field.py_type}] = None"
+
+
+def _required_first(fields: List[_Field]) -> List[_Field]:
+    return [field for field in fields if field.required] + [field for field in fields if not field.required]
+
+
+def _crud_function(operation: str, model: _Model, endpoint: str, param: Optional[str],
+                   success_status, description: str, function_name: str) -> str:
+    pk = model.primary_key
+    route = f'"{endpoint}"'
+    docstring = f"    {_docstring(description)}\n" if description else ""
+    not_found = (
+        f"    item = db.get({model.name}, {param})\n"
+        f"    if item is None:\n"
+        f"        logger.error(\"Error in {function_name}: {model.name} %s not found\", {param})\n"
+        f"        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=\"{model.name} not found\")\n"
+    )
+    if operation == 'list':
+        return (
+            f"@router.get({route}, response_model=List[{model.name}Response])\n"
+            f"def {function_name}(db: Session = Depends(get_db)):\n{docstring}"
+            f"    logger.info(\"Entering {function_name}\")\n"
+            f"    items = db.query({model.name}).all()\n"
+            f"    logger.info(\"Exiting {function_name} with %d items\", len(items))\n"
+            f"    return items"
+        )
+    if operation == 'create':
+        status_code = "status.HTTP_200_OK" if success_status == 200 else "status.HTTP_201_CREATED"
+        return (
+            f"@router.post({route}, response_model={model.name}Response, status_code={status_code})\n"
+            f"def {function_name}(payload: {model.name}Create, db: Session = Depends(get_db)):\n{docstring}"
+            f"    logger.info(\"Entering {function_name} with payload: %s\", payload)\n"
+            f"    item = {model.name}(**payload.model_dump())\n"
+            f"    try:\n"
+            f"        db.add(item)\n"
+            f"        db.commit()\n"
+            f"    except Exception as e:\n"
+            f"        db.rollback()\n"
+            f"        logger.error(\"Error in {function_name}: %s\", e, exc_info=True)\n"
+            f"        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=\"Could not create {model.snake.replace('_', ' ')}\")\n"
+            f"    db.refresh(item)\n"
+            f"    logger.info(\"Exiting {function_name} with result: %s\", item.{pk.name})\n"
+            f"    return item"
+        )
+    signature = f"{param}: {pk.py_type}"
+    if operation == 'get':
+        return (
+            f"@router.get({route}, response_model={model.name}Response)\n"
+            f"def {function_name}({signature}, db: Session = Depends(get_db)):\n{docstring}"
+            f"    logger.info(\"Entering {function_name} with {param}=%s\", {param})\n"
+            f"{not_found}"
+            f"    return item"
+        )
+    if operation in ('update', 'patch'):
+        decorator = 'put' if operation == 'update' else 'patch'
+        return (
+            f"@router.{decorator}({route}, response_model={model.name}Response)\n"
+            f"def {function_name}({signature}, payload: {model.name}Update, db: Session = Depends(get_db)):\n{docstring}"
+            f"    logger.info(\"Entering {function_name} with {param}=%s, payload: %s\", {param}, payload)\n"
+            f"{not_found}"
+            f"    for key, value in payload.model_dump(exclude_unset=True).items():\n"
+            f"        setattr(item, key, value)\n"
+            f"    try:\n"
+            f"        db.commit()\n"
+            f"    except Exception as e:\n"
+            f"        db.rollback()\n"
+            f"        logger.error(\"Error in {function_name}: %s\", e, exc_info=True)\n"
+            f"        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=\"Could not update {model.snake.replace('_', ' ')}\")\n"
+            f"    db.refresh(item)\n"
+            f"    logger.info(\"Exiting {function_name} with result: %s\", item.{pk.name})\n"
+            f"    return item"
+        )
+    status_code = "status.HTTP_200_OK" if success_status == 200 else "status.HTTP_204_NO_CONTENT"
+    return (
+        f"@router.delete({route}, status_code={status_code})\n"
+        f"def {function_name}({signature}, db: Session = Depends(get_db)):\n{docstring}"
+        f"    logger.info(\"Entering {function_name} with {param}=%s\", {param})\n"
+        f"{not_found}"
+        f"    db.delete(item)\n"
+        f"    db.commit()\n"
+        f"    logger.info(\"Exiting {function_name}\")\n"
+        f"    return Response(status_code={status_code})"
+    )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio pipeline helpers (run_sync, run_subprocess, DependencyScheduler.arun, limiter acall).
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+# Add the current directory to path to import async_utils
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_utils import run_sync, run_subprocess
+from generation_scheduler import DependencyScheduler
+from rate_limiter import AdaptiveRateLimiter
+
+def test_arun_respects_dependencies_and_overlaps_requests():
+    dependencies = {"models.py": ["database.py"], "routes.py": ["models.py"], "main.py": ["routes.py"]}
+    order = ["database.py", "style.css", "script.js", "models.py", "routes.py", "main.py"]
+    scheduler = DependencyScheduler(dependencies, order=order, max_workers=3)
+    completed, in_flight, peak = [], set(), [0]
+
+    async def work(node, prepared):
+        in_flight.add(node)
+        peak[0] = max(peak[0], len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.discard(node)
+        return prepared
+
+    results = asyncio.run(scheduler.arun(work, lambda node, result: completed.append(node), prepare=str.upper))
+    for node, deps in dependencies.items():
+        assert all(completed.index(dep) < completed.index(node) for dep in deps), completed
+    assert results == {node: node.upper() for node in order}
+    assert peak[0] == 3, "independent files run concurrently on one event loop"
+    print(f"✅ arun completion order {completed}, peak concurrency {peak[0]}")
+
+def test_run_sync_inside_running_loop():
+    async def answer():
+        await asyncio.sleep(0)
+        return 42
+
+    async def caller():
+        # A blocking API called from a coroutine must not fail with "loop already running"
+        return run_sync(answer())
+
+    assert run_sync(answer()) == 42
+    assert asyncio.run(caller()) == 42
+    print("✅ run_sync works with and without a running loop")
+
+def test_run_subprocess_matches_subprocess_run():
+    result = asyncio.run(run_subprocess([sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"]))
+    assert (result.returncode, result.stdout.strip(), result.stderr.strip()) == (0, "out", "err")
+
+    try:
+        asyncio.run(run_subprocess([sys.executable, "-c", "raise SystemExit(3)"], check=True))
+    except subprocess.CalledProcessError as e:
+        assert e.returncode == 3
+    else:
+        raise AssertionError("check=True must raise on a non-zero exit code")
+
+    try:
+        asyncio.run(run_subprocess([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2))
+    except subprocess.TimeoutExpired:
+        pass
+    else:
+        raise AssertionError("timeout must raise TimeoutExpired")
+    print("✅ run_subprocess returns CompletedProcess and raises like subprocess.run")
+
+def test_acall_retries_after_quota_error():
+    class _QuotaError(Exception):
+        code = 429
+
+    limiter = AdaptiveRateLimiter(requests_per_minute=6000, default_cooldown=0.05)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _QuotaError("429 RESOURCE_EXHAUSTED")
+        return "ok"
+
+    assert asyncio.run(limiter.acall(flaky)) == "ok"
+    assert len(attempts) == 2 and limiter.rate_limited == 1
+    print(f"✅ acall retried after a 429: {limiter.stats()}")
+
+if __name__ == "__main__":
+    test_arun_respects_dependencies_and_overlaps_requests()
+    test_run_sync_inside_running_loop()
+    test_run_subprocess_matches_subprocess_run()
+    test_acall_retries_after_quota_error()
+    print("\n✅ Async pipeline tests completed successfully!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for batch mode: many projects from one requests JSONL, bounded per phase.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import batch_factory
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from batch_factory import BatchFactory, load_results, parse_phase_limits, read_requests
+
+def write_requests(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write((line if isinstance(line, str) else json.dumps(line)) + "\n")
+
+def test_read_requests():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "requests.jsonl")
+        write_requests(path, [
+            {"id": "notes", "description": "a notes app"},
+            {"request_id": "blog", "title": "Blog", "body": "with comments"},
+            "",
+            "{not json",
+            {"id": "notes", "description": "another notes app"},
+            {"id": "empty"},
+            ["not", "an", "object"],
+        ])
+        requests = read_requests(path)
+        assert [r.request_id for r in requests] == ["notes", "blog", "project-004", "notes-line5", "empty", "project-007"]
+        assert requests[1].description == "Blog\n\nwith comments"
+        assert [r.request_id for r in requests if r.error] == ["project-004", "empty", "project-007"]
+        print("✅ Requests read (description, title+body, duplicate ids, invalid lines)")
+
+def test_parse_phase_limits():
+    assert parse_phase_limits("coding=2, testing=1,debugging=0") == {"coding": 2, "testing": 1, "debugging": 1}
+    assert parse_phase_limits("") == {}
+    try:
+        parse_phase_limits("compiling=2")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown phases must be rejected")
+    print("✅ Phase limits parsed and validated")
+
+class FakeFactory:
+    """Stands in for arun_autonomous_software_factory and tracks concurrency"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.active = 0
+        self.peak = 0
+        self.phase_active = {}
+        self.phase_peak = {}
+        self.calls = []
+
+    async def __call__(self, user_description=None, resume_run_id=None, output_dir=None, phase_slots=None):
+        self.calls.append((user_description, resume_run_id))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            for phase in ("specification", "coding"):
+                slot = phase_slots.get(phase)
+                if slot:
+                    await slot.acquire()
+                self.phase_active[phase] = self.phase_active.get(phase, 0) + 1
+                self.phase_peak[phase] = max(self.phase_peak.get(phase, 0), self.phase_active[phase])
+                await asyncio.sleep(0.01)
+                self.phase_active[phase] -= 1
+                if slot:
+                    slot.release()
+        finally:
+            self.active -= 1
+        run_id = resume_run_id or f"run-{user_description}"
+        if user_description in self.fail:
+            return {"run_id": run_id, "status": "failed", "phase": "coding", "error": "boom"}
+        return {"run_id": run_id, "status": "completed", "project_root": output_dir}
+
+def test_batch_bounds_and_resume():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "requests.jsonl")
+        write_requests(path, [{"id": f"p{i}", "description": f"app {i}"} for i in range(6)] + ["{broken"])
+        results_path = os.path.join(temp_dir, "results.jsonl")
+        fake = FakeFactory(fail={"app 2"})
+        factory = BatchFactory(os.path.join(temp_dir, "out"), results_path, max_projects=3,
+                               phase_limits={"coding": 1}, run_project=fake)
+        results = asyncio.run(factory.arun(read_requests(path)))
+
+        assert fake.peak == 3 and fake.phase_peak["coding"] == 1 and fake.phase_peak["specification"] > 1
+        assert [r["status"] for r in results] == ["completed", "completed", "failed", "completed", "completed", "completed", "invalid"]
+        assert results[0]["output_dir"] == os.path.join(temp_dir, "out", "p0")
+        assert len(load_results(results_path)) == 7
+
+        # Second run: completed projects are skipped, the failed one resumes from its run journal
+        fake_again = FakeFactory()
+        factory = BatchFactory(os.path.join(temp_dir, "out"), results_path, max_projects=3, run_project=fake_again)
+        results = asyncio.run(factory.arun(read_requests(path)))
+        assert fake_again.calls == [(None, "run-app 2")]
+        assert results[2]["status"] == "completed" and load_results(results_path)["p2"]["status"] == "completed"
+        print(f"✅ Batch bounded ({fake.peak} projects, {fake.phase_peak['coding']} coding) and resumable")
+
+if __name__ == "__main__":
+    test_read_requests()
+    test_parse_phase_limits()
+    test_batch_bounds_and_resume()
+    print("\n✅ Batch factory tests completed successfully!")
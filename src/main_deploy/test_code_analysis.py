@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the parse-once code analysis record.
+"""
+
+import os
+import sys
+
+# Add the current directory to path to import code_analysis
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from code_analysis import analyze_code
+
+MODELS_CODE = '''
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+)
+from backend.database import Base
+
+class Task(Base):
+    __tablename__ = "tasks"
+    id = Column(Integer, primary_key=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def to_dict(self):
+        return {"id": self.id}
+
+class Flashcard(db.Model):
+    id = Column(Integer, primary_key=True)
+
+async def get_tasks():
+    return []
+'''
+
+SCHEMAS_CODE = '''
+from pydantic import BaseModel
+from typing import Optional
+
+class TaskBase(BaseModel):
+    title: str
+
+class TaskCreate(TaskBase):
+    pass
+
+class Task(TaskBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+'''
+
+def test_top_level_definitions_only():
+    analysis = analyze_code("backend/models.py", MODELS_CODE)
+    assert analysis.class_names == ["Task", "Flashcard"], analysis.class_names
+    assert analysis.functions == ["get_tasks"], "methods and nested classes must not be project symbols"
+    assert analysis.model_classes == ["Task", "Flashcard"]
+    assert analysis.contains_sqlalchemy and not analysis.contains_pydantic
+    print(f"✅ Classes: {analysis.class_names}, functions: {analysis.functions}")
+
+def test_multiline_imports_are_structured():
+    analysis = analyze_code("backend/models.py", MODELS_CODE)
+    first = analysis.imports[0]
+    assert first['module'] == "sqlalchemy"
+    assert [name for name, _ in first['names']] == ["Column", "Integer", "String"]
+    assert first['statement'].startswith("from sqlalchemy import (") and first['statement'].endswith(")")
+    assert analysis.has_import("backend.database", "Base")
+    assert not analysis.has_import("backend.database", "get_db")
+    print("✅ Multi-line imports parsed into module/names")
+
+def test_schema_inheritance_is_not_a_db_model():
+    analysis = analyze_code("backend/schemas.py", SCHEMAS_CODE)
+    assert analysis.schema_classes == ["TaskBase", "TaskCreate", "Task"]
+    assert analysis.model_classes == []
+    assert analysis.contains_pydantic
+    assert "Config" not in analysis.class_names
+    print(f"✅ Schema classes: {analysis.schema_classes}")
+
+def test_parse_is_shared_and_errors_reported():
+    assert analyze_code("backend/models.py", MODELS_CODE) is analyze_code("backend/models.py", MODELS_CODE)
+
+    broken = analyze_code("backend/broken.py", "def broken(:\n    pass\n")
+    assert broken.syntax_error and broken.classes == []
+
+    frontend = analyze_code("frontend/script.js", "import x from './y.js';\nclass A {}\n")
+    assert frontend.syntax_error is None and frontend.imports == []
+    print("✅ Analysis cached per content; syntax errors and non-Python files handled")
+
+if __name__ == "__main__":
+    test_top_level_definitions_only()
+    test_multiline_imports_are_structured()
+    test_schema_inheritance_is_not_a_db_model()
+    test_parse_is_shared_and_errors_reported()
+    print("\n✅ Code analysis tests completed successfully!")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass rewrite engine behind AutoFixer.
+"""
+
+import os
+import sys
+
+# Add the current directory to path to import code_rewriter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import code_rewriter
+from code_rewriter import rewrite
+
+ROUTER_CODE = '''"""Item routes"""
+from fastapi import APIRouter  # web
+from app.models import (
+    Item,
+    ItemCreate,  # schema
+)
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+router = APIRouter()
+
+
+def get_session():
+    from db import SessionLocal
+    return SessionLocal()
+'''
+
+def test_fixes_applied_in_one_pass():
+    result = rewrite("app/routes.py", ROUTER_CODE, [
+        {'action': 'replace_import', 'old_import': 'from app.models import Item, ItemCreate',
+         'new_import': 'from app.models import Item\nfrom app.schemas import ItemCreate'},
+        {'action': 'replace_import', 'old_import': 'from db import SessionLocal', 'new_import': 'from app.database import SessionLocal'},
+        {'action': 'remove_redefinition', 'name': 'Base', 'definition': 'Base = declarative_base()',
+         'new_import': 'from app.database import Base'},
+        {'action': 'add_import', 'new_import': 'from fastapi import APIRouter'},
+    ])
+    if code_rewriter.cst is None:
+        print("⚠️ libcst not installed, skipping the libcst engine test")
+        return
+    assert result.engine == 'libcst'
+    code = result.code
+    # Multi-line import matched by meaning and replaced; comments elsewhere kept
+    assert "from app.models import Item\nfrom app.schemas import ItemCreate\n" in code
+    assert "from fastapi import APIRouter  # web" in code and '"""Item routes"""' in code
+    # Nested import replaced in place, with its indentation
+    assert "    from app.database import SessionLocal\n" in code
+    # Redefinition removed and imported instead, after the import block
+    assert "Base = declarative_base()" not in code and "from app.database import Base\n" in code
+    assert code.index("from app.database import Base") < code.index("router = APIRouter()")
+    # The already present import is not added twice
+    assert code.count("from fastapi import APIRouter") == 1
+    assert len(result.applied) == 3 and result.skipped[0]['action'] == 'add_import'
+    compile(code, "app/routes.py", "exec")
+    print("✅ All fixes applied in one libcst pass, formatting and comments preserved")
+
+def test_fix_import_source_and_diff():
+    code = "from models import ItemCreate\n\nprint(ItemCreate)\n"
+    result = rewrite("app/main.py", code, [{
+        'action': 'fix_import_source',
+        'new_import': {'original': 'from models import ItemCreate', 'fixed': 'from schemas import ItemCreate',
+                       'additional_import': 'import logging'},
+    }])
+    assert "from schemas import ItemCreate" in result.code and "import logging" in result.code
+    assert result.changed and result.diff.startswith("--- a/app/main.py\n+++ b/app/main.py\n")
+    assert "-from models import ItemCreate" in result.diff and "+from schemas import ItemCreate" in result.diff
+    assert len(result.applied) == 1
+
+    unchanged = rewrite("app/main.py", code, [{'action': 'replace_import', 'old_import': 'import os', 'new_import': 'import sys'}])
+    assert unchanged.code == code and not unchanged.changed and unchanged.skipped
+    print("✅ Nested fix_import_source suggestions flattened; unified diff produced")
+
+def test_text_fallback_for_unparsable_code():
+    code = "from db import SessionLocal\nBase = declarative_base()\ndef broken(:\n    pass\n"
+    result = rewrite("app/broken.py", code, [
+        {'action': 'replace_import', 'old_import': 'from db import SessionLocal', 'new_import': 'from app.database import SessionLocal'},
+        {'action': 'remove_redefinition', 'name': 'Base', 'definition': 'Base = declarative_base()',
+         'new_import': 'from app.database import Base'},
+    ])
+    assert result.engine == 'text'
+    assert result.code.startswith("from app.database import SessionLocal\nfrom app.database import Base\n")
+    assert "Base = declarative_base()" not in result.code and len(result.applied) == 2
+    print("✅ Unparsable code falls back to the line-based fixes")
+
+if __name__ == "__main__":
+    test_fixes_applied_in_one_pass()
+    test_fix_import_source_and_diff()
+    test_text_fallback_for_unparsable_code()
+    print("\n✅ Code rewriter tests completed successfully!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for using one LangChainCodingAgent from several event loops (async API first,
+then the blocking API from a worker thread, as the AutoGen fallback in main.py does).
+"""
+
+import asyncio
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Add the current directory to path to import coding_agent
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MAIN_DEPLOY_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE = os.path.splitext(os.path.basename(__file__))[0]
+
+class LoopBoundChatModel:
+    """Like the Gemini async client: bound to the event loop of its first request"""
+
+    def __init__(self, model, violations):
+        self.model = model
+        self.temperature = getattr(model, 'temperature', None)
+        self.loop = None
+        self.violations = violations
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            self.violations.append(id(self))
+
+    async def ainvoke(self, *args, **kwargs):
+        self._check_loop()
+        return await self.model.ainvoke(*args, **kwargs)
+
+    def astream(self, *args, **kwargs):
+        self._check_loop()
+        return self.model.astream(*args, **kwargs)
+
+def generated_error_files(project_root):
+    errors = []
+    for root, _, files in os.walk(project_root):
+        for file in files:
+            if file.endswith('.py'):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    if f.read().startswith("# Error"):
+                        errors.append(file)
+    return errors
+
+def run_in_fresh_interpreter(scenario, env):
+    """Runs `scenario` of this module in a new interpreter, so config reads `env`"""
+    code = f"import {MODULE} as t; t.{scenario}()"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               cwd=MAIN_DEPLOY_DIR, env=dict(os.environ, **env))
+    assert completed.returncode == 0, completed.stdout[-2000:] + completed.stderr[-4000:]
+
+def generate_twice():
+    """agenerate_project on the factory loop, then generate_project from a worker thread (a new loop)"""
+    import llm_clients
+    from coding_agent import LangChainCodingAgent, AgentConfig
+    from fake_llm import _SYNTHETIC_SPEC, _SYNTHETIC_DESIGN
+
+    violations = []
+    new_chat_model = llm_clients._new_chat_model
+    llm_clients._new_chat_model = lambda *args, **kwargs: LoopBoundChatModel(new_chat_model(*args, **kwargs), violations)
+    config = AgentConfig.from_central_config()
+    project_root = os.path.join(config.base_output_dir, _SYNTHETIC_DESIGN['folder_Structure']['root_Project_Directory_Name'])
+
+    async def factory():
+        # Created on the factory loop, as in main.arun_autogen_coding_crew
+        agent = LangChainCodingAgent(config)
+        await agent.agenerate_project(_SYNTHETIC_DESIGN, _SYNTHETIC_SPEC)
+        assert generated_error_files(project_root) == []
+        # Without the files the manifest has nothing to keep, so every file is generated again
+        shutil.rmtree(project_root)
+        return await asyncio.to_thread(agent.generate_project, _SYNTHETIC_DESIGN, _SYNTHETIC_SPEC)
+
+    result = asyncio.run(factory())
+    assert result.startswith("Successfully generated project"), result
+    assert violations == [], "a chat model was used on an event loop it does not belong to"
+    assert generated_error_files(project_root) == []
+
+def test_generate_project_after_agenerate_project():
+    if importlib.util.find_spec("langchain") is None or importlib.util.find_spec("dotenv") is None:
+        print("⚠️  langchain/python-dotenv not installed, coding agent event loop test skipped")
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_in_fresh_interpreter("generate_twice", {
+            "LLM_PROVIDER": "fake",
+            "LLM_CACHE_BYPASS": "true",
+            "PERSISTED_BASE_OUTPUT_DIR": temp_dir,
+            "PERSISTED_PYTHON_PATH": sys.executable,
+            "SETUP_PROJECT_ENV": "false",
+            "TEMPLATE_SYNTHESIS": "false",
+        })
+    print("✅ generate_project works after agenerate_project on the same agent (one chat model per loop)")
+
+if __name__ == "__main__":
+    test_generate_project_after_agenerate_project()
+    print("\n✅ Coding agent event loop tests completed successfully!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the append-only error journal.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import error_journal
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from error_journal import ErrorJournal, BLOB_REF_KEY
+
+DESIGN = {"folder_Structure": {"structure": [{"path": f"backend/file_{i}.py", "description": "x" * 80} for i in range(50)]}}
+
+def _entry(attempt):
+    return {"error_type": "code_generation", "file_path": "backend/main.py", "error_message": f"boom {attempt}",
+            "context": {"design_data": DESIGN, "attempt": attempt}}
+
+def test_large_context_is_stored_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = ErrorJournal(os.path.join(tmp, "errors.jsonl"))
+        for attempt in range(5):
+            record = journal.append(_entry(attempt))
+        assert set(record["context"]["design_data"]) == {BLOB_REF_KEY}
+        assert record["context"]["attempt"] == 4, "small values stay inline"
+
+        blobs = [name for _, _, files in os.walk(journal.blob_dir) for name in files]
+        assert len(blobs) == 1, blobs
+        with open(journal.journal_path, encoding="utf-8") as f:
+            lines = f.readlines()
+        assert len(lines) == 5 and all(len(line) < 300 for line in lines)
+
+        resolved = list(journal.read(resolve=True))
+        assert resolved[2]["context"]["design_data"] == DESIGN
+        assert [r["error_message"] for r in resolved] == [f"boom {i}" for i in range(5)]
+        print(f"✅ 5 errors journaled in {sum(map(len, lines))} bytes with one shared blob")
+
+def test_compact_drops_torn_lines_and_orphan_blobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = ErrorJournal(os.path.join(tmp, "errors.jsonl"))
+        journal.append(_entry(0))
+        other = _entry(1)
+        other["context"]["design_data"] = {"other": "y" * 5000}
+        journal.append(other)
+        with open(journal.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"error_type": "cut off mid-wri')
+
+        assert len(list(journal.read())) == 2, "torn trailing line is skipped"
+        stats = journal.compact(keep_last=1)
+        assert stats == {"entries": 1, "blobs": 1, "removed_blobs": 1}, stats
+        remaining = list(journal.read(resolve=True))
+        assert remaining[0]["context"]["design_data"] == {"other": "y" * 5000}
+        print(f"✅ Compaction: {stats}")
+
+if __name__ == "__main__":
+    test_large_context_is_stored_once()
+    test_compact_drops_torn_lines_and_orphan_blobs()
+    print("\n✅ Error journal tests completed successfully!")
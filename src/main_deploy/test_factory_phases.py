@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the factory's testing phase on a project whose imports are broken: no test run,
+the imports go to the debugging phase as its failures.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add the current directory to path to import main
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MAIN_DEPLOY_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE = os.path.splitext(os.path.basename(__file__))[0]
+
+BROKEN_PROJECT = {
+    'app/__init__.py': '',
+    'app/main.py': 'from app.models import Note\n',
+    'app/models.py': 'class Item:\n    pass\n',
+}
+
+def run_in_fresh_interpreter(scenario, env):
+    """Runs `scenario` of this module in a new interpreter, so config reads `env`"""
+    code = f"import {MODULE} as t; t.{scenario}()"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               cwd=MAIN_DEPLOY_DIR, env=dict(os.environ, **env))
+    assert completed.returncode == 0, completed.stdout[-2000:] + completed.stderr[-4000:]
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+def resume_at_testing_phase():
+    """Resumes a run whose coding phase produced BROKEN_PROJECT"""
+    import config
+    import debug_agent
+    import testing_agent
+    from fake_llm import _SYNTHETIC_SPEC, _SYNTHETIC_DESIGN
+    from main import arun_autonomous_software_factory
+    from run_journal import RunJournal
+
+    base_dir = config.BASE_OUTPUT_DIR
+    project_root = os.path.join(base_dir, 'notes_app')
+    for rel_path, content in BROKEN_PROJECT.items():
+        path = os.path.join(project_root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    journal = RunJournal.create(base_dir, "a notes app")
+    journal.complete_phase('specification', spec_path=write_json(os.path.join(base_dir, 'spec.json'), _SYNTHETIC_SPEC))
+    journal.complete_phase('design', design_path=write_json(os.path.join(base_dir, 'design.json'), _SYNTHETIC_DESIGN))
+    journal.project_root = project_root
+    journal.complete_phase('coding', files={})
+
+    async def no_test_run(*args, **kwargs):
+        raise AssertionError("tests must not be generated or run while imports are broken")
+
+    debugged = []
+    async def debugging_cycle(project_root_path, initial_failures, **kwargs):
+        debugged.append((project_root_path, initial_failures))
+        return True
+
+    testing_agent.arun_test_generation_and_execution = no_test_run
+    debug_agent.arun_debugging_cycle = debugging_cycle
+    result = asyncio.run(arun_autonomous_software_factory(resume_run_id=journal.run_id))
+
+    assert result['status'] == 'completed', result
+    assert len(debugged) == 1 and debugged[0][0] == project_root
+    failures = debugged[0][1]
+    assert [f['source_file'] for f in failures] == ['app/main.py']
+    assert "Unresolved import: app/main.py:1" in failures[0]['error_line_summary']
+    assert "Note not defined in app/models.py" in failures[0]['error_line_summary']
+    journal = RunJournal.load(base_dir, journal.run_id)
+    assert journal.phase('testing')['failures'] == failures
+    assert journal.phase('debugging')['successful'] is True
+
+def test_testing_phase_debugs_import_blockers():
+    if importlib.util.find_spec("langchain") is None or importlib.util.find_spec("dotenv") is None:
+        print("⚠️  langchain/python-dotenv not installed, factory testing phase test skipped")
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run_in_fresh_interpreter("resume_at_testing_phase", {
+            "LLM_PROVIDER": "fake",
+            "PERSISTED_BASE_OUTPUT_DIR": temp_dir,
+            "PERSISTED_PYTHON_PATH": sys.executable,
+        })
+    print("✅ Broken imports skip the test run and are handed to the debugging phase")
+
+if __name__ == "__main__":
+    test_testing_phase_debugs_import_blockers()
+    print("\n✅ Factory phase tests completed successfully!")
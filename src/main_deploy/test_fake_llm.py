@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline fake LLM used by the pipeline benchmark.
+"""
+
+import ast
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import fake_llm
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm import FakeLLMBackend, FakeGenerativeModel, FakeRateLimitError
+from generation_batches import parse_multi_file_response
+from rate_limiter import AdaptiveRateLimiter, is_rate_limit_error, retry_after_from_error
+import tracing
+
+FILE_PROMPT = "CONTEXT:\n- Full Path of the File to Generate: /tmp/notes/backend/models.py\n"
+BATCH_PROMPT = "FILES TO GENERATE (2):\n        FILE 1: frontend/index.html\n        FILE 2: backend/utils.py\n"
+
+def test_prompts_get_plausible_responses():
+    backend = FakeLLMBackend()
+    spec = json.loads(backend.complete("To act as a Requirements Analyst AI, ...").text)
+    design = json.loads(backend.complete("To act as a System Designer AI, ...").text)
+    assert spec["technology_Stack"]["backend"]["framework"] and design["folder_Structure"]["root_Project_Directory_Name"]
+
+    module = backend.complete(FILE_PROMPT).text
+    assert "def models_step_0" in module
+    ast.parse(module)
+
+    files = parse_multi_file_response(backend.complete(BATCH_PROMPT).text, ["frontend/index.html", "backend/utils.py"])
+    assert files["frontend/index.html"].startswith("<!DOCTYPE html>")
+    ast.parse(files["backend/utils.py"])
+
+    ast.parse(backend.complete("Generate the Python code for the test file now.").text)
+    assert "Final Answer" in backend.complete("You are an expert Python debugging agent.").text
+
+    stats = backend.stats()
+    assert stats["calls"] == 6 and stats["prompt_tokens"] > 0 and stats["response_tokens"] > 0
+    assert stats["calls_by_kind"] == {"specification": 1, "design": 1, "file": 1, "batch": 1, "test": 1, "debug": 1}
+    print(f"✅ Synthetic responses for every agent: {stats['calls_by_kind']}")
+
+def test_fixture_replay():
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        prefix = os.path.join(fixture_dir, "todo")
+        for suffix, payload in ((".spec.json", {"project_Overview": {"project_Name": "Todo"}}), (".design.json", {"folder_Structure": {}})):
+            with open(prefix + suffix, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+        backend = FakeLLMBackend.from_fixture(prefix + ".spec.json", prefix + ".design.json")
+        assert json.loads(backend.complete("Requirements Analyst AI").text) == {"project_Overview": {"project_Name": "Todo"}}
+        assert json.loads(backend.complete("System Designer AI").text) == {"folder_Structure": {}}
+        print("✅ Fixture spec/design replayed")
+
+def test_error_injection_is_deterministic_and_retryable():
+    def outcomes(backend):
+        results = []
+        for index in range(40):
+            try:
+                backend.complete(FILE_PROMPT.replace("models", f"module_{index}"))
+                results.append("ok")
+            except FakeRateLimitError:
+                results.append("429")
+        return results
+
+    first = outcomes(FakeLLMBackend(rate_limit_rate=0.3, retry_after=0.01))
+    assert first == outcomes(FakeLLMBackend(rate_limit_rate=0.3, retry_after=0.01))
+    assert 0 < first.count("429") < 40
+
+    error = FakeRateLimitError(0.01)
+    assert is_rate_limit_error(error) and retry_after_from_error(error) == 0.01
+
+    # A retried prompt gets a fresh roll, so the limiter eventually gets through
+    backend = FakeLLMBackend(rate_limit_rate=0.5, retry_after=0.01)
+    limiter = AdaptiveRateLimiter(requests_per_minute=60000, default_cooldown=0.01)
+    for index in range(5):
+        limiter.call(lambda: backend.complete(FILE_PROMPT.replace("models", f"module_{index}")), max_rate_limit_retries=20)
+
+    malformed = FakeLLMBackend(malformed_rate=1.0)
+    try:
+        ast.parse(malformed.complete(FILE_PROMPT).text)
+    except SyntaxError:
+        pass
+    else:
+        raise AssertionError("malformed responses must not parse")
+    print(f"✅ 429s ({first.count('429')}/40) and malformed code injected reproducibly")
+
+def test_genai_compatible_model_reports_usage():
+    model = FakeGenerativeModel("gemini-2.0-flash", FakeLLMBackend(latency=0.01))
+    response = asyncio.run(model.generate_content_async("Generate the Python code for the test file now."))
+    assert "def test_" in response.text
+    assert response.usage_metadata.prompt_token_count > 0 and response.usage_metadata.candidates_token_count > 0
+    assert tracing.usage_attributes(response)["response_tokens"] == response.usage_metadata.candidates_token_count
+    assert "def test_" in model.generate_content("Generate the Python code for the test file now.").text
+    print("✅ generate_content / generate_content_async with usage metadata")
+
+if __name__ == "__main__":
+    test_prompts_get_plausible_responses()
+    test_fixture_replay()
+    test_error_injection_is_deterministic_and_retryable()
+    test_genai_compatible_model_reports_usage()
+    print("\n✅ Fake LLM tests completed successfully!")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for batched generation of small sibling files.
+"""
+
+import os
+import sys
+
+# Add the current directory to path to import generation_batches
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generation_batches import plan_batches, contract_graph, parse_multi_file_response, BatchParseError
+from generation_scheduler import DependencyScheduler
+
+ORDER = [
+    "requirements.txt", ".env", "backend/database.py", "backend/models.py", "backend/schemas.py",
+    "backend/routes.py", "backend/main.py", "frontend/index.html", "frontend/style.css",
+    "frontend/utils.js", "frontend/script.js", "frontend/api.js",
+]
+
+def _file_type(path):
+    return "frontend" if path.startswith("frontend/") else "utility"
+
+def test_small_siblings_are_grouped():
+    batches = plan_batches(ORDER, {}, _file_type, max_files=4)
+    assert list(batches.values()) == [["frontend/style.css", "frontend/utils.js", "frontend/script.js", "frontend/api.js"]], batches
+    assert not any("requirements.txt" in members or ".env" in members for members in batches.values()), "templated files are never batched"
+
+    capped = plan_batches(ORDER, {}, _file_type, max_files=2)
+    assert sorted(map(len, capped.values())) == [2, 2]
+    assert plan_batches(ORDER, {}, _file_type, max_files=1) == {}
+    print(f"✅ Batches: {list(batches.values())}")
+
+def test_dependent_members_are_split_and_graph_stays_acyclic():
+    # script.js uses utils.js, and api.js is only reachable through index.html
+    dependencies = {
+        "frontend/script.js": ["frontend/utils.js"],
+        "frontend/index.html": ["frontend/style.css"],
+        "frontend/api.js": ["frontend/index.html"],
+    }
+    batches = plan_batches(ORDER, dependencies, _file_type, max_files=4)
+    for members in batches.values():
+        assert not ({"frontend/script.js", "frontend/utils.js"} <= set(members))
+        assert not ({"frontend/style.css", "frontend/api.js"} <= set(members)), "transitive dependency through a non-member"
+
+    node_order, node_dependencies = contract_graph(ORDER, dependencies, batches)
+    scheduler = DependencyScheduler(node_dependencies, order=node_order)
+    covered = [path for level in scheduler.levels() for node in level for path in batches.get(node, [node])]
+    assert sorted(covered) == sorted(ORDER)
+    assert scheduler.dependencies == {node: deps for node, deps in node_dependencies.items()}, "no cycle had to be broken"
+    print(f"✅ Contracted graph: {len(node_order)} nodes for {len(ORDER)} files, {len(scheduler.levels())} levels")
+
+def test_batches_never_form_a_cycle_between_each_other():
+    # static/a1.js -> web/b1.js and web/b2.js -> static/a2.js: batching {a1, a2} and {b1, b2} would
+    # make the two batch nodes depend on each other although no file reaches a sibling
+    order = ["static/a1.js", "static/a2.js", "web/b1.js", "web/b2.js"]
+    dependencies = {"static/a1.js": ["web/b1.js"], "web/b2.js": ["static/a2.js"]}
+    batches = plan_batches(order, dependencies, lambda path: "js", max_files=4)
+    assert batches == {"batch::static:js:0": ["static/a1.js", "static/a2.js"]}, batches
+
+    node_order, node_dependencies = contract_graph(order, dependencies, batches)
+    scheduler = DependencyScheduler(node_dependencies, order=node_order)
+    assert scheduler.dependencies == node_dependencies, "no cycle had to be broken"
+    print("✅ A file is not batched when its batch would depend on another batch that depends on it")
+
+def test_parser_splits_and_strips_fences():
+    response = (
+        "<<<FILE: frontend/style.css>>>\n"
+        "```css\nbody { margin: 0; }\n```\n"
+        "<<<END FILE>>>\n\n"
+        "<<<FILE: /frontend/utils.js>>>\n"
+        "export const add = (a, b) => a + b;\n"
+        "<<<END FILE>>>\n"
+    )
+    files = parse_multi_file_response(response, ["frontend/style.css", "frontend/utils.js"])
+    assert files == {"frontend/style.css": "body { margin: 0; }", "frontend/utils.js": "export const add = (a, b) => a + b;"}
+    print("✅ Multi-file response split into files")
+
+def test_parser_rejects_protocol_violations():
+    expected = ["a.css", "b.js"]
+    bad_responses = {
+        "missing file": "<<<FILE: a.css>>>\nx\n<<<END FILE>>>\n",
+        "prose": "Here are the files:\n<<<FILE: a.css>>>\nx\n<<<END FILE>>>\n<<<FILE: b.js>>>\ny\n<<<END FILE>>>\n",
+        "unexpected": "<<<FILE: a.css>>>\nx\n<<<END FILE>>>\n<<<FILE: c.js>>>\ny\n<<<END FILE>>>\n",
+        "unterminated": "<<<FILE: a.css>>>\nx\n<<<FILE: b.js>>>\ny\n<<<END FILE>>>\n",
+        "empty": "<<<FILE: a.css>>>\n\n<<<END FILE>>>\n<<<FILE: b.js>>>\ny\n<<<END FILE>>>\n",
+    }
+    for name, response in bad_responses.items():
+        try:
+            parse_multi_file_response(response, expected)
+        except BatchParseError as e:
+            print(f"✅ Rejected ({name}): {e}")
+        else:
+            raise AssertionError(f"{name} response should be rejected")
+
+if __name__ == "__main__":
+    test_small_siblings_are_grouped()
+    test_dependent_members_are_split_and_graph_stays_acyclic()
+    test_batches_never_form_a_cycle_between_each_other()
+    test_parser_splits_and_strips_fences()
+    test_parser_rejects_protocol_violations()
+    print("\n✅ Batched generation tests completed successfully!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the dependency-aware parallel file generation scheduler.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to path to import generation_scheduler
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generation_scheduler import DependencyScheduler
+
+def test_dependents_wait_for_dependencies():
+    """Dependents must only start after on_complete ran for every dependency"""
+    dependencies = {
+        "backend/models.py": ["backend/database.py"],
+        "backend/routes.py": ["backend/models.py", "backend/database.py"],
+        "backend/main.py": ["backend/database.py", "backend/models.py", "backend/routes.py"],
+    }
+    order = ["backend/database.py", "backend/models.py", "backend/routes.py",
+             "frontend/style.css", "frontend/script.js", "backend/main.py"]
+    scheduler = DependencyScheduler(dependencies, order=order, max_workers=3)
+
+    completed = []
+    started_after = {}
+
+    def work(node, prepared):
+        started_after[node] = list(prepared)
+        time.sleep(0.01)
+        return f"code for {node}"
+
+    results = scheduler.run(work, lambda node, result: completed.append(node), prepare=lambda node: completed)
+
+    assert set(results) == set(order)
+    for node, deps in dependencies.items():
+        for dep in deps:
+            assert dep in started_after[node], f"{node} started before {dep} was registered"
+    print(f"✅ Completion order: {completed}")
+
+def test_independent_files_run_concurrently():
+    """Files without dependencies between them should overlap in time"""
+    order = [f"frontend/file_{i}.js" for i in range(6)]
+    scheduler = DependencyScheduler({}, order=order, max_workers=3)
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(node, prepared):
+        with lock:
+            active.append(node)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(node)
+        return node
+
+    scheduler.run(work, lambda node, result: None)
+    assert max(peak) == 3, f"Expected 3 concurrent workers, saw {max(peak)}"
+    print(f"✅ Peak concurrency: {max(peak)}")
+
+def test_cycles_and_unknown_dependencies():
+    """Cycles fall back to priority order and unknown dependencies are ignored"""
+    dependencies = {
+        "a.py": ["b.py", "backend"],
+        "b.py": ["a.py"],
+    }
+    scheduler = DependencyScheduler(dependencies, order=["a.py", "b.py"], max_workers=2)
+    assert scheduler.dependencies == {"a.py": [], "b.py": ["a.py"]}
+    assert scheduler.levels() == [["a.py"], ["b.py"]]
+
+    completed = []
+    scheduler.run(lambda node, prepared: node, lambda node, result: completed.append(node))
+    assert completed == ["a.py", "b.py"]
+    print("✅ Cycle broken by priority order")
+
+if __name__ == "__main__":
+    test_dependents_wait_for_dependencies()
+    test_independent_files_run_concurrently()
+    test_cycles_and_unknown_dependencies()
+    print("\n✅ DependencyScheduler tests completed successfully!")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for design/spec slicing and the generation manifest used by incremental regeneration.
+"""
+
+import copy
+import glob
+import json
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import the modules under test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from design_slices import stable_hash, design_slice_for_file, spec_slice_for_file, endpoints_for_file
+from generation_manifest import GenerationManifest
+
+def _sample_design():
+    return {
+        "folder_Structure": {
+            "root_Project_Directory_Name": "task_app",
+            "structure": [
+                {"path": "backend/database.py", "description": "Database setup"},
+                {"path": "backend/models.py", "description": "SQLAlchemy models"},
+                {"path": "backend/routes/tasks.py", "description": "Task API routes"},
+                {"path": "backend/routes/users.py", "description": "User API routes"},
+                {"path": "frontend/style.css", "description": "Stylesheet"},
+            ]
+        },
+        "data_Design": {
+            "storage_Type": "SQL",
+            "data_Models": [{"model_Name": "Task", "fields": [{"name": "title", "type": "String"}]}]
+        },
+        "interface_Design": {
+            "api_Specifications": [
+                {"endpoint": "/api/tasks", "method": "GET", "related_NFRs": ["FR-001"]},
+                {"endpoint": "/api/users/{id}", "method": "GET", "related_NFRs": ["FR-002"]},
+            ]
+        },
+        "dependencies": {"backend": ["fastapi"]},
+        "metadata": {"timestamp": "2025-06-17T10:00:00"}
+    }
+
+def _sample_spec():
+    return {
+        "project_Overview": {"project_Name": "Task App"},
+        "functional_Requirements": [{"id": "FR-001", "title": "List tasks"}, {"id": "FR-002", "title": "View user"}],
+        "non_Functional_Requirements": [{"id": "NFR-001", "description": "Fast"}],
+        "technology_Stack": {"backend": {"framework": "FastAPI"}},
+        "metadata": {"timestamp": "2025-06-17T10:00:00"}
+    }
+
+def test_route_slices_only_contain_their_endpoints():
+    design, spec = _sample_design(), _sample_spec()
+    endpoints = endpoints_for_file(design, "backend/routes/tasks.py")
+    assert [e["endpoint"] for e in endpoints] == ["/api/tasks"]
+
+    spec_slice = spec_slice_for_file(spec, design, "backend/routes/tasks.py", "routes")
+    assert [r["id"] for r in spec_slice["requirements"]] == ["FR-001"]
+    print("✅ Route slices are limited to their own endpoints and requirements")
+
+def test_slice_hashes_react_only_to_relevant_changes():
+    design, spec = _sample_design(), _sample_spec()
+    before = {
+        path: stable_hash(design_slice_for_file(design, path, file_type))
+        for path, file_type in [("backend/routes/tasks.py", "routes"), ("backend/routes/users.py", "routes"), ("frontend/style.css", "frontend")]
+    }
+
+    changed = copy.deepcopy(design)
+    changed["interface_Design"]["api_Specifications"][1]["method"] = "PUT"
+    changed["metadata"]["timestamp"] = "2025-06-18T09:00:00"
+    after = {
+        path: stable_hash(design_slice_for_file(changed, path, file_type))
+        for path, file_type in [("backend/routes/tasks.py", "routes"), ("backend/routes/users.py", "routes"), ("frontend/style.css", "frontend")]
+    }
+
+    assert before["backend/routes/tasks.py"] == after["backend/routes/tasks.py"]
+    assert before["backend/routes/users.py"] != after["backend/routes/users.py"]
+    assert before["frontend/style.css"] != after["frontend/style.css"]
+    print("✅ Only files touched by the design change are invalidated")
+
+def test_structure_edits_only_invalidate_siblings():
+    design = _sample_design()
+    files = [("backend/models.py", "models"), ("backend/routes/tasks.py", "routes"), ("frontend/style.css", "frontend")]
+    before = {path: stable_hash(design_slice_for_file(design, path, file_type)) for path, file_type in files}
+
+    changed = copy.deepcopy(design)
+    changed["folder_Structure"]["structure"].append({"path": "backend/routes/projects.py", "description": "Project API routes"})
+    changed["folder_Structure"]["structure"][4]["path"] = "frontend/main.css"
+    after = {path: stable_hash(design_slice_for_file(changed, path, file_type)) for path, file_type in files}
+
+    assert before["backend/models.py"] == after["backend/models.py"]
+    assert before["backend/routes/tasks.py"] != after["backend/routes/tasks.py"]
+    assert before["frontend/style.css"] != after["frontend/style.css"]
+    print("✅ Adding or renaming a file only invalidates files in the same directory")
+
+def test_manifest_round_trip():
+    with tempfile.TemporaryDirectory() as base_dir:
+        project_root = os.path.join(base_dir, "task_app")
+        manifest = GenerationManifest.load(project_root)
+        manifest.set_generator_hash("gen-1")
+        inputs = {"design": "d", "spec": "s", "dependencies": "x"}
+        manifest.record("backend/models.py", inputs, "out")
+        manifest.record("backend/old.py", inputs, "out")
+        manifest.save()
+        assert os.path.exists(project_root + ".manifest.json")
+
+        reloaded = GenerationManifest.load(project_root)
+        assert reloaded.is_up_to_date("backend/models.py", inputs)
+        assert not reloaded.is_up_to_date("backend/models.py", {**inputs, "dependencies": "y"})
+        assert reloaded.removed_files(["backend/models.py"]) == ["backend/old.py"]
+
+        reloaded.set_generator_hash("gen-2")
+        assert not reloaded.is_up_to_date("backend/models.py", inputs)
+        print("✅ Manifest persists entries and resets when generator settings change")
+
+def test_fixture_designs_slice_cleanly():
+    """Real design fixtures from the repo must slice without errors"""
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for design_path in glob.glob(os.path.join(repo_root, "outputs", "*.design.json")):
+        with open(design_path, "r", encoding="utf-8") as f:
+            design = json.load(f)
+        for item in design.get("folder_Structure", {}).get("structure", []):
+            for file_type in ("database", "models", "routes", "entry_point", "frontend", "config", "utility"):
+                stable_hash(design_slice_for_file(design, item["path"].strip("/\\"), file_type))
+    print("✅ Fixture designs sliced successfully")
+
+if __name__ == "__main__":
+    test_route_slices_only_contain_their_endpoints()
+    test_slice_hashes_react_only_to_relevant_changes()
+    test_structure_edits_only_invalidate_siblings()
+    test_manifest_round_trip()
+    test_fixture_designs_slice_cleanly()
+    print("\n✅ Incremental generation tests completed successfully!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy imports: entry points must not load the agent frameworks.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+# Add the current directory to path to run the imports from here
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MAIN_DEPLOY_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_google_genai", "autogen",
+                 "google.genai", "google.generativeai", "pydantic", "colorama")
+
+def loaded_after_import(module, env=None):
+    """Heavy modules and root logger handlers after `import module` in a fresh interpreter"""
+    code = (
+        "import json, logging, sys\n"
+        f"import {module}\n"
+        f"heavy = sorted(name for name in sys.modules if name.split('.')[0] in {HEAVY_MODULES!r} or name in {HEAVY_MODULES!r})\n"
+        "print(json.dumps({'heavy': heavy, 'handlers': len(logging.getLogger().handlers)}))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               cwd=MAIN_DEPLOY_DIR, env=dict(os.environ, **(env or {})))
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def test_entry_points_stay_light():
+    for module in ("run", "batch_factory", "llm_clients", "tracing", "rate_limiter", "llm_cache", "fake_llm"):
+        result = loaded_after_import(module)
+        assert result["heavy"] == [], (module, result["heavy"])
+    help_run = subprocess.run([sys.executable, "run.py", "--help"], capture_output=True, text=True, cwd=MAIN_DEPLOY_DIR)
+    assert help_run.returncode == 0 and "--batch" in help_run.stdout
+    print("✅ run, batch_factory and the LLM plumbing import without langchain/autogen/Google clients")
+
+def test_config_import_has_no_side_effects():
+    if importlib.util.find_spec("dotenv") is None:
+        print("⚠️  python-dotenv not installed, config/main import check skipped")
+        return
+    # Missing essentials only fail in config.init(), not at import
+    for module in ("config", "main"):
+        result = loaded_after_import(module, env={"PERSISTED_BASE_OUTPUT_DIR": "", "LLM_PROVIDER": "fake"})
+        assert result["heavy"] == [] and result["handlers"] == 0, (module, result)
+    print("✅ config and main import without logging handlers, env checks or agent frameworks")
+
+if __name__ == "__main__":
+    test_entry_points_stay_light()
+    test_config_import_has_no_side_effects()
+    print("\n✅ Lazy import tests completed successfully!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the disk-backed LLM response cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to path to import llm_cache
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_cache import LLMResponseCache, cached_llm_call
+
+def test_hit_after_miss():
+    """A second identical call must be served from disk without calling the model"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir)
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return "print('hello')"
+
+        first = cached_llm_call("prompt", "gemini-2.0-flash", 0.1, generate, cache=cache)
+        second = cached_llm_call("prompt", "gemini-2.0-flash", 0.1, generate, cache=cache)
+        assert first == second == "print('hello')"
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+        # A fresh instance over the same directory still hits (persistent)
+        reopened = LLMResponseCache(cache_dir)
+        cached_llm_call("prompt", "gemini-2.0-flash", 0.1, generate, cache=reopened)
+        assert len(calls) == 1
+
+        # Model name and temperature are part of the key
+        cached_llm_call("prompt", "gemini-1.5-pro-latest", 0.1, generate, cache=cache)
+        cached_llm_call("prompt", "gemini-2.0-flash", 0.3, generate, cache=cache)
+        assert len(calls) == 3
+        print(f"✅ Cache stats: {cache.stats()}")
+
+def test_failed_generations_are_not_cached():
+    """Exceptions and responses rejected by the validator are never stored"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir)
+
+        def broken():
+            raise ValueError("Syntax error in generated Python code")
+
+        try:
+            cached_llm_call("prompt", "model", 0.1, broken, cache=cache)
+            assert False, "Expected the exception to propagate"
+        except ValueError:
+            pass
+
+        cached_llm_call("prompt", "model", 0.1, lambda: "not json", validator=lambda text: text.startswith("{"), cache=cache)
+        assert cache.stats()['stores'] == 0
+        print("✅ Failed generations were not cached")
+
+def test_bypass_and_eviction():
+    """Bypass skips the cache entirely; size and age limits evict old entries"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        bypassed = LLMResponseCache(cache_dir, bypass=True)
+        calls = []
+        for _ in range(2):
+            cached_llm_call("prompt", "model", 0.1, lambda: calls.append(1) or "x", cache=bypassed)
+        assert len(calls) == 2 and not os.listdir(cache_dir)
+
+        cache = LLMResponseCache(cache_dir, max_size_bytes=400)
+        for i in range(10):
+            cache.put(cache.make_key("model", 0.1, f"prompt {i}"), "y" * 50)
+            time.sleep(0.01)
+        assert cache._scan_size() <= 400
+        assert cache.get(cache.make_key("model", 0.1, "prompt 9")) is not None
+        assert cache.get(cache.make_key("model", 0.1, "prompt 0")) is None
+
+        expiring = LLMResponseCache(cache_dir, max_age_seconds=0)
+        assert expiring.get(cache.make_key("model", 0.1, "prompt 9")) is None
+        print(f"✅ Evictions: {cache.stats()['evictions']}")
+
+if __name__ == "__main__":
+    test_hit_after_miss()
+    test_failed_generations_are_not_cached()
+    test_bypass_and_eviction()
+    print("\n✅ LLM cache tests completed successfully!")
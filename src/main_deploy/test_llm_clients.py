@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled LLM client registry shared across agents.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to path to import llm_clients
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_clients import ClientRegistry
+
+class FakeClient:
+    instances = 0
+
+    def __init__(self, model, **options):
+        FakeClient.instances += 1
+        self.model = model
+        self.options = options
+
+def factory(model, **options):
+    return lambda: FakeClient(model, **options)
+
+def test_clients_are_shared_by_key():
+    registry = ClientRegistry()
+    limiter = object()
+    first = registry.get("chat", "gemini", "gemini-2.0-flash", factory("gemini-2.0-flash"), temperature=0.3, rate_limiter=limiter)
+    again = registry.get("chat", "gemini", "gemini-2.0-flash", factory("gemini-2.0-flash"), temperature=0.3, rate_limiter=limiter)
+    assert first is again
+
+    assert registry.get("chat", "gemini", "gemini-2.0-flash", factory("x"), temperature=0.1, rate_limiter=limiter) is not first
+    assert registry.get("chat", "gemini", "gemini-2.0-flash", factory("x"), temperature=0.3, rate_limiter=object()) is not first
+    assert registry.get("generative", "gemini", "gemini-2.0-flash", factory("x")) is not first
+    assert registry.get("chat", "gemini", "gemini-2.0-flash", factory("x"), temperature=0.3,
+                        rate_limiter=limiter, stop=["a", "b"]) is not first
+
+    stats = registry.stats()
+    assert stats["created"] == 5 and stats["reused"] == 1 and stats["pooled"] == 5
+    assert stats["uses"]["chat:gemini:gemini-2.0-flash@0.3"] == 4
+    print(f"✅ Clients shared per (model, temperature, options): {stats['created']} created, {stats['reused']} reused")
+
+def test_concurrent_agents_get_one_client():
+    registry = ClientRegistry()
+
+    def slow_factory():
+        time.sleep(0.02)
+        return FakeClient("gemini-2.0-flash")
+
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(registry.get("generative", "gemini", "m", slow_factory)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+    assert registry.stats()["pooled"] == 1 and registry.stats()["created"] + registry.stats()["reused"] == 8
+    print("✅ Concurrent requests for the same client share one instance")
+
+def test_clients_are_pooled_per_event_loop():
+    registry = ClientRegistry()
+
+    async def phase():
+        return registry.get("chat", "gemini", "m", factory("m"))
+
+    async def run():
+        return await phase(), await phase()
+
+    first_run = asyncio.run(run())
+    assert first_run[0] is first_run[1]
+    second_run = asyncio.run(run())
+    assert second_run[0] is not first_run[0]
+    # The client of the closed loop was dropped
+    assert registry.stats()["pooled"] == 1
+    print("✅ Async clients pooled per event loop, dropped when the loop closes")
+
+if __name__ == "__main__":
+    test_clients_are_shared_by_key()
+    test_concurrent_agents_get_one_client()
+    test_clients_are_pooled_per_event_loop()
+    print("\n✅ LLM client registry tests completed successfully!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the queued, structured logging set up by config.setup_global_logger.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+# Add the current directory to path to import log_utils
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from log_utils import JsonFormatter, start_queue_logging, stop_queue_logging
+import tracing
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread().name)
+        self.lines.append(self.format(record))
+
+def make_logger(name):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    handler.setFormatter(JsonFormatter())
+    return logger, handler
+
+def test_records_are_handled_off_thread_as_json():
+    logger, handler = make_logger("test_log_utils.queue")
+    listener = start_queue_logging(logger, [handler])
+    try:
+        logger.info("generated %s", "models.py")
+        try:
+            raise ValueError("bad response")
+        except ValueError:
+            logger.exception("generation failed")
+    finally:
+        stop_queue_logging(listener)
+        stop_queue_logging(listener)
+        logger.handlers.clear()
+
+    entries = [json.loads(line) for line in handler.lines]
+    assert entries[0]["message"] == "generated models.py" and entries[0]["level"] == "INFO"
+    assert entries[0]["thread"] == threading.current_thread().name
+    assert "ValueError: bad response" in entries[1]["exc"] and entries[1]["message"] == "generation failed"
+    assert threading.current_thread().name not in handler.threads
+    print("✅ Records formatted as JSON on the listener thread, tracebacks kept")
+
+def test_trace_context_is_attached():
+    logger, handler = make_logger("test_log_utils.trace")
+    listener = start_queue_logging(logger, [handler])
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with tracing.trace_run(os.path.join(temp_dir, "run.trace.jsonl"), "run-1"):
+                with tracing.span("coding", kind="phase") as phase_span:
+                    logger.info("inside the coding phase")
+            logger.info("outside any run")
+            stop_queue_logging(listener)
+    finally:
+        logger.handlers.clear()
+
+    inside, outside = [json.loads(line) for line in handler.lines]
+    assert inside["trace_id"] == "run-1" and inside["span"] == "coding" and inside["span_id"] == phase_span.span_id
+    assert "trace_id" not in outside
+    print("✅ trace_id/span_id of the current span added to log records")
+
+def test_disabled_levels_build_nothing():
+    logger, handler = make_logger("test_log_utils.levels")
+    logger.addHandler(handler)
+    built = []
+
+    class Expensive:
+        def __str__(self):
+            built.append(1)
+            return "huge payload"
+
+    logger.debug("payload: %s", Expensive())
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"payload: {Expensive()}")
+    logger.info("payload: %s", Expensive())
+    assert built == [1] and len(handler.lines) == 1
+    logger.handlers.clear()
+    print("✅ Payloads of disabled levels are never rendered")
+
+if __name__ == "__main__":
+    test_records_are_handled_off_thread_as_json()
+    test_trace_context_is_attached()
+    test_disabled_levels_build_nothing()
+    print("\n✅ Logging tests completed successfully!")
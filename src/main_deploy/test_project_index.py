@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the one-pass project indexer used by ProjectValidatorTool.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import project_index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from project_index import ProjectIndex, import_blockers
+
+PROJECT_FILES = {
+    'requirements.txt': 'fastapi\n',
+    'app/__init__.py': '',
+    'app/database.py': 'from sqlalchemy.orm import declarative_base\nBase = declarative_base()\n',
+    'app/models.py': 'from app.database import Base\nfrom app import crud\n\nclass Item(Base):\n    pass\n',
+    'app/crud.py': 'from app.models import Item\n',
+    'app/main.py': ('import os\nfrom fastapi import FastAPI\nfrom app.models import Item, ItemCreate\n'
+                    'from .database import Base\nfrom app.routers import items\n\napp = FastAPI()\n'),
+    'app/routers/items.py': ('from ..models import Item\nfrom models import Item\n\n'
+                             'def get_session():\n    from app.session import SessionLocal\n    return SessionLocal()\n'),
+    'app/static/style.css': '',
+    'venv/lib/site.py': 'from nowhere import anything\n',
+}
+
+def write_project(root, files):
+    for rel_path, content in files.items():
+        path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+def test_index_reports_import_problems():
+    with tempfile.TemporaryDirectory() as root:
+        write_project(root, PROJECT_FILES)
+        index = ProjectIndex.build(root)
+
+        assert index.has_file('requirements.txt') and not index.has_file('package.json')
+        assert index.empty_files == ['app/static/style.css']
+        assert 'venv/lib/site.py' not in index.files and 'Base' in index.modules['app.database'].exports
+
+        unresolved = index.unresolved_imports()
+        assert any("app/main.py:3" in problem and "ItemCreate not defined in app/models.py" in problem for problem in unresolved)
+        assert any("`from models import Item`" in problem and "did you mean app.models?" in problem for problem in unresolved)
+        assert any("no module app.session" in problem for problem in unresolved)
+        # Relative imports, submodule imports and third-party imports resolve or are ignored
+        assert len(unresolved) == 3, unresolved
+
+        assert index.circular_imports() == [['app.crud', 'app.models', 'app.crud']]
+        # The import inside get_session() is not a module-level edge
+        assert index.graph['app.routers.items'] == {'app.models'}
+        assert index.missing_init_files() == ['app/routers']
+        # Only unresolved and circular imports block the test phase; a missing __init__.py does not
+        assert len(import_blockers(index.check())) == 4 and len(index.check()) == 5
+        print("✅ Unresolved imports, circular imports and missing __init__.py found in one walk")
+
+def test_clean_project_and_syntax_errors():
+    with tempfile.TemporaryDirectory() as root:
+        write_project(root, {
+            'main.py': 'from api.routes import router\nfrom api import *\n',
+            'api/__init__.py': 'from .routes import router\n',
+            'api/routes.py': 'try:\n    from fastapi import APIRouter\nexcept ImportError:\n    APIRouter = None\nrouter = APIRouter()\n',
+        })
+        assert ProjectIndex.build(root).check() == []
+
+        write_project(root, {'api/broken.py': 'def broken(:\n', 'main.py': 'from api.broken import anything\n'})
+        issues = ProjectIndex.build(root).check()
+        assert len(issues) == 1 and issues[0].startswith("Syntax error: api/broken.py")
+        print("✅ Clean projects pass; unparsable modules reported once")
+
+def test_import_failures_for_debugging():
+    with tempfile.TemporaryDirectory() as root:
+        write_project(root, PROJECT_FILES)
+        failures = ProjectIndex.build(root).import_failures()
+
+        # One failure per blocker, in the entry format of the testing phase
+        assert len(failures) == 4
+        assert all(set(f) == {"test", "test_file_path", "source_file", "source_function", "error_line_summary"} for f in failures)
+        assert [f['error_line_summary'] for f in failures] == import_blockers(ProjectIndex.build(root).check())
+        assert failures[-1]['source_file'] == 'app/crud.py'
+        assert any(f['source_file'] == 'app/main.py' and "ItemCreate" in f['error_line_summary'] for f in failures)
+
+        write_project(root, {'app/main.py': 'from app.models import Item\n', 'app/models.py': 'class Item:\n    pass\n',
+                             'app/crud.py': '', 'app/database.py': '', 'app/routers/items.py': ''})
+        assert ProjectIndex.build(root).import_failures() == []
+        print("✅ Unresolved and circular imports turned into failures for the debugging phase")
+
+if __name__ == "__main__":
+    test_index_reports_import_problems()
+    test_clean_project_and_syntax_errors()
+    test_import_failures_for_debugging()
+    print("\n✅ Project index tests completed successfully!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the relevance-sliced prompt builder.
+"""
+
+import copy
+import glob
+import json
+import os
+import sys
+
+# Add the current directory to path to import prompt_builder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from design_slices import design_slice_for_file, stable_hash
+from prompt_builder import SlicedPromptBuilder, estimate_tokens
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class _GeneratedFiles:
+    """Minimal stand-in for ProjectContext: only what the builder reads"""
+    project_name = "task_management_web_app"
+    tech_stack = "fastapi"
+    project_structure = {'database_files': ['backend/database.py'], 'model_files': ['backend/models.py'],
+                         'route_files': ['backend/routes/tasks.py'], 'entry_points': ['backend/main.py']}
+
+    def get_exports_for_file(self, file_path):
+        if file_path == 'backend/models.py':
+            return {'classes': ['Task', 'User'], 'functions': []}
+        return {'classes': [], 'functions': ['get_db'], 'variables': ['Base', 'engine']}
+
+def _load_fixture():
+    design_path = sorted(glob.glob(os.path.join(REPO_ROOT, "src", "module_1_vs_2", "outputs", "*.design.json")))[0]
+    spec_path = design_path.replace(".design.json", ".spec.json")
+    with open(design_path, "r", encoding="utf-8") as f:
+        design = json.load(f)
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    return design, spec
+
+def test_sliced_sections_are_smaller_than_full_documents():
+    design, spec = _load_fixture()
+    builder = SlicedPromptBuilder(design, spec, _GeneratedFiles())
+    structure = [item['path'].strip('/\\') for item in design['folder_Structure']['structure']]
+
+    for file_type in ('models', 'routes', 'frontend', 'database'):
+        file_path = next((p for p in structure if p.endswith('.py')), structure[0])
+        sections = builder.sections_for(file_path, file_type, ['backend/models.py'], _GeneratedFiles())
+        sliced_tokens = sum(estimate_tokens(text) for text in sections.values())
+        assert sliced_tokens < builder.full_documents_tokens, f"{file_type} slice is not smaller than the full documents"
+        assert "metadata" not in sections['design_context']
+        print(f"✅ {file_type}: ~{sliced_tokens} tokens vs ~{builder.full_documents_tokens} for the full documents")
+
+def test_dependency_context_lists_exports():
+    design, spec = _load_fixture()
+    builder = SlicedPromptBuilder(design, spec, _GeneratedFiles())
+    summary = builder.dependency_context_for('backend/routes/tasks.py', ['backend/models.py', 'backend/database.py'], _GeneratedFiles())
+    assert "module `backend.models`" in summary
+    assert "classes: Task, User" in summary
+    assert "functions: get_db" in summary
+    assert "variables: Base, engine" in summary
+    print("✅ Dependency exports listed in the context summary")
+
+def test_report_tracks_savings():
+    design, spec = _load_fixture()
+    builder = SlicedPromptBuilder(design, spec, _GeneratedFiles())
+    sections = {'design_context': 'x' * 400, 'spec_context': 'y' * 400, 'project_context_summary': 'z' * 200}
+    builder.record_prompt("p" * 4000, sections, baseline_sections_tokens=2000)
+    report = builder.report()
+    assert report['tokens_after'] == 1000
+    assert report['tokens_before'] == 1000 - 250 + 2000
+    assert report['saved_pct'] > 0
+    print(f"✅ Prompt report: {report}")
+
+def test_structure_in_prompt_matches_design_hash():
+    """The manifest keeps a file only if its prompt would be the same: structure edits change both or neither"""
+    design, spec = _load_fixture()
+    file_path, file_type = 'backend/models.py', 'models'
+
+    def prompt_and_hash(design_data):
+        design_context = SlicedPromptBuilder(design_data, spec).design_context_for(file_path, file_type)
+        return design_context, stable_hash(design_slice_for_file(design_data, file_path, file_type))
+
+    prompt, design_hash = prompt_and_hash(design)
+    assert "- backend/schemas.py: Pydantic schemas" in prompt
+    assert "frontend/style.css" not in prompt and "backend/routers/reviews.py" not in prompt
+
+    elsewhere = copy.deepcopy(design)
+    elsewhere['folder_Structure']['structure'].append({'path': '/backend/routers/decks.py', 'description': 'Deck API endpoints file.'})
+    assert prompt_and_hash(elsewhere) == (prompt, design_hash)
+
+    sibling = copy.deepcopy(design)
+    next(item for item in sibling['folder_Structure']['structure'] if item['path'] == '/backend/schemas.py')['description'] = 'Pydantic schemas.'
+    changed_prompt, changed_hash = prompt_and_hash(sibling)
+    assert changed_prompt != prompt and changed_hash != design_hash
+    print("✅ The prompt shows the structure entries the design hash covers (the file's directory)")
+
+if __name__ == "__main__":
+    test_sliced_sections_are_smaller_than_full_documents()
+    test_dependency_context_lists_exports()
+    test_report_tracks_savings()
+    test_structure_in_prompt_matches_design_hash()
+    print("\n✅ Prompt builder tests completed successfully!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared adaptive rate limiter.
+"""
+
+import os
+import sys
+import threading
+
+# Add the current directory to path to import rate_limiter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limiter import AdaptiveRateLimiter, is_rate_limit_error, retry_after_from_error
+
+class _FakeClock:
+    """Virtual time: sleeping just advances the clock"""
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += seconds
+
+class _QuotaError(Exception):
+    code = 429
+
+def _limiter(clock, **kwargs):
+    return AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+def test_requests_are_spaced_to_the_quota():
+    clock = _FakeClock()
+    limiter = _limiter(clock, requests_per_minute=30)
+    waits = [limiter.reserve() for _ in range(4)]
+    assert waits == [0.0, 2.0, 4.0, 6.0], waits
+    print(f"✅ Reservations at 30 RPM wait {waits}s (each caller only its own deficit)")
+
+def test_token_budget_limits_large_prompts():
+    clock = _FakeClock()
+    limiter = _limiter(clock, requests_per_minute=1000, tokens_per_minute=6000)
+    assert limiter.reserve(tokens=6000) == 0.0
+    wait = limiter.reserve(tokens=3000)
+    assert abs(wait - 30.0) < 0.1, wait
+    limiter.settle(estimated_tokens=3000, actual_tokens=1000)
+    clock.sleep(30)
+    assert limiter.reserve(tokens=2000) < 0.1, "over-estimated usage is credited back"
+    print("✅ Token-per-minute budget enforced and settled with real usage")
+
+def test_backoff_on_429_and_recovery():
+    clock = _FakeClock()
+    limiter = _limiter(clock, requests_per_minute=60)
+    calls = []
+
+    def flaky():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise _QuotaError("429 RESOURCE_EXHAUSTED. Please retry in 7s.")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert calls[1] - calls[0] >= 7.0, "retry-after hint honoured"
+    assert limiter.rpm == 31.0, limiter.rpm
+    assert limiter.rate_limited == 1
+
+    # A burst of 429s within one cooldown window halves the rate only once
+    limiter.on_rate_limited(5)
+    limiter.on_rate_limited(5)
+    assert limiter.rpm == 15.5, limiter.rpm
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rpm == 60.0
+    print(f"✅ AIMD backoff and recovery: {limiter.stats()}")
+
+def test_non_quota_errors_propagate_and_parsing():
+    clock = _FakeClock()
+    limiter = _limiter(clock, requests_per_minute=60)
+    try:
+        limiter.call(lambda: (_ for _ in ()).throw(ValueError("bad output")))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("non-quota errors must not be retried by the limiter")
+    assert limiter.rate_limited == 0
+
+    assert is_rate_limit_error(Exception("RESOURCE_EXHAUSTED: quota exceeded"))
+    assert not is_rate_limit_error(Exception("500 INTERNAL"))
+    assert retry_after_from_error(Exception("{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '23s'}")) == 23.0
+    assert retry_after_from_error(Exception("no hint")) is None
+    print("✅ Other errors propagate; 429 and retry hints detected")
+
+if __name__ == "__main__":
+    test_requests_are_spaced_to_the_quota()
+    test_token_budget_limits_large_prompts()
+    test_backoff_on_429_and_recovery()
+    test_non_quota_errors_propagate_and_parsing()
+    print("\n✅ Rate limiter tests completed successfully!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the run journal used by --resume.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import run_journal
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from run_journal import RunJournal, PHASES, file_hashes
+
+def test_phases_are_checkpointed_and_resumed():
+    with tempfile.TemporaryDirectory() as base_dir:
+        journal = RunJournal.create(base_dir, "A todo app")
+        assert journal.current_phase() == "specification"
+
+        journal.start_phase("specification")
+        journal.complete_phase("specification", spec_path="/out/todo.spec.json")
+        journal.start_phase("design")
+        journal.complete_phase("design", design_path="/out/todo.design.json")
+        journal.start_phase("coding")
+        journal.fail_phase("coding", "429 RESOURCE_EXHAUSTED")
+
+        resumed = RunJournal.load(base_dir, journal.run_id)
+        assert resumed.user_description == "A todo app"
+        assert resumed.is_completed("specification") and resumed.is_completed("design")
+        assert resumed.current_phase() == "coding"
+        assert resumed.phase("coding")["status"] == "failed"
+        assert resumed.phase("design")["design_path"] == "/out/todo.design.json"
+
+        resumed.start_phase("coding")
+        assert resumed.phase("coding")["attempts"] == 2 and "error" not in resumed.phase("coding")
+        print(f"✅ Run {journal.run_id} resumes at '{resumed.current_phase()}'")
+
+def test_debug_iterations_and_listing():
+    with tempfile.TemporaryDirectory() as base_dir:
+        journal = RunJournal.create(base_dir, "A blog")
+        journal.record_debug_iteration(1, "still failing: test_create_post")
+        journal.record_debug_iteration(2, "fixed")
+        reloaded = RunJournal.load(base_dir, journal.run_id)
+        assert [it["outcome"] for it in reloaded.phase("debugging")["iterations"]] == ["still failing: test_create_post", "fixed"]
+
+        runs = RunJournal.list_runs(base_dir)
+        assert [run["run_id"] for run in runs] == [journal.run_id]
+        assert list(runs[0]["phases"]) == list(PHASES)
+
+        try:
+            RunJournal.load(base_dir, "missing-run")
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError("unknown run ids must be reported")
+        print("✅ Debug iterations recorded and runs listed")
+
+def test_file_hashes():
+    with tempfile.TemporaryDirectory() as project_root:
+        with open(os.path.join(project_root, "main.py"), "w", encoding="utf-8") as f:
+            f.write("print('hi')\n")
+        hashes = file_hashes(project_root, ["main.py", "missing.py"])
+        assert len(hashes["main.py"]) == 64 and hashes["missing.py"] is None
+        print("✅ Generated files hashed")
+
+if __name__ == "__main__":
+    test_phases_are_checkpointed_and_resumed()
+    test_debug_iterations_and_listing()
+    test_file_hashes()
+    print("\n✅ Run journal tests completed successfully!")
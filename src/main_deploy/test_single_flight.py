@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight coalescing of identical in-flight LLM calls.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the current directory to path to import single_flight
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from single_flight import SingleFlight
+from llm_cache import LLMResponseCache, acached_llm_call, cached_llm_call
+
+def test_concurrent_threads_share_one_call():
+    group = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.05)
+        return "response"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("key", slow_call))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and [result for result, _ in results] == ["response"] * 5
+    assert sum(shared for _, shared in results) == 4 and group.stats()["coalesced"] == 4
+
+    # Once finished, nothing is remembered
+    assert group.do("key", lambda: "fresh") == ("fresh", False) and group.in_flight() == 0
+    print("✅ Concurrent identical blocking calls made one upstream call")
+
+def test_errors_reach_every_caller():
+    group = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    async def run():
+        return await asyncio.gather(*(group.ado("key", failing) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) and "429" in str(error) for error in errors)
+    assert group.stats()["calls"] == 1 and group.stats()["errors"] == 1 and group.in_flight() == 0
+
+    def failing_sync():
+        raise ValueError("bad prompt")
+    try:
+        group.do("sync", failing_sync)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the error must propagate")
+    print("✅ Errors propagate to every waiting caller and are not remembered")
+
+def test_cancellation():
+    group = SingleFlight()
+    started = []
+
+    async def upstream():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "response"
+
+    async def one_caller_cancelled():
+        first = asyncio.ensure_future(group.ado("key", upstream))
+        second = asyncio.ensure_future(group.ado("key", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        assert first.cancelled()
+        return result
+
+    assert asyncio.run(one_caller_cancelled()) == ("response", True) and len(started) == 1
+
+    async def all_callers_cancelled():
+        callers = [asyncio.ensure_future(group.ado("other", upstream)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        assert group.in_flight() == 0
+        # A new caller starts a new upstream call instead of joining the cancelled one
+        return await group.ado("other", upstream)
+
+    assert asyncio.run(all_callers_cancelled()) == ("response", False) and len(started) == 3
+    print("✅ Cancelling one caller keeps the call alive; cancelling all cancels it")
+
+def test_cached_calls_coalesce():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir)
+        calls = []
+
+        async def agenerate():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "def helper():\n    return 1\n"
+
+        async def run():
+            return await asyncio.gather(*(acached_llm_call("same prompt", "model", 0.1, agenerate, cache=cache) for _ in range(4)))
+
+        assert len(set(asyncio.run(run()))) == 1 and len(calls) == 1 and cache.stores == 1
+        # Later calls are plain cache hits
+        assert cached_llm_call("same prompt", "model", 0.1, lambda: "other", cache=cache) == "def helper():\n    return 1\n"
+
+        bypassed = LLMResponseCache(cache_dir, bypass=True)
+        async def run_bypassed():
+            return await asyncio.gather(*(acached_llm_call("another prompt", "model", 0.1, agenerate, cache=bypassed) for _ in range(3)))
+        asyncio.run(run_bypassed())
+        assert len(calls) == 2 and bypassed.single_flight.stats()["coalesced"] == 2
+
+        disabled = LLMResponseCache(cache_dir, bypass=True, single_flight=False)
+        async def run_disabled():
+            return await asyncio.gather(*(acached_llm_call("another prompt", "model", 0.1, agenerate, cache=disabled) for _ in range(3)))
+        asyncio.run(run_disabled())
+        assert len(calls) == 5
+        print("✅ Cached calls share in-flight responses (also with the cache bypassed)")
+
+if __name__ == "__main__":
+    test_concurrent_threads_share_one_call()
+    test_errors_reach_every_caller()
+    test_cancellation()
+    test_cached_calls_coalesce()
+    print("\n✅ Single-flight tests completed successfully!")
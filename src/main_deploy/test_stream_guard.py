@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming generation guard.
+"""
+
+import os
+import sys
+
+# Add the current directory to path to import stream_guard
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stream_guard import GenerationAborted, StreamingCodeGuard
+
+def _feed_in_chunks(guard, text, size=7):
+    accepted = ""
+    for start in range(0, len(text), size):
+        accepted += guard.feed(text[start:start + size])
+        if guard.done:
+            break
+    return accepted + guard.finish()
+
+def _expect_abort(guard, text, reason_fragment):
+    try:
+        _feed_in_chunks(guard, text)
+    except GenerationAborted as e:
+        assert reason_fragment in e.reason, e.reason
+        return e.reason
+    raise AssertionError(f"expected an abort containing {reason_fragment!r}")
+
+def test_fence_is_stripped_and_stream_stops_at_close():
+    guard = StreamingCodeGuard("backend/main.py")
+    text = "\n```python\nimport os\n\nprint(os.name)\n```\nThis file sets up the app.\n"
+    accepted = _feed_in_chunks(guard, text)
+    assert guard.done and guard.fenced
+    assert guard.code == "import os\n\nprint(os.name)"
+    assert "```" not in accepted and "This file" not in accepted
+    print("✅ Code fence stripped, trailing prose never consumed")
+
+def test_prose_and_second_file_abort():
+    reason = _expect_abort(StreamingCodeGuard("backend/main.py"), "Sure! Here is the file:\n```python\nx = 1\n```\n", "prose")
+    print(f"✅ Prose opener aborted: {reason}")
+    reason = _expect_abort(StreamingCodeGuard("backend/main.py"), "import os\nx = 1\n\n### File: backend/routes.py\nimport sys\n", "second file")
+    print(f"✅ Second file aborted: {reason}")
+    reason = _expect_abort(StreamingCodeGuard("frontend/script.js"), "```js\nlet a = 1;\n```css\nbody {}\n```\n", "second code block")
+    print(f"✅ New fence inside the block aborted: {reason}")
+    guard = StreamingCodeGuard("backend/main.py")
+    _feed_in_chunks(guard, "# File: backend/main.py\nimport os\n")
+    assert guard.code.startswith("# File:"), "a single Python comment header is allowed"
+
+def test_python_syntax_error_aborts_early():
+    broken = "import os\n\ndef broken(:\n    pass\n\n" + "".join(f"value_{i} = {i}\n" for i in range(100))
+    guard = StreamingCodeGuard("backend/main.py", syntax_check_every=5)
+    reason = _expect_abort(guard, broken, "syntax error")
+    assert len(guard._lines) < 20, "the guard should stop long before the end of the output"
+    print(f"✅ Syntax error aborted after {len(guard._lines)} lines: {reason}")
+
+def test_incomplete_prefix_is_not_an_error():
+    code = (
+        'x = [\n    1,\n    2,\n]\n'
+        'def f(a,\n      b):\n    """Doc\n\nstring"""\n    return a\n'
+        'try:\n    pass\nexcept Exception:\n    pass\n'
+        '@decorator\nclass A:\n    pass\n'
+        'if x:\n    pass\nelse:\n    pass\n'
+    )
+    guard = StreamingCodeGuard("backend/main.py", syntax_check_every=1)
+    _feed_in_chunks(guard, code, size=3)
+    assert guard.code == code.strip()
+    print("✅ Valid code streamed through with a syntax check on every statement")
+
+def test_output_limit_and_markdown_files():
+    _expect_abort(StreamingCodeGuard("backend/main.py", max_chars=50), "x = 1\n" * 50, "limit")
+    guard = StreamingCodeGuard("README.md")
+    _feed_in_chunks(guard, "```markdown\n# App\n\n```bash\npip install -r requirements.txt\n```\n```\n")
+    assert guard.code == "# App\n\n```bash\npip install -r requirements.txt\n```", guard.code
+    print("✅ Output limit enforced; markdown keeps its inner fences")
+
+def test_text_files_may_start_with_prose():
+    for file_path in ("README.md", "docs/NOTES.txt"):
+        guard = StreamingCodeGuard(file_path)
+        _feed_in_chunks(guard, "This project is a task tracker.\nHere is how to run it:\n")
+        assert guard.code == "This project is a task tracker.\nHere is how to run it:", guard.code
+    _expect_abort(StreamingCodeGuard("backend/main.py"), "Here is the code:\nimport os\n", "prose")
+    print("✅ Prose accepted as the content of text files")
+
+if __name__ == "__main__":
+    test_fence_is_stripped_and_stream_stops_at_close()
+    test_prose_and_second_file_abort()
+    test_python_syntax_error_aborts_early()
+    test_incomplete_prefix_is_not_an_error()
+    test_output_limit_and_markdown_files()
+    test_text_files_may_start_with_prose()
+    print("\n✅ Stream guard tests completed successfully!")
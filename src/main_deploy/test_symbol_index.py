@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the SymbolIndex backing ProjectContext.
+"""
+
+import os
+import sys
+
+# Add the current directory to path to import symbol_index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from symbol_index import SymbolIndex
+
+def test_definitions_and_exports():
+    index = SymbolIndex()
+    index.add_class("Task", "backend/models.py", is_db_model=True)
+    index.add_class("TaskCreate", "backend/schemas.py")
+    index.add_function("get_db", "backend/database.py")
+    index.set_variables("backend/database.py", ["Base", "engine"])
+
+    assert index.defining_module("Task") == "backend/models.py"
+    assert index.defining_module("get_db") == "backend/database.py"
+    assert index.exports_for("backend/database.py") == {'classes': [], 'functions': ['get_db'], 'variables': ['Base', 'engine']}
+    assert index.db_models == ["Task"]
+
+    # Re-registering in another module moves the export
+    index.add_class("Task", "backend/schemas.py")
+    assert index.exports_for("backend/models.py")['classes'] == []
+    assert index.exports_for("backend/schemas.py")['classes'] == ["TaskCreate", "Task"]
+    print("✅ Definitions and exports tracked incrementally")
+
+def test_forbidden_and_conflicts():
+    index = SymbolIndex()
+    index.add_class("Task", "backend/models.py")
+    index.add_class("User", "backend/models.py")
+    index.add_class("TaskCreate", "backend/schemas.py")
+
+    assert index.forbidden_class_patterns("backend/routes.py") == ["class Task", "class User", "class TaskCreate"]
+    assert index.forbidden_class_patterns("backend/models.py") == ["class TaskCreate"]
+    assert index.conflicts("backend/routes.py", ["Task", "Router"]) == [("Task", "backend/models.py")]
+    assert index.conflicts("backend/models.py", ["Task"]) == []
+    print("✅ Forbidden redefinitions and conflicts resolved by lookup")
+
+def test_imports_are_deduplicated():
+    index = SymbolIndex()
+    assert index.add_import("routes.py", "from fastapi import APIRouter")
+    assert not index.add_import("routes.py", "from fastapi import APIRouter")
+    index.add_import("routes.py", "from sqlalchemy.orm import Session")
+    assert index.imports["routes.py"] == ["from fastapi import APIRouter", "from sqlalchemy.orm import Session"]
+    print("✅ Import sets deduplicate in O(1)")
+
+if __name__ == "__main__":
+    test_definitions_and_exports()
+    test_forbidden_and_conflicts()
+    test_imports_are_deduplicated()
+    print("\n✅ SymbolIndex tests completed successfully!")
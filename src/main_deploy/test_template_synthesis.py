@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the template fast path (boilerplate rendered from the design without the LLM).
+"""
+
+import ast
+import copy
+import os
+import sys
+
+# Add the current directory to path to import template_synthesis
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from template_synthesis import TemplateSynthesizer
+
+DESIGN = {
+    "folder_Structure": {
+        "root_Project_Directory_Name": "notes_app",
+        "structure": [
+            {"path": "backend/__init__.py", "description": "Backend package marker."},
+            {"path": "backend/database.py", "description": "Database setup."},
+            {"path": "backend/models.py", "description": "SQLAlchemy ORM models."},
+            {"path": "backend/schemas.py", "description": "Pydantic schemas."},
+            {"path": "backend/routes.py", "description": "API route definitions."},
+            {"path": "backend/main.py", "description": "FastAPI entry point."},
+        ],
+    },
+    "data_Design": {
+        "storage_Type": "SQL",
+        "database_Type": "SQLite",
+        "data_Models": [
+            {
+                "model_Name": "Notebook",
+                "fields": [
+                    {"name": "id", "type": "INTEGER", "constraints": ["primary_key: true", "autoincrement: true"]},
+                    {"name": "title", "type": "VARCHAR(100)", "constraints": ["required", "unique"]},
+                ],
+                "relationships": [{"field_Name": "notes", "type": "One-to-many", "related_Model": "Note"}],
+            },
+            {
+                "model_Name": "Note",
+                "fields": [
+                    {"name": "id", "type": "INTEGER", "constraints": ["primary_key: true"]},
+                    {"name": "notebook_id", "type": "INTEGER", "constraints": ["required"]},
+                    {"name": "body", "type": "TEXT", "constraints": ["nullable: true"]},
+                    {"name": "pinned", "type": "BOOLEAN", "constraints": ["default: false"]},
+                    {"name": "created_at", "type": "TIMESTAMP", "constraints": ["default: CURRENT_TIMESTAMP"]},
+                ],
+                "relationships": [{"field_Name": "notebook_id", "type": "Many-to-one", "related_Model": "Notebook",
+                                   "foreign_Field": "id", "on_Delete": "CASCADE"}],
+            },
+        ],
+    },
+    "interface_Design": {
+        "api_Specifications": [
+            {"endpoint": "/api/notes", "method": "GET", "description": "List notes."},
+            {"endpoint": "/api/notes", "method": "POST", "response_Format": {"success_Status": 201}},
+            {"endpoint": "/api/notes/{note_id}", "method": "GET"},
+            {"endpoint": "/api/notes/{note_id}", "method": "PUT"},
+            {"endpoint": "/api/notes/{note_id}", "method": "DELETE", "response_Format": {"success_Status": 204}},
+        ],
+    },
+}
+
+STRUCTURE = {"database_files": ["backend/database.py"]}
+
+EXPORTS = {
+    "backend/database.py": {"classes": [], "functions": ["get_db"], "variables": ["engine", "SessionLocal", "Base"]},
+    "backend/models.py": {"classes": ["Notebook", "Note"], "functions": [], "variables": []},
+    "backend/schemas.py": {"classes": ["NoteCreate", "NoteUpdate", "NoteResponse"], "functions": [], "variables": []},
+}
+
+def _exports(path):
+    return EXPORTS.get(path, {"classes": [], "functions": [], "variables": []})
+
+def _top_level_names(code):
+    tree = ast.parse(code)
+    return [node.name for node in tree.body if isinstance(node, (ast.ClassDef, ast.FunctionDef))]
+
+def test_models_and_schemas_are_rendered():
+    synthesizer = TemplateSynthesizer(DESIGN, STRUCTURE)
+    models = synthesizer.synthesize("backend/models.py", "models", _exports)
+    assert models.code is not None, models
+    assert "from backend.database import Base" in models.code
+    assert 'ForeignKey("notebooks.id", ondelete="CASCADE")' in models.code
+    assert 'notes = relationship("Note", back_populates="notebook", cascade="all, delete-orphan")' in models.code
+    assert "server_default=func.now()" in models.code
+    assert _top_level_names(models.code) == ["Notebook", "Note"]
+
+    schemas = synthesizer.synthesize("backend/schemas.py", "models", _exports)
+    assert "NoteCreate" in _top_level_names(schemas.code) and "NoteResponse" in _top_level_names(schemas.code)
+    assert "    pinned: bool = False" in schemas.code
+    assert "created_at" not in schemas.code.split("class NoteUpdate")[0], "server-side defaults are not client input"
+    assert synthesizer.synthesize("backend/__init__.py", "utility", _exports).code == ""
+    print(f"✅ Models, schemas and __init__ templated: {synthesizer.stats}")
+
+def test_crud_router_is_rendered():
+    synthesizer = TemplateSynthesizer(DESIGN, STRUCTURE)
+    router = synthesizer.synthesize("backend/routes.py", "routes", _exports)
+    assert router.code is not None, router
+    assert _top_level_names(router.code) == ["list_notes", "create_note", "get_note", "update_note", "delete_note"]
+    assert '@router.get("/api/notes/{note_id}", response_model=NoteResponse)' in router.code
+    assert "from backend.schemas import NoteCreate, NoteResponse, NoteUpdate" in router.code
+    print(f"✅ CRUD router templated ({router.reason})")
+
+def test_unsupported_designs_go_to_the_llm():
+    synthesizer = TemplateSynthesizer(DESIGN, STRUCTURE)
+    assert synthesizer.synthesize("backend/main.py", "entry_point", _exports).code is None
+
+    # The router needs get_db from the (already generated) database module
+    no_get_db = lambda path: {"classes": [], "functions": [], "variables": ["Base"]} if path == "backend/database.py" else _exports(path)
+    assert "get_db" in synthesizer.synthesize("backend/routes.py", "routes", no_get_db).reason
+
+    auth_design = copy.deepcopy(DESIGN)
+    auth_design["interface_Design"]["api_Specifications"].append(
+        {"endpoint": "/api/notes/search", "method": "GET", "request_Format": {"query": ["q"]}})
+    assert TemplateSynthesizer(auth_design, STRUCTURE).synthesize("backend/routes.py", "routes", _exports).code is None
+
+    custom_design = copy.deepcopy(DESIGN)
+    custom_design["data_Design"]["data_Models"][1]["fields"][2]["constraints"] += ["check: length(body) < 5000", "collate: nocase"]
+    result = TemplateSynthesizer(custom_design, STRUCTURE).synthesize("backend/models.py", "models", _exports)
+    assert result.code is None and result.confidence < 0.9, result
+
+    nosql_design = copy.deepcopy(DESIGN)
+    nosql_design["data_Design"]["storage_Type"] = "NoSQL"
+    assert TemplateSynthesizer(nosql_design, STRUCTURE).synthesize("backend/schemas.py", "models", _exports).code is None
+    print(f"✅ Entry points, auth/query endpoints, custom constraints and NoSQL fall back to the LLM")
+
+if __name__ == "__main__":
+    test_models_and_schemas_are_rendered()
+    test_crud_router_is_rendered()
+    test_unsupported_designs_go_to_the_llm()
+    print("\n✅ Template synthesis tests completed successfully!")
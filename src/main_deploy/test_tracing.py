@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the run tracing (JSONL spans with parent/child ids and the summary CLI).
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Add the current directory to path to import tracing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tracing
+from async_utils import run_sync
+from llm_cache import LLMResponseCache, cached_llm_call
+from rate_limiter import AdaptiveRateLimiter
+
+class _Usage:
+    prompt_token_count = 120
+    candidates_token_count = 30
+
+class _GenaiResponse:
+    usage_metadata = _Usage()
+    text = "print('hi')"
+
+def test_nested_spans_share_a_trace():
+    with tempfile.TemporaryDirectory() as base_dir:
+        path = tracing.trace_path(base_dir, "run-1")
+        with tracing.trace_run(path, "run-1"):
+            with tracing.span("coding", kind="phase") as phase:
+                with tracing.span("generate_file", kind="file", file="backend/models.py") as file_span:
+                    file_span.set(attempts=2)
+                try:
+                    with tracing.span("generate_file", kind="file", file="backend/main.py"):
+                        raise ValueError("syntax error")
+                except ValueError:
+                    pass
+        spans = {s["attrs"].get("file", s["name"]): s for s in tracing.load_spans(path)}
+        assert spans["backend/models.py"]["parent_id"] == phase.span_id == spans["coding"]["span_id"]
+        assert spans["coding"]["parent_id"] is None and spans["coding"]["trace_id"] == "run-1"
+        assert spans["backend/models.py"]["attrs"]["attempts"] == 2
+        assert spans["backend/main.py"]["status"] == "error" and "syntax error" in spans["backend/main.py"]["error"]
+
+        # Outside a traced run spans cost nothing and write nothing
+        with tracing.span("generate_file", kind="file") as noop:
+            noop.set(attempts=1)
+        tracing.annotate(retries=3)
+        assert len(tracing.load_spans(path)) == 3
+        print("✅ Spans are nested by parent id and errors are recorded")
+
+def test_concurrent_tasks_keep_their_parent():
+    async def generate(name):
+        with tracing.span("generate_file", kind="file", file=name):
+            await asyncio.sleep(0.01)
+            with tracing.span("llm_call", kind="llm"):
+                await asyncio.sleep(0.01)
+
+    async def phase():
+        with tracing.span("coding", kind="phase"):
+            await asyncio.gather(*(generate(name) for name in ("a.py", "b.py", "c.py")))
+            # Blocking wrappers called from a coroutine still attach to the current span
+            run_sync(generate("d.py"))
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        path = tracing.trace_path(base_dir, "run-2")
+        with tracing.trace_run(path, "run-2"):
+            asyncio.run(phase())
+        spans = tracing.load_spans(path)
+        by_id = {s["span_id"]: s for s in spans}
+        coding = next(s for s in spans if s["name"] == "coding")
+        files = [s for s in spans if s["name"] == "generate_file"]
+        assert len(files) == 4 and all(s["parent_id"] == coding["span_id"] for s in files)
+        for call in (s for s in spans if s["name"] == "llm_call"):
+            assert by_id[call["parent_id"]]["name"] == "generate_file"
+
+        rows = tracing.flame_summary(spans)
+        assert [(row["depth"], row["name"], row["count"]) for row in rows] == [(0, "coding", 1), (1, "generate_file", 4), (2, "llm_call", 4)]
+        print("✅ Concurrent file spans attach to the phase span")
+
+def test_llm_span_records_cache_hits_retries_and_usage():
+    class _QuotaError(Exception):
+        code = 429
+
+    limiter = AdaptiveRateLimiter(requests_per_minute=6000, default_cooldown=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _QuotaError("429 RESOURCE_EXHAUSTED")
+        tracing.record_usage(_GenaiResponse())
+        return _GenaiResponse.text
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        cache = LLMResponseCache(os.path.join(base_dir, "cache"))
+        path = tracing.trace_path(base_dir, "run-3")
+        with tracing.trace_run(path, "run-3"):
+            for _ in range(2):
+                cached_llm_call("prompt " * 40, "gemini-2.0-flash", 0.1, lambda: limiter.call(flaky), cache=cache)
+        miss, hit = tracing.load_spans(path)
+        assert (miss["kind"], miss["attrs"]["model"], miss["attrs"]["cache_hit"]) == ("llm", "gemini-2.0-flash", False)
+        assert (miss["attrs"]["retries"], miss["attrs"]["prompt_tokens"], miss["attrs"]["response_tokens"]) == (1, 120, 30)
+        assert hit["attrs"]["cache_hit"] is True and hit["attrs"]["response_tokens"] == len(_GenaiResponse.text) // 4
+        print(f"✅ LLM spans: miss {miss['attrs']}, hit {hit['attrs']}")
+
+def test_report_cli():
+    with tempfile.TemporaryDirectory() as base_dir:
+        path = tracing.trace_path(base_dir, "run-4")
+        with tracing.trace_run(path, "run-4"):
+            with tracing.span("coding", kind="phase"):
+                for name in ("backend/models.py", "backend/routes.py"):
+                    with tracing.span("generate_file", kind="file", file=name, source="generated"):
+                        with tracing.span("llm_call", kind="llm", model="gemini-2.0-flash", prompt_tokens=10, response_tokens=5):
+                            pass
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            tracing.main(["run-4", "--base-dir", base_dir, "--top", "1"])
+        report = output.getvalue()
+        assert "Trace run-4 - 5 spans" in report
+        assert "Top 1 slowest files" in report and "Top 1 slowest LLM calls" in report
+        assert "LLM calls: 2 (0 cache hits), ~30 tokens" in report
+        print(report)
+        print("✅ Report prints the flame summary and the slowest files and calls")
+
+if __name__ == "__main__":
+    test_nested_spans_share_a_trace()
+    test_concurrent_tasks_keep_their_parent()
+    test_llm_span_records_cache_hits_retries_and_usage()
+    test_report_cli()
+    print("\n✅ Tracing tests completed successfully!")
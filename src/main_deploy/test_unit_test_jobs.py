@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for collecting unit-test generation jobs and generating them concurrently.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to path to import unit_test_jobs
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from unit_test_jobs import (UnitTestJob, collect_unit_test_jobs, agenerate_for_jobs, plan_module_batches,
+                            select_stale_jobs, job_input_hashes)
+from generation_manifest import UnitTestManifest
+
+SOURCES = {
+    'app/crud.py': 'def get_item(db, item_id):\n    return db.get(item_id)\n\ndef _helper():\n    pass\n\nclass Repo:\n    def save(self, item):\n        return item\n    def _private(self):\n        pass\n',
+    'app/routers/items.py': 'async def get_item(item_id):\n    return {"id": item_id}\n',
+    'app/broken.py': 'def broken(:\n',
+    'app/tests/test_skip.py': 'def test_something():\n    pass\n',
+}
+
+def write_sources(root):
+    for rel_path, content in SOURCES.items():
+        path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+def test_collect_jobs():
+    with tempfile.TemporaryDirectory() as root:
+        write_sources(root)
+        jobs = collect_unit_test_jobs(root, os.path.join(root, 'app'))
+    assert [job.key for job in jobs] == ['app.crud.get_item', 'app.crud.Repo.save', 'app.routers.items.get_item']
+    assert [job.output_name for job in jobs] == ['test_get_item.py', 'test_Repo_save.py', 'test_app_routers_items_get_item.py']
+    assert jobs[1].is_method and "class Repo" in jobs[1].context and jobs[2].code.startswith("async def get_item")
+    print("✅ Public functions and methods collected; duplicate output names made unique")
+
+def test_bounded_concurrent_generation():
+    with tempfile.TemporaryDirectory() as root:
+        write_sources(root)
+        jobs = collect_unit_test_jobs(root, os.path.join(root, 'app'))
+
+    in_flight, peak, saved = [0], [0], []
+
+    async def generate(job):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.1)
+        in_flight[0] -= 1
+        if job.is_method:
+            return None
+        if job.module_path.endswith('items'):
+            raise RuntimeError("model unavailable")
+        return f"def test_{job.function_name}():\n    pass\n"
+
+    started = time.perf_counter()
+    report = asyncio.run(agenerate_for_jobs(jobs, generate, lambda job, code: saved.append(job.output_name), max_workers=2))
+    elapsed = time.perf_counter() - started
+
+    assert peak[0] == 2 and elapsed < 0.28  # serially: 0.3s
+    assert saved == ['test_get_item.py']
+    assert report['jobs'] == 3 and report['generated'] == 1 and report['empty'] == 1 and report['failed'] == 1
+    assert report['jobs_per_minute'] > 0
+    print("✅ Jobs generated concurrently up to the worker limit; failures do not stop the rest")
+
+def test_module_batches_respect_the_token_budget():
+    small = "def f():\n    return 1\n"
+    big = "def g():\n" + "    x = 1\n" * 400
+    jobs = [UnitTestJob('app.crud', name, small, 'app/crud.py') for name in ('a', 'b', 'c')]
+    jobs += [UnitTestJob('app.crud', 'huge', big, 'app/crud.py'), UnitTestJob('app.models', 'd', small, 'app/models.py')]
+    groups = plan_module_batches(jobs, token_budget=2000)
+    assert [[job.function_name for job in group] for group in groups] == [['a', 'b', 'c'], ['huge'], ['d']]
+    # A smaller budget splits the module; too small for anything means per-function requests
+    assert [len(group) for group in plan_module_batches(jobs, token_budget=1300)] == [2, 1, 1, 1]
+    assert [len(group) for group in plan_module_batches(jobs, token_budget=0)] == [1, 1, 1, 1, 1]
+    print("✅ Jobs grouped per module within the token budget")
+
+def test_batched_generation_with_fallback():
+    with tempfile.TemporaryDirectory() as root:
+        write_sources(root)
+        jobs = collect_unit_test_jobs(root, os.path.join(root, 'app'))
+        jobs.append(UnitTestJob('app.models', 'to_dict', "def to_dict(self):\n    return {}\n", 'app/models.py', class_name='Item'))
+        jobs.append(UnitTestJob('app.models', 'validate', "def validate(self):\n    return True\n", 'app/models.py', class_name='Item'))
+
+    batch_calls, single_calls, saved = [], [], {}
+
+    async def generate_batch(group):
+        batch_calls.append([job.key for job in group])
+        if group[0].module_path == 'app.models':
+            return None
+        return {job.output_name: f"def test_x():\n    # source_info: {job.key}\n    pass\n" for job in group}
+
+    async def generate(job):
+        single_calls.append(job.key)
+        return "def test_y():\n    pass\n"
+
+    report = asyncio.run(agenerate_for_jobs(jobs, generate, lambda job, code: saved.__setitem__(job.output_name, code),
+                                            max_workers=2, generate_batch=generate_batch, token_budget=5000))
+    assert batch_calls == [['app.crud.get_item', 'app.crud.Repo.save'], ['app.models.Item.to_dict', 'app.models.Item.validate']]
+    # The module with one function and the failed batch are generated per function
+    assert single_calls == ['app.routers.items.get_item', 'app.models.Item.to_dict', 'app.models.Item.validate']
+    assert "# source_info: app.crud.Repo.save" in saved['test_Repo_save.py'] and len(saved) == 5
+    assert report['requests'] == 5 and report['batched'] == 2 and report['generated'] == 5
+    print("✅ One request per module; failed batches fall back to per-function generation")
+
+def test_only_changed_functions_are_regenerated():
+    with tempfile.TemporaryDirectory() as workspace:
+        root = os.path.join(workspace, 'project')
+        write_sources(root)
+        source_dir, output_dir = os.path.join(root, 'app'), os.path.join(root, 'tests', 'unit')
+        os.makedirs(output_dir)
+
+        def run(framework='fastapi', model='model-a'):
+            manifest = UnitTestManifest.load(root)
+            jobs = collect_unit_test_jobs(root, source_dir)
+            stale = select_stale_jobs(jobs, manifest, framework, model, output_dir)
+            for job in stale:
+                test_file = os.path.join(output_dir, job.output_name)
+                with open(test_file, 'w', encoding='utf-8') as f:
+                    f.write(f"# source_info: {job.key}\n")
+                manifest.record_test(job.key, job_input_hashes(job, framework, model), test_file, f"# {job.key}")
+            manifest.save()
+            return [job.key for job in stale]
+
+        assert len(run()) == 3
+        assert run() == []
+        assert os.path.isfile(os.path.join(workspace, 'project.tests.manifest.json'))
+
+        # The debug agent edits one function and deletes another
+        with open(os.path.join(source_dir, 'crud.py'), 'w', encoding='utf-8') as f:
+            f.write('def get_item(db, item_id):\n    return db.query(item_id)\n')
+        assert run() == ['app.crud.get_item']
+        assert sorted(os.listdir(output_dir)) == ['test_app_routers_items_get_item.py', 'test_get_item.py']
+
+        # A deleted test file or another model regenerates
+        os.remove(os.path.join(output_dir, 'test_get_item.py'))
+        assert run() == ['app.crud.get_item']
+        assert len(run(model='model-b')) == 2
+        print("✅ Only new or changed functions regenerated; tests of deleted functions removed")
+
+if __name__ == "__main__":
+    test_collect_jobs()
+    test_bounded_concurrent_generation()
+    test_module_batches_respect_the_token_budget()
+    test_batched_generation_with_fallback()
+    test_only_changed_functions_are_regenerated()
+    print("\n✅ Unit test job tests completed successfully!")
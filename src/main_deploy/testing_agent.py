@@ -1,6 +1,5 @@
 import os
 import json
-import time
 import logging
 import ast
 import subprocess
@@ -8,8 +7,16 @@ import re
 import argparse
 import sys
 import config
+from llm_cache import acached_llm_call
+from rate_limiter import get_rate_limiter
+from async_utils import run_sync, run_subprocess, script_command
+import tracing
+from llm_clients import generative_model
+from unit_test_jobs import collect_unit_test_jobs, agenerate_for_jobs, select_stale_jobs, job_input_hashes
+from generation_manifest import UnitTestManifest
+from design_slices import stable_hash
+from generation_batches import parse_multi_file_response, BatchParseError
 
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,7 +28,9 @@ UNIT_TEST_SUBDIR = "unit"
 INTEGRATION_TEST_SUBDIR = "integration"
 TEST_LOG_FILE = "test_results.log"
 TEST_HISTORY_LOG_FILE = "test_results_history.log"
+# Written by older versions to skip test generation altogether; replaced by UnitTestManifest and removed when found
 TEST_GENERATED_FLAG = ".test_generated"
+INTEGRATION_MANIFEST_KEY = "integration"
 
 # DEFAULT_MODEL = 'gemini-2.0-flash'
 # BASE_GENERATED_DIR = os.getenv('BASE_GENERATED_DIR', 'code_generated_result')
@@ -358,6 +367,12 @@ def update_requirements_for_testing(project_root):
         return False
 
 def install_project_dependencies(project_root):
+    return run_sync(ainstall_project_dependencies(project_root))
+
+async def ainstall_project_dependencies(project_root):
+    if not config.SETUP_PROJECT_ENV:
+        logger.info("SETUP_PROJECT_ENV is off, skipping dependency installation.")
+        return
     venv_python_path = os.path.join(project_root, "venv", "Scripts", "python.exe")
     requirements_file_name = "requirements.txt"
     requirements_path_full = os.path.join(project_root, requirements_file_name)
@@ -372,14 +387,14 @@ def install_project_dependencies(project_root):
 
     logger.info(f"Installing dependencies from {requirements_path_full} into project venv...")
     try:
-        result = subprocess.run(
+        result = await run_subprocess(
             [venv_python_path, "-m", "pip", "install", "-r", requirements_file_name],
-            capture_output=True,
-            text=True,
             check=True,
             cwd=project_root
         )
-        logger.info(f"Successfully installed dependencies. Pip output:\n{result.stdout}")
+        logger.info("Successfully installed dependencies.")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Pip output:\n{result.stdout}")
         if result.stderr:
             logger.warning(f"Pip warnings/errors during dependency installation:\n{result.stderr}")
     except subprocess.CalledProcessError as e:
@@ -388,15 +403,8 @@ def install_project_dependencies(project_root):
         logger.error(f"Pip stderr:\n{e.stderr}")
         raise
 
-def generate_unit_tests(function_code, function_name, module_path, framework, context, is_method=False, class_name=None):
-    if not function_code:
-        logger.warning(f"No function code provided for {function_name}. Skipping unit test generation.")
-        return None
-    
-    model = genai.GenerativeModel(config.CURRENT_MODELS['testing'])
-    logger.info(f"Using model: {config.CURRENT_MODELS['testing']} for unit test generation for '{function_name}'.")
-
-    framework_specific = {
+def _framework_hints(framework, module_path):
+    return {
         "flask": {
             "imports": "from flask import request, render_template, redirect, url_for",
             "mock_targets": f"{module_path}.request, {module_path}.render_template, {module_path}.redirect, {module_path}.url_for",
@@ -409,6 +417,19 @@ def generate_unit_tests(function_code, function_name, module_path, framework, co
         }
     }.get(framework, {"imports": "", "mock_targets": "", "context_hint": ""})
 
+def generate_unit_tests(function_code, function_name, module_path, framework, context, is_method=False, class_name=None):
+    return run_sync(agenerate_unit_tests(function_code, function_name, module_path, framework, context, is_method, class_name))
+
+async def agenerate_unit_tests(function_code, function_name, module_path, framework, context, is_method=False, class_name=None):
+    if not function_code:
+        logger.warning(f"No function code provided for {function_name}. Skipping unit test generation.")
+        return None
+    
+    model = generative_model(config.CURRENT_MODELS['testing'])
+    logger.info(f"Using model: {config.CURRENT_MODELS['testing']} for unit test generation for '{function_name}'.")
+
+    framework_specific = _framework_hints(framework, module_path)
+
     target_import = ""
     target_source_info = ""
     test_file_prefix = "" 
@@ -473,17 +494,20 @@ def generate_unit_tests(function_code, function_name, module_path, framework, co
 
     Generate the Python code for the test file now.
     """
-    time.sleep(config.API_DELAY_SECONDS)
+    async def call_model():
+        response = await get_rate_limiter().acall(lambda: model.generate_content_async(prompt), estimated_tokens=len(prompt) // 4)
+        text = response.text.strip()
+        if text.startswith("```python"):
+            text = text[len("```python"):].strip()
+        if text.endswith("```"):
+            text = text[:-3].strip()
+        return text
 
     try:
-        response = model.generate_content(prompt)
-        generated_text = response.text.strip()
-        if generated_text.startswith("```python"):
-            generated_text = generated_text[len("```python"):].strip()
-        if generated_text.endswith("```"):
-            generated_text = generated_text[:-3].strip()
+        # Temperature is the model default for the GenerativeModel
+        generated_text = await acached_llm_call(prompt, config.CURRENT_MODELS['testing'], None, call_model)
         
-        if not generated_text.strip():
+        if not generated_text or not generated_text.strip():
             logger.warning(f"LLM returned empty content for unit tests for {function_name}. Skipping file creation.")
             return None
         return generated_text
@@ -491,8 +515,111 @@ def generate_unit_tests(function_code, function_name, module_path, framework, co
         logger.error(f"Failed to generate unit tests for {function_name}: {e}", exc_info=True)
         return None
 
+async def agenerate_module_unit_tests(jobs, framework):
+    """
+    Unit tests for several functions/methods of one module in a single request.
+    Returns {test file name: code} with one file per job, or None (the caller then generates them one by one).
+    """
+    module_path = jobs[0].module_path
+    model = generative_model(config.CURRENT_MODELS['testing'])
+    logger.info(f"Using model: {config.CURRENT_MODELS['testing']} for unit test generation for {len(jobs)} functions/methods of '{module_path}'.")
+    framework_specific = _framework_hints(framework, module_path)
+    expected_files = [job.output_name for job in jobs]
+
+    targets = []
+    for job in jobs:
+        if job.is_method:
+            target_import = f"from {module_path} import {job.class_name}"
+            test_prefix = f"test_{job.class_name}_{job.function_name}"
+            kind = f"method of class `{job.class_name}` (instantiate or mock the class to test it; mock `self` if necessary)"
+        else:
+            target_import = f"from {module_path} import {job.function_name}"
+            test_prefix = f"test_{job.function_name}"
+            kind = "top-level function"
+        targets.append(f"""
+    ### {job.label}
+    Test File: {job.output_name}
+    Kind: {kind}
+    Target Import: `{target_import}`
+    Test Function Names: `{test_prefix}_<scenario>`
+    Source Info Comment: `# source_info: {job.key}`
+    ```python
+    {job.code}
+    ```""")
+
+    prompt = f"""
+    You are an expert Python test engineer specializing in the pytest framework and testing {framework} applications.
+    Your task is to generate comprehensive unit tests, using the pytest framework and `pytest-mock`, for each of the {len(jobs)} functions/methods below.
+    They all live in the module `{module_path}`. Write one separate test file per function/method.
+
+    Module Path: {module_path}
+    Framework: {framework}
+    {framework_specific['context_hint']}
+
+    Functions/methods to test:
+    {''.join(targets)}
+
+    Requirements for Test Generation:
+    1.  **Output Format**: Your response MUST consist only of the test files below, each written exactly as:
+        <<<FILE: test_file_name.py>>>
+        ...raw Python code of the test file...
+        <<<END FILE>>>
+        Write exactly these files, in this order: {', '.join(expected_files)}. No explanations or markdown outside the file blocks.
+    2.  **Test Naming Convention**: All test functions MUST start with the `Test Function Names` prefix given for their target, followed by a descriptive scenario suffix.
+    3.  **Imports**: Each file is standalone: include all necessary imports: `pytest`, `unittest.mock` (or `pytest-mock`'s `mocker` fixture), relevant modules from `{framework_specific['imports']}`, and the `Target Import` of its function/method, using the module path `{module_path}` exactly.
+    4.  **Mocking Dependencies**:
+        -   Properly mock all external dependencies.
+        -   Specifically mock: {framework_specific['mock_targets']}.
+        -   Crucially, ensure patches target the **correct module where the object is looked up by the function under test**, not just where it's defined.
+    5.  **Test Scenarios**: For every function/method, test the "happy path", edge cases, invalid inputs and error conditions; verify calls to mocked collaborators and assert return values or side effects.
+    6.  **Source Info**: Include the `Source Info Comment` of the target at the beginning of each test function's body. This metadata is critical for tracing test failures back to the source.
+    7.  **Runnability**: Ensure tests are runnable with `pytest` from the project root.
+
+    Generate the test files now.
+    """
+
+    def parse(text):
+        files = parse_multi_file_response(text or "", expected_files)
+        for job in jobs:
+            code = files[job.output_name]
+            if _syntax_error(code):
+                raise BatchParseError(f"syntax error in {job.output_name}")
+            if "# source_info:" not in code:
+                raise BatchParseError(f"{job.output_name} has no # source_info tags")
+        return files
+
+    def is_valid(text):
+        try:
+            parse(text)
+            return True
+        except BatchParseError:
+            return False
+
+    async def call_model():
+        response = await get_rate_limiter().acall(lambda: model.generate_content_async(prompt), estimated_tokens=len(prompt) // 4)
+        text = response.text.strip()
+        parse(text)
+        return text
+
+    try:
+        generated_text = await acached_llm_call(prompt, config.CURRENT_MODELS['testing'], None, call_model, validator=is_valid)
+        return parse(generated_text)
+    except Exception as e:
+        logger.warning(f"⚠️ Batched unit test generation for '{module_path}' failed ({e}); generating its tests one by one")
+        return None
+
+def _syntax_error(code):
+    try:
+        ast.parse(code)
+        return None
+    except SyntaxError as e:
+        return f"{e.msg} (line {e.lineno})"
+
 def generate_integration_tests(app_package, framework, discovered_api_handlers, project_root):
-    model = genai.GenerativeModel(config.CURRENT_MODELS['testing'])
+    return run_sync(agenerate_integration_tests(app_package, framework, discovered_api_handlers, project_root))
+
+async def agenerate_integration_tests(app_package, framework, discovered_api_handlers, project_root):
+    model = generative_model(config.CURRENT_MODELS['testing'])
     logger.info(f"Generating integration tests for {app_package} using {config.CURRENT_MODELS['testing']}")
     
     framework_specific = {
@@ -551,10 +678,9 @@ def generate_integration_tests(app_package, framework, discovered_api_handlers,
 
     Generate the Python code for the integration test file now.
     """
-    time.sleep(config.API_DELAY_SECONDS)
-
     try:
-        response = model.generate_content(prompt)
+        with tracing.span('llm_call', kind='llm', model=config.CURRENT_MODELS['testing'], prompt_tokens=len(prompt) // 4, cache_hit=False):
+            response = await get_rate_limiter().acall(lambda: model.generate_content_async(prompt), estimated_tokens=len(prompt) // 4)
         generated_text = response.text.strip()
         if generated_text.startswith("```python"):
             generated_text = generated_text[len("```python"):].strip()
@@ -570,6 +696,9 @@ def generate_integration_tests(app_package, framework, discovered_api_handlers,
         return None
 
 def run_test(project_root):
+    return run_sync(arun_test(project_root))
+
+async def arun_test(project_root):
     bat_file = os.path.join(project_root, "run_test.bat")
     test_log_file = os.path.join(project_root, TEST_LOG_FILE)
 
@@ -582,16 +711,11 @@ def run_test(project_root):
     logger.info(f"Executing run_test.bat from {project_root}. Results will be in {test_log_file}")
     
     try:
-        result = subprocess.run(
-            f'"{bat_file}"',
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=project_root,
-            check=False
-        )
+        with tracing.span('pytest', kind='test', project_root=project_root) as test_span:
+            result = await run_subprocess(script_command(bat_file), cwd=project_root)
+            test_span.set(exit_code=result.returncode)
         
-        if result.stdout:
+        if result.stdout and logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"run_test.bat stdout (from debug_test_agent.log):\n{result.stdout}")
         if result.stderr:
             logger.error(f"run_test.bat stderr (from debug_test_agent.log):\n{result.stderr}")
@@ -828,9 +952,8 @@ def discover_api_handlers_from_code(project_root: str, app_package: str, framewo
                     logger.warning(f"Error processing '{file_path}' for API discovery: {e}", exc_info=True)
     return discovered_handlers
 
-#The main entry point for the testing phase. It orchestrates test generation environment setup, and test execution for a given project.
-def run_test_generation_and_execution(project_root: str, design_data: dict, spec_data: dict) -> list:
-    logger.info(f"Starting test pipeline for project at: {project_root}")
+def _test_parameters(design_data: dict, spec_data: dict) -> tuple:
+    """(framework, app_package) of the generated project, from the spec and design"""
     try:
         framework = spec_data['technology_Stack']['backend']['framework'].lower()
         # detect the application package name
@@ -844,133 +967,119 @@ def run_test_generation_and_execution(project_root: str, design_data: dict, spec
     except KeyError as e:
         logger.error(f"Could not determine framework or app package from spec/design data: Missing key {e}")
         raise ValueError(f"Invalid spec/design data: Missing key {e}")
+    return framework, app_package
+
+#Generate tests incrementally: only functions/endpoints that are new or changed since the tests were last generated
+async def agenerate_stale_tests(project_root: str, framework: str, app_package: str):
+    base_test_dir = os.path.join(project_root, TEST_OUTPUT_DIR_NAME)
+    unit_test_output_dir = os.path.join(base_test_dir, UNIT_TEST_SUBDIR)
+    integration_test_output_dir = os.path.join(base_test_dir, INTEGRATION_TEST_SUBDIR)
+    manifest = UnitTestManifest.load(project_root)
+    test_model = config.CURRENT_MODELS['testing']
+    os.makedirs(unit_test_output_dir, exist_ok=True)
+    os.makedirs(integration_test_output_dir, exist_ok=True)
+    
+    #generate unit tests: collect every public function/method first, then generate them concurrently
+    source_dir = os.path.join(project_root, app_package)
+    if os.path.exists(source_dir):
+        all_jobs = collect_unit_test_jobs(project_root, source_dir)
+        jobs = select_stale_jobs(all_jobs, manifest, framework, test_model, unit_test_output_dir)
+        logger.info(f"♻️ Unit tests of {len(all_jobs) - len(jobs)}/{len(all_jobs)} functions/methods are up to date")
+        logger.info(f"Generating unit tests for {len(jobs)} functions/methods with up to {config.TEST_GENERATION_WORKERS} concurrent requests"
+                    + (f" (batched per module, {config.UNIT_TEST_BATCH_TOKENS} tokens per request)..." if config.BATCH_UNIT_TESTS else "..."))
+
+        def save_unit_tests(job, test_code):
+            test_file = os.path.join(unit_test_output_dir, job.output_name)
+            with open(test_file, 'w', encoding='utf-8') as f:
+                f.write(test_code)
+            logger.info(f"Saved unit tests to {test_file}")
+            manifest.record_test(job.key, job_input_hashes(job, framework, test_model), test_file, test_code)
+            manifest.save()
+
+        with tracing.span('unit_test_generation', kind='stage', jobs=len(jobs)):
+            report = await agenerate_for_jobs(
+                jobs,
+                lambda job: agenerate_unit_tests(job.code, job.function_name, job.module_path, framework, job.context,
+                                                 is_method=job.is_method, class_name=job.class_name),
+                save_unit_tests,
+                max_workers=config.TEST_GENERATION_WORKERS,
+                generate_batch=(lambda group: agenerate_module_unit_tests(group, framework)) if config.BATCH_UNIT_TESTS else None,
+                token_budget=config.UNIT_TEST_BATCH_TOKENS
+            )
+            tracing.annotate(**report)
+        logger.info(f"📊 Unit test generation: {report['generated']}/{report['jobs']} files from {report['requests']} requests "
+                    f"({report['batched']} batched) in {report['elapsed_seconds']}s "
+                    f"({report['jobs_per_minute']} functions/min, {report['empty'] + report['failed']} without tests)")
+        logger.info(f"Rate limiter stats: {get_rate_limiter().stats()}")
+    else:
+        logger.error(f"Source directory '{source_dir}' not found. Cannot generate unit tests.")
+    
+    #discover API handlers and generate Integration Tests
+    logger.info("Discovering API handlers from source code for integration tests...")
+    discovered_handlers = discover_api_handlers_from_code(project_root, app_package, framework)
+    integration_test_file = os.path.join(integration_test_output_dir, "test_integration.py")
+    integration_hashes = {
+        'endpoints': stable_hash(discovered_handlers),
+        'generator': stable_hash({'framework': framework, 'model': test_model, 'app_package': app_package}),
+    }
+    if not discovered_handlers:
+        logger.warning("No API handlers discovered for integration tests. Skipping integration test generation.")
+        if manifest.test_file(INTEGRATION_MANIFEST_KEY) and os.path.isfile(integration_test_file):
+            os.remove(integration_test_file)
+            logger.info(f"🗑️ Removed {integration_test_file} (no endpoints left)")
+        manifest.forget(INTEGRATION_MANIFEST_KEY)
+    elif manifest.is_up_to_date(INTEGRATION_MANIFEST_KEY, integration_hashes, integration_test_file):
+        logger.info(f"♻️ Integration tests are up to date ({len(discovered_handlers)} endpoints unchanged)")
+    else:
+        integration_test_code = await agenerate_integration_tests(app_package, framework, discovered_handlers, project_root)
+        if integration_test_code:
+            with open(integration_test_file, 'w', encoding='utf-8') as f:
+                f.write(integration_test_code)
+            logger.info(f"Saved integration tests to {integration_test_file}")
+            manifest.record_test(INTEGRATION_MANIFEST_KEY, integration_hashes, integration_test_file, integration_test_code, kind='integration')
+    manifest.save()
+
+#Between debug iterations: regenerate the tests of the functions/endpoints the fixes changed
+def refresh_generated_tests(project_root: str, design_data: dict, spec_data: dict):
+    return run_sync(arefresh_generated_tests(project_root, design_data, spec_data))
+
+async def arefresh_generated_tests(project_root: str, design_data: dict, spec_data: dict):
+    framework, app_package = _test_parameters(design_data, spec_data)
+    await agenerate_stale_tests(project_root, framework, app_package)
+
+#The main entry point for the testing phase. It orchestrates test generation environment setup, and test execution for a given project.
+def run_test_generation_and_execution(project_root: str, design_data: dict, spec_data: dict) -> list:
+    return run_sync(arun_test_generation_and_execution(project_root, design_data, spec_data))
+
+async def arun_test_generation_and_execution(project_root: str, design_data: dict, spec_data: dict) -> list:
+    logger.info(f"Starting test pipeline for project at: {project_root}")
+    framework, app_package = _test_parameters(design_data, spec_data)
     
     create_pytest_ini(project_root)
     base_test_dir = os.path.join(project_root, TEST_OUTPUT_DIR_NAME)
     unit_test_output_dir = os.path.join(base_test_dir, UNIT_TEST_SUBDIR)
     integration_test_output_dir = os.path.join(base_test_dir, INTEGRATION_TEST_SUBDIR)
-    test_flag_file = os.path.join(project_root, TEST_GENERATED_FLAG)
     venv_python_path = os.path.join(project_root, "venv", "Scripts", "python.exe")
     
-    #generate tests if not already generated
-    if not os.path.exists(test_flag_file):
-        logger.info("Test generation flag not found. Generating tests...")
-        os.makedirs(unit_test_output_dir, exist_ok=True)
-        os.makedirs(integration_test_output_dir, exist_ok=True)
-        
-        ensure_init_py_recursive(os.path.join(project_root, app_package))
-        ensure_init_py_recursive(unit_test_output_dir)
-        ensure_init_py_recursive(integration_test_output_dir)
-        
-        if update_requirements_for_testing(project_root):
-            install_project_dependencies(project_root)
-            
-        #generate unit tests by walking through the source directory
-        source_dir = os.path.join(project_root, app_package)
-        if os.path.exists(source_dir):
-            for root, _, files in os.walk(source_dir):
-                    if 'venv' in root or 'node_modules' in root or 'tests' in root:
-                        continue
-                    for file in files:
-                        if file.endswith(".py") and file != "__init__.py":
-                            file_path = os.path.join(root, file)
-                            relative_to_project_root = os.path.relpath(file_path, project_root)
-                            module_name = relative_to_project_root.replace(os.sep, ".")[:-3]
-
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                source = f.read()
-                            tree = ast.parse(source)
-                            
-                            top_level_functions = [
-                                n for n in tree.body
-                                if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
-                                and not n.name.startswith('_')
-                            ]
-                            
-                            class_methods = []
-                            for node in tree.body:
-                                if isinstance(node, ast.ClassDef):
-                                    class_name = node.name
-                                    for method_node in node.body:
-                                        if isinstance(method_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                                            if not method_node.name.startswith('_'):
-                                                class_methods.append((class_name, method_node))
-                            
-                            for func_node in top_level_functions:
-                                func_name = func_node.name
-                                func_code = ast.get_source_segment(source, func_node)
-                                if func_code:
-                                    logger.debug(f"Generating unit tests for function: {func_name} in module: {module_name}")
-                                    test_code = generate_unit_tests(
-                                        func_code,
-                                        func_name,
-                                        module_name,
-                                        framework,
-                                        f"Function {func_name} is in module {module_name}. Ensure all its dependencies are mocked effectively.",
-                                        is_method=False,
-                                        class_name=None
-                                    )
-                                    if test_code:
-                                        test_file = os.path.join(unit_test_output_dir, f"test_{func_name}.py")
-                                        with open(test_file, 'w', encoding='utf-8') as f:
-                                            f.write(test_code)
-                                        logger.info(f"Saved unit tests to {test_file}")
-                                    else:
-                                        logger.warning(f"No test code generated by LLM for '{func_name}' in '{module_name}'. Skipping file creation.")
-                                else:
-                                    logger.warning(f"Could not extract code for function '{func_name}' from '{file_path}'. Skipping unit test generation.")
-
-                            for class_name, method_node in class_methods:
-                                method_name = method_node.name
-                                method_code = ast.get_source_segment(source, method_node)
-                                if method_code:
-                                    logger.debug(f"Generating unit tests for method: {class_name}.{method_name} in module: {module_name}")
-                                    test_code = generate_unit_tests(
-                                        method_code,
-                                        method_name,
-                                        module_name,
-                                        framework,
-                                        f"Method {method_name} is part of class {class_name} in module {module_name}. Ensure you instantiate or mock the class to test this method. Mock its `self` argument if necessary.",
-                                        is_method=True,
-                                        class_name=class_name
-                                    )
-                                    if test_code:
-                                        test_file = os.path.join(unit_test_output_dir, f"test_{class_name}_{method_name}.py")
-                                        with open(test_file, 'w', encoding='utf-8') as f:
-                                            f.write(test_code)
-                                        logger.info(f"Saved unit tests to {test_file}")
-                                    else:
-                                        logger.warning(f"No test code generated by LLM for method '{class_name}.{method_name}' in '{module_name}'. Skipping file creation.")
-                                else:
-                                    logger.warning(f"Could not extract code for method '{class_name}.{method_name}' from '{file_path}'. Skipping unit test generation.")
-        else:
-            logger.error(f"Source directory '{source_dir}' not found. Cannot generate unit tests.")
-        
-        #discover API handlers and generate Integration Tests
-        logger.info("Discovering API handlers from source code for integration tests...")
-        discovered_handlers = discover_api_handlers_from_code(project_root, app_package, framework)
-        if discovered_handlers:
-            integration_test_code = generate_integration_tests(app_package, framework, discovered_handlers, project_root)
-            if integration_test_code:
-                test_file = os.path.join(integration_test_output_dir, "test_integration.py")
-                with open(test_file, 'w', encoding='utf-8') as f:
-                    f.write(integration_test_code)
-                logger.info(f"Saved integration tests to {test_file}")
-        else:
-            logger.warning("No API handlers discovered for integration tests. Skipping integration test generation.")
-            
-        #create the flag to prevent re-generating tests
-        with open(test_flag_file, 'w', encoding='utf-8') as f:
-            f.write(f"Tests generated on {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Created test generation flag file at: {test_flag_file}")
+    legacy_flag_file = os.path.join(project_root, TEST_GENERATED_FLAG)
+    if os.path.exists(legacy_flag_file):
+        os.remove(legacy_flag_file)
+    os.makedirs(unit_test_output_dir, exist_ok=True)
+    os.makedirs(integration_test_output_dir, exist_ok=True)
     
-    else:
-        logger.info("Test generation flag found. Skipping test generation.")
+    ensure_init_py_recursive(os.path.join(project_root, app_package))
+    ensure_init_py_recursive(unit_test_output_dir)
+    ensure_init_py_recursive(integration_test_output_dir)
+    
+    if update_requirements_for_testing(project_root):
+        await ainstall_project_dependencies(project_root)
+    
+    await agenerate_stale_tests(project_root, framework, app_package)
         
     #execute tests
     logger.info("Executing test suite...")
     generate_run_test_bat_script(project_root, venv_python_path)
-    failed_tests_info = run_test(project_root)
+    failed_tests_info = await arun_test(project_root)
 
     if failed_tests_info:
         logger.error(f"TESTING PHASE FAILED: Found {len(failed_tests_info)} test failures.")
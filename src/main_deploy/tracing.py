@@ -0,0 +1,270 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """
+    Appends finished spans of one run to a JSONL file.
+
+    A span is written when it ends, so children appear before their parent and a crashed
+    run still leaves every completed span on disk. Each line holds
+    trace_id, span_id, parent_id, name, kind, start (epoch seconds), duration_ms, status,
+    error and attrs.
+    """
+
+    def __init__(self, path: str, trace_id: str):
+        self.path = path
+        self.trace_id = trace_id
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                logger.debug(f"Failed to write trace span to {self.path}: {e}")
+
+
+class Span:
+    """One timed operation; use as a context manager (also inside coroutines)"""
+
+    def __init__(self, tracer: Optional[Tracer], name: str, kind: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.span_id = os.urandom(8).hex()
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = None
+        self._started = None
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> 'Span':
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _current_span.reset(self._token)
+        record = {
+            'trace_id': self.tracer.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start': round(self.start, 6),
+            'duration_ms': round(duration_ms, 3),
+            'status': 'error' if exc_type else 'ok',
+            'attrs': self.attrs,
+        }
+        if exc_type:
+            record['error'] = f"{exc_type.__name__}: {exc}"[:500]
+        self.tracer.write(record)
+        return False
+
+
+class _NoopSpan:
+    """Returned by `span` when no trace is active, so instrumentation costs almost nothing"""
+
+    span_id = None
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_tracer: ContextVar[Optional[Tracer]] = ContextVar('current_tracer', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def trace_path(base_output_dir: str, run_id: str) -> str:
+    """Traces are stored next to the run journal: <BASE_OUTPUT_DIR>/.runs/<run_id>.trace.jsonl"""
+    return os.path.join(base_output_dir, '.runs', f"{run_id}.trace.jsonl")
+
+
+@contextmanager
+def trace_run(path: str, trace_id: str):
+    """Record every span opened in this context (including tasks and threads started from it) to `path`"""
+    tracer = Tracer(path, trace_id)
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+def span(name: str, kind: str = 'internal', **attrs):
+    """Open a child span of the current span; a no-op outside `trace_run`"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, kind, attrs)
+
+
+def current_span():
+    return _current_span.get() or _NOOP_SPAN
+
+
+def annotate(**attrs):
+    """Add attributes to the current span (e.g. retries seen by the rate limiter)"""
+    current_span().set(**attrs)
+
+
+def usage_attributes(result) -> Dict[str, int]:
+    """Prompt/response token counts of a langchain AIMessage or a google-genai response, if reported"""
+    usage = getattr(result, 'usage_metadata', None)
+    if isinstance(usage, dict):
+        attrs = {'prompt_tokens': usage.get('input_tokens'), 'response_tokens': usage.get('output_tokens')}
+    elif usage is not None:
+        attrs = {'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+                 'response_tokens': getattr(usage, 'candidates_token_count', None)}
+    else:
+        return {}
+    return {key: value for key, value in attrs.items() if isinstance(value, int)}
+
+
+def record_usage(result):
+    """Attach the reported token usage of an LLM response to the current span"""
+    attrs = usage_attributes(result)
+    if attrs:
+        annotate(**attrs, tokens_reported=True)
+
+
+# --- Report CLI ---
+
+def load_spans(path: str) -> List[dict]:
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # a line cut off by a crash
+    return spans
+
+
+def flame_summary(spans: List[dict]) -> List[dict]:
+    """
+    Aggregate spans by their stack of names (phase > generate_file > llm_call ...).
+
+    Returns rows in depth-first order with depth, name, count, total_ms and self_ms, so
+    sibling spans with the same name (one per file, one per call) collapse into one line.
+    """
+    by_id = {s['span_id']: s for s in spans}
+    children: Dict[Optional[str], List[dict]] = {}
+    for s in spans:
+        parent = s.get('parent_id') if s.get('parent_id') in by_id else None
+        children.setdefault(parent, []).append(s)
+
+    rows = []
+
+    def visit(group: List[dict], depth: int):
+        by_name: Dict[str, List[dict]] = {}
+        for s in group:
+            by_name.setdefault(s['name'], []).append(s)
+        ordered = sorted(by_name.items(), key=lambda item: -sum(s['duration_ms'] for s in item[1]))
+        for name, members in ordered:
+            total = sum(s['duration_ms'] for s in members)
+            nested = [child for s in members for child in children.get(s['span_id'], [])]
+            # Concurrent children can add up to more than their parent; self time never goes negative
+            self_ms = max(0.0, total - sum(child['duration_ms'] for child in nested))
+            rows.append({'depth': depth, 'name': name, 'count': len(members), 'total_ms': total, 'self_ms': self_ms})
+            visit(nested, depth + 1)
+
+    visit(children.get(None, []), 0)
+    return rows
+
+
+def slowest(spans: List[dict], kind: str, top: int) -> List[dict]:
+    return sorted((s for s in spans if s.get('kind') == kind), key=lambda s: -s['duration_ms'])[:top]
+
+
+def _seconds(ms: float) -> str:
+    return f"{ms / 1000:8.2f}s"
+
+
+def print_report(spans: List[dict], top: int = 10):
+    if not spans:
+        print("No spans recorded.")
+        return
+    rows = flame_summary(spans)
+    wall = max((row['total_ms'] for row in rows if row['depth'] == 0), default=0) or 1
+    print(f"Trace {spans[0].get('trace_id')} - {len(spans)} spans\n")
+    print("Flame summary (total / self, concurrent children can exceed their parent)")
+    for row in rows:
+        bar = "█" * max(1, round(30 * min(row['total_ms'], wall) / wall))
+        label = f"{'  ' * row['depth']}{row['name']}"
+        print(f"  {label:<40} {_seconds(row['total_ms'])} {_seconds(row['self_ms'])}  x{row['count']:<4} {bar}")
+
+    files = slowest(spans, 'file', top)
+    if files:
+        print(f"\nTop {len(files)} slowest files")
+        for s in files:
+            attrs = s.get('attrs', {})
+            target = attrs.get('file') or ", ".join(attrs.get('files', []))
+            print(f"  {_seconds(s['duration_ms'])}  {target}  ({attrs.get('source', s['status'])}, attempts {attrs.get('attempts', 1)})")
+
+    calls = slowest(spans, 'llm', top)
+    if calls:
+        print(f"\nTop {len(calls)} slowest LLM calls")
+        for s in calls:
+            attrs = s.get('attrs', {})
+            print(f"  {_seconds(s['duration_ms'])}  {attrs.get('model')}  "
+                  f"prompt {attrs.get('prompt_tokens', '?')} / response {attrs.get('response_tokens', '?')} tokens, "
+                  f"retries {attrs.get('retries', 0)}, cache {'hit' if attrs.get('cache_hit') else 'miss'}")
+
+    llm_spans = [s for s in spans if s.get('kind') == 'llm']
+    if llm_spans:
+        hits = sum(1 for s in llm_spans if s.get('attrs', {}).get('cache_hit'))
+        tokens = sum((s.get('attrs', {}).get('prompt_tokens') or 0) + (s.get('attrs', {}).get('response_tokens') or 0) for s in llm_spans)
+        print(f"\nLLM calls: {len(llm_spans)} ({hits} cache hits), ~{tokens} tokens")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Summarize the trace of a software factory run.")
+    parser.add_argument("run", help="Run id (see run.py --list-runs) or path to a .trace.jsonl file")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest files and LLM calls to show")
+    parser.add_argument("--base-dir", default=None, help="Output directory holding .runs/ (defaults to BASE_OUTPUT_DIR)")
+    args = parser.parse_args(argv)
+
+    path = args.run
+    if not os.path.isfile(path):
+        base_dir = args.base_dir
+        if base_dir is None:
+            import config
+            base_dir = config.BASE_OUTPUT_DIR
+        path = trace_path(base_dir, args.run)
+    if not os.path.isfile(path):
+        parser.error(f"No trace found at {path}")
+    print_report(load_spans(path), top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import ast
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from design_slices import stable_hash
+from generation_manifest import UnitTestManifest
+from generation_scheduler import DependencyScheduler
+from prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_SOURCE_DIRS = ('venv', 'node_modules', 'tests')
+# Rough size of the tests written for one function, counted against the batch token budget
+EXPECTED_TEST_TOKENS_PER_FUNCTION = 600
+
+
+class UnitTestJob:
+    """One public function or method of the project that gets its own generated test file"""
+
+    def __init__(self, module_path: str, function_name: str, code: str, source_file: str, class_name: Optional[str] = None):
+        self.module_path = module_path
+        self.function_name = function_name
+        self.code = code
+        self.source_file = source_file
+        self.class_name = class_name
+        self.output_name = f"test_{class_name}_{function_name}.py" if class_name else f"test_{function_name}.py"
+
+    @property
+    def is_method(self) -> bool:
+        return self.class_name is not None
+
+    @property
+    def key(self) -> str:
+        """Unique name of the job: module.function or module.Class.method"""
+        return '.'.join(part for part in (self.module_path, self.class_name, self.function_name) if part)
+
+    @property
+    def label(self) -> str:
+        return f"{self.class_name}.{self.function_name}" if self.class_name else self.function_name
+
+    @property
+    def context(self) -> str:
+        if self.is_method:
+            return (f"Method {self.function_name} is part of class {self.class_name} in module {self.module_path}. "
+                    f"Ensure you instantiate or mock the class to test this method. Mock its `self` argument if necessary.")
+        return f"Function {self.function_name} is in module {self.module_path}. Ensure all its dependencies are mocked effectively."
+
+
+def collect_unit_test_jobs(project_root: str, source_dir: str) -> List[UnitTestJob]:
+    """
+    Every public top-level function and public method under `source_dir`, in walk order.
+    Output file names are made unique: a later job whose name is taken gets its module prefixed.
+    """
+    jobs = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_SOURCE_DIRS)
+        for file in sorted(files):
+            if not file.endswith(".py") or file == "__init__.py":
+                continue
+            file_path = os.path.join(root, file)
+            module_name = os.path.relpath(file_path, project_root).replace(os.sep, ".")[:-3]
+            jobs.extend(_module_jobs(file_path, module_name))
+
+    taken = set()
+    for job in jobs:
+        if job.output_name in taken:
+            job.output_name = f"test_{job.module_path.replace('.', '_')}_{job.output_name[len('test_'):]}"
+        taken.add(job.output_name)
+    return jobs
+
+
+def _module_jobs(file_path: str, module_name: str) -> List[UnitTestJob]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        logger.warning(f"Could not parse '{file_path}' ({e.msg}, line {e.lineno}). Skipping unit test generation.")
+        return []
+
+    targets = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith('_'):
+            targets.append((None, node))
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            targets.extend((node.name, method) for method in node.body
+                           if isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef)) and not method.name.startswith('_'))
+
+    jobs = []
+    for class_name, node in targets:
+        code = ast.get_source_segment(source, node)
+        if code:
+            jobs.append(UnitTestJob(module_name, node.name, code, file_path, class_name))
+        else:
+            label = f"{class_name}.{node.name}" if class_name else node.name
+            logger.warning(f"Could not extract code for '{label}' from '{file_path}'. Skipping unit test generation.")
+    return jobs
+
+
+def job_input_hashes(job: UnitTestJob, framework: str, model: str) -> Dict[str, str]:
+    """What a job's tests depend on: its source segment, and the framework/model that wrote them"""
+    return {
+        'source': stable_hash(job.code),
+        'generator': stable_hash({'framework': framework, 'model': model, 'class': job.class_name}),
+    }
+
+
+def select_stale_jobs(jobs: List[UnitTestJob], manifest: UnitTestManifest, framework: str, model: str,
+                      output_dir: str) -> List[UnitTestJob]:
+    """
+    Jobs whose test file must be (re)generated: new or changed functions, or a missing test file.
+
+    Test files of functions that no longer exist are deleted and forgotten (unless a current
+    job writes the same file). Manifest entries that are not unit tests are left alone.
+    """
+    current = {job.key for job in jobs}
+    current_files = {os.path.normpath(os.path.join(output_dir, job.output_name)) for job in jobs}
+    for key in manifest.removed_files(current):
+        entry = manifest.files[key]
+        if entry.get('kind') != 'unit':
+            continue
+        test_file = manifest.test_file(key)
+        if test_file and os.path.normpath(test_file) not in current_files and os.path.isfile(test_file):
+            os.remove(test_file)
+            logger.info(f"🗑️ Removed {os.path.basename(test_file)} ({key} no longer exists)")
+        manifest.forget(key)
+    return [job for job in jobs
+            if not manifest.is_up_to_date(job.key, job_input_hashes(job, framework, model), os.path.join(output_dir, job.output_name))]
+
+
+def plan_module_batches(jobs: List[UnitTestJob], token_budget: int) -> List[List[UnitTestJob]]:
+    """
+    Group the jobs of each module into as few requests as the token budget allows.
+
+    A job costs its source plus EXPECTED_TEST_TOKENS_PER_FUNCTION of output. Jobs are added to
+    the module's current group until the next one would exceed `token_budget`; a job that
+    does not fit with any other is generated on its own (per-function). Module order and the
+    order of jobs inside a module are kept.
+    """
+    groups: List[List[UnitTestJob]] = []
+    current: List[UnitTestJob] = []
+    current_tokens = 0
+    for job in jobs:
+        cost = estimate_tokens(job.code) + EXPECTED_TEST_TOKENS_PER_FUNCTION
+        same_module = current and current[0].module_path == job.module_path
+        if current and (not same_module or current_tokens + cost > token_budget):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(job)
+        current_tokens += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+class GenerationProgress:
+    """Counts finished jobs, logs progress as they complete and summarizes throughput at the end"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.generated = 0
+        self.empty = 0
+        self.failed = 0
+        self.requests = 0
+        self.batched = 0
+        self.started = time.perf_counter()
+
+    @property
+    def done(self) -> int:
+        return self.generated + self.empty + self.failed
+
+    def record(self, job: UnitTestJob, outcome: str):
+        """outcome: 'generated', 'empty' (no code returned) or 'failed' (exception)"""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        logger.info(f"🧪 [{self.done}/{self.total}] {job.label} ({job.module_path}): {outcome}")
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            'jobs': self.total,
+            'generated': self.generated,
+            'empty': self.empty,
+            'failed': self.failed,
+            'requests': self.requests,
+            'batched': self.batched,
+            'elapsed_seconds': round(elapsed, 1),
+            'jobs_per_minute': round(self.done * 60 / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+async def agenerate_for_jobs(jobs: List[UnitTestJob],
+                             generate: Callable[[UnitTestJob], Awaitable[Optional[str]]],
+                             on_result: Callable[[UnitTestJob, str], None],
+                             max_workers: int = 4,
+                             generate_batch: Optional[Callable[[List[UnitTestJob]], Awaitable[Optional[Dict[str, str]]]]] = None,
+                             token_budget: int = 0) -> dict:
+    """
+    Run `generate` for every job with at most `max_workers` requests in flight, on the running loop.
+
+    The jobs are independent, so they go through DependencyScheduler without edges; API pacing
+    comes from the shared rate limiter inside `generate`, not from sleeping between jobs.
+    `on_result` is called with the code of each job as soon as it completes (never concurrently).
+    A job that raises is counted as failed and does not stop the others. Returns the progress report.
+
+    With `generate_batch`, the jobs of a module are sent together (see plan_module_batches).
+    It returns {output_name: test code} for every job of the group, or None, in which case the
+    group falls back to one `generate` call per job.
+    """
+    unique_jobs = list({job.key: job for job in jobs}.values())
+    if generate_batch is not None:
+        groups = plan_module_batches(unique_jobs, token_budget)
+    else:
+        groups = [[job] for job in unique_jobs]
+    by_node: Dict[str, List[UnitTestJob]] = {group[0].key: group for group in groups}
+    progress = GenerationProgress(len(unique_jobs))
+
+    async def generate_one(job: UnitTestJob):
+        progress.requests += 1
+        try:
+            return await generate(job)
+        except Exception as e:
+            logger.error(f"Failed to generate unit tests for {job.key}: {e}", exc_info=True)
+            return e
+
+    async def work(node: str, _prepared: Any) -> List[Tuple[UnitTestJob, Any]]:
+        group = by_node[node]
+        if len(group) > 1:
+            progress.requests += 1
+            try:
+                files = await generate_batch(group)
+            except Exception as e:
+                logger.warning(f"⚠️ Batched unit test generation for {group[0].module_path} failed ({e})")
+                files = None
+            if files is not None:
+                progress.batched += len(group)
+                return [(job, files.get(job.output_name)) for job in group]
+            logger.info(f"Generating the {len(group)} unit test files of {group[0].module_path} one by one")
+        return [(job, await generate_one(job)) for job in group]
+
+    def on_complete(node: str, results: List[Tuple[UnitTestJob, Any]]):
+        for job, result in results:
+            if isinstance(result, Exception):
+                progress.record(job, 'failed')
+            elif result:
+                on_result(job, result)
+                progress.record(job, 'generated')
+            else:
+                progress.record(job, 'empty')
+
+    await DependencyScheduler({}, order=list(by_node), max_workers=max_workers).arun(work, on_complete)
+    return progress.report()
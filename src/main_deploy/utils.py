@@ -1,6 +1,8 @@
 import os
 import json
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple, Optional
@@ -8,8 +10,30 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Set per project by batch runs so concurrent projects never share an output directory
+_project_output_dir: ContextVar[Optional[str]] = ContextVar('project_output_dir', default=None)
+
+def get_base_output_dir() -> str:
+    """Where generated projects (and spec/design files) go: BASE_OUTPUT_DIR, or the project's own directory in a batch"""
+    return _project_output_dir.get() or config.BASE_OUTPUT_DIR
+
+@contextmanager
+def project_output_dir(path: Optional[str]):
+    """Send every output of the pipeline run in this context to `path` (no-op for None)"""
+    if not path:
+        yield
+        return
+    os.makedirs(path, exist_ok=True)
+    token = _project_output_dir.set(path)
+    try:
+        yield
+    finally:
+        _project_output_dir.reset(token)
+
 def get_spec_design_output_dir():
     output_dir = config.SPEC_DESIGN_OUTPUT_DIR
+    if _project_output_dir.get():
+        output_dir = os.path.join(_project_output_dir.get(), "spec_vs_design")
     if not output_dir:
         raise ValueError("SPEC_DESIGN_OUTPUT_DIR is not set in the configuration. Please check the .env")
 
@@ -58,6 +82,13 @@ def parse_json_response(response_text: str) -> dict:
         logger.error(f"An unexpected error occurred while parsing JSON: {e}\nRaw response: {response_text}", exc_info=True)
         raise
 
+def is_json_object_response(response_text: str) -> bool:
+    """Validator for cached responses: True when the text parses to a JSON object."""
+    try:
+        return isinstance(parse_json_response(response_text), dict)
+    except Exception:
+        return False
+
 def find_latest_json_files(project_name: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
     """
     Finds the latest design and specification JSON files, optionally for a specific project.
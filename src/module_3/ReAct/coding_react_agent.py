@@ -155,7 +155,7 @@ def main():
         
         project_name = design_data.get('folder_Structure', {}).get('root_Project_Directory_Name', 'unknown_project')
         project_root = Path(config.base_output_dir) / project_name
-        error_file = project_root / 'errors.json'
+        error_file = project_root / 'errors.jsonl'
         print(f"Check {error_file} for any logged issues during the process.")
 
     except Exception as e:
@@ -760,6 +760,7 @@
         
 import json
 import os
+import sys
 import logging
 import time
 import ast
@@ -771,6 +772,9 @@ from langchain_core.messages import HumanMessage
 from langchain_core.callbacks.base import BaseCallbackHandler
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+# One ErrorJournal implementation, shared with the main_deploy pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'main_deploy'))
+from error_journal import ErrorJournal
 
 load_dotenv()
 
@@ -805,7 +809,8 @@ class ErrorTracker:
     def __init__(self, project_root: str):
         self.project_root = project_root
         self.errors = []
-        self.error_file = os.path.join(project_root, "errors.json")
+        self.error_file = os.path.join(project_root, "errors.jsonl")
+        self.journal = ErrorJournal(self.error_file, blob_dir=os.path.join(project_root, ".error_blobs"))
     
     def add_error(self, error_type: str, file_path: str, error_message: str, context: Optional[Dict] = None):
         error_entry = {
@@ -815,16 +820,11 @@ class ErrorTracker:
             "error_message": error_message,
             "context": context or {}
         }
-        self.errors.append(error_entry)
-        self._save_errors()
-    
-    def _save_errors(self):
-        os.makedirs(os.path.dirname(self.error_file), exist_ok=True)
         try:
-            with open(self.error_file, 'w', encoding='utf-8') as f:
-                json.dump(self.errors, f, indent=2)
+            error_entry = self.journal.append(error_entry)
         except Exception as e:
-            logging.error(f"Failed to save errors to {self.error_file}: {e}")
+            logging.error(f"Failed to save error to {self.error_file}: {e}")
+        self.errors.append(error_entry)
 
     def get_errors(self) -> List[Dict]:
         return self.errors